@@ -6,3 +6,9 @@ class AddressesConfig(AppConfig):
     name = 'addresses'
     verbose_name = 'Adresler'
 
+    def ready(self):
+        from django.db.models.signals import post_delete, post_save
+        from . import tree
+        for model in (self.get_model('City'), self.get_model('District'), self.get_model('Neighborhood')):
+            post_save.connect(tree.on_address_changed, sender=model, dispatch_uid=f'address_tree_save_{model.__name__}')
+            post_delete.connect(tree.on_address_changed, sender=model, dispatch_uid=f'address_tree_delete_{model.__name__}')
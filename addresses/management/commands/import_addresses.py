@@ -1,4 +1,5 @@
 from django.core.management.base import BaseCommand
+from django.db import transaction
 from django.utils.text import slugify
 from addresses.models import City, District, Neighborhood
 from gumbuz_shop.utils.address_data import TURKEY_ADDRESS_DATA
@@ -7,6 +8,7 @@ from gumbuz_shop.utils.address_data import TURKEY_ADDRESS_DATA
 class Command(BaseCommand):
     help = 'Import address data from TURKEY_ADDRESS_DATA'
     
+    @transaction.atomic
     def handle(self, *args, **kwargs):
         self.stdout.write(self.style.WARNING('Starting address data import...'))
         
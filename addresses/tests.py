@@ -1,4 +1,5 @@
 from django.test import TestCase
+from . import tree
 from .models import City, District, Neighborhood
 
 class AddressModelTests(TestCase):
@@ -28,3 +29,152 @@ class AddressModelTests(TestCase):
         district = District.objects.create(city=city, name="Test District")
         neighborhood = Neighborhood.objects.create(district=district, name="Gümüşsuyu")
         self.assertEqual(neighborhood.slug, "gumussuyu")
+
+
+class AddressTreeTest(TestCase):
+    def setUp(self):
+        self.istanbul = City.objects.create(name="İstanbul")
+        self.ankara = City.objects.create(name="Ankara")
+        self.kadikoy = District.objects.create(city=self.istanbul, name="Kadıköy")
+        self.besiktas = District.objects.create(city=self.istanbul, name="Beşiktaş")
+        self.cankaya = District.objects.create(city=self.ankara, name="Çankaya")
+        self.moda = Neighborhood.objects.create(district=self.kadikoy, name="Moda")
+        self.caferaga = Neighborhood.objects.create(district=self.kadikoy, name="Caferağa")
+        self.kizilay = Neighborhood.objects.create(district=self.cankaya, name="Kızılay")
+        tree.clear()
+
+    def test_lookup_and_children_without_queries(self):
+        address_tree = tree.get_tree()
+        with self.assertNumQueries(0):
+            address_tree = tree.get_tree()
+            node = address_tree.neighborhood(self.moda.id)
+            self.assertEqual((node.name, node.parent.name, node.parent.parent.name), ("Moda", "Kadıköy", "İstanbul"))
+            self.assertEqual([c.name for c in address_tree.city_list()], ["Ankara", "İstanbul"])
+            self.assertEqual([d.name for d in address_tree.districts_of(self.istanbul.id)], ["Beşiktaş", "Kadıköy"])
+            self.assertEqual([n.id for n in address_tree.neighborhoods_of(str(self.kadikoy.id))], [self.caferaga.id, self.moda.id])
+            self.assertEqual(address_tree.neighborhoods_of(self.besiktas.id), [])
+            self.assertIsNone(address_tree.city('abc'))
+
+    def test_resolve_validates_hierarchy(self):
+        address_tree = tree.get_tree()
+        city, district, neighborhood = address_tree.resolve('', '', self.kizilay.id)
+        self.assertEqual((city.id, district.id), (self.ankara.id, self.cankaya.id))
+        with self.assertRaises(tree.AddressMismatch):
+            address_tree.resolve(self.istanbul.id, self.kadikoy.id, self.kizilay.id)
+        with self.assertRaises(tree.AddressMismatch):
+            address_tree.resolve(self.ankara.id, self.kadikoy.id, None)
+        with self.assertRaises(tree.UnknownAddress):
+            address_tree.resolve(self.ankara.id, 999999, None)
+        self.assertEqual(address_tree.resolve(), (None, None, None))
+
+    def test_changes_invalidate_tree(self):
+        tree.get_tree()
+        self.cankaya.is_active = False
+        self.cankaya.save()
+        address_tree = tree.get_tree()
+        self.assertEqual(address_tree.districts_of(self.ankara.id), [])
+        self.assertEqual(len(address_tree.districts_of(self.ankara.id, active_only=False)), 1)
+        self.assertNotIn(self.kizilay.id, [row[4] for row in address_tree.rows()])
+
+        self.moda.delete()
+        self.assertIsNone(tree.get_tree().neighborhood(self.moda.id))
+
+    def test_names_are_interned(self):
+        other = Neighborhood.objects.create(district=self.cankaya, name="".join(["Mo", "da"]))
+        address_tree = tree.get_tree()
+        self.assertIs(address_tree.neighborhood(self.moda.id).name, address_tree.neighborhood(other.id).name)
+
+    def test_checkout_rejects_mismatched_address(self):
+        from decimal import Decimal
+        from django.urls import reverse
+        from campaigns.models import Campaign, CampaignProduct
+        from products.models import Product
+
+        campaign = Campaign.objects.create(title="Kampanya", slug="kampanya", price=Decimal('100'), min_quantity=1)
+        product = Product.objects.create(name="Ürün", sku="ADR-1", stock_qty=10)
+        CampaignProduct.objects.create(campaign=campaign, product=product)
+        data = {
+            'campaign_id': campaign.id, 'first_name': 'Ayşe', 'last_name': 'Yılmaz', 'phone': '5551234567',
+            'city': self.ankara.id, 'district': self.kadikoy.id, 'neighborhood': self.moda.id,
+            'address_detail': 'No: 1', 'selected_products[]': [product.id],
+        }
+        response = self.client.post(reverse('create_order'), data)
+        self.assertEqual(response.status_code, 400)
+
+        data['neighborhood'] = 999999
+        self.assertEqual(self.client.post(reverse('create_order'), data).status_code, 404)
+
+
+class NeighborhoodSearchTest(TestCase):
+    def setUp(self):
+        self.city = City.objects.create(name="İzmir")
+        self.karsiyaka = District.objects.create(city=self.city, name="Karşıyaka")
+        self.bornova = District.objects.create(city=self.city, name="Bornova")
+        self.names = {}
+        for district, name in (
+            (self.karsiyaka, "Çarşı"), (self.karsiyaka, "Şemikler"), (self.karsiyaka, "Yalı"),
+            (self.karsiyaka, "Yeni Şehir"), (self.bornova, "Işıklar"), (self.bornova, "Çamdibi"),
+        ):
+            self.names[name] = Neighborhood.objects.create(district=district, name=name)
+        Neighborhood.objects.create(district=self.bornova, name="Çamlık", is_active=False)
+        tree.clear()
+
+    def search(self, query, district=None, city=None):
+        return [node.name for node in tree.get_tree().search_neighborhoods(query, district, city_id=city)]
+
+    def test_fold(self):
+        self.assertEqual(tree.fold("Çağlayan İŞ Mah."), "caglayan is mah")
+        self.assertEqual(tree.fold("IŞIKLAR"), tree.fold("ışıklar"))
+
+    def test_case_and_accent_insensitive_prefix(self):
+        self.assertEqual(self.search("carsi"), ["Çarşı"])
+        self.assertEqual(self.search("ISIK"), ["Işıklar"])
+        self.assertEqual(self.search("ça"), ["Çamdibi", "Çarşı"])
+        self.assertEqual(self.search("   "), [])
+
+    def test_word_prefix_ranks_after_name_prefix(self):
+        Neighborhood.objects.create(district=self.bornova, name="Şehitler")
+        self.assertEqual(self.search("seh"), ["Şehitler", "Yeni Şehir"])
+
+    def test_district_scope_and_inactive(self):
+        self.assertEqual(self.search("ca", self.karsiyaka.id), ["Çarşı"])
+        self.assertEqual(self.search("ca", 999999), [])
+        self.assertNotIn("Çamlık", self.search("caml"))
+
+    def test_city_scope(self):
+        ankara = City.objects.create(name="Ankara")
+        cankaya = District.objects.create(city=ankara, name="Çankaya")
+        Neighborhood.objects.create(district=cankaya, name="Yalıncak")
+        tree.clear()
+        self.assertEqual(self.search("yal"), ["Yalı", "Yalıncak"])
+        self.assertEqual(self.search("yal", city=self.city.id), ["Yalı"])
+        self.assertEqual(self.search("yal", city=ankara.id), ["Yalıncak"])
+        # İlçe verilirse ilçe kapsamı geçerlidir
+        self.assertEqual(self.search("ca", self.karsiyaka.id, city=self.city.id), ["Çarşı"])
+        self.assertEqual(self.search("yal", city=999999), [])
+
+    def test_rebuilt_on_change(self):
+        self.assertEqual(self.search("mavi"), [])
+        Neighborhood.objects.create(district=self.karsiyaka, name="Mavişehir")
+        self.assertEqual(self.search("mavi"), ["Mavişehir"])
+
+    def test_endpoint(self):
+        from django.urls import reverse
+
+        tree.get_tree()
+        with self.assertNumQueries(0):
+            response = self.client.get(reverse('search_neighborhoods'), {'q': 'yal', 'district': self.karsiyaka.id})
+        self.assertContains(response, f'<option value="{self.names["Yalı"].id}" selected>Yalı</option>', html=True)
+
+        response = self.client.get(reverse('search_neighborhoods'), {'q': 'isik'})
+        self.assertContains(response, "Işıklar (Bornova / İzmir)")
+
+        # İlçe seçilmeden yazılırsa seçili ilde aranır
+        response = self.client.get(reverse('search_neighborhoods'), {'q': 'isik', 'city': self.city.id, 'district': ''})
+        self.assertContains(response, "Işıklar (Bornova)")
+        response = self.client.get(reverse('search_neighborhoods'), {'q': 'isik', 'city': self.city.id + 1, 'district': ''})
+        self.assertContains(response, "Eşleşen mahalle yok")
+
+        response = self.client.get(reverse('search_neighborhoods'), {'q': '', 'district': self.bornova.id})
+        self.assertContains(response, "Çamdibi")
+        self.assertNotContains(response, "selected")
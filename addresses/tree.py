@@ -0,0 +1,411 @@
+"""
+Süreç içi adres ağacı (il -> ilçe -> mahalle).
+
+Adres verisi neredeyse hiç değişmez ama checkout, il/ilçe/mahalle seçim uçları
+ve sipariş üreticileri tarafından sürekli okunur. Üç tablo bir kez, seviye başına
+tek sorguyla okunur ve kompakt dizilere yazılır:
+
+- ``ids`` / ``parents``: ``array`` (kayıt id'si ve üst seviyedeki sıra numarası),
+- ``names``: ``sys.intern`` edilmiş adlar (aynı mahalle adı tek nesne),
+- ``active``: ``bytearray``,
+- ``child_start`` / ``child_end``: alt seviyede çocukların ardışık aralığı.
+
+Satırlar (üst, ad) sırasıyla yerleştirildiği için bir düğümün çocukları tek bir
+dilimdir; id ile arama, çocuk listeleme ve il/ilçe/mahalle tutarlılığı
+sorgusuz ve sabit zamanlıdır. Düğümler (``AddressNode``) yalnızca seviye ve
+sıra numarası tutan ``__slots__`` nesneleridir.
+
+Mahalle arama (type-ahead) için adlar Türkçe büyük/küçük harf ve aksan
+duyarsız katlanıp (``fold``) sıralı bir diziye yazılır; önek araması ``bisect``
+ile yapılır. İndeks ağaçla birlikte, ilk aramada kurulur ve ağaçla birlikte
+yenilenir. Adın her kelimesinden başlayan aramalar da eşleşir ("sok" ->
+"Yeni Sokak"), ama adın başından eşleşenler önce gelir.
+
+Geçersiz kılma: adres modeli kaydedilince/silinince bu süreçteki ağaç hemen
+düşürülür, commit sonrası cache'teki sürüm değiştirilir. Diğer süreçler sürümü
+en fazla ADDRESS_TREE_CHECK_INTERVAL saniyede bir (tek cache okuması) kontrol
+edip değişmişse ağacı yeniden yükler. Sinyal üretmeyen toplu işlemlerden
+(bulk_create, update) sonra ``invalidate()`` çağrılmalıdır.
+"""
+import re
+import sys
+import threading
+import time
+import unicodedata
+from array import array
+from bisect import bisect_left
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+
+from .models import City, District, Neighborhood
+
+VERSION_KEY = 'addresses:tree_version'
+SEARCH_LIMIT = 10
+# Aynı önekle eşleşen en fazla bu kadar indeks girdisi sıralamaya alınır
+SEARCH_SCAN_LIMIT = 500
+
+_FOLD = str.maketrans({'İ': 'i', 'I': 'i', 'ı': 'i'})
+_NON_WORD = re.compile(r'[\W_]+')
+
+
+def fold(text):
+    """Türkçe harf ve aksan duyarsız arama anahtarı: 'Çağlayan İŞ Mah.' -> 'caglayan is mah'."""
+    text = unicodedata.normalize('NFKD', text.translate(_FOLD).lower())
+    text = ''.join(char for char in text if not unicodedata.combining(char))
+    return ' '.join(_NON_WORD.sub(' ', text).split())
+
+
+class UnknownAddress(LookupError):
+    """Verilen id'ye sahip il/ilçe/mahalle yok."""
+
+
+class AddressMismatch(ValueError):
+    """İl, ilçe ve mahalle birbirine ait değil."""
+
+
+class Level:
+    """Ağacın bir seviyesi; satırlar (üst sıra no, ad) sırasındadır."""
+    __slots__ = ('kind', 'parent', 'ids', 'names', 'parents', 'active', 'index', 'child_start', 'child_end')
+
+    def __init__(self, kind, parent=None):
+        self.kind = kind
+        self.parent = parent
+        self.ids = array('q')
+        self.names = []
+        self.parents = array('l')
+        self.active = bytearray()
+        self.index = {}
+        # Alt seviyedeki çocuk aralığı [start, end); alt seviye yüklenince doldurulur
+        self.child_start = array('l')
+        self.child_end = array('l')
+
+    def __len__(self):
+        return len(self.ids)
+
+    def append(self, pk, name, parent_index, is_active):
+        self.index[pk] = len(self.ids)
+        self.ids.append(pk)
+        self.names.append(sys.intern(name))
+        self.parents.append(parent_index)
+        self.active.append(1 if is_active else 0)
+
+
+class AddressNode:
+    """Ağaçtaki bir il/ilçe/mahalle; şablonlarda model nesnesi gibi (id, name) kullanılır."""
+    __slots__ = ('level', 'position')
+
+    def __init__(self, level, position):
+        self.level = level
+        self.position = position
+
+    @property
+    def kind(self):
+        return self.level.kind
+
+    @property
+    def id(self):
+        return self.level.ids[self.position]
+
+    pk = id
+
+    @property
+    def name(self):
+        return self.level.names[self.position]
+
+    @property
+    def is_active(self):
+        return bool(self.level.active[self.position])
+
+    @property
+    def parent(self):
+        if self.level.parent is None:
+            return None
+        return AddressNode(self.level.parent, self.level.parents[self.position])
+
+    def __eq__(self, other):
+        return isinstance(other, AddressNode) and (self.kind, self.id) == (other.kind, other.id)
+
+    def __hash__(self):
+        return hash((self.kind, self.id))
+
+    def __str__(self):
+        return self.name
+
+    def __repr__(self):
+        return f'<AddressNode {self.kind} {self.id}: {self.name}>'
+
+
+class PrefixIndex:
+    """Katlanmış anahtarların sıralı dizisi; her girdi bir mahalle sıra numarasını gösterir."""
+    __slots__ = ('keys', 'positions', 'inner')
+
+    def __init__(self, entries):
+        entries.sort()
+        self.keys = [key for key, _, _ in entries]
+        self.inner = bytearray(1 if inner else 0 for _, inner, _ in entries)
+        self.positions = array('l', (position for _, _, position in entries))
+
+    @classmethod
+    def build(cls, names, positions):
+        entries = []
+        for position in positions:
+            words = fold(names[position]).split()
+            for start in range(len(words)):
+                # inner: ad ortasındaki bir kelimeden başlayan girdi (aynı anahtarda sona sıralanır)
+                entries.append((' '.join(words[start:]), start != 0, position))
+        return cls(entries)
+
+    def search(self, prefix, limit=SEARCH_LIMIT):
+        """Öneki taşıyan mahalle sıra numaraları; adın başından eşleşenler önce."""
+        keys = self.keys
+        index = bisect_left(keys, prefix)
+        end = min(len(keys), index + SEARCH_SCAN_LIMIT)
+        first, rest, seen = [], [], set()
+        while index < end and keys[index].startswith(prefix):
+            position = self.positions[index]
+            if position not in seen:
+                seen.add(position)
+                (rest if self.inner[index] else first).append(position)
+            index += 1
+        return (first + rest)[:limit]
+
+
+def _int(value):
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+
+class AddressTree:
+    def __init__(self, version=None):
+        self.version = version
+        self.cities = Level('city')
+        self.districts = Level('district', self.cities)
+        self.neighborhoods = Level('neighborhood', self.districts)
+        # Mahalle arama indeksleri ilk aramada kurulur: None -> tümü, (seviye, sıra no) -> o il/ilçe
+        self._search_indexes = {}
+
+    @classmethod
+    def load(cls, version=None):
+        """Üç sorguyla tüm ağacı kurar."""
+        tree = cls(version)
+        for pk, name, is_active in City.objects.order_by('name', 'pk').values_list('pk', 'name', 'is_active'):
+            tree.cities.append(pk, name, -1, is_active)
+        tree._load_children(
+            tree.cities, tree.districts,
+            District.objects.values_list('pk', 'city_id', 'name', 'is_active'),
+        )
+        tree._load_children(
+            tree.districts, tree.neighborhoods,
+            Neighborhood.objects.values_list('pk', 'district_id', 'name', 'is_active'),
+        )
+        return tree
+
+    @staticmethod
+    def _load_children(parent, level, rows):
+        # Üst seviyenin sırasına göre grupla; grup içinde ad sırası modellerin Meta.ordering'i ile aynı
+        rows = sorted(
+            ((parent.index[parent_id], name, pk, is_active) for pk, parent_id, name, is_active in rows),
+            key=lambda row: (row[0], row[1], row[2]),
+        )
+        parent.child_start = array('l', [0]) * len(parent)
+        parent.child_end = array('l', [0]) * len(parent)
+        for parent_index, name, pk, is_active in rows:
+            if parent.child_end[parent_index] == 0:
+                parent.child_start[parent_index] = len(level)
+            level.append(pk, name, parent_index, is_active)
+            parent.child_end[parent_index] = len(level)
+
+    def __len__(self):
+        return len(self.cities) + len(self.districts) + len(self.neighborhoods)
+
+    def _node(self, level, pk):
+        position = level.index.get(_int(pk))
+        return None if position is None else AddressNode(level, position)
+
+    def city(self, pk):
+        return self._node(self.cities, pk)
+
+    def district(self, pk):
+        return self._node(self.districts, pk)
+
+    def neighborhood(self, pk):
+        return self._node(self.neighborhoods, pk)
+
+    def _children(self, level, child_level, position, active_only):
+        if position is None:
+            return []
+        return [
+            AddressNode(child_level, index)
+            for index in range(level.child_start[position], level.child_end[position])
+            if not active_only or child_level.active[index]
+        ]
+
+    def city_list(self, active_only=True):
+        return [
+            AddressNode(self.cities, index) for index in range(len(self.cities))
+            if not active_only or self.cities.active[index]
+        ]
+
+    def districts_of(self, city_id, active_only=True):
+        return self._children(self.cities, self.districts, self.cities.index.get(_int(city_id)), active_only)
+
+    def neighborhoods_of(self, district_id, active_only=True):
+        return self._children(
+            self.districts, self.neighborhoods, self.districts.index.get(_int(district_id)), active_only
+        )
+
+    def resolve(self, city_id=None, district_id=None, neighborhood_id=None):
+        """
+        Formdan gelen id'leri (boş olabilir) düğümlere çevirir ve hiyerarşiyi
+        doğrular. Boş bırakılan üst seviye alt seviyeden tamamlanır.
+        Olmayan id: UnknownAddress; birbirine ait olmayan seviyeler: AddressMismatch.
+        """
+        nodes = []
+        for level, pk in ((self.cities, city_id), (self.districts, district_id), (self.neighborhoods, neighborhood_id)):
+            if pk in (None, ''):
+                nodes.append(None)
+                continue
+            node = self._node(level, pk)
+            if node is None:
+                raise UnknownAddress(f'{level.kind} {pk}')
+            nodes.append(node)
+        city, district, neighborhood = nodes
+
+        if neighborhood is not None:
+            if district is None:
+                district = neighborhood.parent
+            elif neighborhood.parent != district:
+                raise AddressMismatch('Mahalle seçilen ilçeye ait değil.')
+        if district is not None:
+            if city is None:
+                city = district.parent
+            elif district.parent != city:
+                raise AddressMismatch('İlçe seçilen ile ait değil.')
+        return city, district, neighborhood
+
+    def _search_index(self, scope):
+        index = self._search_indexes.get(scope)
+        if index is None:
+            neighborhoods = self.neighborhoods
+            if scope is None:
+                positions = [
+                    position for position in range(len(neighborhoods))
+                    if neighborhoods.active[position] and self._ancestors_active(neighborhoods.parents[position])
+                ]
+            elif scope[0] == 'city':
+                districts = self.districts
+                positions = [
+                    position
+                    for district in range(self.cities.child_start[scope[1]], self.cities.child_end[scope[1]])
+                    if districts.active[district]
+                    for position in range(districts.child_start[district], districts.child_end[district])
+                    if neighborhoods.active[position]
+                ]
+            else:
+                positions = [
+                    position for position in range(
+                        self.districts.child_start[scope[1]], self.districts.child_end[scope[1]]
+                    )
+                    if neighborhoods.active[position]
+                ]
+            index = self._search_indexes[scope] = PrefixIndex.build(neighborhoods.names, positions)
+        return index
+
+    def _ancestors_active(self, district_position):
+        districts = self.districts
+        return districts.active[district_position] and self.cities.active[districts.parents[district_position]]
+
+    def search_neighborhoods(self, query, district_id=None, limit=SEARCH_LIMIT, city_id=None):
+        """
+        Aktif mahallelerde önek araması (Türkçe harf ve aksan duyarsız).
+        district_id verilirse yalnızca o ilçede, city_id verilirse o ilde,
+        ikisi de verilmezse tüm ağaçta arar.
+        """
+        prefix = fold(query or '')
+        if not prefix:
+            return []
+        scope = None
+        for level, pk in ((self.districts, district_id), (self.cities, city_id)):
+            if pk not in (None, ''):
+                position = level.index.get(_int(pk))
+                if position is None:
+                    return []
+                scope = (level.kind, position)
+                break
+        return [
+            AddressNode(self.neighborhoods, position)
+            for position in self._search_index(scope).search(prefix, limit)
+        ]
+
+    def rows(self, active_only=True):
+        """(il id, il, ilçe id, ilçe, mahalle id, mahalle) demetleri; üst seviyeleri pasif olanlar atlanır."""
+        cities, districts, neighborhoods = self.cities, self.districts, self.neighborhoods
+        for index in range(len(neighborhoods)):
+            district = neighborhoods.parents[index]
+            city = districts.parents[district]
+            if active_only and not (neighborhoods.active[index] and districts.active[district] and cities.active[city]):
+                continue
+            yield (
+                cities.ids[city], cities.names[city],
+                districts.ids[district], districts.names[district],
+                neighborhoods.ids[index], neighborhoods.names[index],
+            )
+
+
+_tree = None
+_checked_at = 0.0
+_lock = threading.Lock()
+
+
+def _current():
+    """Sürüm kontrolü gerekmiyorsa yüklü ağaç, aksi halde None."""
+    tree = _tree
+    if tree is not None and time.monotonic() - _checked_at < settings.ADDRESS_TREE_CHECK_INTERVAL:
+        return tree
+    return None
+
+
+def _refresh(version):
+    global _tree, _checked_at
+    with _lock:
+        if _tree is None or _tree.version != version:
+            _tree = AddressTree.load(version)
+        _checked_at = time.monotonic()
+        return _tree
+
+
+def get_tree():
+    """Süreçteki adres ağacı; gerekirse sürümü kontrol eder veya yeniden yükler."""
+    return _current() or _refresh(cache.get(VERSION_KEY))
+
+
+async def aget_tree():
+    tree = _current()
+    if tree is None:
+        tree = await sync_to_async(_refresh)(await cache.aget(VERSION_KEY))
+    return tree
+
+
+def clear():
+    """Yalnızca bu süreçteki ağacı düşürür."""
+    global _tree
+    _tree = None
+
+
+def invalidate():
+    """Bu süreçteki ağacı düşürür ve diğer süreçler için sürümü değiştirir."""
+    clear()
+    cache.set(VERSION_KEY, time.time_ns(), None)
+
+
+def on_address_changed(sender, **kwargs):
+    # Commit öncesi yüklenen ağaç eski veriyi görebilir; commit sonrası bir kez daha (işlem başına tek kez)
+    clear()
+    connection = transaction.get_connection()
+    if not any(func is invalidate for _, func, _ in connection.run_on_commit):
+        transaction.on_commit(invalidate)
@@ -1,5 +1,5 @@
 from django.contrib import admin
-from .models import AdminRole, AdminPermission, AdminUser
+from .models import AdminRole, AdminPermission, AdminUser, ImageJob
 
 
 class AdminPermissionInline(admin.TabularInline):
@@ -42,3 +42,11 @@ class AdminUserAdmin(admin.ModelAdmin):
     
     readonly_fields = ['created_at', 'updated_at']
 
+
+
+@admin.register(ImageJob)
+class ImageJobAdmin(admin.ModelAdmin):
+    list_display = ['id', 'content_type', 'object_id', 'field_name', 'status', 'attempts', 'created_at', 'finished_at']
+    list_filter = ['status', 'content_type']
+    readonly_fields = ['content_type', 'object_id', 'field_name', 'variants_field', 'attempts', 'error',
+                       'created_at', 'started_at', 'finished_at']
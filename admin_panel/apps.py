@@ -6,3 +6,8 @@ class AdminPanelConfig(AppConfig):
     name = 'admin_panel'
     verbose_name = 'Admin Panel'
 
+    def ready(self):
+        from django.core import checks
+        from gumbuz_shop.assets import check_assets
+        # Ön yüz paketleri (build_assets): check --deploy derlenmemiş/indirilmemiş (CDN'e düşen) dosyaları bildirir
+        checks.register(check_assets, checks.Tags.staticfiles, deploy=True)
@@ -0,0 +1,173 @@
+"""
+Yüklenen görseller için yerel arka plan kuyruğu.
+
+Admin yüklemesi dosyayı kaydedip hemen döner; ağır işler (Pillow doğrulaması,
+EXIF yön düzeltmesi, metadata temizliği, yeniden sıkıştırma ve türev üretimi)
+ImageJob tablosundaki işler olarak sonra yapılır. İşleri kim çalıştırır
+``IMAGE_JOB_RUNNER`` ayarıyla seçilir:
+
+- ``thread``: commit sonrası süreç içi tek thread'lik havuz kuyruğu boşaltır
+  (runserver/tek sunucu için varsayılan),
+- ``worker``: yalnızca ``process_image_jobs`` komutu işler,
+- ``inline``: commit sonrası aynı istekte işlenir.
+
+Geçersiz dosya reddedilir: alan boş bırakılabiliyorsa temizlenir, değilse
+(ürün görseli) kayıt silinir; referanssız kalan dosyaları gc_media temizler.
+"""
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+
+from django.conf import settings
+from django.contrib.contenttypes.models import ContentType
+from django.core.files.base import ContentFile
+from django.db import close_old_connections, transaction
+from django.db.models import F, Q
+from django.utils import timezone
+
+from gumbuz_shop.images import InvalidImage, ensure_variants, normalize
+from .models import ImageJob
+
+logger = logging.getLogger(__name__)
+
+MAX_ATTEMPTS = 3
+STALE_AFTER = timedelta(minutes=10)  # bu süreden uzun 'processing' kalan iş (çöken worker) yeniden alınır
+RECENT_FAILURES = timedelta(minutes=10)
+
+_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='image-jobs')
+
+
+def enqueue(instance, field_name, variants_field=''):
+    """Kayıt commit edildikten sonra işlenecek görsel işini ekler (bekleyen varsa tekrar eklemez)."""
+    job, created = ImageJob.objects.get_or_create(
+        content_type=ContentType.objects.get_for_model(instance),
+        object_id=instance.pk,
+        field_name=field_name,
+        status='pending',
+        defaults={'variants_field': variants_field},
+    )
+    if created:
+        transaction.on_commit(kick, robust=True)
+    return job
+
+
+def kick():
+    runner = getattr(settings, 'IMAGE_JOB_RUNNER', 'thread')
+    if runner == 'thread':
+        _executor.submit(_run_in_thread)
+    elif runner == 'inline':
+        run_pending()
+
+
+def _run_in_thread():
+    close_old_connections()
+    try:
+        run_pending()
+    except Exception:
+        logger.exception('Görsel kuyruğu işlenemedi')
+    finally:
+        close_old_connections()
+
+
+def _claimable(now):
+    return Q(status='pending') | Q(status='processing', started_at__lt=now - STALE_AFTER)
+
+
+def claim():
+    """Sıradaki işi atomik olarak 'processing' yapar; başka worker aldıysa bir sonrakine geçer."""
+    while True:
+        now = timezone.now()
+        pk = ImageJob.objects.filter(_claimable(now)).order_by('id').values_list('pk', flat=True).first()
+        if pk is None:
+            return None
+        claimed = ImageJob.objects.filter(_claimable(now), pk=pk).update(
+            status='processing', started_at=now, attempts=F('attempts') + 1,
+        )
+        if claimed:
+            return ImageJob.objects.select_related('content_type').get(pk=pk)
+
+
+def run_pending(limit=None):
+    """Kuyruk boşalana (veya limit dolana) kadar iş işler; işlenen iş sayısını döndürür."""
+    processed = 0
+    while limit is None or processed < limit:
+        job = claim()
+        if job is None:
+            break
+        process(job)
+        processed += 1
+    return processed
+
+
+def _finish(job, status, error=''):
+    job.status = status
+    job.error = error
+    job.finished_at = timezone.now()
+    job.save(update_fields=['status', 'error', 'finished_at'])
+
+
+def reject(instance, field_name):
+    """
+    Geçersiz dosyayı kayıttan ayırır: boş bırakılabilen alan temizlenir, değilse
+    kayıt silinir. Dosyanın kendisini gc_media siler.
+    """
+    field = instance._meta.get_field(field_name)
+    if field.blank:
+        type(instance).objects.filter(pk=instance.pk).update(**{field_name: ''})
+    else:
+        instance.delete()
+
+
+def process(job):
+    model = job.content_type.model_class()
+    instance = model.objects.filter(pk=job.object_id).first()
+    field_file = getattr(instance, job.field_name, None) if instance else None
+    if not field_file:
+        # Kayıt silinmiş ya da görsel kaldırılmış
+        _finish(job, 'done')
+        return
+
+    try:
+        with field_file.open('rb') as handle:
+            data = handle.read()
+        output = normalize(data)
+        if output is not None:
+            # İçerik adresli storage yeni içeriğe yeni ad verir; eski dosya başka
+            # kayıtlarca paylaşılıyor olabilir, referanssız kalırsa gc_media siler.
+            new_name = field_file.storage.save(field_file.name, ContentFile(output))
+            if new_name != field_file.name:
+                model.objects.filter(pk=instance.pk).update(**{job.field_name: new_name})
+                field_file.name = new_name
+
+        if job.variants_field:
+            # İçerik değişmiş olabilir; türevler normalize edilmiş dosyadan üretilir
+            setattr(instance, job.variants_field, {})
+            ensure_variants(instance, job.field_name, job.variants_field)
+    except InvalidImage as exc:
+        reject(instance, job.field_name)
+        _finish(job, 'failed', str(exc))
+        return
+    except FileNotFoundError:
+        _finish(job, 'failed', f'Dosya bulunamadı: {field_file.name}')
+        return
+    except Exception as exc:
+        logger.exception('Görsel işi başarısız: %s', job)
+        if job.attempts >= MAX_ATTEMPTS:
+            _finish(job, 'failed', str(exc))
+        else:
+            job.status = 'pending'
+            job.error = str(exc)
+            job.save(update_fields=['status', 'error'])
+        return
+
+    _finish(job, 'done')
+
+
+def status_summary():
+    """Admin durum göstergesi: bekleyen/işlenen sayısı ve son başarısız işler."""
+    active = ImageJob.objects.filter(status__in=('pending', 'processing')).count()
+    failures = list(
+        ImageJob.objects.filter(status='failed', finished_at__gte=timezone.now() - RECENT_FAILURES)
+        .select_related('content_type').order_by('-finished_at')[:5]
+    )
+    return {'active': active, 'failures': failures}
@@ -0,0 +1,55 @@
+from urllib.error import URLError
+
+from django.core.management.base import BaseCommand, CommandError
+
+from gumbuz_shop import assets, tailwind
+
+
+class Command(BaseCommand):
+    help = 'Şablonlarda kullanılan Tailwind sınıflarından CSS paketlerini derler (static/build, bkz. gumbuz_shop/assets.py)'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--fetch',
+            action='store_true',
+            help='Eksik üçüncü taraf dosyalarını (htmx, Alpine, ApexCharts, font...) static/vendor altına indir'
+        )
+        parser.add_argument(
+            '--bundle',
+            action='append',
+            choices=[bundle.name for bundle in assets.BUNDLES],
+            help='Yalnızca bu paketi derle (birden fazla verilebilir)'
+        )
+
+    def handle(self, *args, **options):
+        if options['fetch']:
+            try:
+                fetched = assets.fetch_vendor()
+            except (URLError, OSError) as e:
+                raise CommandError(f'İndirilemedi: {e}')
+            except assets.IntegrityMismatch as e:
+                raise CommandError(f'Özet uyuşmuyor (vendor.lock.json): {e}')
+            for vendor in fetched:
+                self.stdout.write(f'  {vendor.name} {vendor.version} -> static/vendor/{vendor.path}')
+            self.stdout.write(self.style.SUCCESS(f'{len(fetched)} dosya indirildi'))
+
+        bundles = assets.BUNDLES
+        if options['bundle']:
+            bundles = tuple(bundle for bundle in bundles if bundle.name in options['bundle'])
+        try:
+            report = assets.build(bundles)
+        except assets.UnknownClasses as e:
+            raise CommandError(f'Şablonlarda derlenemeyen sınıflar: {e}')
+        except tailwind.TailwindNotFound as e:
+            raise CommandError(str(e))
+        except tailwind.TailwindError as e:
+            raise CommandError(f'Tailwind derlemesi başarısız: {e}')
+        for name, (filename, size, classes) in report.items():
+            self.stdout.write(f'  {name}: build/{filename} ({size / 1024:.1f} KB, {classes} sınıf)')
+        self.stdout.write(self.style.SUCCESS(f'{len(report)} paket derlendi'))
+        missing = assets.missing_vendor()
+        if missing:
+            self.stdout.write(self.style.WARNING(
+                'İndirilmemiş dosyalar CDN\'den verilecek (--fetch): '
+                + ', '.join(vendor.path for vendor in missing)
+            ))
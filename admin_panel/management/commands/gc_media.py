@@ -0,0 +1,109 @@
+import os
+import time
+
+from django.apps import apps
+from django.conf import settings
+from django.core.files.storage import default_storage
+from django.core.management.base import BaseCommand
+from django.db import models
+
+from gumbuz_shop.images import DERIVED_DIR
+from gumbuz_shop.storage import is_content_addressed
+
+# Sipariş anındaki görsel URL snapshot'ları (dosya silinirse eski siparişlerde görsel kırılır)
+SNAPSHOT_URL_FIELDS = (
+    ('orders.Order', 'campaign_image_url'),
+    ('orders.OrderItem', 'product_image_url'),
+)
+
+# Görsel türevlerinin kaynak hash'ini tutan JSON alanları
+VARIANT_FIELDS = (
+    ('products.ProductImage', 'variants'),
+    ('campaigns.Campaign', 'banner_variants'),
+)
+
+
+class Command(BaseCommand):
+    help = 'Hiçbir kayıt tarafından referans edilmeyen medya dosyalarını (içerik adresli blob ve türevler) siler'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Silinecek dosyaları listele, silme'
+        )
+        parser.add_argument(
+            '--min-age',
+            type=float,
+            default=24,
+            help='Bu süreden (saat) yeni dosyalara dokunma - henüz commit edilmemiş yüklemeler için (varsayılan: 24)'
+        )
+        parser.add_argument(
+            '--include-legacy',
+            action='store_true',
+            help='İçerik adresli olmayan (eski yükleme adlı) referanssız dosyaları da sil'
+        )
+
+    def referenced_names(self):
+        names = set()
+        for model in apps.get_models():
+            for field in model._meta.get_fields():
+                if isinstance(field, models.FileField):
+                    names.update(
+                        model._default_manager.exclude(**{field.name: ''}).exclude(**{f'{field.name}__isnull': True})
+                        .values_list(field.name, flat=True).distinct().iterator()
+                    )
+
+        media_url = settings.MEDIA_URL
+        for label, field_name in SNAPSHOT_URL_FIELDS:
+            model = apps.get_model(label)
+            urls = model._default_manager.filter(**{f'{field_name}__startswith': media_url})
+            for url in urls.values_list(field_name, flat=True).distinct().iterator():
+                names.add(url[len(media_url):])
+        return names
+
+    def referenced_hashes(self):
+        hashes = set()
+        for label, field_name in VARIANT_FIELDS:
+            model = apps.get_model(label)
+            for data in model._default_manager.exclude(**{field_name: {}}).values_list(field_name, flat=True).iterator():
+                if data and data.get('hash'):
+                    hashes.add(data['hash'])
+        return hashes
+
+    def stored_files(self):
+        root = settings.MEDIA_ROOT
+        for directory, _, files in os.walk(root):
+            for filename in files:
+                path = os.path.join(directory, filename)
+                yield os.path.relpath(path, root).replace(os.sep, '/'), path
+
+    def handle(self, *args, **options):
+        names = self.referenced_names()
+        hashes = self.referenced_hashes()
+        cutoff = time.time() - options['min_age'] * 3600
+        derived_prefix = f'{DERIVED_DIR}/'
+
+        removed = kept = freed = 0
+        for name, path in self.stored_files():
+            if name.startswith(derived_prefix):
+                digest = os.path.basename(name).split('-', 1)[0]
+                referenced = digest in hashes
+            else:
+                referenced = name in names or not (options['include_legacy'] or is_content_addressed(name))
+
+            if referenced or os.path.getmtime(path) > cutoff:
+                kept += 1
+                continue
+
+            removed += 1
+            freed += os.path.getsize(path)
+            if options['dry_run']:
+                self.stdout.write(f'  {name}')
+            else:
+                default_storage.delete(name)
+
+        verb = 'silinecek' if options['dry_run'] else 'silindi'
+        self.stdout.write(self.style.SUCCESS(
+            f'{removed} dosya {verb} ({freed / 1024 / 1024:.1f} MB), {kept} dosya tutuldu'
+        ))
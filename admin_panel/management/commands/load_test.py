@@ -0,0 +1,345 @@
+import json
+import random
+import signal
+import subprocess
+import threading
+import time
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from http.cookiejar import CookieJar
+from contextlib import contextmanager, nullcontext
+from itertools import islice
+from urllib.error import HTTPError, URLError
+from urllib.parse import urlencode, urlsplit
+from urllib.request import HTTPCookieProcessor, Request, build_opener
+
+from django.core.management.base import BaseCommand, CommandError
+
+from addresses.tree import get_tree
+from admin_panel.models import SiteSettings
+from campaigns.models import Campaign, CampaignProduct
+
+
+DEFAULT_MIX = 'browse=40,cascade=20,order=10,social=25,admin=5'
+
+
+def percentile(sorted_values, pct):
+    """Nearest-rank yüzdelik (sorted_values sıralı olmalı)."""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, int(round(pct / 100 * len(sorted_values))))
+    return sorted_values[min(rank, len(sorted_values)) - 1]
+
+
+def parse_mix(value):
+    mix = {}
+    for part in value.split(','):
+        name, _, weight = part.partition('=')
+        name = name.strip()
+        if name not in SCENARIOS:
+            raise CommandError(f'Bilinmeyen senaryo: {name} (geçerli: {", ".join(SCENARIOS)})')
+        mix[name] = int(weight or 1)
+    return mix
+
+
+class Stats:
+    """Endpoint bazlı süre/durum kayıtları (thread-safe)."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.latencies = defaultdict(list)
+        self.statuses = defaultdict(lambda: defaultdict(int))
+        self.errors = defaultdict(int)
+
+    def record(self, endpoint, status, elapsed_ms):
+        with self._lock:
+            self.latencies[endpoint].append(elapsed_ms)
+            self.statuses[endpoint][str(status)] += 1
+            if status == 0 or status >= 400:
+                self.errors[endpoint] += 1
+
+    def report(self, duration):
+        endpoints = {}
+        total = 0
+        total_errors = 0
+        for endpoint in sorted(self.latencies):
+            values = sorted(self.latencies[endpoint])
+            count = len(values)
+            total += count
+            total_errors += self.errors[endpoint]
+            endpoints[endpoint] = {
+                'requests': count,
+                'throughput_rps': round(count / duration, 2) if duration else 0,
+                'error_rate': round(self.errors[endpoint] / count, 4) if count else 0,
+                'p50_ms': round(percentile(values, 50), 2),
+                'p95_ms': round(percentile(values, 95), 2),
+                'p99_ms': round(percentile(values, 99), 2),
+                'mean_ms': round(sum(values) / count, 2) if count else 0,
+                'max_ms': round(values[-1], 2) if values else 0,
+                'statuses': dict(self.statuses[endpoint]),
+            }
+        return {
+            'duration_s': round(duration, 2),
+            'requests': total,
+            'throughput_rps': round(total / duration, 2) if duration else 0,
+            'error_rate': round(total_errors / total, 4) if total else 0,
+            'endpoints': endpoints,
+        }
+
+
+class VirtualUser:
+    """Kendi cookie/session'ı olan tek bir ziyaretçi."""
+
+    def __init__(self, base_url, fixtures, stats, rng, timeout):
+        self.base_url = base_url.rstrip('/')
+        self.fixtures = fixtures
+        self.stats = stats
+        self.rng = rng
+        self.timeout = timeout
+        self.cookies = CookieJar()
+        self.opener = build_opener(HTTPCookieProcessor(self.cookies))
+        self.admin_logged_in = False
+
+    def csrf_token(self):
+        for cookie in self.cookies:
+            if cookie.name == 'csrftoken':
+                return cookie.value
+        return ''
+
+    def request(self, endpoint, path, data=None, headers=None):
+        """İsteği kaydeder; (durum kodu, yönlendirmeler sonrası URL) döner."""
+        url = f'{self.base_url}{path}'
+        body = urlencode(data, doseq=True).encode() if data is not None else None
+        req = Request(url, data=body, headers=headers or {})
+        start = time.perf_counter()
+        status = 0
+        try:
+            with self.opener.open(req, timeout=self.timeout) as response:
+                response.read()
+                status = response.status
+                url = response.geturl()
+        except HTTPError as e:
+            status = e.code
+        except (URLError, OSError):
+            status = 0
+        self.stats.record(endpoint, status, (time.perf_counter() - start) * 1000)
+        return status, url
+
+    def login_admin(self):
+        """Admin girişi yapar; başarılı giriş login sayfasından yönlendirir."""
+        credentials = self.fixtures['admin']
+        self.request('admin_login', '/panel/login/')
+        status, url = self.request('admin_login', '/panel/login/', data=credentials, headers={
+            'X-CSRFToken': self.csrf_token(),
+            'Referer': f'{self.base_url}/panel/login/',
+        })
+        self.admin_logged_in = status == 200 and urlsplit(url).path != '/panel/login/'
+        return self.admin_logged_in
+
+    # --- Senaryolar ---
+
+    def browse(self):
+        campaign = self.rng.choice(self.fixtures['campaigns'])
+        self.request('campaign_detail', f"/{campaign['slug']}/")
+
+    def cascade(self):
+        city_id, district_id, _ = self.rng.choice(self.fixtures['addresses'])
+        self.request('get_districts', f'/ajax/get-districts/?city={city_id}')
+        self.request('get_neighborhoods', f'/ajax/get-neighborhoods/?district={district_id}')
+
+    def order(self):
+        campaign = self.rng.choice(self.fixtures['campaigns'])
+        if not self.csrf_token():
+            self.request('campaign_detail', f"/{campaign['slug']}/")
+        city_id, district_id, neighborhood_id = self.rng.choice(self.fixtures['addresses'])
+        quantity = campaign['min_quantity']
+        products = [self.rng.choice(campaign['products']) for _ in range(quantity)]
+        self.request('create_order', '/orders/create/', data={
+            'campaign_id': campaign['id'],
+            'first_name': 'Yük',
+            'last_name': 'Testi',
+            'phone': f'05{self.rng.randint(300000000, 599999999)}',
+            'city': city_id,
+            'district': district_id,
+            'neighborhood': neighborhood_id,
+            'address_detail': 'Load test adresi',
+            'selected_products[]': products,
+            'selected_sizes[]': [campaign['size']] * quantity,
+        }, headers={
+            'X-CSRFToken': self.csrf_token(),
+            'HX-Request': 'true',
+            'Referer': f"{self.base_url}/{campaign['slug']}/",
+        })
+
+    def social(self):
+        self.request('social_proof', '/orders/api/social-proof/')
+
+    def admin(self):
+        if not self.fixtures.get('admin'):
+            return
+        if not self.admin_logged_in and not self.login_admin():
+            return
+        path, endpoint = self.rng.choice([
+            ('/panel/orders/', 'admin_orders'),
+            ('/panel/products/', 'admin_products'),
+            ('/panel/campaigns/', 'admin_campaigns'),
+            ('/panel/returns/', 'admin_returns'),
+        ])
+        self.request(endpoint, path)
+
+
+SCENARIOS = {
+    'browse': VirtualUser.browse,
+    'cascade': VirtualUser.cascade,
+    'order': VirtualUser.order,
+    'social': VirtualUser.social,
+    'admin': VirtualUser.admin,
+}
+
+
+class Command(BaseCommand):
+    help = 'Çalışan bir sunucuya gerçekçi senaryolarla yük testi uygular ve JSON rapor üretir'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--base-url', default='http://127.0.0.1:8000', help='Hedef sunucu (varsayılan: http://127.0.0.1:8000)')
+        parser.add_argument('--concurrency', type=int, default=10, help='Eşzamanlı sanal kullanıcı sayısı')
+        parser.add_argument('--duration', type=float, default=30, help='Test süresi (saniye)')
+        parser.add_argument('--iterations', type=int, default=0, help='Kullanıcı başına senaryo sayısı (0: süre dolana kadar)')
+        parser.add_argument('--mix', default=DEFAULT_MIX, help=f'Senaryo ağırlıkları (varsayılan: {DEFAULT_MIX})')
+        parser.add_argument('--think-time', type=float, default=0, help='Senaryolar arası bekleme (saniye)')
+        parser.add_argument('--timeout', type=float, default=10, help='İstek zaman aşımı (saniye)')
+        parser.add_argument('--seed', type=int, default=42, help='Tekrarlanabilir senaryo dizisi için seed')
+        parser.add_argument('--admin-username', help='Admin liste senaryoları için kullanıcı adı')
+        parser.add_argument('--admin-password', help='Admin liste senaryoları için şifre')
+        parser.add_argument(
+            '--raise-rate-limit', action='store_true',
+            help='Test süresince sipariş rate limit değerini yükseltir (tüm istekler aynı IP\'den gelir)'
+        )
+        parser.add_argument('--output', help='JSON raporun yazılacağı dosya (varsayılan: stdout)')
+
+    def load_fixtures(self, options):
+        # Stokta ürünü olan kampanya ürünleri tek sorguda, kampanyaya göre gruplanır
+        products = defaultdict(list)
+        for campaign_id, product_id in CampaignProduct.objects.filter(
+            campaign__is_active=True, product__stock_qty__gt=0,
+        ).values_list('campaign_id', 'product_id'):
+            products[campaign_id].append(product_id)
+
+        campaigns = []
+        for campaign in Campaign.objects.filter(is_active=True).prefetch_related('available_sizes'):
+            product_ids = products.get(campaign.id)
+            if not product_ids:
+                continue
+            size = next(iter(campaign.available_sizes.all()), None)
+            campaigns.append({
+                'id': campaign.id,
+                'slug': campaign.slug,
+                'min_quantity': max(campaign.min_quantity, 1),
+                'products': product_ids,
+                'size': size.slug if size else '',
+            })
+
+        addresses = [
+            (city_id, district_id, neighborhood_id)
+            for city_id, _, district_id, _, neighborhood_id, _ in islice(get_tree().rows(), 500)
+        ]
+
+        if not campaigns:
+            raise CommandError('Ürünü olan aktif kampanya bulunamadı.')
+        if not addresses:
+            raise CommandError('Aktif adres verisi bulunamadı (import_addresses çalıştırın).')
+
+        fixtures = {'campaigns': campaigns, 'addresses': addresses}
+        if options['admin_username']:
+            fixtures['admin'] = {
+                'username': options['admin_username'],
+                'password': options['admin_password'] or '',
+            }
+        return fixtures
+
+    @contextmanager
+    def raised_rate_limit(self):
+        """
+        Sipariş rate limit'ini test süresince yükseltir; hata, Ctrl+C ya da SIGTERM ile
+        çıkılsa da eski değere döner. Yalnızca bu alan yazılır, aradaki başka ayar
+        değişiklikleri ezilmez.
+        """
+        site_settings = SiteSettings.load()
+        original_limit = site_settings.rate_limit_count
+        previous_handler = None
+        if threading.current_thread() is threading.main_thread():
+            previous_handler = signal.signal(signal.SIGTERM, self._terminate)
+        SiteSettings.objects.filter(pk=site_settings.pk).update(rate_limit_count=10 ** 9)
+        try:
+            yield
+        finally:
+            SiteSettings.objects.filter(pk=site_settings.pk).update(rate_limit_count=original_limit)
+            if previous_handler is not None:
+                signal.signal(signal.SIGTERM, previous_handler)
+
+    @staticmethod
+    def _terminate(signum, frame):
+        raise SystemExit(128 + signum)
+
+    def git_revision(self):
+        try:
+            return subprocess.check_output(
+                ['git', 'rev-parse', '--short', 'HEAD'], stderr=subprocess.DEVNULL, text=True
+            ).strip()
+        except (OSError, subprocess.CalledProcessError):
+            return ''
+
+    def handle(self, *args, **options):
+        mix = parse_mix(options['mix'])
+        if 'admin' in mix and not options['admin_username']:
+            mix.pop('admin')
+        fixtures = self.load_fixtures(options)
+        stats = Stats()
+
+        scenario_names = list(mix)
+        weights = [mix[name] for name in scenario_names]
+        deadline = time.monotonic() + options['duration']
+
+        def run_user(index):
+            rng = random.Random(options['seed'] + index)
+            user = VirtualUser(options['base_url'], fixtures, stats, rng, options['timeout'])
+            done = 0
+            while time.monotonic() < deadline:
+                if options['iterations'] and done >= options['iterations']:
+                    break
+                scenario = rng.choices(scenario_names, weights=weights)[0]
+                SCENARIOS[scenario](user)
+                done += 1
+                if options['think_time']:
+                    time.sleep(options['think_time'])
+
+        if 'admin' in mix:
+            probe = VirtualUser(options['base_url'], fixtures, Stats(), random.Random(), options['timeout'])
+            if not probe.login_admin():
+                raise CommandError('Admin girişi başarısız; --admin-username/--admin-password kontrol edin.')
+
+        self.stderr.write(f"{options['concurrency']} kullanıcı, {options['duration']} sn, senaryolar: {mix}")
+        with self.raised_rate_limit() if options['raise_rate_limit'] else nullcontext():
+            start = time.monotonic()
+            with ThreadPoolExecutor(max_workers=options['concurrency']) as pool:
+                list(pool.map(run_user, range(options['concurrency'])))
+            duration = time.monotonic() - start
+
+        report = stats.report(duration)
+        report['config'] = {
+            'base_url': options['base_url'],
+            'concurrency': options['concurrency'],
+            'duration': options['duration'],
+            'iterations': options['iterations'],
+            'mix': mix,
+            'seed': options['seed'],
+            'git_revision': self.git_revision(),
+        }
+
+        output = json.dumps(report, indent=2, ensure_ascii=False)
+        if options['output']:
+            with open(options['output'], 'w', encoding='utf-8') as f:
+                f.write(output)
+            self.stderr.write(self.style.SUCCESS(f"Rapor yazıldı: {options['output']}"))
+        else:
+            self.stdout.write(output)
@@ -0,0 +1,41 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+
+from admin_panel import image_jobs
+
+
+class Command(BaseCommand):
+    help = 'Yüklenen görsellerin arka plan işlerini (doğrulama, sıkıştırma, türevler) işler'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--once',
+            action='store_true',
+            help='Kuyruğu bir kez boşalt ve çık'
+        )
+        parser.add_argument(
+            '--sleep',
+            type=float,
+            default=2.0,
+            help='Kuyruk boşken bekleme süresi (sn, varsayılan: 2)'
+        )
+
+    def handle(self, *args, **options):
+        if options['once']:
+            processed = image_jobs.run_pending()
+            self.stdout.write(self.style.SUCCESS(f'{processed} görsel işi işlendi'))
+            return
+
+        self.stdout.write(self.style.SUCCESS('Görsel kuyruğu dinleniyor... (Ctrl+C ile çıkış)'))
+        try:
+            while True:
+                close_old_connections()
+                processed = image_jobs.run_pending()
+                if processed:
+                    self.stdout.write(f'{processed} görsel işi işlendi')
+                else:
+                    time.sleep(options['sleep'])
+        except KeyboardInterrupt:
+            self.stdout.write('Durduruldu')
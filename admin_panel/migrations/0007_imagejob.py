@@ -0,0 +1,37 @@
+# Generated by Django 5.2.6 on 2026-10-19 16:22
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('admin_panel', '0006_sitesettings_theme_accent_color_and_more'),
+        ('contenttypes', '0002_remove_content_type_name'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ImageJob',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('object_id', models.PositiveBigIntegerField(verbose_name='Kayıt ID')),
+                ('field_name', models.CharField(max_length=50, verbose_name='Görsel Alanı')),
+                ('variants_field', models.CharField(blank=True, max_length=50, verbose_name='Türev Alanı')),
+                ('status', models.CharField(choices=[('pending', 'Bekliyor'), ('processing', 'İşleniyor'), ('done', 'Tamamlandı'), ('failed', 'Başarısız')], default='pending', max_length=20, verbose_name='Durum')),
+                ('attempts', models.PositiveSmallIntegerField(default=0, verbose_name='Deneme')),
+                ('error', models.TextField(blank=True, verbose_name='Hata')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='Oluşturulma Tarihi')),
+                ('started_at', models.DateTimeField(blank=True, null=True, verbose_name='Başlama Zamanı')),
+                ('finished_at', models.DateTimeField(blank=True, null=True, verbose_name='Bitiş Zamanı')),
+                ('content_type', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='contenttypes.contenttype', verbose_name='Model')),
+            ],
+            options={
+                'verbose_name': 'Görsel İşi',
+                'verbose_name_plural': 'Görsel İşleri',
+                'ordering': ['id'],
+                'indexes': [models.Index(fields=['status', 'id'], name='admin_panel_status_5accf8_idx'), models.Index(fields=['content_type', 'object_id'], name='admin_panel_content_c208eb_idx')],
+            },
+        ),
+    ]
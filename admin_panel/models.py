@@ -1,5 +1,6 @@
 from django.db import models
 from django.contrib.auth.models import User
+from django.contrib.contenttypes.models import ContentType
 
 
 class AdminRole(models.Model):
@@ -117,6 +118,11 @@ class SiteSettings(models.Model):
         obj, created = cls.objects.get_or_create(pk=1)
         return obj
 
+    @classmethod
+    async def aload(cls):
+        obj, created = await cls.objects.aget_or_create(pk=1)
+        return obj
+
     def __str__(self):
         return "Site Ayarları"
 
@@ -138,3 +144,39 @@ class FAQ(models.Model):
     def __str__(self):
         return self.question
 
+
+
+class ImageJob(models.Model):
+    """
+    Yüklenen görseller için arka plan işi (doğrulama, EXIF düzeltme, metadata
+    temizleme, yeniden sıkıştırma, türev üretimi). Bkz. admin_panel.image_jobs
+    """
+    STATUS_CHOICES = [
+        ('pending', 'Bekliyor'),
+        ('processing', 'İşleniyor'),
+        ('done', 'Tamamlandı'),
+        ('failed', 'Başarısız'),
+    ]
+
+    content_type = models.ForeignKey(ContentType, on_delete=models.CASCADE, verbose_name="Model")
+    object_id = models.PositiveBigIntegerField(verbose_name="Kayıt ID")
+    field_name = models.CharField(max_length=50, verbose_name="Görsel Alanı")
+    variants_field = models.CharField(max_length=50, blank=True, verbose_name="Türev Alanı")
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='pending', verbose_name="Durum")
+    attempts = models.PositiveSmallIntegerField(default=0, verbose_name="Deneme")
+    error = models.TextField(blank=True, verbose_name="Hata")
+    created_at = models.DateTimeField(auto_now_add=True, verbose_name="Oluşturulma Tarihi")
+    started_at = models.DateTimeField(null=True, blank=True, verbose_name="Başlama Zamanı")
+    finished_at = models.DateTimeField(null=True, blank=True, verbose_name="Bitiş Zamanı")
+
+    class Meta:
+        verbose_name = 'Görsel İşi'
+        verbose_name_plural = 'Görsel İşleri'
+        ordering = ['id']
+        indexes = [
+            models.Index(fields=['status', 'id']),
+            models.Index(fields=['content_type', 'object_id']),
+        ]
+
+    def __str__(self):
+        return f"{self.content_type.model}#{self.object_id}.{self.field_name} ({self.get_status_display()})"
@@ -1,12 +1,15 @@
-from django.test import TestCase, Client
+from django.conf import settings as django_settings
+from django.test import SimpleTestCase, TestCase, Client, override_settings
 from django.urls import reverse
 from django.contrib.auth.models import User
 from .models import AdminRole, AdminPermission, AdminUser
 from django.core.cache import cache
 from gumbuz_shop.middleware import get_active_user_count
+from gumbuz_shop.testing import TempDirMixin
 from django.core.files.uploadedfile import SimpleUploadedFile
 from .models import SiteSettings
 
+
 class AdminLoginTest(TestCase):
     def setUp(self):
         self.client = Client()
@@ -134,8 +137,9 @@ class ActiveUserTrackingTest(TestCase):
 
         self.assertEqual(response.context['active_user_count'], 1)
 
-class AdminSettingsTest(TestCase):
+class AdminSettingsTest(TempDirMixin, TestCase):
     def setUp(self):
+        super().setUp()
         self.client = Client()
         self.user = User.objects.create_user(username='admin', password='password')
         self.role = AdminRole.objects.create(name='admin', description='Admin Role')
@@ -271,7 +275,7 @@ class AdminSettingsTest(TestCase):
         self.assertTrue(settings.store_logo)
         # Check if file exists (name will be changed by Django)
         self.assertTrue(settings.store_logo)
-        self.assertTrue(settings.store_logo.name.startswith('settings/logo'))
+        self.assertTrue(settings.store_logo.name.startswith('settings/'))  # içerik adresli ad
 
     def test_settings_save_permission_required(self):
         """Test that saving settings requires permission"""
@@ -290,3 +294,659 @@ class AdminSettingsTest(TestCase):
         # Verify settings NOT changed
         settings = SiteSettings.load()
         self.assertNotEqual(settings.store_name, 'Hacked Store Name')
+
+
+class InstrumentationMiddlewareTest(TestCase):
+    def setUp(self):
+        from gumbuz_shop.instrumentation import registry
+        self.registry = registry
+        self.registry.reset()
+        self.user = User.objects.create_user(username='admin', password='password')
+        self.role = AdminRole.objects.create(name='admin', description='Admin Role')
+        AdminUser.objects.create(user=self.user, role=self.role)
+        AdminPermission.objects.create(role=self.role, permission='view_reports')
+
+    def instrumented(self):
+        """settings.py'nin INSTRUMENTATION_ENABLED = True iken seçtiği backend'ler"""
+        return override_settings(
+            INSTRUMENTATION_ENABLED=True,
+            TEMPLATES=[dict(django_settings.TEMPLATES[0], BACKEND='gumbuz_shop.instrumentation.DjangoTemplates')],
+            CACHES={'default': dict(django_settings.CACHES['default'], BACKEND='gumbuz_shop.instrumentation.DatabaseCache')},
+        )
+
+    def test_disabled_by_default(self):
+        """Instrumentation kapalıyken Server-Timing eklenmez, Django'nun kendi backend'leri kullanılır"""
+        from django.core.cache import caches
+        from django.core.cache.backends.db import DatabaseCache
+        from django.template import engines
+        from django.template.backends.django import DjangoTemplates
+        response = Client().get(reverse('admin_login'))
+        self.assertNotIn('Server-Timing', response)
+        self.assertEqual(self.registry.snapshot(), {})
+        self.assertIs(type(caches['default']), DatabaseCache)
+        self.assertIs(type(engines['django']), DjangoTemplates)
+
+    def test_records_metrics_per_url_name(self):
+        """Sorgu, cache ve süre metrikleri URL adına göre toplanır"""
+        with self.instrumented():
+            client = Client()
+            client.login(username='admin', password='password')
+            response = client.get(reverse('admin_login'))
+
+            self.assertIn('db;dur=', response['Server-Timing'])
+            self.assertIn('total;dur=', response['Server-Timing'])
+
+            snapshot = self.registry.snapshot()
+            self.assertIn('admin_login', snapshot)
+            self.assertEqual(snapshot['admin_login']['wall_ms']['count'], 1)
+            self.assertGreater(snapshot['admin_login']['sql_queries']['avg'], 0)
+            # Context processor aktif kullanıcı sözlüğünü cache'ten okur
+            login_metrics = snapshot['admin_login']
+            self.assertGreater(login_metrics['cache_hits'] + login_metrics['cache_misses'], 0)
+
+            response = client.get(reverse('admin_instrumentation'))
+            self.assertEqual(response.status_code, 200)
+            self.assertIn('admin_login', response.json()['views'])
+
+    def test_cache_and_templates_counted_without_patching(self):
+        """get_many, get_or_set ve async okumalar sayılır; Template.render ve cache örneği yamalanmaz"""
+        from asgiref.sync import async_to_sync
+        from django.core.cache import cache, caches
+        from django.template.base import Template
+        from django.template.loader import render_to_string
+        from gumbuz_shop.instrumentation import RequestRecord, _current_record
+        original_render = Template.render
+
+        with self.instrumented():
+            cache.set('instr-a', 1)
+            record = RequestRecord()
+            token = _current_record.set(record)
+            try:
+                cache.get_many(['instr-a', 'instr-b'])
+                cache.get_or_set('instr-c', 3)
+                async_to_sync(cache.aget)('instr-a')
+                render_to_string('admin_panel/auth/login.html')
+            finally:
+                _current_record.reset(token)
+
+            # get_or_set ıskalamada ekledikten sonra değeri tekrar okur (1 miss + 1 hit)
+            self.assertEqual((record.cache_hits, record.cache_misses), (3, 2))
+            self.assertGreater(record.template_time, 0)
+            self.assertEqual(record.template_depth, 0)
+            self.assertIs(Template.render, original_render)
+            self.assertNotIn('get', vars(caches['default']))
+
+    def test_sql_shape_groups_repeated_queries(self):
+        """Farklı parametrelerle çalışan aynı sorgu tek şekle indirgenir"""
+        from gumbuz_shop.instrumentation import RequestRecord, sql_shape
+        self.assertEqual(
+            sql_shape('SELECT * FROM t WHERE id IN (%s, %s, %s) AND x = 5'),
+            sql_shape('SELECT * FROM t WHERE id IN (%s) AND x = 7'),
+        )
+        record = RequestRecord()
+        for _ in range(6):
+            record(lambda *args: None, 'SELECT * FROM t WHERE id = %s', (1,), False, {})
+        self.assertEqual(record.repeated_queries(5), [('SELECT * FROM t WHERE id = %s', 6)])
+
+
+class LoadTestReportTest(TestCase):
+    def test_percentiles_and_error_rate(self):
+        """Yük testi raporu endpoint bazlı yüzdelik ve hata oranı üretir"""
+        from admin_panel.management.commands.load_test import Stats, percentile, parse_mix
+        self.assertEqual(percentile([], 95), 0.0)
+        self.assertEqual(percentile(list(range(1, 101)), 50), 50)
+        self.assertEqual(percentile(list(range(1, 101)), 99), 99)
+
+        stats = Stats()
+        for ms in range(1, 101):
+            stats.record('campaign_detail', 200, ms)
+        stats.record('create_order', 500, 10)
+        stats.record('create_order', 200, 20)
+        report = stats.report(duration=2)
+
+        self.assertEqual(report['requests'], 102)
+        self.assertEqual(report['endpoints']['campaign_detail']['p95_ms'], 95)
+        self.assertEqual(report['endpoints']['campaign_detail']['throughput_rps'], 50)
+        self.assertEqual(report['endpoints']['create_order']['error_rate'], 0.5)
+        self.assertEqual(report['endpoints']['create_order']['statuses'], {'500': 1, '200': 1})
+        self.assertEqual(parse_mix('browse=3,order=1'), {'browse': 3, 'order': 1})
+
+
+    def test_fixtures_load_campaign_products_in_one_query(self):
+        """Kampanya ürünleri kampanya başına ayrı sorguyla değil, tek sorguda yüklenir"""
+        from addresses import tree
+        from addresses.models import City, District, Neighborhood
+        from admin_panel.management.commands.load_test import Command
+        from campaigns.models import Campaign, CampaignProduct
+        from products.models import Product
+
+        district = District.objects.create(city=City.objects.create(name="İzmir"), name="Bornova")
+        Neighborhood.objects.create(district=district, name="Kazımdirik")
+        tree.clear()
+        tree.get_tree()
+        in_stock = Product.objects.create(name="Var", sku="LT-1", stock_qty=3)
+        sold_out = Product.objects.create(name="Yok", sku="LT-2", stock_qty=0)
+        for i in range(4):
+            campaign = Campaign.objects.create(title=f"K{i}", slug=f"lt-{i}", price=100, min_quantity=1)
+            CampaignProduct.objects.create(campaign=campaign, product=in_stock if i else sold_out)
+
+        with self.assertNumQueries(3):  # kampanya ürünleri + kampanyalar + bedenler
+            fixtures = Command().load_fixtures({'admin_username': None})
+        self.assertEqual([c['slug'] for c in fixtures['campaigns']], ['lt-1', 'lt-2', 'lt-3'])
+        self.assertEqual({tuple(c['products']) for c in fixtures['campaigns']}, {(in_stock.id,)})
+
+    def test_raised_rate_limit_restored_on_error(self):
+        """Rate limit hata ile çıkılsa da eski değere döner, diğer ayarlar ezilmez"""
+        from admin_panel.management.commands.load_test import Command
+        SiteSettings.objects.update_or_create(pk=1, defaults={'rate_limit_count': 7})
+        with self.assertRaises(KeyboardInterrupt):
+            with Command().raised_rate_limit():
+                self.assertEqual(SiteSettings.load().rate_limit_count, 10 ** 9)
+                SiteSettings.objects.filter(pk=1).update(rate_limit_period=42)
+                raise KeyboardInterrupt
+        site_settings = SiteSettings.load()
+        self.assertEqual(site_settings.rate_limit_count, 7)
+        self.assertEqual(site_settings.rate_limit_period, 42)
+
+    def test_failed_admin_login_is_not_marked(self):
+        """Login sayfasında kalan giriş başarılı sayılmaz, admin listeleri istenmez"""
+        import random
+        from unittest.mock import patch
+        from admin_panel.management.commands.load_test import Stats, VirtualUser
+        user = VirtualUser('http://test', {'admin': {'username': 'x', 'password': 'y'}}, Stats(), random.Random(1), 1)
+        with patch.object(VirtualUser, 'request', return_value=(200, 'http://test/panel/login/')) as request:
+            user.admin()
+            user.admin()
+        self.assertFalse(user.admin_logged_in)
+        self.assertEqual([c.args[1] for c in request.call_args_list], ['/panel/login/'] * 4)
+
+        with patch.object(VirtualUser, 'request', return_value=(200, 'http://test/panel/')) as request:
+            user.admin()
+        self.assertTrue(user.admin_logged_in)
+        self.assertEqual(request.call_count, 3)
+
+class ListCounterTest(TestCase):
+    def setUp(self):
+        from campaigns.models import Campaign
+        from products.models import Product
+
+        self.client = Client()
+        self.user = User.objects.create_user(username='admin', password='password')
+        self.role = AdminRole.objects.create(name='admin', description='Admin Role')
+        AdminUser.objects.create(user=self.user, role=self.role)
+        for permission in ('manage_products', 'manage_campaigns'):
+            AdminPermission.objects.create(role=self.role, permission=permission)
+        self.client.login(username='admin', password='password')
+
+        self.campaign_a = Campaign.objects.create(title='A', slug='a', price=100)
+        self.campaign_b = Campaign.objects.create(title='B', slug='b', price=100)
+        self.product = Product.objects.create(name='P', sku='CNT-1', stock_qty=5)
+
+    def test_product_campaign_moves_update_counters(self):
+        url = reverse('admin_product_update', args=[self.product.pk])
+        data = {'name': 'P', 'sku': 'CNT-1', 'stock_qty': 5, 'is_active': 'on'}
+
+        self.client.post(url, {**data, 'campaigns': [self.campaign_a.pk]})
+        self.product.refresh_from_db()
+        self.campaign_a.refresh_from_db()
+        self.assertEqual(self.product.campaign_count, 1)
+        self.assertEqual(self.campaign_a.product_count, 1)
+
+        self.client.post(url, {**data, 'campaigns': [self.campaign_b.pk]})
+        self.campaign_a.refresh_from_db()
+        self.campaign_b.refresh_from_db()
+        self.assertEqual(self.campaign_a.product_count, 0)
+        self.assertEqual(self.campaign_b.product_count, 1)
+
+        self.client.post(reverse('admin_campaign_delete', args=[self.campaign_b.pk]))
+        self.product.refresh_from_db()
+        self.assertEqual(self.product.campaign_count, 0)
+
+    def test_campaign_list_sorts_by_counter(self):
+        self.client.post(reverse('admin_campaign_product_add', args=[self.campaign_b.pk]), {'product_id': self.product.pk})
+        response = self.client.get(reverse('admin_campaigns'), {'sort': 'product_count', 'dir': 'desc'})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.context['page_obj'][0], self.campaign_b)
+
+
+class ImageJobTest(TempDirMixin, TestCase):
+    def setUp(self):
+        from products.models import Product
+
+        super().setUp()
+        self.client = Client()
+        self.user = User.objects.create_user(username='admin', password='password')
+        self.role = AdminRole.objects.create(name='admin', description='Admin Role')
+        AdminUser.objects.create(user=self.user, role=self.role)
+        AdminPermission.objects.create(role=self.role, permission='manage_products')
+        self.client.login(username='admin', password='password')
+        self.product = Product.objects.create(name='P', sku='IMG-1')
+
+    def upload(self, name='foto.jpg', size=(200, 100), orientation=None):
+        from io import BytesIO
+        from PIL import Image
+
+        image = Image.new('RGB', size, (10, 120, 200))
+        exif = Image.Exif()
+        if orientation:
+            exif[0x0112] = orientation
+        buffer = BytesIO()
+        image.save(buffer, 'JPEG', exif=exif.tobytes())
+        return SimpleUploadedFile(name, buffer.getvalue(), content_type='image/jpeg')
+
+    def post_images(self, *files):
+        url = reverse('admin_product_update', args=[self.product.pk])
+        data = {'name': 'P', 'sku': 'IMG-1', 'stock_qty': 0, 'images': list(files)}
+        return self.client.post(url, data)
+
+    def test_upload_returns_before_processing(self):
+        from products.models import ProductImage
+        from .models import ImageJob
+
+        response = self.post_images(self.upload(orientation=6))
+        self.assertEqual(response.status_code, 200)
+
+        image = ProductImage.objects.get(product=self.product)
+        self.assertEqual(image.variants, {})
+        job = ImageJob.objects.get()
+        self.assertEqual((job.status, job.field_name, job.variants_field), ('pending', 'image', 'variants'))
+
+    def test_job_fixes_orientation_strips_metadata_and_builds_variants(self):
+        from PIL import Image
+        from products.models import ProductImage
+        from . import image_jobs
+        from .models import ImageJob
+
+        self.post_images(self.upload(orientation=6))
+        self.assertEqual(image_jobs.run_pending(), 1)
+
+        image = ProductImage.objects.get(product=self.product)
+        with image.image.open('rb') as handle, Image.open(handle) as stored:
+            self.assertEqual(stored.size, (100, 200))  # 90° döndürüldü
+            self.assertFalse(stored.getexif())
+        self.assertEqual(image.variants['sizes']['card'], [100, 200])
+        self.assertEqual(ImageJob.objects.get().status, 'done')
+
+    def test_large_upload_is_downscaled(self):
+        from PIL import Image
+        from gumbuz_shop.images import MAX_DIMENSION
+        from products.models import ProductImage
+        from . import image_jobs
+
+        self.post_images(self.upload(size=(3000, 1500)))
+        image_jobs.run_pending()
+        image = ProductImage.objects.get(product=self.product)
+        with image.image.open('rb') as handle, Image.open(handle) as stored:
+            self.assertEqual(stored.size, (MAX_DIMENSION, MAX_DIMENSION // 2))
+
+    def test_invalid_upload_is_rejected(self):
+        from products.models import ProductImage
+        from . import image_jobs
+        from .models import ImageJob
+
+        self.post_images(SimpleUploadedFile('bozuk.jpg', b'not an image', content_type='image/jpeg'))
+        image = ProductImage.objects.get(product=self.product)
+        name = image.image.name
+
+        image_jobs.run_pending()
+        self.assertFalse(ProductImage.objects.filter(pk=image.pk).exists())
+        job = ImageJob.objects.get()
+        self.assertEqual(job.status, 'failed')
+        self.assertIn('Geçersiz', job.error)
+
+        # Referanssız kalan dosyayı gc_media siler
+        from django.core.management import call_command
+        from io import StringIO
+        call_command('gc_media', min_age=0, stdout=StringIO())
+        self.assertFalse(image.image.storage.exists(name))
+
+    def test_stale_processing_job_is_reclaimed(self):
+        from datetime import timedelta
+        from django.utils import timezone
+        from . import image_jobs
+        from .models import ImageJob
+
+        self.post_images(self.upload())
+        ImageJob.objects.update(status='processing', started_at=timezone.now() - timedelta(hours=1), attempts=1)
+        self.assertEqual(image_jobs.run_pending(), 1)
+        job = ImageJob.objects.get()
+        self.assertEqual((job.status, job.attempts), ('done', 2))
+
+    def test_status_polling(self):
+        from . import image_jobs
+
+        self.post_images(self.upload())
+        url = reverse('admin_image_jobs_status')
+        response = self.client.get(url)
+        self.assertContains(response, '1 görsel arka planda işleniyor')
+        self.assertContains(response, 'hx-trigger="every 2s"')
+
+        image_jobs.run_pending()
+        response = self.client.get(url, {'polling': '1'})
+        self.assertContains(response, 'Görseller işlendi')
+        self.assertNotContains(response, 'every 2s')
+        self.assertIn('showToast', response['HX-Trigger'])
+
+
+class MediaGarbageCollectionTest(TempDirMixin, TestCase):
+    def gc(self, **options):
+        from io import StringIO
+        from django.core.management import call_command
+
+        out = StringIO()
+        call_command('gc_media', min_age=0, stdout=out, **options)
+        return out.getvalue()
+
+    def test_keeps_referenced_and_snapshot_files(self):
+        from django.core.files.base import ContentFile
+        from django.core.files.storage import default_storage
+        from orders.models import Order, OrderItem
+        from products.models import Product, ProductImage
+
+        product = Product.objects.create(name='P', sku='GC-1')
+        used = default_storage.save('products/a.jpg', ContentFile(b'kullanilan'))
+        ProductImage.objects.bulk_create([ProductImage(product=product, image=used)])
+        snapshot = default_storage.save('products/b.jpg', ContentFile(b'eski siparis'))
+        order = Order.objects.create(customer_name='X', total_amount=1)
+        OrderItem.objects.create(order=order, product=product, product_image_url=default_storage.url(snapshot))
+        orphan = default_storage.save('products/c.jpg', ContentFile(b'sahipsiz'))
+        orphan_variant = 'derived/ff/ffffffffffffffffffff-card.jpg'
+        default_storage.save(orphan_variant, ContentFile(b'turev'))
+        legacy = 'settings/eski-logo.png'
+        default_storage.save(legacy, ContentFile(b'legacy'))  # içerik adresli adı alır
+        with open(f'{self.temp_dir}/settings/legacy.png', 'wb') as handle:
+            handle.write(b'eski yukleme')
+
+        output = self.gc(dry_run=True)
+        self.assertIn('3 dosya silinecek', output)
+        self.assertTrue(default_storage.exists(orphan))
+
+        self.gc()
+        self.assertTrue(default_storage.exists(used))
+        self.assertTrue(default_storage.exists(snapshot))
+        self.assertFalse(default_storage.exists(orphan))
+        self.assertFalse(default_storage.exists(orphan_variant))
+        self.assertTrue(default_storage.exists('settings/legacy.png'))
+
+        self.gc(include_legacy=True)
+        self.assertFalse(default_storage.exists('settings/legacy.png'))
+
+    def test_min_age_protects_fresh_uploads(self):
+        from io import StringIO
+        from django.core.files.base import ContentFile
+        from django.core.files.storage import default_storage
+        from django.core.management import call_command
+
+        orphan = default_storage.save('products/c.jpg', ContentFile(b'yeni'))
+        call_command('gc_media', stdout=StringIO())
+        self.assertTrue(default_storage.exists(orphan))
+
+
+# Hash'li adlar collectstatic gerektirir (bkz. StaticPipelineTest); burada düz URL'ler
+@override_settings(STORAGES={**django_settings.STORAGES, 'staticfiles': {
+    'BACKEND': 'django.contrib.staticfiles.storage.StaticFilesStorage',
+}})
+class FrontendAssetsTest(TempDirMixin, TestCase):
+    temp_dir_setting = 'ASSETS_DIR'
+
+    def build(self, *args):
+        from io import StringIO
+        from django.core.management import call_command
+
+        out = StringIO()
+        call_command('build_assets', *args, stdout=out)
+        return out.getvalue()
+
+    def test_generates_only_used_utilities(self):
+        import os
+        from gumbuz_shop import tailwind
+
+        path = os.path.join(self.temp_dir, 'page.html')
+        with open(path, 'w') as handle:
+            handle.write('''<div class="p-4 md:hover:bg-pink-500/50 w-1/2 bg-brand-pink/10 top-[3px] group-hover:text-white
+                   nonsense-class" :class="{ 'space-y-2': open }">{{ x|yesno:"text-red-600,text-green-600" }}</div>''')
+        css = tailwind.build_css(tailwind.Theme(colors={'brand-pink': 'var(--brand)'}), [path])
+        self.assertLessEqual({
+            'p-4', 'md:hover:bg-pink-500/50', 'w-1/2', 'bg-brand-pink/10', 'top-[3px]', 'group-hover:text-white',
+            'space-y-2',
+        }, tailwind.generated_classes(css))
+        # Virgüllü yesno seçeneklerini CLI ayırmaz; build bunları safelist'e ekler
+        with open(path) as handle:
+            self.assertEqual(tailwind.yesno_classes(handle.read()), {'text-red-600', 'text-green-600'})
+        self.assertIn('var(--brand) 10%', css)
+        self.assertNotIn('nonsense', css)
+        # v3 uyumluluk kuralları (kenarlık rengi, shadow-sm ölçeği)
+        self.assertIn('border-color:var(--color-gray-200', css)
+        self.assertEqual(tailwind.unknown({'p-4', 'group', 'bg-opacity-50'}, css), {'bg-opacity-50'})
+
+    def fetch_vendor(self):
+        import io
+        from gumbuz_shop import assets
+
+        assets.fetch_vendor(opener=lambda url, timeout: io.BytesIO(url.encode()))
+
+    def test_build_writes_bundles_and_templates_use_them(self):
+        import json
+        import os
+        from gumbuz_shop import assets
+
+        # Derleme ve indirme yokken şablonlar sabit sürümlü CDN'lere düşer
+        response = self.client.get(reverse('admin_login'))
+        self.assertContains(response, assets.TAILWIND_BROWSER_URL)
+        self.assertContains(response, '<style type="text/tailwindcss">@theme {')
+        self.assertContains(response, assets.VENDOR_BY_NAME['alpine'].url)
+        self.assertContains(response, 'fonts.googleapis.com')
+
+        # Vendor dosyaları olmadan da derlenir; Inter yoksa CSS'e gömülmez
+        output = self.build()
+        self.assertIn('3 paket derlendi', output)
+        self.assertIn("CDN'den verilecek", output)
+        with open(os.path.join(self.temp_dir, 'build', 'manifest.json')) as handle:
+            manifest = json.load(handle)
+        self.assertFalse(manifest['fonts'])
+        login = manifest['bundles']['login']
+        self.assertEqual(login, 'login.css')
+        response = self.client.get(reverse('admin_login'))
+        self.assertContains(response, f'/static/build/{login}')
+        self.assertNotContains(response, 'text/tailwindcss')
+
+        self.fetch_vendor()
+        self.build()
+        with open(os.path.join(self.temp_dir, 'build', login)) as handle:
+            css = handle.read()
+        self.assertIn('.from-primary', css)
+        self.assertIn('#e91e63', css.lower())
+        self.assertIn('@font-face', css)
+        response = self.client.get(reverse('admin_login'))
+        self.assertContains(response, '/static/vendor/alpinejs-3.13.3.min.js')
+        self.assertNotContains(response, 'cdn.jsdelivr.net')
+        self.assertNotContains(response, 'fonts.googleapis.com')
+
+        # Yalnızca istenen paket derlenir, diğerlerinin manifest girdileri korunur
+        with open(os.path.join(self.temp_dir, 'build', 'manifest.json')) as handle:
+            manifest = json.load(handle)
+        self.build('--bundle', 'login')
+        with open(os.path.join(self.temp_dir, 'build', 'manifest.json')) as handle:
+            self.assertEqual(json.load(handle)['bundles'], manifest['bundles'])
+
+    def test_unknown_template_class_fails_build(self):
+        import os
+        from gumbuz_shop import assets
+        from gumbuz_shop.tailwind import Theme
+
+        with open(os.path.join(self.temp_dir, 'page.html'), 'w') as handle:
+            handle.write(
+                '<style>@media (min-width: 1px) { .kart { color: red } }</style>'
+                '<div class="group kart scroll-mt-28 text-{{ color }}-600 hover:shadow-3xl" '
+                ':class="{ \'whatever\': open }"></div>'
+            )
+        bundle = assets.Bundle('page', ('page.html',), Theme())
+        with self.assertRaises(assets.UnknownClasses) as raised:
+            assets.build([bundle], base_dir=self.temp_dir)
+        self.assertEqual(raised.exception.unknown, {'page': {'hover:shadow-3xl': ['page.html']}})
+        self.assertFalse(os.path.exists(os.path.join(assets.build_dir(), 'page.css')))
+
+        with open(os.path.join(self.temp_dir, 'page.html'), 'w') as handle:
+            handle.write('<div class="scroll-mt-28"></div>')
+        assets.build([bundle], base_dir=self.temp_dir)
+        with open(os.path.join(assets.build_dir(), 'page.css')) as handle:
+            self.assertIn('scroll-margin-top', handle.read())
+
+    def test_project_templates_have_no_unknown_classes(self):
+        from gumbuz_shop import assets
+
+        for bundle in assets.BUNDLES:
+            sources, css = assets.compile_bundle(bundle)
+            self.assertEqual(assets.audit(sources, css, bundle.theme.safelist), {})
+
+    def test_deploy_check_warns_about_cdn_fallback(self):
+        from gumbuz_shop import assets
+
+        ids = {warning.id for warning in assets.check_assets()}
+        self.assertEqual(ids, {'assets.W001', 'assets.W002'})
+        self.fetch_vendor()
+        self.build()
+        self.assertEqual(assets.check_assets(), [])
+
+    def test_fetch_pins_vendor_files_by_digest(self):
+        import io
+        import os
+        from gumbuz_shop import assets
+
+        vendor = assets.VENDOR_BY_NAME['htmx']
+        body = [b'htmx v1']
+        opener = lambda url, timeout: io.BytesIO(body[0])  # noqa: E731
+
+        self.assertEqual(assets.fetch_vendor([vendor], opener=opener), [vendor])
+        self.assertEqual(assets.fetch_vendor([vendor], opener=opener), [])  # zaten var
+        self.assertEqual(assets.get_assets().js['htmx'], f'/static/vendor/{vendor.path}')
+
+        # Dosya kaybolup tekrar indirildiğinde içerik kilit dosyasındaki özetle aynı olmalı
+        os.remove(os.path.join(assets.vendor_dir(), vendor.path))
+        body[0] = b'degistirilmis'
+        with self.assertRaises(assets.IntegrityMismatch):
+            assets.fetch_vendor([vendor], opener=opener)
+
+
+class StaticPipelineTest(TempDirMixin, SimpleTestCase):
+    temp_dir_setting = None
+
+    def setUp(self):
+        import os
+        from gumbuz_shop.storage import CompressedManifestStaticFilesStorage
+
+        super().setUp()
+        os.makedirs(os.path.join(self.temp_dir, 'img'))
+        self.css = b'body { background: url("img/bg.png"); }\n' + b'.a { color: red; }\n' * 200
+        with open(os.path.join(self.temp_dir, 'app.css'), 'wb') as handle:
+            handle.write(self.css)
+        with open(os.path.join(self.temp_dir, 'img', 'bg.png'), 'wb') as handle:
+            handle.write(os.urandom(2048))
+
+        self.storage = CompressedManifestStaticFilesStorage(location=self.temp_dir, base_url='/static/')
+        paths = {name: (self.storage, name) for name in ('app.css', 'img/bg.png')}
+        for name, hashed_name, processed in self.storage.post_process(paths):
+            self.assertNotIsInstance(processed, Exception)
+        self.hashed_css = self.storage.stored_name('app.css')
+
+    def static_files(self):
+        from gumbuz_shop.staticfiles import StaticFiles
+        return StaticFiles(self.temp_dir, '/static/')
+
+    def test_collectstatic_writes_compressed_sidecars(self):
+        import brotli
+        import gzip
+        import os
+
+        path = self.storage.path(self.hashed_css)
+        with open(path, 'rb') as handle:
+            hashed_content = handle.read()
+        # Görsel referansı hash'li ada çevrilmiş
+        self.assertIn(self.storage.stored_name('img/bg.png').encode(), hashed_content)
+        with open(path + '.br', 'rb') as handle:
+            self.assertEqual(brotli.decompress(handle.read()), hashed_content)
+        with open(path + '.gz', 'rb') as handle:
+            self.assertEqual(gzip.decompress(handle.read()), hashed_content)
+        # Sıkıştırılamayan ve hash'siz dosyalara kopya yazılmaz
+        self.assertFalse(os.path.exists(self.storage.path(self.storage.stored_name('img/bg.png')) + '.gz'))
+        self.assertFalse(os.path.exists(self.storage.path('app.css') + '.br'))
+        # Mevcut kopyalar yeniden sıkıştırılmaz
+        self.assertEqual(self.storage.compress(self.hashed_css), ['br', 'gzip'])
+
+    def test_negotiates_encoding_and_caching(self):
+        import os
+
+        files = self.static_files()
+        url = f'/static/{self.hashed_css}'
+        path = self.storage.path(self.hashed_css)
+
+        status, headers, body = files.respond('GET', url, 'gzip, deflate, br')
+        headers = dict(headers)
+        self.assertEqual((status, body), (200, path + '.br'))
+        self.assertEqual(headers['Content-Encoding'], 'br')
+        self.assertEqual(headers['Content-Length'], str(os.path.getsize(path + '.br')))
+        self.assertEqual(headers['Cache-Control'], 'public, max-age=31536000, immutable')
+        self.assertEqual(headers['Vary'], 'Accept-Encoding')
+        self.assertEqual(headers['Content-Type'], 'text/css; charset=utf-8')
+
+        _, headers, body = files.respond('GET', url, 'gzip, br;q=0')
+        self.assertEqual((dict(headers)['Content-Encoding'], body), ('gzip', path + '.gz'))
+        _, headers, body = files.respond('GET', url, '')
+        self.assertNotIn('Content-Encoding', dict(headers))
+        self.assertEqual(body, path)
+
+        # ETag her kodlama için ayrı; eşleşirse 304
+        etag = dict(files.respond('GET', url, 'br')[1])['ETag']
+        self.assertEqual(files.respond('GET', url, 'br', etag)[0], 304)
+        self.assertEqual(files.respond('GET', url, 'gzip', etag)[0], 200)
+
+        # Hash'siz ad her seferinde doğrulanır
+        self.assertEqual(dict(files.respond('GET', '/static/app.css')[1])['Cache-Control'],
+                         'public, max-age=0, must-revalidate')
+        self.assertIsNone(files.respond('HEAD', url)[2])
+        self.assertEqual(files.respond('POST', url)[0], 405)
+        self.assertIsNone(files.respond('GET', '/static/yok.css'))
+        self.assertIsNone(files.respond('GET', '/static/../settings.py'))
+        self.assertIsNone(files.respond('GET', '/panel/'))
+
+    def test_wsgi_and_asgi_handlers(self):
+        import asyncio
+        from gumbuz_shop.staticfiles import asgi, wsgi
+
+        with open(self.storage.path(self.hashed_css) + '.gz', 'rb') as handle:
+            gzipped = handle.read()
+        url = f'/static/{self.hashed_css}'
+
+        def django_wsgi(environ, start_response):
+            start_response('200 OK', [])
+            return [b'django']
+
+        application = wsgi(django_wsgi, self.static_files())
+        started = []
+        environ = {'REQUEST_METHOD': 'GET', 'PATH_INFO': url, 'HTTP_ACCEPT_ENCODING': 'gzip'}
+        body = application(environ, lambda status, headers: started.append((status, dict(headers))))
+        self.assertEqual(b''.join(body), gzipped)
+        body.close()
+        self.assertEqual(started[0][0], '200 OK')
+        self.assertEqual(started[0][1]['Content-Encoding'], 'gzip')
+        self.assertEqual(application({'REQUEST_METHOD': 'GET', 'PATH_INFO': '/'}, lambda *args: None), [b'django'])
+
+        async def django_asgi(scope, receive, send):
+            await send({'type': 'http.response.start', 'status': 200, 'headers': []})
+            await send({'type': 'http.response.body', 'body': b'django'})
+
+        async def request(path):
+            sent = []
+
+            async def send(message):
+                sent.append(message)
+
+            scope = {'type': 'http', 'method': 'GET', 'path': path, 'headers': [(b'accept-encoding', b'gzip')]}
+            await asgi(django_asgi, self.static_files())(scope, None, send)
+            return sent
+
+        sent = asyncio.run(request(url))
+        self.assertEqual(sent[0]['status'], 200)
+        self.assertIn((b'content-encoding', b'gzip'), sent[0]['headers'])
+        self.assertEqual(b''.join(message['body'] for message in sent[1:]), gzipped)
+        self.assertEqual(asyncio.run(request('/'))[1]['body'], b'django')
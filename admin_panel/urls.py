@@ -9,7 +9,8 @@ from .views import (
     settings as settings_views,
     faq as faq_views,
     customers as customer_views,
-    returns as return_views
+    returns as return_views,
+    instrumentation as instrumentation_views
 )
 from .views import sizes as size_views
 
@@ -58,6 +59,7 @@ urlpatterns = [
     path('products/bulk-action/', product_views.product_bulk_action, name='admin_product_bulk_action'),
     path('products/image/<int:pk>/delete/', product_views.product_image_delete, name='admin_product_image_delete'),
     path('products/<int:pk>/images/<int:image_id>/delete/', product_views.product_image_delete, name='admin_product_image_delete'),
+    path('products/image-jobs/', product_views.image_jobs_status, name='admin_image_jobs_status'),
     path('products/<int:pk>/stock/', product_views.product_stock_update, name='admin_product_stock_update'),
     
     # Orders
@@ -84,6 +86,9 @@ urlpatterns = [
 
     path('reports/export/', report_views.export_excel, name='admin_reports_export'),
 
+    # Instrumentation
+    path('instrumentation/', instrumentation_views.instrumentation_metrics, name='admin_instrumentation'),
+
     # Sizes
     path('sizes/', size_views.size_list, name='admin_sizes'),
     path('sizes/create/', size_views.size_create_modal, name='admin_size_create'),
@@ -3,20 +3,20 @@ from django.http import HttpResponse, JsonResponse
 from django.db.models import Count, Q, Max
 from django.core.paginator import Paginator
 from django.contrib import messages
+from django.db import transaction
 import json
 
 from campaigns.models import Campaign, CampaignProduct, SizeOption, CampaignRedirect
 from products.models import Product
+from orders import counters
 from admin_panel.decorators import admin_required
 
 
 @admin_required('manage_campaigns')
 def campaign_list(request):
     """Kampanya listesi"""
-    campaigns = Campaign.objects.annotate(
-        product_count=Count('campaignproduct', distinct=True),
-        order_count=Count('order', distinct=True)
-    )
+    # product_count ve order_count denormalize kolonlardır (orders.counters)
+    campaigns = Campaign.objects.all()
     
     # Search
     search = request.GET.get('search', '').strip()
@@ -228,7 +228,10 @@ def campaign_delete(request, pk):
     
     if request.method == 'DELETE' or request.method == 'POST':
         campaign_title = campaign.title
-        campaign.delete()
+        with transaction.atomic():
+            product_ids = counters.campaign_product_ids([campaign])
+            campaign.delete()
+            counters.refresh_products(product_ids)
         
         response = HttpResponse()
         response['HX-Trigger'] = json.dumps({
@@ -281,7 +284,10 @@ def campaign_bulk_action(request):
             message = f'{len(selected_ids)} kampanya pasif yapıldı'
         elif action == 'delete':
             count = campaigns.count()
-            campaigns.delete()
+            with transaction.atomic():
+                product_ids = counters.campaign_product_ids(campaigns)
+                campaigns.delete()
+                counters.refresh_products(product_ids)
             message = f'{count} kampanya silindi'
         else:
             return HttpResponse('Geçersiz işlem', status=400)
@@ -303,7 +309,10 @@ def campaign_product_remove(request, pk):
         
     campaign_product = get_object_or_404(CampaignProduct, pk=pk)
     campaign = campaign_product.campaign
-    campaign_product.delete()
+    with transaction.atomic():
+        campaign_product.delete()
+        counters.refresh_campaigns([campaign.id])
+        counters.refresh_products([campaign_product.product_id])
     
     # Get updated list and count
     campaign_products = campaign.campaignproduct_set.select_related('product').order_by('sort_order')
@@ -415,11 +424,14 @@ def campaign_product_add(request, pk):
         Max('sort_order')
     )['sort_order__max'] or 0
     
-    CampaignProduct.objects.create(
-        campaign=campaign,
-        product=product,
-        sort_order=max_order + 1
-    )
+    with transaction.atomic():
+        CampaignProduct.objects.create(
+            campaign=campaign,
+            product=product,
+            sort_order=max_order + 1
+        )
+        counters.refresh_campaigns([campaign.id])
+        counters.refresh_products([product.id])
     
     # Get updated list and count
     campaign_products = campaign.campaignproduct_set.select_related('product').order_by('sort_order')
@@ -1,4 +1,5 @@
 from django.shortcuts import render
+from django.http import Http404
 from django.db.models import Count, Sum, Max, F
 from django.contrib.auth.decorators import login_required
 from ..decorators import admin_required
@@ -90,15 +91,22 @@ def customer_list(request):
 @login_required
 @admin_required('manage_orders')
 def customer_detail(request, phone):
-    # Get all orders for this customer (phone)
-    orders = Order.objects.filter(phone=phone).order_by('-created_at')
+    # Get all orders for this customer (phone) - tek sorgu, yalnızca sipariş kolonları
+    orders = list(
+        Order.objects.filter(phone=phone).select_related('neighborhood_fk').only(
+            'id', 'status', 'created_at', 'total_amount', 'customer_name', 'phone',
+            'city', 'district', 'full_address', 'neighborhood_fk__name',
+        ).order_by('-created_at')
+    )
+    if not orders:
+        raise Http404
     
     # Calculate summary stats
-    total_spent = orders.aggregate(Sum('total_amount'))['total_amount__sum'] or 0
-    total_orders = orders.count()
+    total_spent = sum(order.total_amount for order in orders)
+    total_orders = len(orders)
     
     # Get the latest customer info
-    latest_order = orders.first()
+    latest_order = orders[0]
     customer_info = {
         'name': latest_order.customer_name,
         'phone': latest_order.phone,
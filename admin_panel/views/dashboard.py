@@ -120,8 +120,8 @@ def dashboard(request):
     
     # ====== En Çok Satan Ürünler ======
     top_products = Product.objects.annotate(
-        sales_count=Count('orderitem', filter=Q(orderitem__order__created_at__date=today))
-    ).filter(sales_count__gt=0).order_by('-sales_count')[:5]
+        period_sales=Count('orderitem', filter=Q(orderitem__order__created_at__date=today))
+    ).filter(period_sales__gt=0).order_by('-period_sales')[:5]
     
     # ====== Saatlik Satış Farkı (Table için) ======
     hourly_comparison = []
@@ -174,9 +174,7 @@ def dashboard(request):
         'passive': Product.objects.filter(is_active=False).count(),
         'with_campaign': Product.objects.filter(campaignproduct__isnull=False).distinct().count(),
         'without_campaign': Product.objects.filter(campaignproduct__isnull=True).count(),
-        'multiple_campaigns': Product.objects.annotate(
-            campaign_count=Count('campaignproduct')
-        ).filter(campaign_count__gt=1).count(),
+        'multiple_campaigns': Product.objects.filter(campaign_count__gt=1).count(),
     }
     
     # ====== Şehir Performansı ======
@@ -0,0 +1,16 @@
+from django.http import JsonResponse
+from django.conf import settings
+from admin_panel.decorators import admin_required
+from gumbuz_shop.instrumentation import registry
+
+
+@admin_required('view_reports')
+def instrumentation_metrics(request):
+    """View bazlı sorgu/süre histogramları (JSON). POST ile sıfırlanır."""
+    if request.method == 'POST':
+        registry.reset()
+
+    return JsonResponse({
+        'enabled': getattr(settings, 'INSTRUMENTATION_ENABLED', False),
+        'views': registry.snapshot(),
+    })
@@ -1,15 +1,21 @@
 from django.shortcuts import render, get_object_or_404
-from django.http import HttpResponse, JsonResponse
+from django.http import HttpResponse, JsonResponse, StreamingHttpResponse
+from django.template.loader import render_to_string
 from django.db.models import Q, Count, Sum
 from django.core.paginator import Paginator
+from django.db import transaction
 from django.utils import timezone
 from datetime import timedelta
 import json
 import csv
 from orders.models import Order, OrderItem
+from orders import counters, rollups
+from orders.snapshots import snapshot_items
+from orders.transitions import ORDER_TRANSITIONS, transition_orders
 from campaigns.models import Campaign
 from products.models import Product
 from admin_panel.decorators import admin_required
+from gumbuz_shop.barcodes import code128_svg
 from urllib.parse import urlencode
 
 
@@ -134,6 +140,11 @@ def order_list(request):
         from django.db.models import F
         orders = orders.exclude(campaign_title='').exclude(campaign_title__isnull=True).exclude(campaign_title=F('campaign__title'))
 
+    # Checkout'ta şüpheli işaretlenenler (orders.abuse)
+    suspicious = request.GET.get('suspicious', '')
+    if suspicious == 'true':
+        orders = orders.filter(is_suspicious=True)
+
     # Sorting
     sort = request.GET.get('sort', 'created_at')
     direction = request.GET.get('dir', 'desc')
@@ -194,6 +205,8 @@ def order_list(request):
             qs = qs.filter(items__product_id=product_id)
         if exclude_filter != 'size' and size_filter:
             qs = qs.filter(items__selected_size__icontains=size_filter)
+        if exclude_filter != 'suspicious' and suspicious == 'true':
+            qs = qs.filter(is_suspicious=True)
         if exclude_filter != 'campaign_changed' and campaign_changed == 'true':
             from django.db.models import F
             qs = qs.exclude(campaign_title='').exclude(campaign_title__isnull=True).exclude(campaign_title=F('campaign__title'))
@@ -273,6 +286,7 @@ def order_list(request):
         'date_to': date_to,
         'size_filter': size_filter,
         'campaign_changed': campaign_changed,
+        'suspicious': suspicious,
         'campaign_changed_count': campaign_changed_count,
         'per_page': per_page,
         'sort': sort,
@@ -291,11 +305,11 @@ def order_list(request):
 
 @admin_required('manage_orders')
 def order_detail_modal(request, pk):
-    """Sipariş detay modal - 3 tab"""
+    """Sipariş detay modal - 3 tab (ürünler yalnızca sipariş snapshot'ından)"""
     order = get_object_or_404(
         Order.objects.select_related(
             'campaign', 'city_fk', 'district_fk', 'neighborhood_fk'
-        ).prefetch_related('items__product__images'),
+        ).prefetch_related(snapshot_items()),
         pk=pk
     )
     
@@ -316,8 +330,17 @@ def order_update_status(request, pk):
     
     if request.method == 'POST':
         new_status = request.POST.get('status')
+        try:
+            result = transition_orders([order.pk], new_status, user=request.user)
+        except ValueError:
+            result = None
+        if result is None or result.invalid:
+            response = HttpResponse(status=400)
+            response['HX-Trigger'] = json.dumps({
+                'showToast': {'message': 'Sipariş bu duruma geçirilemez', 'type': 'error'}
+            })
+            return response
         order.status = new_status
-        order.save()
         
         # Return the updated row
         return render(request, 'admin_panel/orders/partials/order_row.html', {
@@ -359,7 +382,12 @@ def order_bulk_action(request):
         
         if action == 'delete':
             count = orders.count()
-            orders.delete()
+            with transaction.atomic():
+                campaign_ids, product_ids = counters.order_related_ids(orders)
+                rollups.subtract(orders)
+                orders.delete()
+                counters.refresh_campaigns(campaign_ids)
+                counters.refresh_products(product_ids)
             response = HttpResponse()
             response['HX-Trigger'] = json.dumps({
                 'orderListChanged': {},
@@ -367,12 +395,15 @@ def order_bulk_action(request):
             })
             return response
             
-        elif action in ['new', 'processing', 'shipped', 'delivered', 'cancelled', 'return']:
-            orders.update(status=action)
+        elif action in ORDER_TRANSITIONS:
+            result = transition_orders(selected_ids, action, user=request.user)
             response = HttpResponse()
             response['HX-Trigger'] = json.dumps({
                 'orderListChanged': {},
-                'showToast': {'message': f'{orders.count()} sipariş durumu güncellendi', 'type': 'success'}
+                'showToast': {
+                    'message': result.message('sipariş durumu'),
+                    'type': 'warning' if result.invalid else 'success',
+                }
             })
             return response
             
@@ -417,22 +448,50 @@ def order_bulk_action(request):
     return HttpResponse(status=405)
 
 
+LABEL_CHUNK_SIZE = 100
+LABEL_FIELDS = (
+    'id', 'created_at', 'customer_name', 'phone', 'campaign_title', 'tracking_number',
+    'full_address', 'district', 'city', 'campaign_price', 'cargo_price', 'cod_fee', 'total_amount',
+)
+
+
+def iter_label_chunks(order_ids, chunk_size=None):
+    """Siparişleri chunk_size'lık parçalar halinde, yalnızca snapshot kolonlarıyla getirir."""
+    chunk_size = chunk_size or LABEL_CHUNK_SIZE
+    for start in range(0, len(order_ids), chunk_size):
+        orders = list(
+            Order.objects.filter(id__in=order_ids[start:start + chunk_size])
+            .only(*LABEL_FIELDS).prefetch_related(snapshot_items()).order_by('id')
+        )
+        for order in orders:
+            order.barcode_value = order.tracking_number or str(order.id)
+            order.barcode = code128_svg(order.barcode_value)
+        yield orders
+
+
+def render_labels(order_ids):
+    # Parçalar context processor'sız render edilir; etiketler yalnızca sipariş verisini kullanır
+    yield render_to_string('admin_panel/orders/print/header.html', {'total': len(order_ids)})
+    for orders in iter_label_chunks(order_ids):
+        yield render_to_string('admin_panel/orders/print/labels.html', {'orders': orders})
+    yield render_to_string('admin_panel/orders/print/footer.html')
+
+
 @admin_required('manage_orders')
 def order_print_view(request):
-    """Toplu yazdırma sayfası"""
+    """
+    Toplu yazdırma sayfası. Binlerce etiket tek seferde render edilmez; sayfa
+    LABEL_CHUNK_SIZE siparişlik parçalar halinde akıtılır ve barkodlar sunucuda
+    (takip numarasına göre önbellekli) SVG olarak basılır.
+    """
     if request.method == 'POST':
         order_ids = request.POST.getlist('selected_items')
     else:
         order_ids = request.session.get('print_orders', [])
+    order_ids = sorted({int(pk) for pk in order_ids if str(pk).isdigit()})
     
     if not order_ids:
         return HttpResponse('Yazdırılacak sipariş bulunamadı', status=404)
     
-    orders = Order.objects.filter(id__in=order_ids).select_related(
-        'campaign', 'city_fk', 'district_fk', 'neighborhood_fk'
-    ).prefetch_related('items__product')
-    
-    return render(request, 'admin_panel/orders/print.html', {
-        'orders': orders,
-    })
+    return StreamingHttpResponse(render_labels(order_ids), content_type='text/html; charset=utf-8')
 
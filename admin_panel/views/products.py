@@ -3,6 +3,7 @@ from django.http import HttpResponse, JsonResponse
 from django.db.models import Count, Q, Sum, Avg, F, Max
 from django.core.paginator import Paginator
 from django.contrib import messages
+from django.db import transaction
 from django.utils import timezone
 from datetime import timedelta
 import json
@@ -10,19 +11,18 @@ import json
 from products.models import Product, ProductImage
 from campaigns.models import Campaign, CampaignProduct
 from orders.models import OrderItem
+from orders import counters
 from admin_panel.decorators import admin_required
+from admin_panel import image_jobs
 
 
 @admin_required('manage_products')
 def product_list(request):
     """Ürün listesi - Kampanyalar sayfasına benzer yapıda"""
+    # campaign_count, sales_count ve revenue denormalize kolonlardır (orders.counters)
     products = Product.objects.prefetch_related(
         'images', 
         'campaignproduct_set__campaign'
-    ).annotate(
-        campaign_count=Count('campaignproduct', distinct=True),
-        total_sales=Count('orderitem', distinct=True),
-        revenue=Sum('orderitem__order__total_amount')
     )
     
     # Search
@@ -93,7 +93,8 @@ def product_list(request):
         'sku': 'sku',
         'stock': 'stock_qty',
         'campaign_count': 'campaign_count',
-        'sales': 'total_sales',
+        'sales': 'sales_count',
+        'revenue': 'revenue',
     }
     sort_field = sort_map.get(sort, 'id')
     if direction == 'asc':
@@ -168,18 +169,21 @@ def product_create_modal(request):
             
             # Add to campaigns if selected
             campaign_ids = request.POST.getlist('campaigns')
-            for campaign_id in campaign_ids:
-                campaign = Campaign.objects.get(id=campaign_id)
-                # Get max sort order
-                max_order = CampaignProduct.objects.filter(
-                    campaign=campaign
-                ).aggregate(Max('sort_order'))['sort_order__max'] or 0
-                
-                CampaignProduct.objects.create(
-                    campaign=campaign,
-                    product=product,
-                    sort_order=max_order + 1
-                )
+            with transaction.atomic():
+                for campaign_id in campaign_ids:
+                    campaign = Campaign.objects.get(id=campaign_id)
+                    # Get max sort order
+                    max_order = CampaignProduct.objects.filter(
+                        campaign=campaign
+                    ).aggregate(Max('sort_order'))['sort_order__max'] or 0
+                    
+                    CampaignProduct.objects.create(
+                        campaign=campaign,
+                        product=product,
+                        sort_order=max_order + 1
+                    )
+                counters.refresh_campaigns(campaign_ids)
+                counters.refresh_products([product.id])
             
             response = HttpResponse()
             response['HX-Trigger'] = json.dumps({
@@ -244,21 +248,26 @@ def product_update(request, pk):
             # Update campaigns
             campaign_ids = request.POST.getlist('campaigns')
             
-            # Remove from old campaigns
-            product.campaignproduct_set.all().delete()
-            
-            # Add to new campaigns
-            for campaign_id in campaign_ids:
-                campaign = Campaign.objects.get(id=campaign_id)
-                max_order = CampaignProduct.objects.filter(
-                    campaign=campaign
-                ).aggregate(Max('sort_order'))['sort_order__max'] or 0
+            with transaction.atomic():
+                old_campaign_ids = counters.product_campaign_ids([product])
+
+                # Remove from old campaigns
+                product.campaignproduct_set.all().delete()
                 
-                CampaignProduct.objects.create(
-                    campaign=campaign,
-                    product=product,
-                    sort_order=max_order + 1
-                )
+                # Add to new campaigns
+                for campaign_id in campaign_ids:
+                    campaign = Campaign.objects.get(id=campaign_id)
+                    max_order = CampaignProduct.objects.filter(
+                        campaign=campaign
+                    ).aggregate(Max('sort_order'))['sort_order__max'] or 0
+                    
+                    CampaignProduct.objects.create(
+                        campaign=campaign,
+                        product=product,
+                        sort_order=max_order + 1
+                    )
+                counters.refresh_campaigns(old_campaign_ids | {int(pk) for pk in campaign_ids})
+                counters.refresh_products([product.id])
             
             # Trigger success event
             response = HttpResponse()
@@ -285,7 +294,10 @@ def product_delete(request, pk):
     
     if request.method == 'DELETE' or request.method == 'POST':
         product_name = product.name
-        product.delete()
+        with transaction.atomic():
+            campaign_ids = counters.product_campaign_ids([product])
+            product.delete()
+            counters.refresh_campaigns(campaign_ids)
         
         response = HttpResponse()
         response['HX-Trigger'] = json.dumps({
@@ -306,12 +318,6 @@ def product_toggle(request, pk):
         product.is_active = not product.is_active
         product.save()
         
-        # Re-fetch with annotations for the row
-        product = Product.objects.annotate(
-            campaign_count=Count('campaignproduct'),
-            total_sales=Count('orderitem')
-        ).get(pk=pk)
-        
         # Render updated row
         from django.template.loader import render_to_string
         row_html = render_to_string('admin_panel/products/partials/product_row.html', {
@@ -376,27 +382,33 @@ def product_bulk_action(request):
             msg_type = 'warning'
         elif action == 'delete':
             count = products.count()
-            products.delete()
+            with transaction.atomic():
+                campaign_ids = counters.product_campaign_ids(products)
+                products.delete()
+                counters.refresh_campaigns(campaign_ids)
             message = f'{count} ürün silindi'
             msg_type = 'error'
         elif action == 'add_to_campaign':
             campaign_id = request.POST.get('campaign_id')
             if campaign_id:
                 campaign = Campaign.objects.get(id=campaign_id)
-                for product in products:
-                    if not CampaignProduct.objects.filter(
-                        campaign=campaign, 
-                        product=product
-                    ).exists():
-                        max_order = CampaignProduct.objects.filter(
-                            campaign=campaign
-                        ).aggregate(Max('sort_order'))['sort_order__max'] or 0
-                        
-                        CampaignProduct.objects.create(
-                            campaign=campaign,
-                            product=product,
-                            sort_order=max_order + 1
-                        )
+                with transaction.atomic():
+                    for product in products:
+                        if not CampaignProduct.objects.filter(
+                            campaign=campaign, 
+                            product=product
+                        ).exists():
+                            max_order = CampaignProduct.objects.filter(
+                                campaign=campaign
+                            ).aggregate(Max('sort_order'))['sort_order__max'] or 0
+                            
+                            CampaignProduct.objects.create(
+                                campaign=campaign,
+                                product=product,
+                                sort_order=max_order + 1
+                            )
+                    counters.refresh_campaigns([campaign.id])
+                    counters.refresh_products(selected_ids)
                 message = f'{len(selected_ids)} ürün {campaign.title} kampanyasına eklendi'
                 msg_type = 'success'
             else:
@@ -454,4 +466,19 @@ def product_stock_update(request, pk):
         except ValueError:
             return HttpResponse('Geçersiz stok miktarı', status=400)
     
-    return HttpResponse(status=405)
\ No newline at end of file
+    return HttpResponse(status=405)
+
+@admin_required('manage_products')
+def image_jobs_status(request):
+    """Arka plan görsel işleri durumu (HTMX polling)"""
+    summary = image_jobs.status_summary()
+    finished = request.GET.get('polling') == '1' and not summary['active']
+    response = render(request, 'admin_panel/components/image_jobs_status.html', {
+        'summary': summary,
+        'finished': finished,
+    })
+    if finished:
+        response['HX-Trigger'] = json.dumps({
+            'showToast': {'message': 'Görseller işlendi', 'type': 'success'}
+        })
+    return response
@@ -4,6 +4,7 @@ from django.db.models import Sum, Count
 from django.utils import timezone
 from datetime import timedelta
 from orders.models import Order
+from orders import rollups
 from admin_panel.decorators import admin_required
 import csv
 import json
@@ -52,11 +53,11 @@ def reports(request):
     from django.db.models import Q
     
     top_products = Product.objects.annotate(
-        sales_count=Count('orderitem', filter=Q(
+        period_sales=Count('orderitem', filter=Q(
             orderitem__order__created_at__date__gte=start_date,
             orderitem__order__created_at__date__lte=end_date
         ))
-    ).filter(sales_count__gt=0).order_by('-sales_count')
+    ).filter(period_sales__gt=0).prefetch_related('images').order_by('-period_sales')
     
     # ====== Grafik Verileri (Günlük Ciro) ======
     chart_dates = []
@@ -235,6 +236,7 @@ def reports(request):
         'profitability_data': profitability_data,
         'chart_data': json.dumps(chart_data),
         'top_products': top_products,
+        'status_report': rollups.period_report(start_date, end_date),
     })
 
 
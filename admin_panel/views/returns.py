@@ -4,6 +4,7 @@ from django.contrib.auth.decorators import login_required
 from django.http import JsonResponse
 from ..decorators import admin_required
 from orders.models import ReturnRequest, Order
+from orders.transitions import transition_returns
 
 @login_required
 @admin_required('manage_orders')
@@ -133,29 +134,19 @@ def return_action(request, return_id):
     action = request.POST.get('action')
     note = request.POST.get('note')
     
-    if action == 'approve':
-        return_request.status = 'approved'
-        return_request.admin_note = note
-        return_request.save()
-        
-        # Update Order Status
-        order = return_request.order
-        order.status = 'return'
-        order.save()
-        
-        messages.success(request, 'İade talebi onaylandı.')
-        
-    elif action == 'reject':
-        return_request.status = 'rejected'
-        return_request.admin_note = note
-        return_request.save()
-        messages.warning(request, 'İade talebi reddedildi.')
-        
-    elif action == 'complete':
-        return_request.status = 'completed'
-        return_request.admin_note = note
-        return_request.save()
-        messages.success(request, 'İade süreci tamamlandı.')
+    outcomes = {
+        'approve': ('approved', messages.success, 'İade talebi onaylandı.'),
+        'reject': ('rejected', messages.warning, 'İade talebi reddedildi.'),
+        'complete': ('completed', messages.success, 'İade süreci tamamlandı.'),
+    }
+    if action in outcomes:
+        to_status, notify, text = outcomes[action]
+        # Onayda sipariş de 'return' durumuna alınır (orders.transitions)
+        result = transition_returns([return_request.pk], to_status, user=request.user, note=note)
+        if result.invalid:
+            messages.error(request, 'İade talebi bu duruma geçirilemez.')
+        else:
+            notify(request, text)
         
     return redirect('admin_returns')
 
@@ -184,22 +175,16 @@ def return_bulk_action(request):
             return response
             
         elif action in ['approved', 'rejected', 'completed']:
-            # For approval, we also need to update order status
-            if action == 'approved':
-                for ret in returns:
-                    ret.status = 'approved'
-                    ret.save()
-                    # Update Order Status
-                    order = ret.order
-                    order.status = 'return'
-                    order.save()
-            else:
-                returns.update(status=action)
-                
+            # Onayda siparişler de 'return' durumuna alınır; birkaç set tabanlı sorgu
+            result = transition_returns(selected_ids, action, user=request.user)
+
             response = JsonResponse({'status': 'success'})
             response['HX-Trigger'] = json.dumps({
                 'modalSuccess': {},
-                'showToast': {'message': f'{returns.count()} iade talebi güncellendi', 'type': 'success'}
+                'showToast': {
+                    'message': result.message('iade talebi'),
+                    'type': 'warning' if result.invalid else 'success',
+                }
             })
             return response
             
@@ -5,6 +5,7 @@ from django.contrib import messages
 from django.contrib.auth.decorators import login_required
 from ..models import SiteSettings, FAQ
 from ..decorators import admin_required
+from .. import image_jobs
 
 @login_required
 @admin_required('manage_settings')
@@ -34,12 +35,14 @@ def settings_view(request):
                 messages.error(request, 'Hata: Dosya boyutu 2MB\'dan büyük olamaz.')
                 return redirect('admin_settings')
 
-            # 3. İçerik Kontrolü (Pillow ile)
+            # 3. İçerik Kontrolü: yalnızca başlık okunur (ucuz). Tam doğrulama (verify),
+            #    EXIF/metadata temizliği ve sıkıştırma arka planda (image_jobs) yapılır.
             try:
                 from PIL import Image
-                img = Image.open(logo_file)
-                img.verify()  # Verify that it is, in fact, an image
-                logo_file.seek(0)  # Reset file pointer after verify
+                with Image.open(logo_file) as img:
+                    if img.format not in ('JPEG', 'PNG'):
+                        raise ValueError(img.format)
+                logo_file.seek(0)
             except Exception:
                 messages.error(request, 'Hata: Geçersiz resim dosyası.')
                 return redirect('admin_settings')
@@ -83,6 +86,8 @@ def settings_view(request):
             messages.error(request, 'Hata: Geçersiz sayı formatı.')
         
         settings.save()
+        if 'store_logo' in request.FILES:
+            image_jobs.enqueue(settings, 'store_logo')
         
         if request.headers.get('X-Requested-With') == 'XMLHttpRequest':
             return JsonResponse({'status': 'success', 'message': 'Ayarlar başarıyla güncellendi.'})
@@ -0,0 +1,123 @@
+"""
+View ve ORM yolları için benchmark testleri.
+
+Deterministik veri seti (gumbuz_shop.utils.benchmark_data) üzerinde anahtar
+view'leri zamanlar ve sorgu sayısı üst sınırlarını doğrular. Sorgu bütçeleri
+veri hacminden bağımsız olmalıdır; aşılırsa büyük ihtimalle bir N+1 eklenmiştir.
+
+Varsayılan ölçek hızlıdır. Büyük hacim için:
+    BENCHMARK_SCALE=20 python manage.py test benchmarks --tag benchmark
+Sonuçları JSON olarak yazmak için BENCHMARK_OUTPUT=bench_output.txt.
+"""
+import json
+import os
+import shutil
+import tempfile
+import time
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.db import connection
+from django.test import Client, TestCase, override_settings, tag
+from django.test.utils import CaptureQueriesContext
+
+from admin_panel.models import AdminPermission, AdminRole, AdminUser, SiteSettings
+from campaigns.models import Campaign
+from gumbuz_shop.utils import benchmark_data
+from orders.models import Order
+
+SCALE = max(1, int(os.environ.get('BENCHMARK_SCALE', '1')))
+OUTPUT = os.environ.get('BENCHMARK_OUTPUT')
+
+
+def dataset_size():
+    return benchmark_data.DatasetSize(
+        campaigns=5 * SCALE,
+        products=40 * SCALE,
+        products_per_campaign=6,
+        images_per_product=2,
+        image_pool=4,
+        cities=3,
+        districts_per_city=3 * SCALE,
+        neighborhoods_per_district=5 * SCALE,
+        orders=300 * SCALE,
+        days=30,
+    )
+
+
+@tag('benchmark')
+class BenchmarkTestCase(TestCase):
+    results = {}
+
+    @classmethod
+    def setUpClass(cls):
+        # Placeholder görseller ve türevleri gerçek MEDIA_ROOT'a değil geçici dizine yazılır
+        cls.media_root = tempfile.mkdtemp(prefix='benchmark-media-')
+        cls.media_override = override_settings(MEDIA_ROOT=cls.media_root)
+        cls.media_override.enable()
+        try:
+            super().setUpClass()
+        except Exception:
+            cls._remove_media()
+            raise
+
+    @classmethod
+    def _remove_media(cls):
+        cls.media_override.disable()
+        shutil.rmtree(cls.media_root, ignore_errors=True)
+
+    @classmethod
+    def setUpTestData(cls):
+        benchmark_data.generate(dataset_size(), seed=1)
+        user = User.objects.create_user(username='bench', password='bench')
+        role = AdminRole.objects.create(name='super_admin')
+        AdminUser.objects.create(user=user, role=role)
+        for code, _ in AdminPermission.PERMISSION_CHOICES:
+            AdminPermission.objects.create(role=role, permission=code)
+        settings = SiteSettings.load()
+        settings.rate_limit_count = 10 ** 6
+        settings.save()
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        cls._remove_media()
+        if OUTPUT and cls.results:
+            existing = {}
+            if os.path.exists(OUTPUT):
+                with open(OUTPUT, encoding='utf-8') as f:
+                    existing = json.load(f)
+            existing.update(cls.results)
+            with open(OUTPUT, 'w', encoding='utf-8') as f:
+                json.dump(existing, f, indent=2, ensure_ascii=False)
+
+    def setUp(self):
+        cache.clear()
+        self.client = Client()
+        self.campaign = Campaign.objects.filter(slug__startswith='bench-').order_by('id').first()
+        self.order = Order.objects.order_by('id').first()
+
+    def login(self):
+        self.client.login(username='bench', password='bench')
+
+    def measure(self, name, func, max_queries, repeat=3):
+        """func'ı repeat kez çalıştırır, en iyi süreyi kaydeder ve sorgu bütçesini doğrular."""
+        timings = []
+        result = None
+        for _ in range(repeat):
+            with CaptureQueriesContext(connection) as ctx:
+                start = time.perf_counter()
+                result = func()
+                timings.append((time.perf_counter() - start) * 1000)
+        query_count = len(ctx.captured_queries)
+        type(self).results[name] = {
+            'scale': SCALE,
+            'best_ms': round(min(timings), 2),
+            'queries': query_count,
+            'max_queries': max_queries,
+        }
+        self.assertLessEqual(
+            query_count, max_queries,
+            f'{name}: {query_count} sorgu (bütçe {max_queries})'
+        )
+        return result
@@ -0,0 +1,57 @@
+from django.db.models import Count
+from django.urls import reverse
+
+from orders.models import Order
+from products.models import Product
+from .base import BenchmarkTestCase
+
+
+class AdminBenchmarkTest(BenchmarkTestCase):
+    def setUp(self):
+        super().setUp()
+        self.login()
+
+    def test_order_list(self):
+        response = self.measure('admin_order_list', lambda: self.client.get(reverse('admin_orders')), max_queries=40)
+        self.assertEqual(response.status_code, 200)
+
+    def test_order_detail_modal(self):
+        url = reverse('admin_order_detail', args=[self.order.id])
+        self.measure('admin_order_detail', lambda: self.client.get(url), max_queries=15)
+
+    def test_order_print(self):
+        ids = list(Order.objects.order_by('id').values_list('id', flat=True)[:50])
+        self.measure(
+            'admin_order_print',
+            lambda: b''.join(self.client.post(reverse('admin_order_print'), {'selected_items': ids}).streaming_content),
+            max_queries=15,
+        )
+
+    def test_product_list(self):
+        self.measure('admin_product_list', lambda: self.client.get(reverse('admin_products')), max_queries=29)
+
+    def test_campaign_list(self):
+        self.measure('admin_campaign_list', lambda: self.client.get(reverse('admin_campaigns')), max_queries=20)
+
+    def test_dashboard(self):
+        self.measure('admin_dashboard', lambda: self.client.get(reverse('admin_dashboard')), max_queries=187)
+
+    def test_reports(self):
+        self.measure('admin_reports', lambda: self.client.get(reverse('admin_reports')), max_queries=62)
+
+    def test_customer_list(self):
+        self.measure('admin_customer_list', lambda: self.client.get(reverse('admin_customers')), max_queries=18)
+
+    def test_orm_product_revenue_columns(self):
+        self.measure(
+            'orm_product_revenue',
+            lambda: list(Product.objects.order_by('-sales_count')[:50]),
+            max_queries=1,
+        )
+
+    def test_orm_order_status_counts(self):
+        self.measure(
+            'orm_order_status_counts',
+            lambda: list(Order.objects.values('status').annotate(count=Count('id'))),
+            max_queries=1,
+        )
@@ -0,0 +1,78 @@
+from django.test import override_settings
+from django.urls import reverse
+
+from addresses.models import District, Neighborhood
+from campaigns.models import CampaignProduct
+from .base import BenchmarkTestCase
+
+
+class StorefrontBenchmarkTest(BenchmarkTestCase):
+    def test_campaign_detail(self):
+        url = reverse('campaign_detail', args=[self.campaign.slug])
+        response = self.measure('campaign_detail', lambda: self.client.get(url), max_queries=10)
+        self.assertEqual(response.status_code, 200)
+
+    def test_address_cascade(self):
+        district = District.objects.filter(slug__startswith='bench-').first()
+        self.measure(
+            'get_districts',
+            lambda: self.client.get(reverse('get_districts'), {'city': district.city_id}),
+            max_queries=0,
+        )
+        self.measure(
+            'get_neighborhoods',
+            lambda: self.client.get(reverse('get_neighborhoods'), {'district': district.id}),
+            max_queries=0,
+        )
+        self.measure(
+            'search_neighborhoods',
+            lambda: self.client.get(reverse('search_neighborhoods'), {'q': 'bench mah'}),
+            max_queries=0,
+        )
+
+    def test_social_proof_api(self):
+        response = self.measure('social_proof_api', lambda: self.client.get(reverse('social_proof_api')), max_queries=1)
+        self.assertEqual(response.status_code, 200)
+
+    def test_create_order(self):
+        neighborhood = Neighborhood.objects.filter(slug__startswith='bench-').select_related('district').first()
+        product_ids = list(
+            CampaignProduct.objects.filter(campaign=self.campaign).values_list('product_id', flat=True)
+        )[:self.campaign.min_quantity]
+        data = {
+            'campaign_id': self.campaign.id,
+            'first_name': 'Bench',
+            'last_name': 'Müşteri',
+            'phone': '05551112233',
+            'city': neighborhood.district.city_id,
+            'district': neighborhood.district_id,
+            'neighborhood': neighborhood.id,
+            'address_detail': 'Bench adresi',
+            'selected_products[]': product_ids,
+            'selected_sizes[]': ['bench-38-m'] * len(product_ids),
+        }
+        response = self.measure('create_order', lambda: self.client.post(reverse('create_order'), data), max_queries=43)
+        self.assertEqual(response.status_code, 200)
+
+    @override_settings(ORDER_INTAKE_MODE='journal', ORDER_INTAKE_RUNNER='worker')
+    def test_create_order_intake(self):
+        neighborhood = Neighborhood.objects.filter(slug__startswith='bench-').select_related('district').first()
+        product_ids = list(
+            CampaignProduct.objects.filter(campaign=self.campaign).values_list('product_id', flat=True)
+        )[:self.campaign.min_quantity]
+        data = {
+            'campaign_id': self.campaign.id,
+            'first_name': 'Bench',
+            'last_name': 'Müşteri',
+            'phone': '05551112233',
+            'city': neighborhood.district.city_id,
+            'district': neighborhood.district_id,
+            'neighborhood': neighborhood.id,
+            'address_detail': 'Bench adresi',
+            'selected_products[]': product_ids,
+            'selected_sizes[]': ['bench-38-m'] * len(product_ids),
+        }
+        response = self.measure(
+            'create_order_intake', lambda: self.client.post(reverse('create_order'), data), max_queries=29
+        )
+        self.assertEqual(response.status_code, 200)
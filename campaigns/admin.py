@@ -1,5 +1,6 @@
 from django.contrib import admin
 from .models import Campaign, SizeOption, CampaignProduct, FAQ
+from orders import counters
 
 class CampaignProductInline(admin.TabularInline):
     model = CampaignProduct
@@ -27,3 +28,10 @@ class CampaignAdmin(admin.ModelAdmin):
     prepopulated_fields = {'slug': ('title',)}
     inlines = [CampaignProductInline]
     filter_horizontal = ('available_sizes',)
+
+    def save_related(self, request, form, formsets, change):
+        # Inline ürün değişiklikleri liste sayaçlarına yansısın
+        old_product_ids = counters.campaign_product_ids([form.instance])
+        super().save_related(request, form, formsets, change)
+        counters.refresh_campaigns([form.instance.pk])
+        counters.refresh_products(old_product_ids | counters.campaign_product_ids([form.instance]))
@@ -1,4 +1,4 @@
-from django.shortcuts import redirect
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
 from django.http import HttpResponsePermanentRedirect
 from campaigns.models import CampaignRedirect
 
@@ -7,30 +7,50 @@ class CampaignRedirectMiddleware:
     """
     Middleware to handle 301 redirects for old campaign slugs.
     Checks if the requested URL is an old campaign slug and redirects to the new one.
+    Hem sync (WSGI) hem async (ASGI) zincirde çalışır.
     """
-    
+    sync_capable = True
+    async_capable = True
+
     def __init__(self, get_response):
         self.get_response = get_response
-    
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+
     def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+
         response = self.get_response(request)
-        
+
         # Only process 404 responses
         if response.status_code == 404:
             # Check if this is a campaign detail URL pattern
             # Example: /kampanya-slug/ or /kampanya-slug
-            path = request.path.strip('/')
-            
-            # Try to find a redirect for this slug
             try:
-                campaign_redirect = CampaignRedirect.objects.select_related('campaign').get(
-                    old_slug=path,
-                    is_active=True
-                )
-                # Perform 301 permanent redirect
-                new_url = f'/{campaign_redirect.campaign.slug}/'
-                return HttpResponsePermanentRedirect(new_url)
+                return self.redirect_response(self.lookup(request).get())
             except CampaignRedirect.DoesNotExist:
                 pass
-        
+
         return response
+
+    async def __acall__(self, request):
+        response = await self.get_response(request)
+
+        if response.status_code == 404:
+            try:
+                return self.redirect_response(await self.lookup(request).aget())
+            except CampaignRedirect.DoesNotExist:
+                pass
+
+        return response
+
+    def lookup(self, request):
+        # Try to find a redirect for this slug
+        path = request.path.strip('/')
+        return CampaignRedirect.objects.select_related('campaign').filter(old_slug=path, is_active=True)
+
+    def redirect_response(self, campaign_redirect):
+        # Perform 301 permanent redirect
+        new_url = f'/{campaign_redirect.campaign.slug}/'
+        return HttpResponsePermanentRedirect(new_url)
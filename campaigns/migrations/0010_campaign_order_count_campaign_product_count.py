@@ -0,0 +1,23 @@
+# Generated by Django 5.2.6 on 2026-10-19 16:03
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('campaigns', '0009_campaignredirect'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='campaign',
+            name='order_count',
+            field=models.PositiveIntegerField(db_index=True, default=0, editable=False, verbose_name='Sipariş Sayısı'),
+        ),
+        migrations.AddField(
+            model_name='campaign',
+            name='product_count',
+            field=models.PositiveIntegerField(db_index=True, default=0, editable=False, verbose_name='Ürün Sayısı'),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.6 on 2026-10-19 16:19
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('campaigns', '0010_campaign_order_count_campaign_product_count'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='campaign',
+            name='banner_variants',
+            field=models.JSONField(blank=True, default=dict, editable=False, verbose_name='Banner Türevleri'),
+        ),
+    ]
@@ -1,5 +1,6 @@
 from django.db import models
 from products.models import Product
+from gumbuz_shop.images import ResponsiveImage
 
 class SizeOption(models.Model):
     name = models.CharField(max_length=50, verbose_name="Beden İsmi")
@@ -19,6 +20,8 @@ class Campaign(models.Model):
     slug = models.SlugField(unique=True, verbose_name="Slug (URL)")
     description = models.TextField(blank=True, verbose_name="Açıklama")
     banner_image = models.ImageField(upload_to='campaigns/', blank=True, null=True, verbose_name="Banner Görseli")
+    # Banner'ın boyutlandırılmış türevleri (gumbuz_shop.images)
+    banner_variants = models.JSONField(default=dict, blank=True, editable=False, verbose_name="Banner Türevleri")
     
     price = models.DecimalField(max_digits=10, decimal_places=2, verbose_name="Satış Fiyatı")
     min_quantity = models.PositiveIntegerField(default=1, verbose_name="Minimum Adet")
@@ -33,6 +36,12 @@ class Campaign(models.Model):
 
     available_sizes = models.ManyToManyField(SizeOption, blank=True, verbose_name="Tanımlı Bedenler")
 
+    # Denormalize sayaçlar (orders.counters tarafından güncellenir)
+    product_count = models.PositiveIntegerField(default=0, db_index=True, editable=False, verbose_name="Ürün Sayısı")
+    order_count = models.PositiveIntegerField(default=0, db_index=True, editable=False, verbose_name="Sipariş Sayısı")
+
+    COUNTER_FIELDS = ('product_count', 'order_count')
+
     class Meta:
         verbose_name = "Kampanya"
         verbose_name_plural = "Kampanyalar"
@@ -54,7 +63,18 @@ class Campaign(models.Model):
             return self.price / self.min_quantity
         return 0
     
+    @property
+    def banner(self):
+        return ResponsiveImage(self.banner_image, self.banner_variants)
+
     def save(self, *args, **kwargs):
+        # Sayaçlar tam save ile eski değerlerine geri yazılmasın
+        if not self._state.adding and kwargs.get('update_fields') is None and not kwargs.get('force_insert'):
+            kwargs['update_fields'] = [
+                f.name for f in self._meta.concrete_fields
+                if not f.primary_key and f.name not in self.COUNTER_FIELDS
+            ]
+
         # Store old slug if this is an update
         old_slug = None
         old_title = None
@@ -70,6 +90,11 @@ class Campaign(models.Model):
         
         # First save the campaign with new slug
         super().save(*args, **kwargs)
+
+        if self.banner_image and self.banner_variants.get('source') != self.banner_image.name:
+            # Doğrulama/sıkıştırma/türevler arka planda (admin_panel.image_jobs)
+            from admin_panel.image_jobs import enqueue
+            enqueue(self, 'banner_image', 'banner_variants')
         
         # Clean up redirects to prevent loops
         if old_slug and old_slug != self.slug:
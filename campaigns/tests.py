@@ -1,8 +1,8 @@
-from django.test import TestCase, Client
+from django.test import TestCase, Client, AsyncClient
 from django.urls import reverse
-from .models import Campaign, CampaignProduct
+from .models import Campaign, CampaignProduct, CampaignRedirect, SizeOption
 from products.models import Product
-from addresses.models import City
+from addresses.models import City, District
 
 class CampaignModelTest(TestCase):
     def setUp(self):
@@ -104,3 +104,26 @@ class CampaignViewTest(TestCase):
         url = reverse('campaign_detail', args=[self.inactive_campaign.slug])
         response = self.client.get(url)
         self.assertEqual(response.status_code, 404)
+
+    async def test_campaign_detail_async(self):
+        """ASGI altında render sırasında sync ORM erişimi olmamalı"""
+        size = await SizeOption.objects.acreate(name="S", slug="s")
+        await self.campaign.available_sizes.aadd(size)
+        product = await Product.objects.acreate(name="Async Ürün", sku="ASYNC-1")
+        await CampaignProduct.objects.acreate(campaign=self.campaign, product=product)
+
+        response = await AsyncClient().get(reverse('campaign_detail', args=[self.campaign.slug]))
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, "Async Ürün")
+        self.assertContains(response, "commonSize = 's'")
+
+    async def test_address_options_async(self):
+        await District.objects.acreate(city=self.city, name="Kadıköy", slug="kadikoy")
+        response = await AsyncClient().get(reverse('get_districts'), {'city': self.city.id})
+        self.assertContains(response, "Kadıköy")
+
+    async def test_old_slug_redirect_async(self):
+        await CampaignRedirect.objects.acreate(old_slug="eski-kampanya", campaign=self.campaign)
+        response = await AsyncClient().get('/eski-kampanya/')
+        self.assertEqual(response.status_code, 301)
+        self.assertEqual(response['Location'], '/active-campaign/')
@@ -1,8 +1,10 @@
-from django.shortcuts import render, get_object_or_404, redirect
+from django.shortcuts import render, aget_object_or_404, redirect
 from django.http import HttpResponse
+from django.utils.html import format_html
 from .models import Campaign
-from admin_panel.models import FAQ
-from addresses.models import City, District, Neighborhood
+from admin_panel.models import FAQ, SiteSettings
+from addresses.tree import SEARCH_LIMIT, aget_tree
+from gumbuz_shop.middleware import aget_active_user_count
 
 def home_view(request):
     first_campaign = Campaign.objects.filter(is_active=True).first()
@@ -10,58 +12,86 @@ def home_view(request):
         return redirect('campaign_detail', slug=first_campaign.slug)
     return render(request, 'campaigns/no_campaign.html')
 
-def campaign_detail(request, slug):
-    campaign = get_object_or_404(Campaign, slug=slug, is_active=True)
-    # Fetch other active campaigns for the tab navigation
-    other_campaigns = Campaign.objects.filter(is_active=True).exclude(id=campaign.id)
-    all_campaigns = Campaign.objects.filter(is_active=True).order_by('id') # Or any specific ordering
-    
+async def campaign_detail(request, slug):
+    """
+    Async view (ASGI altında thread hop'u olmadan çalışır). Template render'ı
+    sırasında ORM'e gidilemeyeceği için tüm veriler önceden (async) yüklenir.
+    """
+    campaign = await aget_object_or_404(
+        Campaign.objects.prefetch_related('available_sizes'), slug=slug, is_active=True
+    )
+    all_campaigns = [c async for c in Campaign.objects.filter(is_active=True).order_by('id')]  # Or any specific ordering
+
     # Fetch products via Through Model to respect ordering
-    products = campaign.campaignproduct_set.select_related('product').prefetch_related('product__images').order_by('sort_order')
-    
-    # Fetch active cities from database
-    cities = City.objects.filter(is_active=True).order_by('name')
-    
+    products = [
+        cp async for cp in campaign.campaignproduct_set.select_related('product').prefetch_related('product__images').order_by('sort_order')
+    ]
+
+    # Aktif iller süreç içi adres ağacından (sorgusuz)
+    cities = (await aget_tree()).city_list()
+
     # Fetch active FAQs
-    faqs = FAQ.objects.filter(is_active=True).order_by('order')
-    
+    faqs = [faq async for faq in FAQ.objects.filter(is_active=True).order_by('order')]
+
     context = {
         'campaign': campaign,
         'all_campaigns': all_campaigns,
         'products': products,
         'cities': cities,
         'faqs': faqs,
+        # Context processor değerleri (render sırasında sync sorgu olmasın)
+        'site_settings': await SiteSettings.aload(),
+        'active_user_count': await aget_active_user_count(),
     }
     return render(request, 'campaigns/detail.html', context)
 
-def get_districts(request):
+
+def _options(placeholder, objects, label=None, select_first=False):
+    options = f'<option value="">{placeholder}</option>'
+    for index, obj in enumerate(objects):
+        selected = ' selected' if select_first and index == 0 else ''
+        options += format_html('<option value="{}"{}>{}</option>', obj.id, selected, label(obj) if label else obj.name)
+    return options
+
+
+async def get_districts(request):
     city_id = request.GET.get('city')
-    districts = []
-    
-    if city_id:
-        districts = District.objects.filter(
-            city_id=city_id, 
-            is_active=True
-        ).order_by('name')
-    
-    options = '<option value="">İlçe Seçin</option>'
-    for district in districts:
-        options += f'<option value="{district.id}">{district.name}</option>'
-        
-    return HttpResponse(options)
+    districts = (await aget_tree()).districts_of(city_id) if city_id else []
+    return HttpResponse(_options('İlçe Seçin', districts))
 
-def get_neighborhoods(request):
+
+async def get_neighborhoods(request):
+    district_id = request.GET.get('district')
+    neighborhoods = (await aget_tree()).neighborhoods_of(district_id) if district_id else []
+    return HttpResponse(_options('Mahalle Seçin', neighborhoods))
+
+
+async def search_neighborhoods(request):
+    """
+    Mahalle type-ahead: q önekiyle eşleşen aktif mahalleler (Türkçe harf ve
+    aksan duyarsız). district verilirse o ilçede, yalnızca city verilirse o ilde,
+    hiçbiri verilmezse tüm illerde arar; sonuç #neighborhood-select için <option>
+    listesidir. Sorgu atılmaz.
+    """
+    city_id = request.GET.get('city')
     district_id = request.GET.get('district')
-    neighborhoods = []
-    
-    if district_id:
-        neighborhoods = Neighborhood.objects.filter(
-            district_id=district_id,
-            is_active=True
-        ).order_by('name')
-    
-    options = '<option value="">Mahalle Seçin</option>'
-    for neighborhood in neighborhoods:
-        options += f'<option value="{neighborhood.id}">{neighborhood.name}</option>'
-        
-    return HttpResponse(options)
+    query = request.GET.get('q', '')
+    tree = await aget_tree()
+    if not query.strip():
+        neighborhoods = tree.neighborhoods_of(district_id) if district_id else []
+        return HttpResponse(_options('Mahalle Seçin', neighborhoods))
+
+    try:
+        limit = min(max(int(request.GET.get('limit', SEARCH_LIMIT)), 1), 50)
+    except ValueError:
+        limit = SEARCH_LIMIT
+    matches = tree.search_neighborhoods(query, district_id, limit, city_id=city_id)
+    label = None
+    if not district_id:
+        if city_id:
+            label = lambda node: f'{node.name} ({node.parent.name})'
+        else:
+            label = lambda node: f'{node.name} ({node.parent.name} / {node.parent.parent.name})'
+    # En iyi eşleşme seçili gelir
+    placeholder = 'Mahalle Seçin' if matches else 'Eşleşen mahalle yok'
+    return HttpResponse(_options(placeholder, matches, label, select_first=True))
@@ -3,6 +3,10 @@ ASGI config for gumbuz_shop project.
 
 It exposes the ASGI callable as a module-level variable named ``application``.
 
+SSE_PATH istekleri (sosyal kanıt ve anlık kullanıcı yayını) Django'ya uğramadan
+gumbuz_shop.sse uygulamasına, STATIC_URL istekleri gumbuz_shop.staticfiles'a
+yönlendirilir; diğer her şey Django'ya gider.
+
 For more information on this file, see
 https://docs.djangoproject.com/en/5.2/howto/deployment/asgi/
 """
@@ -13,4 +17,15 @@ from django.core.asgi import get_asgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'gumbuz_shop.settings')
 
-application = get_asgi_application()
+from django.conf import settings  # noqa: E402
+
+from gumbuz_shop.sse import sse_application  # noqa: E402
+from gumbuz_shop.staticfiles import asgi as static_asgi  # noqa: E402
+
+django_application = static_asgi(get_asgi_application())
+
+
+async def application(scope, receive, send):
+    if scope['type'] == 'http' and scope['path'] == settings.SSE_PATH:
+        return await sse_application(scope, receive, send)
+    return await django_application(scope, receive, send)
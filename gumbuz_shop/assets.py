@@ -0,0 +1,381 @@
+"""
+Kendi sunucumuzdan servis edilen, önceden derlenmiş ön yüz paketleri.
+
+Şablonlar Tailwind'i tarayıcıda derleyen betik, htmx/Alpine/ApexCharts ve Google
+Fonts için dört ayrı CDN'e gidiyordu: her ilk ziyarette ek DNS/TLS bağlantıları
+ve ~100 KB'lık Tailwind derleyicisi, CDN yavaşsa da boş (stilsiz) sayfa. Bunun yerine:
+
+* ``build_assets --fetch`` üçüncü taraf dosyalarını (``VENDOR``, sürümleri sabit)
+  ``static/vendor/`` altına indirir ve SHA-384 özetlerini ``vendor.lock.json``'a
+  yazar; sonraki indirmeler bu özetlerle doğrulanır.
+* ``build_assets`` her paket (``BUNDLES``) için ilgili şablonları Tailwind CLI ile
+  tarayıp yalnızca kullanılan sınıfları içeren CSS üretir (gumbuz_shop.tailwind) ve
+  ``static/build/<paket>.css``'e yazar; derlenen paketler ``manifest.json``'da
+  tutulur. İçerik hash'li adı ``collectstatic`` verir (gumbuz_shop.storage).
+* ``assets`` context processor'ı şablonlara yerel URL'leri verir. Paket henüz
+  derlenmemişse ya da vendor dosyası indirilmemişse (yeni checkout, ağsız ortam)
+  şablonlar sabit sürümlü CDN adreslerine düşer: Tailwind tarayıcı derleyicisi
+  aynı temayla (``tailwind.theme_css``), betikler ``Vendor.url``'den, Inter Google
+  Fonts'tan. ``check --deploy`` bu durumu uyarı olarak bildirir.
+
+Tema renkleri (site ayarlarındaki marka renkleri) derlenen CSS'e gömülmez,
+``var(--color-...)`` olarak kalır; değerleri base şablondaki ``:root`` bloğu verir.
+"""
+import base64
+import hashlib
+import json
+import os
+from dataclasses import dataclass, replace
+from glob import glob
+from urllib.request import urlopen
+
+from django.conf import settings
+from django.templatetags.static import static
+
+from django.core import checks
+
+from . import tailwind
+from .tailwind import Theme, class_attributes, defined_classes
+
+VENDOR_LOCK = 'vendor.lock.json'
+MANIFEST = 'manifest.json'
+
+
+@dataclass(frozen=True)
+class Vendor:
+    name: str
+    version: str
+    url: str
+    path: str  # static/vendor altında
+
+
+VENDOR = (
+    Vendor('htmx', '1.9.10', 'https://unpkg.com/htmx.org@1.9.10/dist/htmx.min.js', 'htmx-1.9.10.min.js'),
+    Vendor('alpine', '3.13.3', 'https://cdn.jsdelivr.net/npm/alpinejs@3.13.3/dist/cdn.min.js',
+           'alpinejs-3.13.3.min.js'),
+    Vendor('apexcharts', '3.45.2', 'https://cdn.jsdelivr.net/npm/apexcharts@3.45.2/dist/apexcharts.min.js',
+           'apexcharts-3.45.2.min.js'),
+    Vendor('confetti', '1.6.0',
+           'https://cdn.jsdelivr.net/npm/canvas-confetti@1.6.0/dist/confetti.browser.min.js',
+           'canvas-confetti-1.6.0.min.js'),
+    Vendor('sortable', '1.15.2', 'https://cdn.jsdelivr.net/npm/sortablejs@1.15.2/Sortable.min.js',
+           'sortablejs-1.15.2.min.js'),
+    Vendor('inter_latin', '5.0.16',
+           'https://cdn.jsdelivr.net/npm/@fontsource-variable/inter@5.0.16/files/inter-latin-wght-normal.woff2',
+           'fonts/inter-latin-wght-normal.woff2'),
+    Vendor('inter_latin_ext', '5.0.16',
+           'https://cdn.jsdelivr.net/npm/@fontsource-variable/inter@5.0.16/files/inter-latin-ext-wght-normal.woff2',
+           'fonts/inter-latin-ext-wght-normal.woff2'),
+)
+VENDOR_BY_NAME = {vendor.name: vendor for vendor in VENDOR}
+
+# Inter değişken font (100-900); Türkçe harfler (ğ, ş, ı, İ) latin-ext dilimindedir.
+# url()'ler derlenen CSS'e (static/build/) göredir.
+FONT_FACES = """
+@font-face { font-family: 'Inter'; font-style: normal; font-display: swap; font-weight: 100 900; src: url('../vendor/fonts/inter-latin-ext-wght-normal.woff2') format('woff2-variations'); unicode-range: U+0100-02AF, U+0304, U+0308, U+0329, U+1E00-1E9F, U+1EF2-1EFF, U+2020, U+20A0-20AB, U+20AD-20C0, U+2113, U+2C60-2C7F, U+A720-A7FF; }
+@font-face { font-family: 'Inter'; font-style: normal; font-display: swap; font-weight: 100 900; src: url('../vendor/fonts/inter-latin-wght-normal.woff2') format('woff2-variations'); unicode-range: U+0000-00FF, U+0131, U+0152-0153, U+02BB-02BC, U+02C6, U+02DA, U+02DC, U+0304, U+0308, U+0329, U+2000-206F, U+2074, U+20AC, U+2122, U+2191, U+2193, U+2212, U+2215, U+FEFF, U+FFFD; }
+"""
+FONT_VENDORS = ('inter_latin', 'inter_latin_ext')
+
+# Paket derlenmemişken şablonlarda kullanılan Tailwind tarayıcı derleyicisi (CLI ile aynı sürüm)
+TAILWIND_BROWSER_URL = 'https://cdn.jsdelivr.net/npm/@tailwindcss/browser@4.3.3'
+
+# Mağaza teması (templates/base.html); marka renkleri site ayarlarından gelir
+SITE_THEME = Theme(
+    colors={
+        'brand-pink': 'var(--color-brand-pink)',
+        'brand-purple': 'var(--color-brand-purple)',
+        'brand-coral': 'var(--color-brand-coral)',
+        'brand-dark': '#333333',
+        'brand-light': '#f8f8f8',
+        'gradient-start': 'var(--color-brand-pink)',
+        'gradient-middle': 'var(--color-brand-purple)',
+        'gradient-end': 'var(--color-brand-coral)',
+    },
+    variables={
+        '--color-brand-pink': '#E91E63',
+        '--color-brand-purple': '#9C27B0',
+        '--color-brand-coral': '#FF6B6B',
+    },
+    # gradient / pulse-glow / shimmer keyframes'leri base.html <style> içinde
+    animations={
+        'gradient': ('gradient 15s ease infinite', None),
+        'pulse-glow': ('pulse-glow 2s infinite', None),
+        'shimmer': ('shimmer 2s infinite', None),
+        'float': ('float 3s ease-in-out infinite', 'float'),
+        'slide-up': ('slideUp 0.3s ease-out', 'slideUp'),
+        'fade-in': ('fadeIn 0.5s ease-out', 'fadeIn'),
+    },
+    keyframes={
+        'float': '0%, 100% { transform: translateY(0px); } 50% { transform: translateY(-10px); }',
+        'slideUp': '0% { transform: translateY(20px); opacity: 0; } 100% { transform: translateY(0); opacity: 1; }',
+        'fadeIn': '0% { opacity: 0; } 100% { opacity: 1; }',
+    },
+)
+
+# Yönetim paneli (templates/admin_panel/base.html)
+ADMIN_THEME = Theme(
+    colors={
+        'primary': '#3B82F6',
+        'secondary': '#8B5CF6',
+        'primary-dark': '#2563EB',
+        'brand-pink': '#E91E63',
+        'brand-purple': '#9C27B0',
+    },
+    # components/stats_card.html ve tablo başlıkları sınıfı değişkenden kurar
+    safelist=tuple(
+        f'{prefix}-{color}-{shade}'
+        for color in ('blue', 'green', 'purple', 'red', 'amber', 'cyan', 'emerald', 'gray', 'indigo',
+                      'orange', 'pink', 'teal', 'yellow')
+        for prefix, shade in (('from', '400'), ('to', '600'))
+    ) + ('text-left', 'text-center', 'text-right'),
+)
+
+# Panel giriş sayfası kendi renkleriyle (templates/admin_panel/auth/login.html)
+LOGIN_THEME = Theme(colors={'primary': '#E91E63', 'secondary': '#9C27B0'})
+
+
+@dataclass(frozen=True)
+class Bundle:
+    name: str
+    content: tuple  # BASE_DIR'e göre glob'lar
+    theme: Theme
+
+
+BUNDLES = (
+    Bundle('site', (
+        'templates/*.html', 'templates/campaigns/**/*.html', 'templates/includes/**/*.html',
+        'templates/orders/**/*.html', 'campaigns/**/*.py', 'orders/**/*.py',
+    ), SITE_THEME),
+    Bundle('admin', ('templates/admin_panel/**/*.html', 'admin_panel/**/*.py'), ADMIN_THEME),
+    Bundle('login', ('templates/admin_panel/auth/login.html',), LOGIN_THEME),
+)
+
+
+def vendor_dir():
+    return os.path.join(settings.ASSETS_DIR, 'vendor')
+
+
+def build_dir():
+    return os.path.join(settings.ASSETS_DIR, 'build')
+
+
+def sha384(data):
+    return 'sha384-' + base64.b64encode(hashlib.sha384(data).digest()).decode()
+
+
+def read_json(path):
+    try:
+        with open(path, encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def write_json(path, data):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(data, f, indent=2, sort_keys=True)
+        f.write('\n')
+
+
+class IntegrityMismatch(Exception):
+    pass
+
+
+class UnknownClasses(Exception):
+    """Şablonlarda derlenemeyen sınıflar; unknown: {paket: {sınıf: [dosyalar]}}."""
+
+    def __init__(self, unknown):
+        self.unknown = unknown
+        super().__init__('; '.join(
+            f'{bundle}: ' + ', '.join(f'{name} ({", ".join(files)})' for name, files in sorted(classes.items()))
+            for bundle, classes in unknown.items()
+        ))
+
+
+def fetch_vendor(vendors=VENDOR, opener=urlopen):
+    """
+    Eksik üçüncü taraf dosyalarını indirir; kilit dosyasında özeti olanlar doğrulanır,
+    olmayanlarınki yazılır. İndirilen Vendor listesini döndürür.
+    """
+    lock_path = os.path.join(vendor_dir(), VENDOR_LOCK)
+    lock = read_json(lock_path)
+    fetched = []
+    for vendor in vendors:
+        path = os.path.join(vendor_dir(), vendor.path)
+        pinned = lock.get(vendor.name, {})
+        if os.path.exists(path) and pinned.get('version') == vendor.version:
+            continue
+        with opener(vendor.url, timeout=30) as response:
+            data = response.read()
+        digest = sha384(data)
+        if pinned.get('version') == vendor.version and pinned.get('integrity') != digest:
+            raise IntegrityMismatch(f'{vendor.url}: beklenen {pinned["integrity"]}, gelen {digest}')
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, 'wb') as f:
+            f.write(data)
+        lock[vendor.name] = {'version': vendor.version, 'url': vendor.url, 'path': vendor.path, 'integrity': digest}
+        fetched.append(vendor)
+    if fetched:
+        write_json(lock_path, lock)
+    return fetched
+
+
+def read_sources(patterns, base_dir=None):
+    """Glob'lara uyan dosyalar: {BASE_DIR'e göre yol: içerik}."""
+    base_dir = str(base_dir or settings.BASE_DIR)
+    sources = {}
+    for pattern in patterns:
+        for path in sorted(glob(os.path.join(base_dir, pattern), recursive=True)):
+            with open(path, encoding='utf-8') as f:
+                sources[os.path.relpath(path, base_dir)] = f.read()
+    return sources
+
+
+def audit(sources, css, safelist=()):
+    """
+    Şablonların class özniteliklerinde geçip ne derlenen CSS'in ne de paket
+    şablonlarının <style> bloklarının tanıdığı sınıflar: {sınıf: [dosyalar]}.
+    """
+    templates = {path: text for path, text in sources.items() if path.endswith('.html')}
+    defined = set()
+    for text in templates.values():
+        defined |= defined_classes(text)
+    unknown = {}
+    for path, text in templates.items():
+        for name in tailwind.unknown(class_attributes(text) - defined, css):
+            unknown.setdefault(name, []).append(path)
+    for name in tailwind.unknown(safelist, css):
+        unknown.setdefault(name, []).append('safelist')
+    return unknown
+
+
+def compile_bundle(bundle, base_dir=None, fonts=False):
+    """Paketi Tailwind CLI ile derler; (kaynaklar, css) döndürür. fonts: Inter @font-face eklenir."""
+    base_dir = str(base_dir or settings.BASE_DIR)
+    sources = read_sources(bundle.content, base_dir)
+    dynamic = set()
+    for text in sources.values():
+        dynamic |= tailwind.yesno_classes(text)
+    css = tailwind.build_css(
+        replace(bundle.theme, font_faces=FONT_FACES if fonts else '', safelist=(*bundle.theme.safelist, *sorted(dynamic))),
+        [os.path.join(base_dir, pattern) for pattern in bundle.content],
+    )
+    return sources, css
+
+
+def missing_vendor():
+    """Kilit dosyasındaki sürümüyle indirilmemiş Vendor'lar."""
+    lock = read_json(os.path.join(vendor_dir(), VENDOR_LOCK))
+    return [
+        vendor for vendor in VENDOR
+        if lock.get(vendor.name, {}).get('version') != vendor.version
+        or not os.path.exists(os.path.join(vendor_dir(), vendor.path))
+    ]
+
+
+def build(bundles=BUNDLES, base_dir=None):
+    """
+    Paketleri derler ve manifest'i yazar; şablonlarda tanınmayan sınıf varsa
+    UnknownClasses (hiçbir dosya yazılmadan). Inter @font-face kuralları yalnızca
+    font dosyaları indirilmişse eklenir (manifest'te ``fonts``).
+    {paket: (dosya adı, boyut, sınıf sayısı)} döndürür.
+    """
+    fonts = not any(vendor.name in FONT_VENDORS for vendor in missing_vendor())
+    compiled, unknown = {}, {}
+    for bundle in bundles:
+        sources, css = compile_bundle(bundle, base_dir, fonts)
+        bundle_unknown = audit(sources, css, bundle.theme.safelist)
+        if bundle_unknown:
+            unknown[bundle.name] = bundle_unknown
+            continue
+        compiled[bundle.name] = css
+    if unknown:
+        raise UnknownClasses(unknown)
+
+    os.makedirs(build_dir(), exist_ok=True)
+    manifest_path = os.path.join(build_dir(), MANIFEST)
+    # Yalnızca bazı paketler derleniyorsa diğerlerinin girdileri korunur
+    manifest = {'bundles': read_json(manifest_path).get('bundles', {}), 'fonts': fonts}
+    report = {}
+    for name, css in compiled.items():
+        data = css.encode()
+        filename = f'{name}.css'
+        with open(os.path.join(build_dir(), filename), 'wb') as f:
+            f.write(data)
+        manifest['bundles'][name] = filename
+        report[name] = (filename, len(data), len(tailwind.generated_classes(css)))
+
+    write_json(manifest_path, manifest)
+    return report
+
+
+class Assets:
+    """
+    Şablonlardaki URL'ler: ``assets.css.site`` (derlenmemişse None; şablon
+    ``assets.tailwind_browser`` ve ``assets.theme.site`` ile tarayıcıda derler),
+    ``assets.js.htmx`` (indirilmemişse sabit sürümlü CDN adresi), ``assets.fonts``
+    (Inter derlenen CSS'te mi; değilse şablon Google Fonts'u yükler).
+    """
+
+    tailwind_browser = TAILWIND_BROWSER_URL
+
+    def __init__(self):
+        manifest = read_json(os.path.join(build_dir(), MANIFEST))
+        built = manifest.get('bundles', {})
+        self.css = {
+            bundle.name: static_url(f'build/{built[bundle.name]}') if bundle.name in built else None
+            for bundle in BUNDLES
+        }
+        # :root varsayılanları yazılmaz; marka renklerini base şablonun kendi :root bloğu verir
+        self.theme = {bundle.name: tailwind.theme_css(bundle.theme, defaults=False) for bundle in BUNDLES}
+        self.fonts = bool(manifest.get('fonts'))
+        missing = {vendor.name for vendor in missing_vendor()}
+        self.js = {
+            vendor.name: vendor.url if vendor.name in missing else static_url(f'vendor/{vendor.path}')
+            for vendor in VENDOR if vendor.name not in FONT_VENDORS
+        }
+
+
+def static_url(name):
+    """
+    Hash'li statik URL. Dosya collectstatic ile toplanmamışsa hash'siz URL
+    (istek 404 alır; dağıtımda ``check --deploy`` bunu önceden bildirir).
+    """
+    try:
+        return static(name)
+    except ValueError:
+        return settings.STATIC_URL + name
+
+
+_cache = {'key': None, 'assets': None}
+
+
+def get_assets():
+    """Manifest ve kilit dosyası değişmedikçe (mtime) aynı nesne; istek başına iki stat."""
+    paths = (os.path.join(build_dir(), MANIFEST), os.path.join(vendor_dir(), VENDOR_LOCK))
+    key = tuple(os.path.getmtime(path) if os.path.exists(path) else None for path in paths)
+    if _cache['key'] != key or _cache['assets'] is None:
+        _cache['assets'] = Assets()
+        _cache['key'] = key
+    return _cache['assets']
+
+
+def check_assets(app_configs=None, **kwargs):
+    """
+    ``check --deploy``: indirilmemiş vendor dosyaları ve derlenmemiş paketler CDN'den
+    verilir; çalışır ama üçüncü taraf isteği ve tarayıcıda derleme demektir.
+    """
+    warnings = [
+        checks.Warning(f'static/vendor/{vendor.path} yok, CDN\'den verilecek',
+                hint='python manage.py build_assets --fetch', id='assets.W001')
+        for vendor in missing_vendor()
+    ]
+    built = read_json(os.path.join(build_dir(), MANIFEST)).get('bundles', {})
+    warnings += [
+        checks.Warning(f'{bundle.name} paketi derlenmemiş, Tailwind tarayıcıda derlenecek',
+                hint='python manage.py build_assets', id='assets.W002')
+        for bundle in BUNDLES if bundle.name not in built
+    ]
+    return warnings
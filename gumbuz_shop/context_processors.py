@@ -1,8 +1,24 @@
+from django.conf import settings
+from django.utils.functional import SimpleLazyObject
+
+from .assets import get_assets
 from .middleware import get_active_user_count
 from admin_panel.models import SiteSettings
 
 def active_user_count(request):
+    # Tembel: yalnızca template kullanırsa sorgulanır. Async view'lar bu anahtarları
+    # kendi context'lerinde önceden (async) doldurur; böylece render sırasında ORM'e gidilmez.
     return {
-        'active_user_count': get_active_user_count(),
-        'site_settings': SiteSettings.load()
+        'active_user_count': SimpleLazyObject(get_active_user_count),
+        'site_settings': SimpleLazyObject(SiteSettings.load)
     }
+
+
+def assets(request):
+    # Derlenmiş CSS / yerel betik URL'leri (bkz. gumbuz_shop/assets.py)
+    return {'assets': get_assets()}
+
+
+def sse(request):
+    # Canlı yayın adresi (gumbuz_shop/sse.py); şablonlar yolu sabit yazmaz
+    return {'sse_path': settings.SSE_PATH}
@@ -0,0 +1,55 @@
+"""
+SQLite eşzamanlılık yardımcıları.
+
+Bağlantı ayarları (WAL, IMMEDIATE transaction, busy timeout) settings.DATABASES
+içindedir. busy timeout süresinde kilit alınamazsa SQLite 'database is locked'
+döner; ``retry_on_lock`` yazma bloğunu baştan, sınırlı sayıda ve rastgele
+dağıtılmış (jitter) artan beklemelerle yeniden dener.
+"""
+import functools
+import logging
+import random
+import time
+
+from django.conf import settings
+from django.db import OperationalError, connection
+
+logger = logging.getLogger(__name__)
+
+LOCK_ERRORS = ('database is locked', 'database table is locked', 'database is busy')
+
+
+def is_lock_error(exc):
+    return isinstance(exc, OperationalError) and any(text in str(exc).lower() for text in LOCK_ERRORS)
+
+
+def backoff(attempt, base_delay):
+    """Üstel artan, tam jitter'lı bekleme (sn)."""
+    return random.uniform(0, base_delay * (2 ** attempt))
+
+
+def retry_on_lock(func=None, *, attempts=None, base_delay=None):
+    """
+    Kilit hatasında fonksiyonu yeniden çalıştırır. Fonksiyon kendi transaction'ını
+    açmalıdır; dışarıda bir atomic blok varsa (transaction zaten bozulmuştur)
+    yeniden denenmez, hata yukarı iletilir.
+    """
+    if func is None:
+        return functools.partial(retry_on_lock, attempts=attempts, base_delay=base_delay)
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        retries = attempts if attempts is not None else getattr(settings, 'DB_LOCK_RETRIES', 5)
+        delay = base_delay if base_delay is not None else getattr(settings, 'DB_LOCK_RETRY_DELAY', 0.05)
+        attempt = 0
+        while True:
+            try:
+                return func(*args, **kwargs)
+            except OperationalError as exc:
+                if not is_lock_error(exc) or connection.in_atomic_block or attempt >= retries:
+                    raise
+                logger.info('Veritabanı kilitli, yeniden deneniyor (%s/%s): %s', attempt + 1, retries, func.__name__)
+                time.sleep(backoff(attempt, delay))
+                attempt += 1
+
+    return wrapper
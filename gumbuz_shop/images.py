@@ -0,0 +1,261 @@
+"""
+Görsel türevleri (responsive görseller).
+
+Yüklenen ürün görselleri ve kampanya bannerları için Pillow ile boyutlandırılmış
+türevler (grid küçük görseli, kart, lightbox, OG görseli) WebP ve JPEG olarak
+üretilir. Dosya adları kaynak içeriğin hash'inden türetilir
+(``derived/ab/<hash>-card.webp``); aynı görsel ikinci kez yüklenirse yeniden
+üretilmez ve adlar hiç değişmediği için uzun süre cache'lenebilir.
+
+Modelde yalnızca hash ve türev ölçüleri (JSON) saklanır, URL'ler render anında
+storage üzerinden kurulur. Türev yoksa (eski kayıt, bozuk dosya) her URL orijinal
+görsele düşer; mevcut kayıtlar için ``build_image_variants`` komutu kullanılır.
+"""
+import hashlib
+import logging
+from io import BytesIO
+
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.utils.functional import cached_property
+from PIL import Image, ImageOps
+
+logger = logging.getLogger(__name__)
+
+DERIVED_DIR = 'derived'
+
+# ad: (genişlik, yükseklik) - yükseklik None ise oran korunur, verilirse kırpılır
+VARIANTS = {
+    'thumb': (160, None),
+    'card': (480, None),
+    'lightbox': (1600, None),
+    'og': (1200, 630),
+}
+
+# srcset'e giren (oranı korunan) türevler, küçükten büyüğe
+SRCSET_VARIANTS = ('thumb', 'card', 'lightbox')
+
+EXIF_ORIENTATION = 0x0112
+
+FORMATS = {
+    'webp': ('WEBP', {'quality': 80, 'method': 4}),
+    'jpg': ('JPEG', {'quality': 82, 'optimize': True, 'progressive': True}),
+}
+
+# Orijinal dosyanın normalize edilmesi (admin_panel.image_jobs)
+MAX_DIMENSION = 2560
+NORMALIZE_FORMATS = {
+    'JPEG': {'quality': 85, 'optimize': True, 'progressive': True},
+    'PNG': {'optimize': True},
+    'WEBP': {'quality': 85, 'method': 4},
+}
+METADATA_KEYS = ('exif', 'xmp', 'XML:com.adobe.xmp', 'comment', 'photoshop')
+
+
+class InvalidImage(ValueError):
+    pass
+
+
+def content_hash(data):
+    return hashlib.sha256(data).hexdigest()[:20]
+
+
+def variant_name(digest, variant, ext):
+    return f'{DERIVED_DIR}/{digest[:2]}/{digest}-{variant}.{ext}'
+
+
+def target_size(source_size, spec):
+    """Türevin ölçüsü; kaynaktan büyük üretilmez."""
+    width, height = source_size
+    target_width, target_height = spec
+    if target_height is None:
+        if width <= target_width:
+            return width, height
+        return target_width, max(1, round(height * target_width / width))
+    scale = min(1, width / target_width, height / target_height)
+    return max(1, round(target_width * scale)), max(1, round(target_height * scale))
+
+
+def flatten(image):
+    """Saydam görselleri beyaz zemine oturtur (JPEG alfa kanalı taşımaz)."""
+    if image.mode in ('RGBA', 'LA') or (image.mode == 'P' and 'transparency' in image.info):
+        image = image.convert('RGBA')
+        background = Image.new('RGB', image.size, (255, 255, 255))
+        background.paste(image, mask=image.getchannel('A'))
+        return background
+    return image.convert('RGB')
+
+
+def render_variant(image, spec, size):
+    if spec[1] is None:
+        return image.resize(size, Image.Resampling.LANCZOS)
+    return ImageOps.fit(image, size, Image.Resampling.LANCZOS)
+
+
+def encode(image, fmt):
+    pil_format, params = FORMATS[fmt]
+    buffer = BytesIO()
+    image.save(buffer, pil_format, **params)
+    return buffer.getvalue()
+
+
+def normalize(data):
+    """
+    Yüklenen orijinali doğrular; EXIF yönünü uygular, metadata'yı (renk profili
+    hariç) atar, MAX_DIMENSION'a küçültür ve yeniden sıkıştırır. Yeni içeriği,
+    değişiklik gerekmiyorsa None döndürür. Geçersiz dosyada InvalidImage.
+    """
+    try:
+        with Image.open(BytesIO(data)) as probe:
+            probe.verify()
+    except Exception as exc:
+        raise InvalidImage('Geçersiz görsel dosyası') from exc
+
+    with Image.open(BytesIO(data)) as source:
+        pil_format = source.format
+        if pil_format not in NORMALIZE_FORMATS or getattr(source, 'is_animated', False):
+            return None
+
+        has_metadata = bool(source.getexif()) or any(key in source.info for key in METADATA_KEYS)
+        image = ImageOps.exif_transpose(source)
+        resized = max(image.size) > MAX_DIMENSION
+        if resized:
+            image.thumbnail((MAX_DIMENSION, MAX_DIMENSION), Image.Resampling.LANCZOS)
+        if pil_format == 'JPEG' and image.mode not in ('RGB', 'L', 'CMYK'):
+            image = image.convert('RGB')
+
+        params = dict(NORMALIZE_FORMATS[pil_format])
+        if source.info.get('icc_profile'):
+            params['icc_profile'] = source.info['icc_profile']
+        buffer = BytesIO()
+        image.save(buffer, pil_format, **params)
+
+    output = buffer.getvalue()
+    if has_metadata or resized or len(output) < len(data):
+        return output
+    return None
+
+
+def build_variants(field_file, storage=None):
+    """
+    Kaynak dosyadan tüm türevleri üretir (var olanları atlar) ve modelde
+    saklanacak sözlüğü döndürür: {'source', 'hash', 'sizes': {ad: [g, y]}}.
+    """
+    storage = storage or default_storage
+    field_file.open('rb')
+    try:
+        data = field_file.read()
+    finally:
+        field_file.close()
+
+    digest = content_hash(data)
+    image = None
+    with Image.open(BytesIO(data)) as source:
+        source_size = source.size
+        if source.getexif().get(EXIF_ORIENTATION) in (5, 6, 7, 8):  # 90° döndürülmüş
+            source_size = source_size[::-1]
+        sizes = {name: list(target_size(source_size, spec)) for name, spec in VARIANTS.items()}
+
+        for name, spec in VARIANTS.items():
+            missing = [ext for ext in FORMATS if not storage.exists(variant_name(digest, name, ext))]
+            if not missing:
+                continue
+            if image is None:
+                image = flatten(ImageOps.exif_transpose(source))
+            resized = render_variant(image, spec, tuple(sizes[name]))
+            for ext in missing:
+                storage.save(variant_name(digest, name, ext), ContentFile(encode(resized, ext)))
+
+    return {'source': field_file.name, 'hash': digest, 'sizes': sizes}
+
+
+def ensure_variants(instance, field_name, variants_field):
+    """
+    Görsel alanı değiştiyse türevleri üretir ve yalnızca türev alanını günceller.
+    Üretim hatası kaydı engellemez; URL'ler orijinal görsele düşer.
+    """
+    field_file = getattr(instance, field_name)
+    current = getattr(instance, variants_field) or {}
+    if not field_file:
+        data = {}
+    elif current.get('source') == field_file.name:
+        return current
+    else:
+        try:
+            data = build_variants(field_file)
+        except FileNotFoundError:
+            logger.info('Görsel dosyası bulunamadı: %s', field_file.name)
+            data = {}
+        except Exception:
+            logger.exception('Görsel türevleri üretilemedi: %s', field_file.name)
+            data = {}
+
+    if data != current:
+        setattr(instance, variants_field, data)
+        type(instance).objects.filter(pk=instance.pk).update(**{variants_field: data})
+    return data
+
+
+class ResponsiveImage:
+    """
+    Template'ler için türev URL'leri.
+    ``{{ image.responsive.card }}``, ``{{ image.responsive.srcset_webp }}`` gibi kullanılır.
+    """
+
+    def __init__(self, field_file, data, storage=None):
+        self.field_file = field_file
+        self.data = data or {}
+        self.storage = storage or default_storage
+
+    def __bool__(self):
+        return bool(self.field_file)
+
+    @cached_property
+    def original(self):
+        return self.field_file.url if self.field_file else ''
+
+    @property
+    def has_variants(self):
+        return bool(self.data.get('hash')) and self.data.get('source') == self.field_file.name
+
+    def url(self, variant, ext='jpg'):
+        if not self.has_variants:
+            return self.original
+        return self.storage.url(variant_name(self.data['hash'], variant, ext))
+
+    def srcset_for(self, ext):
+        if not self.has_variants:
+            return ''
+        entries = []
+        seen_widths = set()
+        for variant in SRCSET_VARIANTS:
+            width = self.data['sizes'][variant][0]
+            if width in seen_widths:  # küçük kaynakta türevler aynı ölçüde olabilir
+                continue
+            seen_widths.add(width)
+            entries.append(f'{self.url(variant, ext)} {width}w')
+        return ', '.join(entries)
+
+    @property
+    def thumb(self):
+        return self.url('thumb')
+
+    @property
+    def card(self):
+        return self.url('card')
+
+    @property
+    def lightbox(self):
+        return self.url('lightbox')
+
+    @property
+    def og(self):
+        return self.url('og')
+
+    @property
+    def srcset(self):
+        return self.srcset_for('jpg')
+
+    @property
+    def srcset_webp(self):
+        return self.srcset_for('webp')
@@ -0,0 +1,284 @@
+"""
+Opt-in request instrumentation.
+
+Her istek için SQL sorgu sayısı/süresi, cache hit/miss, template render süresi
+ve toplam süre ölçülür; çözümlenen URL adına göre süreç içi histogramlarda
+toplanır. Aynı SQL şeklinin tekrarlandığı istekler (N+1) view adıyla loglanır.
+
+Açmak için settings içinde ``INSTRUMENTATION_ENABLED = True``; settings.py cache ve
+şablon backend'lerini de buna göre bu modüldeki alt sınıflarla değiştirir (kapalıyken
+Django'nun kendi backend'leri kullanılır).
+
+Hiçbir şey süreç genelinde monkeypatch edilmez; ölçümler istek başına bir
+ContextVar'daki kayda yazılır (ASGI'de eşzamanlı istekler birbirine karışmaz):
+
+* SQL: ``connection.execute_wrapper`` (yalnızca istek süresince),
+* cache: settings.CACHES'te bu modüldeki backend alt sınıfları (``DatabaseCache``,
+  ``LocMemCache``); get ve get_many sayılır, get_or_set ve async varyantlar
+  (aget, aget_many, aget_or_set) bunların üzerinden geçtiği için sayılır,
+* template: settings.TEMPLATES'te ``DjangoTemplates`` backend alt sınıfı.
+
+Kayıt yokken (instrumentation kapalı ya da istek dışı) ek maliyet tek bir
+ContextVar okumasıdır.
+"""
+import logging
+import re
+import threading
+import time
+from collections import Counter
+from contextlib import ExitStack
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.core.cache.backends.db import DatabaseCache as BaseDatabaseCache
+from django.core.cache.backends.locmem import LocMemCache as BaseLocMemCache
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+from django.template.backends.django import DjangoTemplates as BaseDjangoTemplates, Template as BackendTemplate
+
+logger = logging.getLogger(__name__)
+
+# Histogram bucket üst sınırları
+TIME_BUCKETS_MS = (5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000)
+QUERY_BUCKETS = (1, 2, 5, 10, 20, 50, 100, 200, 500)
+
+_current_record = ContextVar('instrumentation_record', default=None)
+_MISSING = object()
+
+_IN_LIST_RE = re.compile(r'IN \((?:%s, )*%s\)')
+_STRING_RE = re.compile(r"'(?:[^']|'')*'")
+_NUMBER_RE = re.compile(r'\b\d+(?:\.\d+)?\b')
+_SPACE_RE = re.compile(r'\s+')
+
+
+def sql_shape(sql):
+    """Parametre ve literal farklarını atarak sorgunun şeklini döndürür."""
+    shape = _IN_LIST_RE.sub('IN (...)', sql)
+    shape = _STRING_RE.sub('?', shape)
+    shape = _NUMBER_RE.sub('?', shape)
+    return _SPACE_RE.sub(' ', shape).strip()
+
+
+class RequestRecord:
+    """Tek bir isteğin ölçümleri."""
+    __slots__ = (
+        'sql_count', 'sql_time', 'sql_shapes', 'cache_hits', 'cache_misses', 'cache_depth',
+        'template_time', 'template_depth',
+    )
+
+    def __init__(self):
+        self.sql_count = 0
+        self.sql_time = 0.0
+        self.sql_shapes = Counter()
+        self.cache_hits = 0
+        self.cache_misses = 0
+        self.cache_depth = 0
+        self.template_time = 0.0
+        self.template_depth = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        # connection.execute_wrapper arayüzü
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.sql_time += time.perf_counter() - start
+            self.sql_count += 1
+            self.sql_shapes[sql_shape(sql)] += 1
+
+    def repeated_queries(self, threshold):
+        return [(shape, count) for shape, count in self.sql_shapes.most_common() if count >= threshold]
+
+
+class Histogram:
+    def __init__(self, bounds):
+        self.bounds = bounds
+        self.buckets = [0] * (len(bounds) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def observe(self, value):
+        index = len(self.bounds)
+        for i, bound in enumerate(self.bounds):
+            if value <= bound:
+                index = i
+                break
+        self.buckets[index] += 1
+        self.count += 1
+        self.total += value
+        self.max = max(self.max, value)
+
+    def as_dict(self):
+        labels = [f'<={bound}' for bound in self.bounds] + [f'>{self.bounds[-1]}']
+        return {
+            'count': self.count,
+            'avg': round(self.total / self.count, 2) if self.count else 0,
+            'max': round(self.max, 2),
+            'buckets': dict(zip(labels, self.buckets)),
+        }
+
+
+class MetricsRegistry:
+    """URL adına göre histogramları süreç içinde tutar."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._views = {}
+
+    def _view(self, view_name):
+        view = self._views.get(view_name)
+        if view is None:
+            view = self._views[view_name] = {
+                'wall_ms': Histogram(TIME_BUCKETS_MS),
+                'sql_ms': Histogram(TIME_BUCKETS_MS),
+                'sql_queries': Histogram(QUERY_BUCKETS),
+                'template_ms': Histogram(TIME_BUCKETS_MS),
+                'cache_hits': 0,
+                'cache_misses': 0,
+                'n_plus_one': 0,
+                'last_repeated_query': '',
+            }
+        return view
+
+    def observe(self, view_name, record, wall_ms, repeated):
+        with self._lock:
+            view = self._view(view_name)
+            view['wall_ms'].observe(wall_ms)
+            view['sql_ms'].observe(record.sql_time * 1000)
+            view['sql_queries'].observe(record.sql_count)
+            view['template_ms'].observe(record.template_time * 1000)
+            view['cache_hits'] += record.cache_hits
+            view['cache_misses'] += record.cache_misses
+            if repeated:
+                view['n_plus_one'] += 1
+                view['last_repeated_query'] = repeated[0][0]
+
+    def snapshot(self):
+        with self._lock:
+            return {
+                name: {
+                    key: value.as_dict() if isinstance(value, Histogram) else value
+                    for key, value in view.items()
+                }
+                for name, view in sorted(self._views.items())
+            }
+
+    def reset(self):
+        with self._lock:
+            self._views.clear()
+
+
+registry = MetricsRegistry()
+
+
+class InstrumentedCacheMixin:
+    """
+    Cache okumalarını isteğin kaydına hit/miss olarak sayar. Backend'ler get'i
+    get_many ile (ya da tersi) gerçekleyebildiği için yalnızca en dıştaki çağrı sayılır.
+    """
+
+    def get(self, key, default=None, version=None):
+        record = _current_record.get()
+        if record is None or record.cache_depth:
+            return super().get(key, default, version)
+        record.cache_depth += 1
+        try:
+            value = super().get(key, _MISSING, version)
+        finally:
+            record.cache_depth -= 1
+        if value is _MISSING:
+            record.cache_misses += 1
+            return default
+        record.cache_hits += 1
+        return value
+
+    def get_many(self, keys, version=None):
+        record = _current_record.get()
+        if record is None or record.cache_depth:
+            return super().get_many(keys, version)
+        keys = list(keys)
+        record.cache_depth += 1
+        try:
+            values = super().get_many(keys, version)
+        finally:
+            record.cache_depth -= 1
+        record.cache_hits += len(values)
+        record.cache_misses += len(keys) - len(values)
+        return values
+
+
+class DatabaseCache(InstrumentedCacheMixin, BaseDatabaseCache):
+    pass
+
+
+class LocMemCache(InstrumentedCacheMixin, BaseLocMemCache):
+    pass
+
+
+class InstrumentedTemplate(BackendTemplate):
+    def render(self, context=None, request=None):
+        record = _current_record.get()
+        if record is None:
+            return super().render(context, request)
+        # Şablon içinden render edilen şablonlar (render_to_string) sadece en dıştan ölçülür
+        record.template_depth += 1
+        start = time.perf_counter()
+        try:
+            return super().render(context, request)
+        finally:
+            record.template_depth -= 1
+            if record.template_depth == 0:
+                record.template_time += time.perf_counter() - start
+
+
+class DjangoTemplates(BaseDjangoTemplates):
+    """Render süresini ölçen şablon backend'i (include/extends aynı render'ın parçasıdır)."""
+
+    def from_string(self, template_code):
+        return InstrumentedTemplate(super().from_string(template_code).template, self)
+
+    def get_template(self, template_name):
+        return InstrumentedTemplate(super().get_template(template_name).template, self)
+
+
+class InstrumentationMiddleware:
+    """
+    İstek bazlı SQL/cache/template/süre ölçümü.
+    Sonuçlar ``Server-Timing`` header'ı ile döner ve /panel/instrumentation/ altında toplanır.
+    """
+
+    def __init__(self, get_response):
+        if not getattr(settings, 'INSTRUMENTATION_ENABLED', False):
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.n_plus_one_threshold = getattr(settings, 'INSTRUMENTATION_N_PLUS_ONE_THRESHOLD', 5)
+
+    def __call__(self, request):
+        record = RequestRecord()
+        token = _current_record.set(record)
+        start = time.perf_counter()
+        try:
+            with ExitStack() as stack:
+                for connection in connections.all():
+                    stack.enter_context(connection.execute_wrapper(record))
+                response = self.get_response(request)
+        finally:
+            _current_record.reset(token)
+        wall_ms = (time.perf_counter() - start) * 1000
+
+        match = getattr(request, 'resolver_match', None)
+        view_name = (match.view_name or match._func_path) if match else 'unresolved'
+
+        repeated = record.repeated_queries(self.n_plus_one_threshold)
+        for shape, count in repeated:
+            logger.warning('Olası N+1 (%s): aynı sorgu %d kez çalıştı: %s', view_name, count, shape[:300])
+
+        registry.observe(view_name, record, wall_ms, repeated)
+        response['Server-Timing'] = ', '.join([
+            f'db;dur={record.sql_time * 1000:.1f};desc="{record.sql_count} sorgu"',
+            f'cache;desc="{record.cache_hits} hit / {record.cache_misses} miss"',
+            f'tpl;dur={record.template_time * 1000:.1f}',
+            f'total;dur={wall_ms:.1f}',
+        ])
+        return response
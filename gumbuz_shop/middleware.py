@@ -1,30 +1,59 @@
 import datetime
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
 from django.core.cache import cache
 from django.conf import settings
 
+ACTIVE_USERS_KEY = 'active_users_dict'
+ACTIVE_USER_TIMEOUT = 300  # 5 dakika
+
+
+def _touch_active_users(active_users, session_key):
+    """Oturumun zaman damgasını günceller, süresi dolanları atar."""
+    now = datetime.datetime.now().timestamp()
+    active_users[session_key] = now
+    return {k: v for k, v in active_users.items() if now - v < ACTIVE_USER_TIMEOUT}
+
+
 class ActiveUserMiddleware:
+    """
+    Aktif oturumları cache'teki tek bir sözlükte tutar.
+    Hem sync (WSGI) hem async (ASGI) zincirde çalışır; ASGI altında async cache API kullanılır.
+    """
+    sync_capable = True
+    async_capable = True
+
     def __init__(self, get_response):
         self.get_response = get_response
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
 
     def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+
         if request.session.session_key:
-            # Get current dict
-            active_users = cache.get('active_users_dict', {})
-            
-            # Update current user timestamp
-            now = datetime.datetime.now().timestamp()
-            active_users[request.session.session_key] = now
-            
-            # Cleanup expired (optional optimization: do this only occasionally)
-            timeout = 300
-            active_users = {k: v for k, v in active_users.items() if now - v < timeout}
-            
-            # Save back
-            cache.set('active_users_dict', active_users, timeout + 60)
+            active_users = cache.get(ACTIVE_USERS_KEY, {})
+            active_users = _touch_active_users(active_users, request.session.session_key)
+            cache.set(ACTIVE_USERS_KEY, active_users, ACTIVE_USER_TIMEOUT + 60)
 
         response = self.get_response(request)
         return response
 
+    async def __acall__(self, request):
+        if request.session.session_key:
+            active_users = await cache.aget(ACTIVE_USERS_KEY, {})
+            active_users = _touch_active_users(active_users, request.session.session_key)
+            await cache.aset(ACTIVE_USERS_KEY, active_users, ACTIVE_USER_TIMEOUT + 60)
+
+        return await self.get_response(request)
+
+
+def _count_active(active_users):
+    now = datetime.datetime.now().timestamp()
+    return sum(1 for v in active_users.values() if now - v < ACTIVE_USER_TIMEOUT)
+
+
 def get_active_user_count():
     # This is a bit expensive for Redis/Memcached if we have millions of keys,
     # but for a small shop with local memory cache or limited users, it's fine.
@@ -51,13 +80,8 @@ def get_active_user_count():
     # We will use a dedicated cache key `active_users_list` which is a dict {session_key: timestamp}.
     # We clean it up on read.
     
-    active_users = cache.get('active_users_dict', {})
-    
-    # Clean up expired
-    now = datetime.datetime.now().timestamp()
-    timeout = 300 # 5 minutes
-    
-    # Filter out expired
-    active_users = {k: v for k, v in active_users.items() if now - v < timeout}
-    
-    return len(active_users)
+    return _count_active(cache.get(ACTIVE_USERS_KEY, {}))
+
+
+async def aget_active_user_count():
+    return _count_active(await cache.aget(ACTIVE_USERS_KEY, {}))
@@ -47,6 +47,7 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'gumbuz_shop.instrumentation.InstrumentationMiddleware',  # INSTRUMENTATION_ENABLED ile açılır
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -60,9 +61,18 @@ MIDDLEWARE = [
 
 ROOT_URLCONF = 'gumbuz_shop.urls'
 
+# Instrumentation (query count / latency)
+# Açıkken her yanıta Server-Timing eklenir, metrikler /panel/instrumentation/ altında görülür.
+# Şablon ve cache backend'leri yalnızca açıkken ölçüm yapan alt sınıflarla değiştirilir.
+INSTRUMENTATION_ENABLED = False
+INSTRUMENTATION_N_PLUS_ONE_THRESHOLD = 5
+
 TEMPLATES = [
     {
-        'BACKEND': 'django.template.backends.django.DjangoTemplates',
+        'BACKEND': (
+            'gumbuz_shop.instrumentation.DjangoTemplates' if INSTRUMENTATION_ENABLED
+            else 'django.template.backends.django.DjangoTemplates'
+        ),
         'DIRS': [BASE_DIR / 'templates'],
         'APP_DIRS': True,
         'OPTIONS': {
@@ -71,6 +81,8 @@ TEMPLATES = [
                 'django.contrib.auth.context_processors.auth',
                 'django.contrib.messages.context_processors.messages',
                 'gumbuz_shop.context_processors.active_user_count',
+                'gumbuz_shop.context_processors.assets',
+                'gumbuz_shop.context_processors.sse',
             ],
         },
     },
@@ -86,16 +98,86 @@ DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
         'NAME': BASE_DIR / 'db.sqlite3',
+        'OPTIONS': {
+            # atomic() blokları BEGIN IMMEDIATE ile açılır: yazma kilidi en başta alınır,
+            # okuma->yazma yükseltmesinde bekleme yapılmadan 'database is locked' hatası alınmaz.
+            'transaction_mode': 'IMMEDIATE',
+            'timeout': 20,  # busy_timeout (sn): kilidi bekleme süresi
+            # WAL: okuyucular yazanı beklemez; synchronous=NORMAL WAL'da güvenli ve hızlı
+            'init_command': (
+                'PRAGMA journal_mode=WAL;'
+                'PRAGMA synchronous=NORMAL;'
+                'PRAGMA temp_store=MEMORY;'
+                'PRAGMA cache_size=-20000;'
+                'PRAGMA mmap_size=134217728'
+            ),
+        },
     }
 }
 
+# Kilit hatasında (gumbuz_shop.db.retry_on_lock) yeniden deneme sayısı ve ilk bekleme (sn)
+DB_LOCK_RETRIES = 5
+DB_LOCK_RETRY_DELAY = 0.05
+
 CACHES = {
     'default': {
-        'BACKEND': 'django.core.cache.backends.db.DatabaseCache',
+        # Instrumentation açıkken hit/miss sayan alt sınıf
+        'BACKEND': (
+            'gumbuz_shop.instrumentation.DatabaseCache' if INSTRUMENTATION_ENABLED
+            else 'django.core.cache.backends.db.DatabaseCache'
+        ),
         'LOCATION': 'my_cache_table',
     }
 }
 
+# Checkout tekrar/sahte sipariş tespiti (orders.abuse)
+# Pencere içinde aynı telefon+kampanyadan ABUSE_FLAG_PHONE / aynı adrese ABUSE_FLAG_ADDRESS
+# önceki sipariş varsa sipariş şüpheli işaretlenir; ABUSE_REJECT_PHONE ve üstü reddedilir.
+ABUSE_WINDOW = 30 * 60
+ABUSE_FLAG_PHONE = 1
+ABUSE_FLAG_ADDRESS = 2
+ABUSE_REJECT_PHONE = 4
+
+
+# Süreç içi adres ağacı (addresses.tree)
+# Diğer süreçlerdeki adres değişiklikleri en geç bu kadar saniye sonra fark edilir.
+ADDRESS_TREE_CHECK_INTERVAL = 30
+
+
+# Yüklenen görsellerin arka plan işleri (admin_panel.image_jobs)
+# 'thread': süreç içi thread, 'worker': yalnızca process_image_jobs komutu, 'inline': commit sonrası aynı istekte
+IMAGE_JOB_RUNNER = 'thread'
+
+
+# Checkout öncesi stok ayırma (orders.holds)
+# Ürün seçildiğinde stok STOCK_HOLD_TTL saniye ayrılır; süresi dolanlar en fazla
+# STOCK_HOLD_SWEEP_INTERVAL saniyede bir (veya sweep_stock_holds komutuyla) stoğa döner.
+STOCK_HOLD_TTL = 600
+STOCK_HOLD_SWEEP_INTERVAL = 60
+# Oturum başına ürün başına en fazla ayrılabilecek adet; ayrım istekleri IP başına
+# SiteSettings sipariş limitinin bu katı kadardır (seçim her değişiklikte gönderilir).
+STOCK_HOLD_MAX_PER_PRODUCT = 3
+STOCK_HOLD_RATE_FACTOR = 10
+
+
+# Yoğun satış modu (orders.intake)
+# 'direct': sipariş istekte oluşturulur; 'journal': istek ön kayda yazılıp hemen döner,
+# sipariş worker'da toplu oluşturulur. Runner: 'thread' | 'worker' (process_order_intake) | 'inline'
+ORDER_INTAKE_MODE = 'direct'
+ORDER_INTAKE_RUNNER = 'thread'
+
+
+# Checkout tekrar anahtarlarının geçerlilik süresi (sn, orders.idempotency)
+IDEMPOTENCY_KEY_TTL = 24 * 60 * 60
+
+
+# Server-Sent Events (yalnızca ASGI altında; bkz. gumbuz_shop/sse.py)
+# Tek üretici görev SSE_POLL_INTERVAL saniyede bir cache'i okur, değişiklikleri tüm bağlantılara yayar.
+SSE_PATH = '/orders/stream/'
+SSE_POLL_INTERVAL = 2
+SSE_HEARTBEAT = 15
+SSE_RETRY_MS = 5000
+
 
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
@@ -134,9 +216,28 @@ USE_TZ = True
 STATIC_URL = 'static/'
 STATIC_ROOT = BASE_DIR / 'staticfiles'
 
+# Kendi sunduğumuz ön yüz dosyaları (gumbuz_shop/assets.py): static/vendor (build_assets --fetch)
+# ve static/build (build_assets çıktısı); ikisi de dağıtımda collectstatic'ten önce üretilir
+ASSETS_DIR = BASE_DIR / 'static'
+STATICFILES_DIRS = [ASSETS_DIR]
+# build_assets Tailwind standalone CLI'yi tailwindcss-bin paketinden bulur; başka bir ikili için yolu verin
+TAILWIND_CLI = None
+
 MEDIA_URL = '/media/'
 MEDIA_ROOT = BASE_DIR / 'media'
 
+# Medya dosyaları içerik hash'iyle saklanır (tekilleştirme + immutable URL), bkz. gumbuz_shop/storage.py
+STORAGES = {
+    'default': {
+        'BACKEND': 'gumbuz_shop.storage.ContentAddressedStorage',
+    },
+    # collectstatic: içerik hash'li adlar + .br/.gz kopyaları; gumbuz_shop.staticfiles
+    # bunları (wsgi.py/asgi.py) Accept-Encoding'e göre, hash'lileri immutable olarak verir
+    'staticfiles': {
+        'BACKEND': 'gumbuz_shop.storage.CompressedManifestStaticFilesStorage',
+    },
+}
+
 # Default primary key field type
 # https://docs.djangoproject.com/en/5.2/ref/settings/#default-auto-field
 
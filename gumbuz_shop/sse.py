@@ -0,0 +1,161 @@
+"""
+Server-Sent Events yayını (ASGI).
+
+Storefront'taki sosyal kanıt widget'ı ve admin dashboard'daki anlık kullanıcı
+sayısı için tek bir süreç içi yayıncı (Broadcaster) kullanılır: bağlı istemci
+sayısından bağımsız olarak tek bir üretici görev, belirli aralıklarla cache'teki
+sosyal kanıt akışını ve aktif kullanıcı sayısını okur; değişiklikleri bir kez
+kodlayıp tüm abonelerin kuyruğuna bırakır. İstemci başına veritabanı işi yoktur.
+
+asgi.py, SSE_PATH isteklerini Django'ya uğramadan buraya yönlendirir. WSGI
+altında bu yol 404 döner ve widget eski poll davranışına düşer.
+"""
+import asyncio
+import json
+import logging
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+
+def format_event(event, data):
+    """SSE mesajını (tüm istemcilere aynen gönderilecek) byte olarak kodlar."""
+    payload = json.dumps(data, ensure_ascii=False, separators=(',', ':'))
+    return f'event: {event}\ndata: {payload}\n\n'.encode('utf-8')
+
+
+def entry_key(entry):
+    return (entry.get('created_at'), entry.get('name'), entry.get('product_name'))
+
+
+class Broadcaster:
+    """
+    Aboneler: sınırlı asyncio.Queue'lar. Yavaş istemcinin kuyruğu dolarsa en
+    eski mesaj atılır; üretici hiçbir istemciyi beklemez. Abone kalmayınca
+    üretici durur.
+    """
+
+    def __init__(self, interval=None, queue_size=50):
+        self.interval = interval if interval is not None else getattr(settings, 'SSE_POLL_INTERVAL', 2)
+        self.queue_size = queue_size
+        self.subscribers = set()
+        self.task = None
+        self.ready = None
+        self.entries = []
+        self.visitors = None
+
+    async def subscribe(self):
+        queue = asyncio.Queue(maxsize=self.queue_size)
+        self.subscribers.add(queue)
+        if self.task is None or self.task.done():
+            self.ready = asyncio.Event()
+            self.task = asyncio.ensure_future(self._produce())
+        await self.ready.wait()
+        return queue
+
+    def unsubscribe(self, queue):
+        self.subscribers.discard(queue)
+        if not self.subscribers and self.task is not None:
+            self.task.cancel()
+            self.task = None
+
+    def snapshot(self):
+        """Yeni bağlanan istemcinin ilk mesajı: mevcut akış ve sayaç (DB'ye gitmez)."""
+        return format_event('snapshot', {'entries': self.entries, 'visitors': self.visitors})
+
+    def publish(self, event, data):
+        message = format_event(event, data)
+        for queue in list(self.subscribers):
+            if queue.full():
+                queue.get_nowait()
+            queue.put_nowait(message)
+
+    def read_state(self):
+        from gumbuz_shop.middleware import get_active_user_count
+        from orders import social_proof
+
+        return social_proof.get_feed(), get_active_user_count()
+
+    def update(self, entries, visitors):
+        """Önceki duruma göre yeni girdileri (eskiden yeniye) ve sayaç değişimini yayınlar."""
+        if self.ready.is_set():
+            known = {entry_key(entry) for entry in self.entries}
+            for entry in reversed(entries):
+                if entry_key(entry) not in known:
+                    self.publish('social_proof', entry)
+            if visitors != self.visitors:
+                self.publish('visitors', {'count': visitors})
+        self.entries = entries
+        self.visitors = visitors
+        self.ready.set()
+
+    async def _produce(self):
+        while True:
+            try:
+                entries, visitors = await sync_to_async(self.read_state)()
+                self.update(entries, visitors)
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception('SSE yayıncısı durumu okuyamadı')
+                self.ready.set()
+            await asyncio.sleep(self.interval)
+
+
+broadcaster = Broadcaster()
+
+STREAM_HEADERS = [
+    (b'content-type', b'text/event-stream; charset=utf-8'),
+    (b'cache-control', b'no-cache'),
+    (b'x-accel-buffering', b'no'),
+]
+
+
+async def _wait_disconnect(receive):
+    while True:
+        message = await receive()
+        if message['type'] == 'http.disconnect':
+            return
+
+
+async def sse_application(scope, receive, send, broadcaster=broadcaster):
+    """Tek bir SSE bağlantısı: snapshot, ardından yayınlar ve heartbeat yorumları."""
+    heartbeat = getattr(settings, 'SSE_HEARTBEAT', 15)
+    retry_ms = getattr(settings, 'SSE_RETRY_MS', 5000)
+
+    if scope['method'] == 'HEAD':
+        # Yalnızca başlıklar; yayına abone olunmaz, akış başlamaz
+        await send({'type': 'http.response.start', 'status': 200, 'headers': STREAM_HEADERS})
+        await send({'type': 'http.response.body', 'body': b''})
+        return
+    if scope['method'] != 'GET':
+        await send({'type': 'http.response.start', 'status': 405, 'headers': [(b'allow', b'GET, HEAD')]})
+        await send({'type': 'http.response.body', 'body': b''})
+        return
+
+    queue = await broadcaster.subscribe()
+    disconnect = asyncio.ensure_future(_wait_disconnect(receive))
+    try:
+        await send({'type': 'http.response.start', 'status': 200, 'headers': STREAM_HEADERS})
+        await send({
+            'type': 'http.response.body',
+            'body': f'retry: {retry_ms}\n\n'.encode() + broadcaster.snapshot(),
+            'more_body': True,
+        })
+        while True:
+            get = asyncio.ensure_future(queue.get())
+            done, _ = await asyncio.wait({get, disconnect}, timeout=heartbeat, return_when=asyncio.FIRST_COMPLETED)
+            if disconnect in done:
+                get.cancel()
+                break
+            if get in done:
+                message = get.result()
+            else:
+                get.cancel()
+                message = b': ping\n\n'
+            await send({'type': 'http.response.body', 'body': message, 'more_body': True})
+    finally:
+        disconnect.cancel()
+        broadcaster.unsubscribe(queue)
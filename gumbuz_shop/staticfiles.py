@@ -0,0 +1,245 @@
+"""
+Statik dosya servisi (WSGI ve ASGI).
+
+Django'nun önüne takılan küçük bir uygulama: STATIC_URL altındaki istekleri
+``STATIC_ROOT``'tan, Django'ya (middleware, URL çözümleme, oturum) hiç uğramadan
+cevaplar. Dosya listesi süreç açılışında bir kez taranır; istek başına yalnızca
+sözlük araması ve dosya açma vardır.
+
+* ``collectstatic`` (gumbuz_shop.storage.CompressedManifestStaticFilesStorage)
+  hash'li her metin dosyasının yanına ``.br`` ve ``.gz`` kopyalarını yazar;
+  istemcinin ``Accept-Encoding``'ine göre uygun kopya ``Content-Encoding`` ile
+  verilir, istek başına sıkıştırma yapılmaz.
+* Manifest'teki hash'li adlar değişmez (immutable) olarak bir yıl cache'lenir;
+  hash'siz adlar ETag ile her seferinde doğrulanır (304).
+
+wsgi.py ve asgi.py uygulamayı ``wsgi(...)`` / ``asgi(...)`` ile sarar. STATIC_ROOT
+yoksa (geliştirme) her istek olduğu gibi Django'ya gider.
+"""
+import asyncio
+import json
+import mimetypes
+import os
+from dataclasses import dataclass, field
+from email.utils import formatdate
+from urllib.parse import urlparse
+from wsgiref.util import FileWrapper
+
+from django.conf import settings
+
+from .storage import ENCODINGS, IMMUTABLE_MAX_AGE
+
+BLOCK_SIZE = 64 * 1024
+IMMUTABLE_CACHE_CONTROL = f'public, max-age={IMMUTABLE_MAX_AGE}, immutable'
+REVALIDATE_CACHE_CONTROL = 'public, max-age=0, must-revalidate'
+MANIFEST_NAME = 'staticfiles.json'
+SIDECAR_SUFFIXES = tuple(suffix for _, suffix, _ in ENCODINGS) + ('.tmp',)
+
+# Sistem mimetypes veritabanına bağlı kalmamak için sık kullanılanlar
+CONTENT_TYPES = {
+    '.css': 'text/css; charset=utf-8',
+    '.js': 'text/javascript; charset=utf-8',
+    '.mjs': 'text/javascript; charset=utf-8',
+    '.json': 'application/json',
+    '.map': 'application/json',
+    '.svg': 'image/svg+xml',
+    '.woff2': 'font/woff2',
+    '.woff': 'font/woff',
+    '.webp': 'image/webp',
+    '.avif': 'image/avif',
+    '.ico': 'image/x-icon',
+}
+
+
+def content_type(name):
+    extension = os.path.splitext(name)[1].lower()
+    if extension in CONTENT_TYPES:
+        return CONTENT_TYPES[extension]
+    guessed, _ = mimetypes.guess_type(name)
+    if guessed is None:
+        return 'application/octet-stream'
+    return f'{guessed}; charset=utf-8' if guessed.startswith('text/') else guessed
+
+
+def accepted_encodings(header):
+    """'br;q=1.0, gzip, *;q=0' -> {'br': 1.0, 'gzip': 1.0, '*': 0.0}"""
+    accepted = {}
+    for part in (header or '').split(','):
+        name, _, params = part.partition(';')
+        name = name.strip().lower()
+        if not name:
+            continue
+        quality = 1.0
+        for param in params.split(';'):
+            key, _, value = param.partition('=')
+            if key.strip() == 'q':
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        accepted[name] = quality
+    return accepted
+
+
+@dataclass(frozen=True)
+class Variant:
+    path: str
+    size: int
+    etag: str
+
+
+@dataclass
+class StaticFile:
+    content_type: str
+    cache_control: str
+    last_modified: str
+    # 'identity' her zaman var; 'br' / 'gzip' yalnızca kopyası yazılmışsa
+    variants: dict = field(default_factory=dict)
+
+    def select(self, accept_encoding):
+        """İstemcinin kabul ettiği en küçük kopya: (kodlama, Variant)."""
+        if len(self.variants) > 1:
+            accepted = accepted_encodings(accept_encoding)
+            for encoding, _, _ in ENCODINGS:
+                if encoding in self.variants and accepted.get(encoding, accepted.get('*', 0)) > 0:
+                    return encoding, self.variants[encoding]
+        return 'identity', self.variants['identity']
+
+
+class StaticFiles:
+    def __init__(self, root=None, url=None):
+        root = root if root is not None else settings.STATIC_ROOT
+        self.root = str(root) if root else ''
+        prefix = urlparse(url if url is not None else settings.STATIC_URL or '').path
+        self.prefix = '/' + prefix.strip('/') + '/'
+        self.files = self.scan()
+
+    def hashed_names(self):
+        try:
+            with open(os.path.join(self.root, MANIFEST_NAME), encoding='utf-8') as f:
+                return set(json.load(f).get('paths', {}).values())
+        except (OSError, ValueError):
+            return set()
+
+    def scan(self):
+        """{url yolu: StaticFile}"""
+        if not self.root or not os.path.isdir(self.root):
+            return {}
+        hashed = self.hashed_names()
+        files = {}
+        for directory, _, filenames in os.walk(self.root):
+            names = set(filenames)
+            for filename in filenames:
+                if filename.endswith(SIDECAR_SUFFIXES):
+                    continue
+                path = os.path.join(directory, filename)
+                name = os.path.relpath(path, self.root).replace(os.sep, '/')
+                stat = os.stat(path)
+                static_file = StaticFile(
+                    content_type=content_type(filename),
+                    cache_control=IMMUTABLE_CACHE_CONTROL if name in hashed else REVALIDATE_CACHE_CONTROL,
+                    last_modified=formatdate(stat.st_mtime, usegmt=True),
+                )
+                etag = f'{int(stat.st_mtime):x}-{stat.st_size:x}'
+                static_file.variants['identity'] = Variant(path, stat.st_size, f'"{etag}"')
+                for encoding, suffix, _ in ENCODINGS:
+                    if filename + suffix in names:
+                        static_file.variants[encoding] = Variant(
+                            path + suffix, os.path.getsize(path + suffix), f'"{etag}-{encoding}"'
+                        )
+                files[self.prefix + name] = static_file
+        return files
+
+    def respond(self, method, path, accept_encoding='', if_none_match=''):
+        """
+        Statik dosyaysa (durum, başlıklar, gövde dosya yolu | None), değilse None
+        (istek uygulamaya gider).
+        """
+        if not path.startswith(self.prefix):
+            return None
+        static_file = self.files.get(path)
+        if static_file is None:
+            return None
+        if method not in ('GET', 'HEAD'):
+            return 405, [('Allow', 'GET, HEAD'), ('Content-Length', '0')], None
+
+        encoding, variant = static_file.select(accept_encoding)
+        headers = [
+            ('Cache-Control', static_file.cache_control),
+            ('ETag', variant.etag),
+            ('Last-Modified', static_file.last_modified),
+        ]
+        if len(static_file.variants) > 1:
+            headers.append(('Vary', 'Accept-Encoding'))
+        if if_none_match and variant.etag in (tag.strip() for tag in if_none_match.split(',')):
+            return 304, headers, None
+
+        headers += [('Content-Type', static_file.content_type), ('Content-Length', str(variant.size))]
+        if encoding != 'identity':
+            headers.append(('Content-Encoding', encoding))
+        return 200, headers, None if method == 'HEAD' else variant.path
+
+
+STATUS_LINES = {200: '200 OK', 304: '304 Not Modified', 405: '405 Method Not Allowed'}
+
+
+def wsgi(application, static_files=None):
+    static_files = static_files or StaticFiles()
+
+    def static_application(environ, start_response):
+        # PATH_INFO WSGI'de latin-1 olarak çözülmüş baytlardır
+        path = environ.get('PATH_INFO', '').encode('latin-1').decode('utf-8', 'replace')
+        response = static_files.respond(
+            environ['REQUEST_METHOD'], path,
+            environ.get('HTTP_ACCEPT_ENCODING', ''), environ.get('HTTP_IF_NONE_MATCH', ''),
+        )
+        if response is None:
+            return application(environ, start_response)
+        status, headers, body_path = response
+        start_response(STATUS_LINES[status], headers)
+        if body_path is None:
+            return [b'']
+        file_wrapper = environ.get('wsgi.file_wrapper', FileWrapper)
+        return file_wrapper(open(body_path, 'rb'), BLOCK_SIZE)
+
+    static_application.static_files = static_files
+    return static_application
+
+
+def asgi(application, static_files=None):
+    static_files = static_files or StaticFiles()
+
+    async def static_application(scope, receive, send):
+        if scope['type'] == 'http':
+            headers = dict(scope.get('headers') or ())
+            response = static_files.respond(
+                scope['method'], scope['path'],
+                headers.get(b'accept-encoding', b'').decode('latin-1'),
+                headers.get(b'if-none-match', b'').decode('latin-1'),
+            )
+            if response is not None:
+                status, response_headers, body_path = response
+                await send({
+                    'type': 'http.response.start',
+                    'status': status,
+                    'headers': [(name.lower().encode(), value.encode()) for name, value in response_headers],
+                })
+                await _send_file(send, body_path)
+                return
+        await application(scope, receive, send)
+
+    static_application.static_files = static_files
+    return static_application
+
+
+async def _send_file(send, path):
+    if path is None:
+        await send({'type': 'http.response.body', 'body': b''})
+        return
+    with open(path, 'rb') as f:
+        while True:
+            chunk = await asyncio.to_thread(f.read, BLOCK_SIZE)
+            more = len(chunk) == BLOCK_SIZE
+            await send({'type': 'http.response.body', 'body': chunk, 'more_body': more})
+            if not more:
+                return
@@ -0,0 +1,135 @@
+"""
+İçerik adresli medya depolama ve sıkıştırılmış, hash'li statik dosyalar.
+
+Yüklenen dosya, yükleme adıyla değil içeriğinin SHA-256 hash'iyle saklanır:
+``products/foto.jpg`` -> ``products/3f/3fa9...c1.jpg``. Aynı fotoğraf birden
+fazla ürüne yüklendiğinde tek dosya tutulur ve bir ad hiçbir zaman farklı bir
+içeriğe işaret etmediği için URL'ler değişmez (immutable) olarak bir yıl
+cache'lenebilir.
+
+Dosyalar paylaşıldığı için kod içinden silinmez; hiçbir kayıt tarafından
+referans edilmeyen dosyaları ``gc_media`` komutu temizler.
+
+Statik dosyalar ``collectstatic`` sırasında içerik hash'li adlarla
+(``ManifestStaticFilesStorage``) toplanır ve her hash'li dosyanın yanına önceden
+sıkıştırılmış ``.gz`` ve ``.br`` kopyaları yazılır; istek başına sıkıştırma
+yapılmaz, gumbuz_shop.staticfiles bunları ``Accept-Encoding``'e göre verir.
+"""
+import gzip
+import hashlib
+import os
+import posixpath
+import re
+
+import brotli
+from django.contrib.staticfiles.storage import ManifestStaticFilesStorage
+from django.core.files import File
+from django.core.files.storage import FileSystemStorage
+from django.utils.cache import patch_cache_control
+from django.views.static import serve
+
+HASH_LENGTH = 32
+IMMUTABLE_MAX_AGE = 365 * 24 * 60 * 60
+
+# <dizin>/ab/<hash>[-türev].<uzantı>; görsel türevlerinin adları da kaynak hash'inden türetilir
+CONTENT_ADDRESSED_RE = re.compile(r'(?:^|/)([0-9a-f]{2})/\1[0-9a-f]{18,62}(?:-[a-z]+)?\.[a-z0-9]+$')
+
+
+# Metin tabanlı biçimler; görseller, woff2 vb. zaten sıkıştırılmıştır
+COMPRESSIBLE_EXTENSIONS = ('.css', '.js', '.mjs', '.map', '.json', '.svg', '.txt', '.html', '.xml', '.ico')
+# Sıkıştırılmış kopya bu orandan küçük değilse yazılmaz (küçük dosyalarda kazanç yok)
+MIN_COMPRESSION_RATIO = 0.95
+ENCODINGS = (
+    ('br', '.br', lambda data: brotli.compress(data, quality=11)),
+    ('gzip', '.gz', lambda data: gzip.compress(data, compresslevel=9, mtime=0)),
+)
+
+
+def file_hash(content):
+    digest = hashlib.sha256()
+    for chunk in content.chunks():
+        digest.update(chunk)
+    return digest.hexdigest()[:HASH_LENGTH]
+
+
+def is_content_addressed(name):
+    return bool(CONTENT_ADDRESSED_RE.search(name))
+
+
+class ContentAddressedStorage(FileSystemStorage):
+    # Adı zaten içerik hash'inden türetilmiş yollar (gumbuz_shop.images türevleri) olduğu gibi yazılır
+    passthrough_prefixes = ('derived/',)
+
+    def content_name(self, name, content):
+        digest = file_hash(content)
+        directory = posixpath.dirname(name)
+        if is_content_addressed(name):
+            # Kayıtlı bir dosyanın yeni içeriği (ör. yeniden sıkıştırma): aynı üst dizin
+            directory = posixpath.dirname(directory)
+        extension = os.path.splitext(name)[1].lower()
+        return posixpath.join(directory, digest[:2], digest + extension)
+
+    def save(self, name, content, max_length=None):
+        if name is None:
+            name = content.name
+        if not hasattr(content, 'chunks'):
+            content = File(content, name)
+
+        if not name.startswith(self.passthrough_prefixes):
+            name = self.content_name(name, content)
+        if self.exists(name):
+            # Aynı içerik zaten kayıtlı
+            return name
+        return super().save(name, content, max_length=max_length)
+
+
+def serve_media(request, path, document_root=None, show_indexes=False):
+    """
+    Geliştirme ortamı medya servisi; içerik adresli dosyalar bir yıl ve
+    ``immutable`` olarak cache'lenir. Üretimde aynı kural web sunucusunda
+    uygulanmalıdır (bkz. README).
+    """
+    response = serve(request, path, document_root=document_root, show_indexes=show_indexes)
+    if response.status_code == 200 and is_content_addressed(path):
+        patch_cache_control(response, public=True, max_age=IMMUTABLE_MAX_AGE, immutable=True)
+    return response
+
+
+class CompressedManifestStaticFilesStorage(ManifestStaticFilesStorage):
+    """
+    Hash'li statik dosyaların yanına ``<ad>.br`` / ``<ad>.gz`` yazar. Hash'li ad
+    içeriği belirlediği için mevcut kopyalar yeniden sıkıştırılmaz.
+    """
+
+    def post_process(self, paths, dry_run=False, **options):
+        hashed_names = set()
+        for name, hashed_name, processed in super().post_process(paths, dry_run=dry_run, **options):
+            if hashed_name and not isinstance(processed, Exception):
+                hashed_names.add(hashed_name)
+            yield name, hashed_name, processed
+        if dry_run:
+            return
+        for hashed_name in sorted(hashed_names):
+            if hashed_name.lower().endswith(COMPRESSIBLE_EXTENSIONS):
+                self.compress(hashed_name)
+
+    def compress(self, name):
+        """Yazılan kodlamaların listesi."""
+        path = self.path(name)
+        written = []
+        data = None
+        for encoding, suffix, compress in ENCODINGS:
+            if os.path.exists(path + suffix):
+                written.append(encoding)
+                continue
+            if data is None:
+                with open(path, 'rb') as f:
+                    data = f.read()
+            compressed = compress(data)
+            if len(compressed) < len(data) * MIN_COMPRESSION_RATIO:
+                # Yarım kalan kopya sonraki çalıştırmada "mevcut" sayılmasın
+                with open(path + suffix + '.tmp', 'wb') as f:
+                    f.write(compressed)
+                os.replace(path + suffix + '.tmp', path + suffix)
+                written.append(encoding)
+        return written
@@ -0,0 +1,196 @@
+"""
+Tailwind CSS derlemesi: resmi standalone CLI (``tailwindcss-bin`` paketi, Node gerekmez).
+
+Sayfalar daha önce tarayıcıda çalışan Tailwind derleyicisini (cdn.tailwindcss.com)
+yüklüyordu: her sayfa açılışında ~100 KB betik indirilip stiller çalışma anında
+üretiliyordu. ``build_assets`` bunun yerine paket başına bir girdi CSS'i kurar
+(``input_css``: tema, taranacak dosyalar, safelist) ve CLI ile yalnızca kullanılan
+sınıfları içeren stil dosyasını üretir (``build_css``).
+
+Şablonlar Tailwind v3 için yazıldı; CLI v4'tür. ``COMPAT`` v3 varsayılanlarını geri
+getirir (kenarlık rengi, halka rengi/kalınlığı, ``shadow-sm``/``rounded-sm``/``blur-sm``
+ölçekleri, placeholder rengi, buton imleci). v4'te kaldırılan sınıflar
+(``bg-opacity-*`` gibi) derlenen CSS'te yer almaz: şablonların ``class="..."``
+özniteliklerinde geçip ne derlenen CSS'in ne de şablonların kendi <style>
+bloklarının tanıdığı sınıflar ``unknown`` ile bulunur ve derlemeyi durdurur
+(gumbuz_shop.assets), sessizce stilsiz kalmaz.
+
+Tema renkleri (brand, primary ...) site ayarlarından geldiği için CSS değişkeni
+olarak kalır (``var(--color-brand-pink)``); değerleri şablondaki ``:root`` bloğu verir.
+"""
+import os
+import re
+import shutil
+import subprocess
+import tempfile
+from dataclasses import dataclass, field
+
+from django.conf import settings
+
+
+class TailwindNotFound(Exception):
+    """CLI bulunamadı (pip install tailwindcss-bin ya da settings.TAILWIND_CLI)."""
+
+
+class TailwindError(Exception):
+    """CLI hata ile çıktı."""
+
+
+@dataclass
+class Theme:
+    """
+    Paket (bundle) başına tema. colors: ek renkler (ad -> CSS değeri, çoğunlukla
+    var(--...)); variables: :root varsayılanları; animations: ad -> (animation, keyframes adı);
+    keyframes: ad -> gövde; safelist: şablonda dinamik oluşan (taranamayan) sınıflar.
+    """
+    colors: dict = field(default_factory=dict)
+    variables: dict = field(default_factory=dict)
+    animations: dict = field(default_factory=dict)
+    keyframes: dict = field(default_factory=dict)
+    safelist: tuple = ()
+    font_faces: str = ''
+
+
+FONT_SANS = "Inter, ui-sans-serif, system-ui, sans-serif, 'Apple Color Emoji', 'Segoe UI Emoji'"
+
+# Tailwind v3 varsayılanları (v4 yükseltme kılavuzundaki uyumluluk kuralları)
+COMPAT_THEME = {
+    '--font-sans': FONT_SANS,
+    '--shadow-sm': '0 1px 2px 0 rgb(0 0 0 / 0.05)',
+    '--radius-sm': '0.125rem',
+    '--blur-sm': '4px',
+}
+COMPAT = """@layer base {
+  *, ::after, ::before, ::backdrop, ::file-selector-button { border-color: var(--color-gray-200, currentColor); --tw-ring-color: rgb(59 130 246 / 0.5); }
+  input::placeholder, textarea::placeholder { color: var(--color-gray-400); }
+  button:not(:disabled), [role="button"]:not(:disabled) { cursor: pointer; }
+}
+"""
+
+# CSS üretmeyen ama varyantların dayandığı işaret sınıfları (group-hover:, peer-checked:)
+MARKERS = frozenset({'group', 'peer'})
+
+_CLASS_ATTRIBUTE = re.compile(r"""(?<![\w:.@-])class\s*=\s*(["'])(.*?)\1""", re.S)
+_TEMPLATE_BLOCK_TAG = re.compile(r'\{%.*?%\}', re.S)
+_TEMPLATE_VARIABLE = re.compile(r'\{\{.*?\}\}', re.S)
+_STYLE_BLOCK = re.compile(r'<style[^>]*>(.*?)</style>', re.S | re.I)
+_CSS_PRELUDE = re.compile(r'([^{};]*)\{')
+_CLASS_SELECTOR = re.compile(r'\.(-?[A-Za-z_][\w-]*)')
+# Derlenen CSS'teki kaçışlı sınıf seçicileri (.md\:grid-cols-3, .w-1\/2, .\!hidden)
+_ESCAPED_SELECTOR = re.compile(r'\.((?:\\.|[\w-])+)')
+_ESCAPE = re.compile(r'\\(.)')
+_YESNO = re.compile(r"""\|yesno:(["'])(.*?)\1""")
+
+
+def theme_css(theme, defaults=True):
+    """
+    Temanın Tailwind v4 karşılığı (@theme blokları, keyframes, uyumluluk kuralları;
+    defaults ise :root varsayılanları). CLI girdisinde ve derlenmemiş paketlerde
+    tarayıcı derleyicisinin ``<style type="text/tailwindcss">`` bloğunda kullanılır.
+    """
+    lines = ['@theme {']
+    lines += [f'  {name}: {value};' for name, value in COMPAT_THEME.items()]
+    for name, (animation, _) in theme.animations.items():
+        lines.append(f'  --animate-{name}: {animation};')
+    for name, body in theme.keyframes.items():
+        lines.append(f'  @keyframes {name} {{ {body} }}')
+    lines.append('}')
+    if theme.colors:
+        # inline: değer var(--...) olduğunda yardımcı sınıf değeri doğrudan kullanır
+        lines.append('@theme inline {')
+        lines += [f'  --color-{name}: {value};' for name, value in theme.colors.items()]
+        lines.append('}')
+    if defaults and theme.variables:
+        lines.append(':root { %s }' % ' '.join(f'{name}: {value};' for name, value in theme.variables.items()))
+    return '\n'.join(lines) + '\n' + COMPAT
+
+
+def input_css(theme, sources):
+    """CLI girdisi: sources mutlak yollar/glob'lar; otomatik tarama kapalı."""
+    parts = ['@import "tailwindcss" source(none);']
+    parts += [f'@source "{path}";' for path in sources]
+    if theme.safelist:
+        parts.append('@source inline("%s");' % ' '.join(sorted(theme.safelist)))
+    if theme.font_faces:
+        parts.append(theme.font_faces.strip())
+    parts.append(theme_css(theme))
+    return '\n'.join(parts) + '\n'
+
+
+def executable():
+    configured = getattr(settings, 'TAILWIND_CLI', None)
+    if configured:
+        return configured
+    try:
+        from tailwindcss_bin import find_tailwindcss_bin
+        return find_tailwindcss_bin()
+    except ImportError:
+        pass
+    found = shutil.which('tailwindcss')
+    if not found:
+        raise TailwindNotFound('tailwindcss bulunamadı: pip install -r requirements.txt')
+    return found
+
+
+def build_css(theme, sources, minify=True):
+    """Temayı ve sources'ı CLI ile derler; CSS metnini döndürür."""
+    with tempfile.TemporaryDirectory(prefix='tailwind-') as workdir:
+        source_path = os.path.join(workdir, 'input.css')
+        output_path = os.path.join(workdir, 'output.css')
+        with open(source_path, 'w', encoding='utf-8') as f:
+            f.write(input_css(theme, sources))
+        command = [executable(), '-i', source_path, '-o', output_path]
+        if minify:
+            command.append('--minify')
+        try:
+            result = subprocess.run(command, capture_output=True, text=True, timeout=120)
+        except FileNotFoundError as e:
+            raise TailwindNotFound(str(e))
+        if result.returncode != 0 or not os.path.exists(output_path):
+            raise TailwindError(result.stderr.strip())
+        with open(output_path, encoding='utf-8') as f:
+            return f.read()
+
+
+def generated_classes(css):
+    """Derlenen CSS'in sınıf seçicileri (kaçışlar çözülmüş)."""
+    return {_ESCAPE.sub(r'\1', name) for name in _ESCAPED_SELECTOR.findall(css)}
+
+
+def yesno_classes(text):
+    """
+    ``{{ x|yesno:"text-a,text-b" }}`` seçenekleri: CLI'nin tarayıcısı virgülle
+    birleşik adayları ayırmaz, bunlar build sırasında safelist'e eklenir.
+    """
+    classes = set()
+    for _, choices in _YESNO.findall(text):
+        classes |= {name for choice in choices.split(',') for name in choice.split()}
+    return classes
+
+
+def class_attributes(text):
+    """
+    Şablondaki sabit ``class="..."`` sınıfları. Alpine ``:class`` ifadeleri atlanır;
+    ``{{ }}`` ile birleşik parçalar (``text-{{ color }}-600``) çalışma anında
+    oluştuğu için denetlenemez (bunlar Theme.safelist'e yazılır).
+    """
+    classes = set()
+    for _, value in _CLASS_ATTRIBUTE.findall(text):
+        value = _TEMPLATE_VARIABLE.sub('\0', _TEMPLATE_BLOCK_TAG.sub(' ', value))
+        classes |= {name for name in value.split() if '\0' not in name}
+    return classes
+
+
+def defined_classes(text):
+    """Şablonun kendi <style> bloklarında tanımlanan sınıflar (.glass, .marquee-item ...)."""
+    classes = set()
+    for block in _STYLE_BLOCK.findall(text):
+        # Seçiciler '{'den önceki kısımdadır (@media içindekiler dahil); bildirimler atlanır
+        for prelude in _CSS_PRELUDE.findall(block):
+            classes |= set(_CLASS_SELECTOR.findall(prelude))
+    return classes
+
+
+def unknown(classes, css):
+    """Derlenen CSS'te kuralı olmayan ve işaret sınıfı olmayan sınıflar."""
+    return set(classes) - generated_classes(css) - MARKERS
@@ -0,0 +1,24 @@
+"""
+Uygulamaların testlerinde ortak kullanılan yardımcılar.
+"""
+import shutil
+import tempfile
+
+from django.test import override_settings
+
+
+class TempDirMixin:
+    """
+    Her test için geçici bir dizin açar (self.temp_dir) ve test sonunda siler.
+    temp_dir_setting verilirse o ayar test süresince bu dizini gösterir.
+    """
+    temp_dir_setting = 'MEDIA_ROOT'
+
+    def setUp(self):
+        super().setUp()
+        self.temp_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.temp_dir, ignore_errors=True)
+        if self.temp_dir_setting:
+            override = override_settings(**{self.temp_dir_setting: self.temp_dir})
+            override.enable()
+            self.addCleanup(override.disable)
@@ -4,6 +4,7 @@ from django.conf import settings
 from django.conf.urls.static import static
 from campaigns import views as campaign_views
 from orders import views as order_views
+from gumbuz_shop.storage import serve_media
 
 urlpatterns = [
     # 1. Django Admin (default)
@@ -28,4 +29,4 @@ urlpatterns = [
 
 # 2. Media (Debug mode)
 if settings.DEBUG:
-    urlpatterns += static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
+    urlpatterns += static(settings.MEDIA_URL, view=serve_media, document_root=settings.MEDIA_ROOT)
@@ -0,0 +1,276 @@
+"""
+Deterministic, offline benchmark dataset generator.
+
+Aynı seed ve hacim parametreleriyle her çalıştırmada aynı kampanya, ürün,
+görsel, adres ve sipariş verisini bulk_create ile üretir. Görseller Pillow
+ile yerelde üretilen placeholder dosyalardır; internet gerekmez.
+"""
+import io
+import random
+from contextlib import contextmanager
+from dataclasses import dataclass
+from datetime import timedelta
+from decimal import Decimal
+
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.db import transaction
+from django.utils import timezone
+from slugify import slugify
+
+from addresses import tree as address_tree
+from addresses.models import City, District, Neighborhood
+from campaigns.models import Campaign, CampaignProduct, SizeOption
+from orders import counters, rollups
+from orders.models import Order, OrderItem
+from products.models import Product, ProductImage
+
+PREFIX = 'bench'
+BATCH_SIZE = 1000
+
+SIZES = [
+    ('36 (S)', f'{PREFIX}-36-s', 'Bel: 34cm, Basen: 90cm'),
+    ('38 (M)', f'{PREFIX}-38-m', 'Bel: 36cm, Basen: 94cm'),
+    ('40 (L)', f'{PREFIX}-40-l', 'Bel: 38cm, Basen: 98cm'),
+    ('42 (XL)', f'{PREFIX}-42-xl', 'Bel: 40cm, Basen: 102cm'),
+]
+FIRST_NAMES = ['Ayşe', 'Fatma', 'Zeynep', 'Elif', 'Merve', 'Selin', 'Esra', 'Hatice', 'Emine', 'Büşra']
+LAST_NAMES = ['Yılmaz', 'Kaya', 'Demir', 'Çelik', 'Şahin', 'Aydın', 'Öztürk', 'Arslan', 'Koç', 'Kurt']
+STATUSES = ['new', 'processing', 'processing', 'shipped', 'shipped', 'shipped', 'delivered', 'cancelled', 'return']
+
+
+@dataclass
+class DatasetSize:
+    campaigns: int = 10
+    products: int = 100
+    products_per_campaign: int = 8
+    images_per_product: int = 2
+    image_pool: int = 16
+    cities: int = 5
+    districts_per_city: int = 5
+    neighborhoods_per_district: int = 10
+    orders: int = 1000
+    days: int = 30
+
+
+@contextmanager
+def explicit_timestamps(model, *field_names):
+    """auto_now/auto_now_add alanlarını geçici olarak kapatır (bulk_create ile geçmiş tarih yazmak için)."""
+    fields = [model._meta.get_field(name) for name in field_names]
+    saved = [(field.auto_now, field.auto_now_add) for field in fields]
+    for field in fields:
+        field.auto_now = field.auto_now_add = False
+    try:
+        yield
+    finally:
+        for field, (auto_now, auto_now_add) in zip(fields, saved):
+            field.auto_now, field.auto_now_add = auto_now, auto_now_add
+
+
+def placeholder_image(index, size=(600, 600)):
+    """Index'e göre deterministik renkli JPEG üretir."""
+    from PIL import Image, ImageDraw
+
+    rng = random.Random(index)
+    color = (rng.randint(40, 220), rng.randint(40, 220), rng.randint(40, 220))
+    image = Image.new('RGB', size, color)
+    draw = ImageDraw.Draw(image)
+    draw.rectangle([size[0] // 8, size[1] // 8, size[0] * 7 // 8, size[1] * 7 // 8], outline=(255, 255, 255), width=6)
+    draw.text((size[0] // 2 - 20, size[1] // 2 - 6), f'#{index}', fill=(255, 255, 255))
+    buffer = io.BytesIO()
+    image.save(buffer, format='JPEG', quality=70)
+    return buffer.getvalue()
+
+
+def reset():
+    """Önceki benchmark verisini siler (prefix ile işaretli kayıtlar)."""
+    Order.objects.filter(campaign__slug__startswith=f'{PREFIX}-').delete()
+    Campaign.objects.filter(slug__startswith=f'{PREFIX}-').delete()
+    Product.objects.filter(sku__startswith=f'{PREFIX.upper()}-').delete()
+    SizeOption.objects.filter(slug__startswith=f'{PREFIX}-').delete()
+    City.objects.filter(slug__startswith=f'{PREFIX}-').delete()
+
+
+def _bulk(model, objs):
+    return model.objects.bulk_create(objs, batch_size=BATCH_SIZE)
+
+
+def create_addresses(size):
+    cities = _bulk(City, [
+        City(name=f'Bench İl {c:03d}', slug=f'{PREFIX}-il-{c:03d}')
+        for c in range(size.cities)
+    ])
+    districts = _bulk(District, [
+        District(city=city, name=f'Bench İlçe {c:03d}-{d:03d}', slug=f'{PREFIX}-ilce-{c:03d}-{d:03d}')
+        for c, city in enumerate(cities)
+        for d in range(size.districts_per_city)
+    ])
+    neighborhoods = _bulk(Neighborhood, [
+        Neighborhood(district=district, name=f'Bench Mahalle {d:05d}-{n:03d}', slug=f'{PREFIX}-mah-{d:05d}-{n:03d}')
+        for d, district in enumerate(districts)
+        for n in range(size.neighborhoods_per_district)
+    ])
+    # bulk_create sinyal üretmez
+    address_tree.invalidate()
+    return neighborhoods
+
+
+def create_images(size):
+    names = []
+    for index in range(size.image_pool):
+        # İçerik adresli storage aynı görseli tekrar yazmaz
+        names.append(default_storage.save(f'products/{PREFIX}_{index:04d}.jpg', ContentFile(placeholder_image(index))))
+    return names
+
+
+def create_catalog(size, rng, image_names):
+    sizes = [
+        SizeOption.objects.get_or_create(slug=slug, defaults={'name': name, 'description': desc})[0]
+        for name, slug, desc in SIZES
+    ]
+    products = _bulk(Product, [
+        Product(
+            name=f'Bench Ürün {i:05d}',
+            sku=f'{PREFIX.upper()}-{i:06d}',
+            description=f'Bench Ürün {i:05d} açıklaması. %100 pamuk.',
+            stock_qty=rng.randint(50, 5000),
+        )
+        for i in range(size.products)
+    ])
+    _bulk(ProductImage, [
+        ProductImage(product=product, image=image_names[(i * size.images_per_product + j) % len(image_names)], sort_order=j)
+        for i, product in enumerate(products)
+        for j in range(size.images_per_product)
+    ])
+
+    campaigns = _bulk(Campaign, [
+        Campaign(
+            title=f'Bench Kampanya {i:03d}',
+            slug=f'{PREFIX}-kampanya-{i:03d}',
+            description='Benchmark kampanyası',
+            price=Decimal(rng.choice([999, 1299, 1499, 1899])),
+            min_quantity=rng.choice([1, 2, 3]),
+            shipping_price=Decimal('100'),
+            shipping_price_discounted=Decimal('0'),
+            cod_price=Decimal('100'),
+            cod_price_discounted=Decimal('85'),
+            banner_image=image_names[i % len(image_names)],
+        )
+        for i in range(size.campaigns)
+    ])
+    memberships = {}
+    rows = []
+    for campaign in campaigns:
+        chosen = rng.sample(products, min(size.products_per_campaign, len(products)))
+        memberships[campaign.id] = chosen
+        rows.extend(CampaignProduct(campaign=campaign, product=p, sort_order=i) for i, p in enumerate(chosen))
+    _bulk(CampaignProduct, rows)
+
+    Through = Campaign.available_sizes.through
+    _bulk(Through, [Through(campaign_id=c.id, sizeoption_id=s.id) for c in campaigns for s in sizes])
+    return campaigns, memberships, sizes
+
+
+def create_orders(size, rng, campaigns, memberships, sizes, neighborhoods, anchor):
+    first_image = {
+        product_id: image
+        for product_id, image in ProductImage.objects.filter(product__sku__startswith=f'{PREFIX.upper()}-')
+        .order_by('-sort_order').values_list('product_id', 'image')
+    }
+    districts = {d.id: d for d in District.objects.filter(id__in={n.district_id for n in neighborhoods}).select_related('city')}
+
+    created = 0
+    with explicit_timestamps(Order, 'created_at', 'updated_at'):
+        while created < size.orders:
+            batch = min(BATCH_SIZE, size.orders - created)
+            orders = []
+            order_items = []
+            for i in range(created, created + batch):
+                campaign = rng.choice(campaigns)
+                neighborhood = rng.choice(neighborhoods)
+                district = districts[neighborhood.district_id]
+                created_at = anchor - timedelta(seconds=rng.randint(0, size.days * 86400))
+                total = campaign.price + campaign.shipping_price_discounted + campaign.cod_price_discounted
+                orders.append(Order(
+                    campaign=campaign,
+                    campaign_title=campaign.title,
+                    campaign_slug=campaign.slug,
+                    campaign_image_url=default_storage.url(campaign.banner_image.name),
+                    status=rng.choice(STATUSES),
+                    customer_name=f'{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}',
+                    phone=f'05{rng.randint(300000000, 599999999)}',
+                    city_fk_id=district.city_id,
+                    district_fk_id=district.id,
+                    neighborhood_fk_id=neighborhood.id,
+                    city=district.city.name,
+                    district=district.name,
+                    full_address=f'{neighborhood.name} Mah. Bench Sok. No:{rng.randint(1, 200)}',
+                    campaign_price=campaign.price,
+                    cargo_price=campaign.shipping_price_discounted,
+                    cod_fee=campaign.cod_price_discounted,
+                    total_amount=total,
+                    tracking_number=f'{9000000000 + i:010d}',
+                    created_at=created_at,
+                    updated_at=created_at,
+                ))
+                picked = [rng.choice(memberships[campaign.id]) for _ in range(campaign.min_quantity)]
+                size_option = rng.choice(sizes)
+                order_items.append([
+                    OrderItem(
+                        product=product,
+                        quantity=1,
+                        selected_size=size_option.name,
+                        selected_size_name=size_option.name,
+                        selected_size_description=size_option.description,
+                        product_name=product.name,
+                        product_sku=product.sku,
+                        product_description=product.description,
+                        product_image_url=default_storage.url(first_image[product.id]) if product.id in first_image else None,
+                    )
+                    for product in picked
+                ])
+            orders = _bulk(Order, orders)
+            items = []
+            for order, order_item_rows in zip(orders, order_items):
+                for item in order_item_rows:
+                    item.order = order
+                    items.append(item)
+            _bulk(OrderItem, items)
+            created += batch
+    return created
+
+
+def generate(size=None, seed=1, anchor=None, log=None):
+    """
+    Benchmark veri setini üretir ve oluşturulan kayıt sayılarını döndürür.
+    Aynı seed ve boyutla çağrıldığında içerik aynıdır (tarihler anchor'a göredir).
+    """
+    size = size or DatasetSize()
+    rng = random.Random(seed)
+    anchor = anchor or timezone.now().replace(minute=0, second=0, microsecond=0)
+    log = log or (lambda message: None)
+
+    log('Görseller üretiliyor...')
+    image_names = create_images(size)
+    with transaction.atomic():
+        log('Adresler oluşturuluyor...')
+        neighborhoods = create_addresses(size)
+        log('Ürün ve kampanyalar oluşturuluyor...')
+        campaigns, memberships, sizes = create_catalog(size, rng, image_names)
+        log('Siparişler oluşturuluyor...')
+        order_count = create_orders(size, rng, campaigns, memberships, sizes, neighborhoods, anchor)
+        log('Liste sayaçları hesaplanıyor...')
+        counters.refresh_all()
+        log('Durum geçmişi ve özetleri oluşturuluyor...')
+        rollups.backfill_events()
+        rollups.rebuild()
+
+    return {
+        'cities': size.cities,
+        'districts': size.cities * size.districts_per_city,
+        'neighborhoods': len(neighborhoods),
+        'products': size.products,
+        'images': size.products * size.images_per_product,
+        'campaigns': len(campaigns),
+        'orders': order_count,
+    }
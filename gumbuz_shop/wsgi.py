@@ -3,6 +3,9 @@ WSGI config for gumbuz_shop project.
 
 It exposes the WSGI callable as a module-level variable named ``application``.
 
+STATIC_URL istekleri Django'ya uğramadan gumbuz_shop.staticfiles tarafından
+(önceden sıkıştırılmış kopyalar ve immutable cache başlıklarıyla) cevaplanır.
+
 For more information on this file, see
 https://docs.djangoproject.com/en/5.2/howto/deployment/wsgi/
 """
@@ -13,4 +16,6 @@ from django.core.wsgi import get_wsgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'gumbuz_shop.settings')
 
-application = get_wsgi_application()
+from gumbuz_shop.staticfiles import wsgi as static_wsgi  # noqa: E402
+
+application = static_wsgi(get_wsgi_application())
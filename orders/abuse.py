@@ -0,0 +1,197 @@
+"""
+Checkout anında tekrar/sahte sipariş tespiti.
+
+Kapıda ödemeli sahte siparişler genelde aynı telefondan aynı kampanyaya ya da
+aynı adrese dakikalar içinde tekrar tekrar gelir. Her checkout'ta iki kayan
+pencereye ve engel listesine bakılır; ``Order`` tablosu sorgulanmaz:
+
+- (normalize telefon, kampanya) ve (mahalle, normalize adres) çiftlerinin
+  özet anahtarları altında son ABUSE_WINDOW saniyedeki sipariş zamanları
+  (``AbuseWindow``, anahtar başına tek satır),
+- engellenen telefon/adres özetleri (``BlockedContact``).
+
+``check`` yalnızca okur (kilit almaz, yazmaz); reddedilecek checkout veritabanına
+hiç yazmadan döner. Kabul edilen checkout'un zamanı ``record`` ile siparişin kendi
+transaction'ında eklenir (``place_order``; yoğun satış modunda ön kayıt,
+``orders.intake.submit``): sipariş yazılamazsa zaman da geri alınır, checkout başına
+ek yazma transaction'ı açılmaz. ``record`` pencere satırlarını kilitli okuyup
+(``select_for_update``; SQLite'ta transaction zaten ``BEGIN IMMEDIATE``) eşikleri
+yeniden değerlendirir: ``check`` ile sipariş arasında aynı telefon/adresten gelen
+eşzamanlı checkout'lar sayılır, eşik aşıldıysa ``Rejected`` yükselir. Maliyet
+birkaç benzersiz indeks işlemidir; sipariş hacminden bağımsızdır. Pencereler
+veritabanında tutulduğu için worker'lar arasında paylaşılır ve yeniden başlatmada
+kaybolmaz. Süresi dolan pencere satırları en fazla PURGE_INTERVAL'da bir (süreç
+başına) toplu silinir.
+
+Engel listesindeki ya da aynı telefondan ABUSE_REJECT_PHONE sipariş vermiş
+müşteri reddedilir; daha düşük tekrarlar siparişi "şüpheli" işaretler ve admin
+sipariş listesinde gösterilir.
+"""
+import hashlib
+import re
+import time
+from dataclasses import dataclass, field
+from datetime import timedelta
+
+from django.conf import settings
+from django.utils import timezone
+
+from .models import AbuseWindow, BlockedContact
+
+MAX_STAMPS = 16  # anahtar başına tutulan en fazla zaman damgası
+PURGE_INTERVAL = 10 * 60
+
+_last_purge = 0.0
+
+_TR_LOWER = str.maketrans({'I': 'ı', 'İ': 'i'})
+_NON_WORD = re.compile(r'[^\w]+')
+
+
+def _setting(name, default):
+    return getattr(settings, name, default)
+
+
+def normalize_phone(phone):
+    """Yalnızca rakamlar; ülke kodu/baştaki 0 atılır (0555..., +90 555... ve 555... aynı)."""
+    digits = re.sub(r'\D', '', phone or '')
+    if digits.startswith('90') and len(digits) == 12:
+        digits = digits[2:]
+    return digits.lstrip('0')
+
+
+def normalize_address(text):
+    """Türkçe küçük harf, noktalama ve fazla boşluk atılmış adres."""
+    return ' '.join(_NON_WORD.sub(' ', (text or '').translate(_TR_LOWER).lower()).split())
+
+
+def _digest(*parts):
+    return hashlib.blake2b('|'.join(str(part) for part in parts).encode(), digest_size=8).hexdigest()
+
+
+def phone_key(phone):
+    return _digest('phone', normalize_phone(phone))
+
+
+def address_key(neighborhood_id, address):
+    return _digest('address', neighborhood_id or '', normalize_address(address))
+
+
+class Rejected(Exception):
+    """``record`` sırasında eşik aşıldı; sipariş transaction'ı geri alınmalıdır."""
+
+    def __init__(self, verdict):
+        super().__init__(verdict.reason)
+        self.verdict = verdict
+
+
+@dataclass
+class Verdict:
+    action: str = 'allow'  # 'allow' | 'flag' | 'reject'
+    reasons: list = field(default_factory=list)
+    windows: dict = field(default_factory=dict)  # pencere anahtarı -> bu checkout'tan önceki zamanlar
+    stamp: int = None  # ``record``un pencerelere ekleyeceği zaman (reddedilende None)
+
+    @property
+    def rejected(self):
+        return self.action == 'reject'
+
+    @property
+    def flagged(self):
+        return self.action != 'allow'
+
+    @property
+    def reason(self):
+        return '; '.join(self.reasons)
+
+    def order_fields(self):
+        """Siparişe yazılan şüphe alanları."""
+        return {'is_suspicious': self.flagged, 'suspicion_reason': self.reason[:255]}
+
+
+def _recent(stamps, now, window):
+    return [stamp for stamp in stamps if stamp > now - window]
+
+
+def _window_keys(phone, campaign_id, neighborhood_id, address):
+    return f'p:{phone_key(phone)}:{campaign_id}', f'a:{address_key(neighborhood_id, address)}'
+
+
+def check(phone, campaign_id, neighborhood_id=None, address='', now=None):
+    """
+    Checkout öncesi karar; Verdict döndürür. Yalnızca okur: reddedilmeyen checkout
+    siparişin transaction'ında ``record`` ile pencerelere eklenir.
+    """
+    now = now or timezone.now()
+    stamp = int(now.timestamp())
+    window = _setting('ABUSE_WINDOW', 30 * 60)
+
+    verdict = Verdict()
+    if BlockedContact.objects.filter(digest__in=[phone_key(phone), address_key(neighborhood_id, address)]).exists():
+        verdict.action = 'reject'
+        verdict.reasons.append('Engel listesinde')
+        return verdict
+
+    keys = _window_keys(phone, campaign_id, neighborhood_id, address)
+    stamps = dict(AbuseWindow.objects.filter(key__in=keys).values_list('key', 'stamps'))
+    verdict.windows = {key: _recent(stamps.get(key, []), stamp, window) for key in keys}
+    _judge(verdict, *(len(verdict.windows[key]) for key in keys), window)
+    if not verdict.rejected:
+        verdict.stamp = stamp
+    return verdict
+
+
+def record(verdict):
+    """
+    Kabul edilen checkout'u pencerelere ekler; siparişi yazan transaction içinde
+    çağrılmalıdır. Pencereler kilitli okunup karar güncellenir (ör. araya giren
+    checkout'larla "şüpheli" olur); eşik aşıldıysa ``Rejected`` yükselir.
+    """
+    if verdict.stamp is None:
+        return verdict
+    window = _setting('ABUSE_WINDOW', 30 * 60)
+    keys = tuple(verdict.windows)
+    expires_at = timezone.now() + timedelta(seconds=window)
+    AbuseWindow.objects.bulk_create(
+        [AbuseWindow(key=key, stamps=[], expires_at=expires_at) for key in keys], ignore_conflicts=True,
+    )
+    rows = {row.key: row for row in AbuseWindow.objects.select_for_update().filter(key__in=keys).order_by('key')}
+    verdict.windows = {key: _recent(rows[key].stamps, verdict.stamp, window) for key in keys}
+    verdict.action, verdict.reasons = 'allow', []
+    _judge(verdict, *(len(verdict.windows[key]) for key in keys), window)
+    if verdict.rejected:
+        verdict.stamp = None
+        raise Rejected(verdict)
+    for key, row in rows.items():
+        row.stamps = (verdict.windows[key] + [verdict.stamp])[-MAX_STAMPS:]
+        row.expires_at = expires_at
+    AbuseWindow.objects.bulk_update(rows.values(), ['stamps', 'expires_at'])
+    maybe_purge()
+    return verdict
+
+
+def _judge(verdict, phone_count, address_count, window):
+    minutes = window // 60
+    if phone_count >= _setting('ABUSE_REJECT_PHONE', 4):
+        verdict.action = 'reject'
+        verdict.reasons.append(f'Aynı telefondan {minutes} dk içinde {phone_count} sipariş')
+        return
+    if phone_count >= _setting('ABUSE_FLAG_PHONE', 1):
+        verdict.reasons.append(f'Aynı telefondan {minutes} dk içinde {phone_count + 1}. sipariş')
+    if address_count >= _setting('ABUSE_FLAG_ADDRESS', 2):
+        verdict.reasons.append(f'Aynı adrese {minutes} dk içinde {address_count + 1}. sipariş')
+    if verdict.reasons:
+        verdict.action = 'flag'
+
+
+def purge(now=None):
+    """Süresi dolan pencereleri siler; silinen satır sayısını döndürür."""
+    return AbuseWindow.objects.filter(expires_at__lt=now or timezone.now()).delete()[0]
+
+
+def maybe_purge(now=None):
+    """Süreç başına en fazla PURGE_INTERVAL saniyede bir süpürür (checkout'a cache sorgusu eklemez)."""
+    global _last_purge
+    if time.monotonic() - _last_purge < PURGE_INTERVAL:
+        return 0
+    _last_purge = time.monotonic()
+    return purge(now)
@@ -0,0 +1,151 @@
+"""
+Eski siparişlerin metin adreslerini adres FK'larına bağlama.
+
+FK alanlarından önceki siparişlerde yalnızca ``city`` / ``district`` metinleri ve
+"<mahalle> Mah. <detay>" biçimindeki ``full_address`` vardır; ``city_fk__name``
+ile gruplanan raporlar bu siparişleri saymaz. Eşleştirme süreç içi adres
+ağacı (addresses.tree) üzerinden, Türkçe harf ve aksan duyarsız katlanmış
+adlarla yapılır: önce birebir, bulunamazsa aynı kapsamda (ilin ilçeleri,
+ilçenin mahalleleri) ``difflib`` ile bulanık eşleşme (yazım hataları). Aynı
+metin tekrar tekrar geçtiği için bulanık sonuçlar önbelleğe alınır.
+
+Siparişler pk sırasıyla batch'ler halinde okunur, yalnızca boş FK'lar
+doldurulur ve her batch kendi transaction'ında ``bulk_update`` ile yazılır.
+Yarıda kalan çalıştırma tekrar başlatılabilir: eşleşenler artık filtreye
+takılmaz, ``after_id`` ile kalınan yerden de devam edilebilir.
+"""
+import re
+from dataclasses import dataclass, field
+from difflib import get_close_matches
+
+from django.db import transaction
+from django.db.models import Q
+
+from addresses.tree import fold, get_tree
+from .models import Order
+
+BATCH_SIZE = 1000
+FUZZY_CUTOFF = 0.85
+FK_FIELDS = ('city_fk', 'district_fk', 'neighborhood_fk')
+
+# Katlanmış full_address'in başındaki "<mahalle> mah" kısmı
+_NEIGHBORHOOD = re.compile(r'^(.+?) (?:mahallesi|mah|mh)(?: |$)')
+_SUFFIX = re.compile(r' (?:mahallesi|mah|mh)$')
+
+
+def neighborhood_text(full_address):
+    """full_address'ten mahalle adı (katlanmış); 'Caferağa Mah. Moda Cd.' -> 'caferaga'."""
+    match = _NEIGHBORHOOD.match(fold(full_address or ''))
+    return match.group(1) if match else ''
+
+
+class AddressMatcher:
+    """Adres ağacında ad -> düğüm eşlemesi; kapsam sözlükleri ilk kullanımda kurulur."""
+
+    def __init__(self, tree=None, cutoff=FUZZY_CUTOFF):
+        self.tree = tree or get_tree()
+        self.cutoff = cutoff
+        self._scopes = {}
+        self._fuzzy = {}
+
+    def _names(self, scope, nodes):
+        names = self._scopes.get(scope)
+        if names is None:
+            names = self._scopes[scope] = {}
+            for node in nodes():
+                names.setdefault(_SUFFIX.sub('', fold(node.name)), node)
+        return names
+
+    def _match(self, scope, nodes, text):
+        text = _SUFFIX.sub('', fold(text or ''))
+        if not text:
+            return None
+        names = self._names(scope, nodes)
+        if text in names:
+            return names[text]
+        key = (scope, text)
+        if key not in self._fuzzy:
+            close = get_close_matches(text, names, n=1, cutoff=self.cutoff)
+            self._fuzzy[key] = names[close[0]] if close else None
+        return self._fuzzy[key]
+
+    def city(self, text):
+        return self._match('city', lambda: self.tree.city_list(active_only=False), text)
+
+    def district(self, city_id, text):
+        return self._match(
+            ('district', city_id), lambda: self.tree.districts_of(city_id, active_only=False), text
+        )
+
+    def neighborhood(self, district_id, text):
+        return self._match(
+            ('neighborhood', district_id), lambda: self.tree.neighborhoods_of(district_id, active_only=False), text
+        )
+
+
+@dataclass
+class BackfillResult:
+    scanned: int = 0
+    updated: int = 0
+    last_id: int = 0
+    unmatched: list = field(default_factory=list)  # (sipariş, eksik seviye)
+
+
+def candidates():
+    """FK'larından en az biri boş ve eşleştirilecek metni olan siparişler."""
+    return Order.objects.filter(
+        Q(city_fk__isnull=True) | Q(district_fk__isnull=True) | Q(neighborhood_fk__isnull=True)
+    ).exclude(city='', city_fk__isnull=True).order_by('pk')
+
+
+def match_order(order, matcher):
+    """Boş FK'ları doldurur; değişti mi ve eşleşmeyen ilk seviye ('' -> tamam) döndürür."""
+    changed = False
+    city_id = order.city_fk_id
+    if city_id is None:
+        city = matcher.city(order.city)
+        if city is None:
+            return changed, 'city'
+        order.city_fk_id = city_id = city.id
+        changed = True
+
+    district_id = order.district_fk_id
+    if district_id is None:
+        district = matcher.district(city_id, order.district)
+        if district is None:
+            return changed, 'district'
+        order.district_fk_id = district_id = district.id
+        changed = True
+
+    if order.neighborhood_fk_id is None:
+        neighborhood = matcher.neighborhood(district_id, neighborhood_text(order.full_address))
+        if neighborhood is None:
+            return changed, 'neighborhood'
+        order.neighborhood_fk_id = neighborhood.id
+        changed = True
+    return changed, ''
+
+
+def backfill_batches(after_id=0, batch_size=BATCH_SIZE, dry_run=False, matcher=None):
+    """Her batch için BackfillResult üretir (ilerleme ve eşleşmeyenler çağıranda raporlanır)."""
+    matcher = matcher or AddressMatcher()
+    queryset = candidates().only('pk', 'city', 'district', 'full_address', *FK_FIELDS)
+    last_id = after_id or 0
+    while True:
+        orders = list(queryset.filter(pk__gt=last_id)[:batch_size])
+        if not orders:
+            return
+        result = BackfillResult(scanned=len(orders), last_id=orders[-1].pk)
+        changed = []
+        for order in orders:
+            updated, missing = match_order(order, matcher)
+            if updated:
+                changed.append(order)
+            if missing:
+                result.unmatched.append((order, missing))
+        if changed and not dry_run:
+            with transaction.atomic():
+                Order.objects.bulk_update(changed, FK_FIELDS)
+        result.updated = len(changed)
+        last_id = result.last_id
+        yield result
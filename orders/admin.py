@@ -1,13 +1,63 @@
 from django.contrib import admin
-from .models import Order, OrderItem
+from .models import BlockedContact, Order, OrderItem, OrderStatusEvent
+from . import counters, transitions
 
 class OrderItemInline(admin.TabularInline):
     model = OrderItem
     extra = 0
 
+class OrderStatusEventInline(admin.TabularInline):
+    model = OrderStatusEvent
+    fk_name = 'order'
+    extra = 0
+    can_delete = False
+    readonly_fields = ('kind', 'return_request', 'from_status', 'to_status', 'user', 'created_at', 'seconds_in_previous')
+    fields = readonly_fields
+
+    def has_add_permission(self, request, obj=None):
+        return False
+
 @admin.register(Order)
 class OrderAdmin(admin.ModelAdmin):
     list_display = ('id', 'customer_name', 'phone', 'status', 'city', 'total_amount', 'created_at')
-    list_filter = ('status', 'city', 'campaign')
+    list_filter = ('status', 'is_suspicious', 'city', 'campaign')
     search_fields = ('customer_name', 'phone', 'tracking_code')
-    inlines = [OrderItemInline]
+    inlines = [OrderItemInline, OrderStatusEventInline]
+    actions = ['block_contacts']
+
+    @admin.action(description="Telefon ve adresi engel listesine ekle")
+    def block_contacts(self, request, queryset):
+        created = 0
+        for order in queryset.only('id', 'phone', 'full_address', 'neighborhood_fk_id'):
+            for contact in (
+                BlockedContact(kind='phone', value=order.phone),
+                BlockedContact(kind='address', value=order.full_address, neighborhood_id=order.neighborhood_fk_id),
+            ):
+                contact.reason = f"Sipariş #{order.id}"
+                contact.compute_digest()
+                if not BlockedContact.objects.filter(digest=contact.digest).exists():
+                    contact.save()
+                    created += 1
+        self.message_user(request, f"{created} kayıt engel listesine eklendi.")
+
+    def save_model(self, request, obj, form, change):
+        super().save_model(request, obj, form, change)
+        if change and 'status' in form.changed_data:
+            transitions.record_change(obj, form.initial.get('status'), user=request.user)
+
+    def save_related(self, request, form, formsets, change):
+        # Kalem değişiklikleri liste sayaçlarına yansısın
+        orders = Order.objects.filter(pk=form.instance.pk)
+        campaign_ids, product_ids = counters.order_related_ids(orders)
+        super().save_related(request, form, formsets, change)
+        new_campaign_ids, new_product_ids = counters.order_related_ids(orders)
+        counters.refresh_campaigns(campaign_ids | new_campaign_ids | {form.initial.get('campaign')})
+        counters.refresh_products(product_ids | new_product_ids)
+
+
+@admin.register(BlockedContact)
+class BlockedContactAdmin(admin.ModelAdmin):
+    list_display = ('kind', 'value', 'neighborhood', 'reason', 'created_at')
+    list_filter = ('kind',)
+    search_fields = ('value', 'reason')
+    raw_id_fields = ('neighborhood',)
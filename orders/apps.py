@@ -4,3 +4,8 @@ from django.apps import AppConfig
 class OrdersConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'orders'
+
+    def ready(self):
+        from . import rollups, social_proof, transitions
+        transitions.status_changed.connect(social_proof.on_status_changed, dispatch_uid='social_proof_status')
+        transitions.status_changed.connect(rollups.on_status_changed, dispatch_uid='status_rollups')
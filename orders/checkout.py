@@ -0,0 +1,119 @@
+"""
+Sipariş oluşturma (checkout) işlemi.
+
+Sipariş, kalemleri, stok düşümü, sayaçlar ve durum geçmişi tek transaction'da
+yazılır. SQLite'ta transaction ``BEGIN IMMEDIATE`` ile açılır (settings.DATABASES),
+yani yazma kilidi işlemin başında alınır; eşzamanlı checkout'lar sırayla
+ilerler ve kilit busy timeout içinde alınamazsa işlem ``retry_on_lock`` ile baştan
+denenir.
+
+Oturumun stok ayırmaları (orders.holds) siparişe çevrilir; ayrımla karşılanmayan
+stok "stok yeterliyse düş" koşullu ``UPDATE`` ile düşülür; etkilenen satır
+yoksa stok başka bir siparişe gitmiştir ve transaction geri alınır. Böylece
+kilit davranışından bağımsız olarak stok hiçbir zaman eksiye inmez.
+"""
+import random
+import string
+from collections import Counter
+
+from django.db import transaction
+from django.db.models import F
+
+from campaigns.models import CampaignProduct
+from gumbuz_shop.db import retry_on_lock
+from products.models import Product
+from . import abuse, counters, holds, social_proof, transitions
+from .models import Order, OrderIntake, OrderItem
+from .snapshots import CheckoutSnapshot
+
+
+class OutOfStock(ValueError):
+    """Seçilen ürünün stoğu yetmiyor (view 400 döner)."""
+
+
+def generate_tracking_number():
+    """
+    10 haneli benzersiz takip numarası. Ön kayıtlar (orders.intake) numaralarını
+    siparişe dönüşmeden önce aldığı için her iki tabloda da boşta olmalıdır.
+    """
+    while True:
+        tracking = ''.join(random.choices(string.digits, k=10))
+        # İki tablo tek sorguda (UNION) kontrol edilir
+        taken = Order.objects.filter(tracking_number=tracking).values('tracking_number').union(
+            OrderIntake.objects.filter(tracking_number=tracking).values('tracking_number')
+        )
+        if not taken.exists():
+            return tracking
+
+
+def reserve_stock(snapshot, product_ids, hold_key=None, hold_scope=None):
+    """
+    Ürün başına tek koşullu UPDATE ile stok düşer; yetmeyen ilk üründe OutOfStock.
+    hold_key verilirse oturumun hold_scope'taki stok ayırmaları (orders.holds)
+    önce kullanılır; ayrımla karşılanan adet için ürün satırına tekrar yazılmaz.
+    """
+    counts = Counter(int(pid) for pid in product_ids)
+    if hold_key:
+        counts = holds.consume(hold_key, counts, hold_scope)
+    for product_id, quantity in sorted(counts.items()):
+        reserved = Product.objects.filter(pk=product_id, stock_qty__gte=quantity).update(
+            stock_qty=F('stock_qty') - quantity
+        )
+        if not reserved:
+            raise OutOfStock(f"{snapshot.product(product_id).name} için stok yetersiz.")
+
+
+@retry_on_lock
+@transaction.atomic
+def place_order(campaign, product_ids, size_slugs, hold_key=None, tracking_number=None, verdict=None, **order_fields):
+    """
+    Siparişi oluşturur ve döndürür. order_fields: müşteri ve adres alanları
+    (customer_name, phone, city_fk_id, ..., full_address). Ürünlerin kampanyaya ait
+    olduğu çağıran tarafta doğrulanmış olmalıdır. hold_key: stok ayırmalarının
+    anahtarı (oturum); tracking_number: önceden verilmiş takip numarası (orders.intake);
+    verdict: ``abuse.check`` kararı, checkout pencerelere bu transaction'da eklenir
+    (eşik aşıldıysa ``abuse.Rejected``).
+    """
+    if verdict is not None:
+        order_fields.update(abuse.record(verdict).order_fields())
+    # Seçilen ürünler, ilk görselleri ve bedenler tek seferde yüklenir
+    snapshot = CheckoutSnapshot(product_ids, size_slugs)
+    # Yalnızca bu kampanyanın ayrımları kullanılır (alt sorgu, ek sorgu yok)
+    hold_scope = CampaignProduct.objects.filter(campaign=campaign).values('product_id')
+    reserve_stock(snapshot, product_ids, hold_key, hold_scope)
+
+    order = Order.objects.create(
+        campaign=campaign,
+        # Snapshot Data
+        campaign_title=campaign.title,
+        campaign_slug=campaign.slug,
+        campaign_image_url=campaign.banner_image.url if campaign.banner_image else None,
+        tracking_number=tracking_number or generate_tracking_number(),
+        campaign_price=campaign.price,
+        cargo_price=campaign.shipping_price_discounted,  # İndirimli fiyat kullan
+        cod_fee=campaign.cod_price_discounted,  # İndirimli fiyat kullan
+        total_amount=campaign.price + campaign.shipping_price_discounted + campaign.cod_price_discounted,
+        **order_fields,
+    )
+
+    # Sipariş kalemlerini ekle
+    first_item = None
+    for i, product_id in enumerate(product_ids):
+        size_slug = size_slugs[i] if i < len(size_slugs) else None
+        item = OrderItem.objects.create(
+            order=order,
+            quantity=1,
+            **snapshot.item_fields(product_id, size_slug),
+        )
+        first_item = first_item or item
+
+    # Liste sayaçları (kampanya sipariş sayısı, ürün satış/ciro)
+    counters.order_placed(order, product_ids)
+
+    # Durum geçmişinin ilk satırı ve günlük huni özeti
+    transitions.record_placed(order)
+
+    # Sosyal kanıt akışına commit sonrası ekle
+    entry = social_proof.make_entry(order, first_item)
+    transaction.on_commit(lambda: social_proof.push(entry), robust=True)
+    return order
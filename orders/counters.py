@@ -0,0 +1,127 @@
+"""
+Kampanya ve ürün listelerindeki denormalize sayaçlar.
+
+Campaign.product_count / order_count ve Product.campaign_count / sales_count /
+revenue kolonları liste sayfalarında JOIN + GROUP BY yerine kullanılır.
+Sipariş anında artımlı (F ifadesiyle), diğer yazma noktalarında etkilenen
+kayıtlar için alt sorgularla yeniden hesaplanarak, her zaman çağıranın
+transaction'ı içinde güncellenir. Toplu yazımlar ve olası sapmalar için
+``reconcile_counters`` komutu tüm sayaçları baştan hesaplar.
+
+Ürün cirosu, ürünü içeren siparişlerin toplam tutarıdır; aynı siparişte ürün
+birden fazla kalem olarak geçse de sipariş bir kez sayılır.
+"""
+from collections import Counter
+
+from django.db.models import DecimalField, F, Func, IntegerField, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
+
+from campaigns.models import Campaign, CampaignProduct
+from products.models import Product
+from .models import Order, OrderItem
+
+
+def _total(queryset, function, expression, output_field):
+    """Korelasyonlu alt sorgu: queryset üzerinde tek satırlık COUNT/SUM, boşsa 0."""
+    subquery = queryset.order_by().annotate(
+        result=Func(expression, function=function, output_field=output_field)
+    ).values('result')[:1]
+    return Coalesce(Subquery(subquery), Value(0), output_field=output_field)
+
+
+def campaign_counter_expressions():
+    integer = IntegerField()
+    return {
+        'product_count': _total(CampaignProduct.objects.filter(campaign=OuterRef('pk')), 'COUNT', F('pk'), integer),
+        'order_count': _total(Order.objects.filter(campaign=OuterRef('pk')), 'COUNT', F('pk'), integer),
+    }
+
+
+def product_counter_expressions():
+    integer = IntegerField()
+    orders_with_product = Order.objects.filter(
+        pk__in=OrderItem.objects.filter(product=OuterRef(OuterRef('pk'))).values('order_id')
+    )
+    return {
+        'campaign_count': _total(CampaignProduct.objects.filter(product=OuterRef('pk')), 'COUNT', F('pk'), integer),
+        'sales_count': _total(OrderItem.objects.filter(product=OuterRef('pk')), 'SUM', F('quantity'), integer),
+        'revenue': _total(orders_with_product, 'SUM', F('total_amount'), DecimalField(max_digits=14, decimal_places=2)),
+    }
+
+
+def refresh_campaigns(campaign_ids=None):
+    """Verilen (None ise tüm) kampanyaların sayaçlarını yeniden hesaplar."""
+    queryset = Campaign.objects.all()
+    if campaign_ids is not None:
+        campaign_ids = {pk for pk in campaign_ids if pk is not None}
+        if not campaign_ids:
+            return 0
+        queryset = queryset.filter(pk__in=campaign_ids)
+    return queryset.update(**campaign_counter_expressions())
+
+
+def refresh_products(product_ids=None):
+    """Verilen (None ise tüm) ürünlerin sayaçlarını yeniden hesaplar."""
+    queryset = Product.objects.all()
+    if product_ids is not None:
+        product_ids = {pk for pk in product_ids if pk is not None}
+        if not product_ids:
+            return 0
+        queryset = queryset.filter(pk__in=product_ids)
+    return queryset.update(**product_counter_expressions())
+
+
+def refresh_all():
+    return refresh_campaigns(), refresh_products()
+
+
+def order_related_ids(orders):
+    """Sipariş queryset'inin etkilediği (kampanya id'leri, ürün id'leri) - silmeden önce alınır."""
+    campaign_ids = set(orders.exclude(campaign=None).values_list('campaign_id', flat=True).distinct())
+    product_ids = set(OrderItem.objects.filter(order__in=orders).values_list('product_id', flat=True).distinct())
+    return campaign_ids, product_ids
+
+
+def campaign_product_ids(campaigns):
+    """Kampanya(lar)a bağlı ürün id'leri - üyelik değişmeden/silinmeden önce alınır."""
+    return set(CampaignProduct.objects.filter(campaign__in=campaigns).values_list('product_id', flat=True))
+
+
+def product_campaign_ids(products):
+    """Ürün(ler)in bağlı olduğu kampanya id'leri - üyelik değişmeden/silinmeden önce alınır."""
+    return set(CampaignProduct.objects.filter(product__in=products).values_list('campaign_id', flat=True))
+
+
+def apply_increments(campaign_orders, product_totals):
+    """
+    Artımlı güncelleme.
+    campaign_orders: {kampanya_id: yeni sipariş sayısı}
+    product_totals: {ürün_id: (satış adedi artışı, ciro artışı)}
+    """
+    for campaign_id, count in campaign_orders.items():
+        Campaign.objects.filter(pk=campaign_id).update(order_count=F('order_count') + count)
+    for product_id, (sales, revenue) in product_totals.items():
+        Product.objects.filter(pk=product_id).update(
+            sales_count=F('sales_count') + sales,
+            revenue=F('revenue') + revenue,
+        )
+
+
+def order_placed(order, product_ids):
+    """
+    Yeni sipariş için artımlı güncelleme (checkout sıcak yolu).
+    product_ids: siparişin kalemlerindeki ürün id'leri (tekrarlı; her kalem adet 1).
+    Ciro, ürün siparişte kaç kez geçerse geçsin bir kez eklenir.
+    """
+    if order.campaign_id:
+        Campaign.objects.filter(pk=order.campaign_id).update(order_count=F('order_count') + 1)
+
+    # Aynı adetli ürünler tek UPDATE ile
+    by_quantity = {}
+    for product_id, quantity in Counter(int(pk) for pk in product_ids).items():
+        by_quantity.setdefault(quantity, []).append(product_id)
+    for quantity, ids in by_quantity.items():
+        Product.objects.filter(pk__in=ids).update(
+            sales_count=F('sales_count') + quantity,
+            revenue=F('revenue') + order.total_amount,
+        )
@@ -0,0 +1,351 @@
+"""
+Toplu sipariş üretimi.
+
+Kampanya, ürün, beden ve adres verisi bir kez belleğe alınır (OrderLookup);
+sipariş satırları saf Python ile üretilir (istenirse ayrı süreçlerde) ve
+açık zaman damgalarıyla batch'ler halinde toplu INSERT edilir (RowWriter).
+Checkout'taki gibi her siparişin ilk durum geçmişi satırı ('' -> durum) aynı
+batch'te yazılır ve günlük durum özetleri (orders.rollups) güncellenir.
+Üretim sırasında sipariş başına hiçbir sorgu atılmaz.
+"""
+import random
+from collections import Counter, defaultdict
+from dataclasses import dataclass, field
+from datetime import timedelta
+
+from django.core.files.storage import default_storage
+from django.core.management.color import no_style
+from django.db import DEFAULT_DB_ALIAS, connections, transaction
+from django.db.models import Max
+from django.utils import timezone
+
+from addresses.tree import get_tree
+from campaigns.models import Campaign, CampaignProduct
+from products.models import ProductImage
+from . import counters, rollups
+from .models import Order, OrderItem, OrderStatusEvent
+from .transitions import EVENT_BATCH_SIZE
+
+
+FIRST_NAMES = [
+    'Ahmet', 'Mehmet', 'Mustafa', 'Ali', 'Hüseyin', 'Hasan', 'İbrahim', 'Ömer',
+    'Fatma', 'Ayşe', 'Emine', 'Hatice', 'Zeynep', 'Elif', 'Meryem', 'Fadime',
+    'Burak', 'Can', 'Emre', 'Cem', 'Deniz', 'Ege', 'Kaan', 'Berk',
+    'Selin', 'Ebru', 'Merve', 'Gizem', 'Nur', 'Damla', 'İrem', 'Ceren',
+    'Kerem', 'Mert', 'Onur', 'Barış', 'Serkan', 'Tolga', 'Volkan',
+    'Şeyma', 'Tuğba', 'Seda', 'Derya', 'Burcu', 'Dilek', 'Özlem'
+]
+
+LAST_NAMES = [
+    'Yılmaz', 'Kaya', 'Demir', 'Çelik', 'Şahin', 'Yıldız', 'Yıldırım', 'Öztürk',
+    'Aydın', 'Özdemir', 'Arslan', 'Doğan', 'Kılıç', 'Aslan', 'Çetin', 'Kara',
+    'Koç', 'Kurt', 'Özkan', 'Şimşek', 'Erdoğan', 'Polat', 'Aksoy', 'Korkmaz',
+    'Türk', 'Acar', 'Güneş', 'Başar', 'Bozkurt', 'Tekin', 'Karaca', 'Özer',
+    'Taş', 'Çakır', 'Ateş', 'Bulut', 'Duman', 'Erdem', 'Turan', 'Ak'
+]
+
+# Gerçek operatör kodları
+PHONE_OPERATORS = [
+    '530', '531', '532', '533', '534', '535', '536', '537', '538', '539',
+    '541', '542', '543', '544', '545', '546', '547', '548', '549',
+    '501', '505', '506', '507', '508', '509',
+    '551', '552', '553', '554', '555', '556', '559'
+]
+
+STREETS = [
+    'Atatürk Caddesi', 'İstiklal Caddesi', 'Cumhuriyet Caddesi',
+    'Gazi Bulvarı', 'Ankara Caddesi', 'İzmir Caddesi',
+    'Fatih Sokak', 'Mehmet Sokak', 'Ali Sokak', 'Veli Sokak',
+    'Yaşar Sokak', 'Kemal Sokak', 'Zafer Sokak', 'Hürriyet Caddesi'
+]
+
+# Sipariş statusları ve ağırlıkları
+STATUS_WEIGHTS = [
+    ('new', 20),
+    ('processing', 30),
+    ('shipped', 35),
+    ('delivered', 10),
+    ('cancelled', 3),
+    ('return', 2),
+]
+
+CARGO_FIRMS = ['MNG Kargo', 'Yurtiçi Kargo', 'Aras Kargo', 'PTT Kargo', 'Sürat Kargo']
+
+ORDER_FIELDS = (
+    'campaign_id', 'campaign_title', 'campaign_slug', 'campaign_image_url', 'status',
+    'customer_name', 'phone', 'city_fk_id', 'district_fk_id', 'neighborhood_fk_id',
+    'city', 'district', 'full_address', 'campaign_price', 'cargo_price', 'cod_fee',
+    'total_amount', 'cargo_firm', 'tracking_code', 'cargo_barcode', 'created_at',
+)
+ITEM_FIELDS = (
+    'product_id', 'selected_size', 'selected_size_name', 'selected_size_description',
+    'product_name', 'product_sku', 'product_description', 'product_image_url',
+)
+
+
+@dataclass
+class OrderLookup:
+    """Üretim için gereken tüm referans verisi; pickle edilebilir (süreçlere gönderilir)."""
+    campaigns: list = field(default_factory=list)
+    addresses: list = field(default_factory=list)
+
+    @classmethod
+    def load(cls, campaigns=None, neighborhoods=None):
+        if campaigns is None:
+            campaigns = Campaign.objects.filter(is_active=True)
+        campaigns = list(campaigns.prefetch_related('available_sizes'))
+        campaign_ids = [c.id for c in campaigns]
+
+        first_images = {}
+        for product_id, image in ProductImage.objects.filter(
+            product__campaignproduct__campaign_id__in=campaign_ids
+        ).order_by('product_id', '-sort_order').values_list('product_id', 'image'):
+            first_images[product_id] = image
+
+        products_by_campaign = {}
+        for cp in CampaignProduct.objects.filter(campaign_id__in=campaign_ids).select_related('product').order_by('sort_order'):
+            p = cp.product
+            image = first_images.get(p.id)
+            products_by_campaign.setdefault(cp.campaign_id, []).append(
+                (p.id, p.name, p.sku, p.description, default_storage.url(image) if image else None)
+            )
+
+        lookup = cls()
+        for c in campaigns:
+            lookup.campaigns.append({
+                'id': c.id,
+                'title': c.title,
+                'slug': c.slug,
+                'image_url': c.banner_image.url if c.banner_image else None,
+                'price': c.price,
+                'shipping_price': c.shipping_price,
+                'shipping_price_discounted': c.shipping_price_discounted,
+                'cod_price': c.cod_price,
+                'cod_price_discounted': c.cod_price_discounted,
+                'sizes': [(s.name, s.description) for s in c.available_sizes.all() if s.is_active],
+                'products': products_by_campaign.get(c.id, []),
+            })
+
+        if neighborhoods is None:
+            # Aktif adresler süreç içi ağaçtan (sorgusuz)
+            lookup.addresses = list(get_tree().rows())
+        else:
+            lookup.addresses = list(neighborhoods.values_list(
+                'district__city_id', 'district__city__name', 'district_id', 'district__name', 'id', 'name'
+            ))
+        return lookup
+
+
+@dataclass
+class GenerationOptions:
+    now: object
+    days: int = 7
+    seed: int = None
+
+
+def generate_rows(lookup, start, count, options):
+    """
+    [start, start+count) aralığı için (order_values, [item_values, ...]) demetleri üretir.
+    Saf Python'dur; DB'ye dokunmaz, bu yüzden ayrı süreçte çalışabilir.
+    """
+    rng = random.Random(None if options.seed is None else options.seed * 1_000_003 + start)
+    statuses = [status for status, weight in STATUS_WEIGHTS for _ in range(weight)]
+    now = timezone.localtime(options.now)
+    rows = []
+
+    for _ in range(count):
+        campaign = rng.choice(lookup.campaigns)
+        city_id, city_name, district_id, district_name, neighborhood_id, neighborhood_name = rng.choice(lookup.addresses)
+
+        # Kargo ve kapıda ödeme için %70 ihtimalle indirimli fiyat
+        if rng.random() < 0.7:
+            cargo_price = campaign['shipping_price_discounted']
+            cod_fee = campaign['cod_price_discounted']
+        else:
+            cargo_price = campaign['shipping_price']
+            cod_fee = campaign['cod_price']
+
+        status = rng.choice(statuses)
+        cargo_firm = tracking_code = cargo_barcode = None
+        if status in ('shipped', 'delivered'):
+            cargo_firm = rng.choice(CARGO_FIRMS)
+            tracking_code = str(rng.randint(1000000000, 9999999999))
+            cargo_barcode = f'BR{rng.randint(100000000, 999999999)}'
+
+        # Son N gün, 08:00 - 22:00 arası
+        day = (now - timedelta(days=rng.randint(0, options.days))).replace(
+            hour=rng.randint(8, 22), minute=rng.randint(0, 59), second=rng.randint(0, 59), microsecond=0
+        )
+        created_at = min(day, now)
+
+        order = (
+            campaign['id'], campaign['title'], campaign['slug'], campaign['image_url'], status,
+            f'{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}',
+            f'0{rng.choice(PHONE_OPERATORS)} {rng.randint(100, 999)} {rng.randint(10, 99)} {rng.randint(10, 99)}',
+            city_id, district_id, neighborhood_id, city_name, district_name,
+            f'{neighborhood_name} Mahallesi, {rng.choice(STREETS)} No: {rng.randint(1, 250)}/{rng.randint(1, 30)}, {district_name}/{city_name}',
+            campaign['price'], cargo_price, cod_fee, campaign['price'] + cargo_price + cod_fee,
+            cargo_firm, tracking_code, cargo_barcode, created_at,
+        )
+
+        # Kampanyadaki her üründen 1 adet
+        items = []
+        for product_id, name, sku, description, image_url in campaign['products']:
+            size_name, size_description = rng.choice(campaign['sizes']) if campaign['sizes'] else (None, None)
+            items.append((product_id, size_name, size_name, size_description, name, sku, description, image_url))
+        rows.append((order, items))
+    return rows
+
+
+class RowWriter:
+    """
+    Üretilmiş satırları ORM'i atlayarak ham SQL ile yazar.
+
+    bulk_create satır başına model örneği ve alan hazırlığı yaptığı için milyonluk
+    üretimde süre yazma yerine SQL derlemede geçiyordu. Sipariş id'lerini veritabanı
+    verir ve çok satırlı ``INSERT ... RETURNING`` ile geri okunur; kalemler ve geçmiş
+    satırları bu id'lerle aynı transaction'da bağlanır. Böylece eşzamanlı checkout'lar
+    ve diğer yazıcılarla id çakışmaz. RETURNING desteklemeyen veritabanında id aralığı
+    yazma transaction'ı içinde ayrılır (SQLite'ta transaction ``BEGIN IMMEDIATE`` ile
+    açıldığı için yazma kilidi ayırmadan INSERT'e kadar tutulur).
+    """
+
+    def __init__(self, using=DEFAULT_DB_ALIAS):
+        self.connection = connections[using]
+        self.returning = self.connection.features.can_return_rows_from_bulk_insert
+        columns = ORDER_FIELDS + ('updated_at',)
+        if not self.returning:
+            columns = ('id',) + columns
+        self.order_sql, self.order_defaults = self._insert_statement(Order, columns)
+        self.item_sql, self.item_defaults = self._insert_statement(OrderItem, ('order_id', 'quantity') + ITEM_FIELDS)
+        if self.returning:
+            # Çok satırlı INSERT: sorgu parametre sınırına göre batch'lenir
+            head, row = self.order_sql.split(' VALUES ')
+            self.order_head, self.order_row = head + ' VALUES ', row
+            self.order_names = columns + (None,) * len(self.order_defaults)
+            self.order_returning = self.connection.ops.return_insert_columns([Order._meta.pk])[0]
+        self.adapt_datetime = self.connection.ops.adapt_datetimefield_value
+
+    def _insert_statement(self, model, columns):
+        """Verilen kolonlar + modeldeki diğer alanların varsayılan değerleriyle INSERT cümlesi."""
+        quote = self.connection.ops.quote_name
+        template = model()
+        names = list(columns)
+        defaults = []
+        for f in model._meta.concrete_fields:
+            if f.attname not in columns and not f.primary_key:
+                names.append(f.attname)
+                defaults.append(f.get_db_prep_save(getattr(template, f.attname), self.connection))
+        sql = 'INSERT INTO {} ({}) VALUES ({})'.format(
+            quote(model._meta.db_table),
+            ', '.join(quote(model._meta.get_field(name).column) for name in names),
+            ', '.join(['%s'] * len(names)),
+        )
+        return sql, tuple(defaults)
+
+    def _insert_orders(self, cursor, order_params):
+        """Siparişleri yazar; id'lerini satır sırasıyla döndürür (transaction içinde çağrılır)."""
+        if not self.returning:
+            start = (Order.objects.using(self.connection.alias).aggregate(max_id=Max('id'))['max_id'] or 0) + 1
+            ids = list(range(start, start + len(order_params)))
+            cursor.executemany(self.order_sql, [(pk,) + params for pk, params in zip(ids, order_params)])
+            return ids
+        ids = []
+        batch_size = max(1, self.connection.ops.bulk_batch_size(self.order_names, order_params))
+        for start in range(0, len(order_params), batch_size):
+            batch = order_params[start:start + batch_size]
+            cursor.execute(
+                self.order_head + ', '.join([self.order_row] * len(batch)) + ' ' + self.order_returning,
+                [value for params in batch for value in params],
+            )
+            ids.extend(row[0] for row in cursor.fetchall())
+        return ids
+
+    def write(self, rows):
+        """Satırları tek transaction içinde yazar; sipariş sayısını döndürür."""
+        order_params = []
+        campaign_orders = Counter()
+        product_totals = defaultdict(lambda: [0, 0])
+        total_index = ORDER_FIELDS.index('total_amount')
+        status_index = ORDER_FIELDS.index('status')
+        for values, items in rows:
+            created_at = self.adapt_datetime(values[-1])
+            order_params.append(values[:-1] + (created_at, created_at) + self.order_defaults)
+            campaign_orders[values[0]] += 1
+            for product_id in {item[0] for item in items}:
+                product_totals[product_id][1] += values[total_index]
+            for item in items:
+                product_totals[item[0]][0] += 1
+
+        with transaction.atomic(using=self.connection.alias):
+            with self.connection.cursor() as cursor:
+                order_ids = self._insert_orders(cursor, order_params)
+                item_params = []
+                events = []
+                for order_id, (values, items) in zip(order_ids, rows):
+                    # transitions.record_placed ile aynı ilk geçmiş satırı
+                    events.append(OrderStatusEvent(
+                        order_id=order_id, kind='order', from_status='', to_status=values[status_index],
+                        created_at=values[-1], seconds_since_placed=0,
+                    ))
+                    item_params += [(order_id, 1) + item + self.item_defaults for item in items]
+                cursor.executemany(self.item_sql, item_params)
+            OrderStatusEvent.objects.using(self.connection.alias).bulk_create(events, batch_size=EVENT_BATCH_SIZE)
+            # Liste sayaçları ve durum özetleri aynı transaction içinde, batch başına
+            # kampanya/ürün/(gün, durum) başına tek UPDATE
+            counters.apply_increments(campaign_orders, product_totals)
+            rollups.add(rollups.summarize(events))
+        return len(order_params)
+
+    def finish(self):
+        """Açık id ile yazıldıysa (RETURNING yok) sequence'ları ileri alır."""
+        if self.returning:
+            return
+        statements = self.connection.ops.sequence_reset_sql(no_style(), [Order, OrderItem])
+        if statements:
+            with self.connection.cursor() as cursor:
+                for sql in statements:
+                    cursor.execute(sql)
+
+
+_worker_lookup = None
+
+
+def _init_worker(lookup):
+    global _worker_lookup
+    _worker_lookup = lookup
+
+
+def _generate_chunk(args):
+    start, count, options = args
+    return generate_rows(_worker_lookup, start, count, options)
+
+
+def generate_orders(lookup, count, options, batch_size=5000, workers=0, progress=None):
+    """
+    count adet sipariş üretip yazar. workers > 0 ise satır üretimi süreç havuzunda,
+    yazma ana süreçte yapılır (SQLite tek yazıcıdır). Yazılan sipariş sayısını döndürür.
+    """
+    chunks = [(start, min(batch_size, count - start), options) for start in range(0, count, batch_size)]
+    writer = RowWriter()
+    written = 0
+
+    def write(rows):
+        nonlocal written
+        written += writer.write(rows)
+        if progress:
+            progress(written)
+
+    try:
+        if workers:
+            # fork: çocuk süreçler kurulu Django ortamını ve lookup'ı miras alır
+            import multiprocessing
+            with multiprocessing.get_context('fork').Pool(workers, initializer=_init_worker, initargs=(lookup,)) as pool:
+                for rows in pool.imap(_generate_chunk, chunks):
+                    write(rows)
+        else:
+            for chunk in chunks:
+                write(generate_rows(lookup, *chunk))
+    finally:
+        writer.finish()
+    return written
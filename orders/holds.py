@@ -0,0 +1,158 @@
+"""
+Checkout öncesi stok ayırma.
+
+Müşteri kampanya sayfasında ürün seçtikçe seçimi ``hold`` ile oturum anahtarına
+ayrılır. Ayrılan adet ürün stoğundan koşullu ``UPDATE`` ile hemen düşülür;
+stok bitmişse ürün seçim anında "tükendi" olarak döner, müşteri formu
+doldurduktan sonra değil. Checkout (orders.checkout) oturumun ayrımlarını
+``consume`` ile siparişe çevirir: ayrılan adet zaten düşülmüş olduğu için ürün
+satırlarına yeniden yazılmaz, yalnızca ayrım satırları silinir. ``hold`` ve
+``consume`` yalnızca verilen kapsamdaki (kampanyanın ürünleri) ayrımlara
+dokunur; aynı oturumun başka kampanyadaki seçimi korunur.
+
+Süresi dolan ayrımları ``sweep`` toplu olarak stoğa geri verir (ürün başına
+değil, aynı adetteki ürünler için tek UPDATE). Süpürme, ayrım isteklerinde en
+fazla STOCK_HOLD_SWEEP_INTERVAL saniyede bir kendiliğinden, ayrıca
+``sweep_stock_holds`` komutuyla çalışır.
+"""
+from collections import Counter, defaultdict
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+
+from gumbuz_shop.db import retry_on_lock
+from products.models import Product
+from .models import StockHold
+
+SWEEP_CACHE_KEY = 'stock_holds_swept'
+SWEEP_BATCH_SIZE = 500
+
+
+def hold_ttl():
+    return getattr(settings, 'STOCK_HOLD_TTL', 600)
+
+
+def return_stock(totals):
+    """{ürün id: adet} kadar stoğu geri verir; aynı adetteki ürünler tek UPDATE."""
+    by_quantity = defaultdict(list)
+    for product_id, quantity in totals.items():
+        if quantity > 0:
+            by_quantity[quantity].append(product_id)
+    for quantity, product_ids in by_quantity.items():
+        Product.objects.filter(pk__in=product_ids).update(stock_qty=F('stock_qty') + quantity)
+
+
+@retry_on_lock
+@transaction.atomic
+def hold(key, product_ids, scope=None, ttl=None):
+    """
+    key'in scope'taki (ürün id'leri; None ise tümü) ayrımlarını seçime
+    (product_ids, tekrar eden id = adet) eşitler ve süresini uzatır.
+    (ayrılan {ürün: adet}, stoğu yetmeyen ürün id'leri) döndürür.
+    """
+    wanted = Counter(int(pid) for pid in product_ids)
+    holds = _scoped(key, set(scope) | set(wanted) if scope is not None else None)
+    current = dict(holds.values_list('product_id', 'quantity'))
+
+    # Seçimden çıkan ya da azalan ürünler stoğa döner
+    return_stock({pid: quantity - wanted.get(pid, 0) for pid, quantity in current.items()})
+
+    held, unavailable = {}, []
+    for pid, quantity in sorted(wanted.items()):
+        have = min(current.get(pid, 0), quantity)
+        extra = quantity - have
+        if extra and not Product.objects.filter(pk=pid, stock_qty__gte=extra).update(stock_qty=F('stock_qty') - extra):
+            unavailable.append(pid)
+            quantity = have
+        if quantity:
+            held[pid] = quantity
+
+    expires_at = timezone.now() + timedelta(seconds=hold_ttl() if ttl is None else ttl)
+    if current:
+        holds.filter(product_id__in=current).delete()
+    StockHold.objects.bulk_create([
+        StockHold(key=key, product_id=pid, quantity=quantity, expires_at=expires_at)
+        for pid, quantity in held.items()
+    ])
+    return held, unavailable
+
+
+@retry_on_lock
+@transaction.atomic
+def release(key):
+    """key'in tüm ayrımlarını stoğa geri verir."""
+    current = dict(StockHold.objects.filter(key=key).values_list('product_id', 'quantity'))
+    if current:
+        StockHold.objects.filter(key=key).delete()
+        return_stock(current)
+    return sum(current.values())
+
+
+def _scoped(key, scope):
+    holds = StockHold.objects.filter(key=key)
+    return holds if scope is None else holds.filter(product_id__in=scope)
+
+
+def consume(key, counts, scope=None):
+    """
+    Checkout transaction'ı içinde scope'taki (ürün id'leri ya da alt sorgu; None
+    ise tümü) ayrımları siparişe çevirir. counts: siparişteki {ürün: adet}.
+    Ayrımla karşılanmayan {ürün: adet} döner (çağıran stoktan düşer); siparişte
+    olmayan fazla ayrımlar stoğa geri verilir. Süresi dolmuş ama henüz
+    süpürülmemiş ayrım da stoktan düşülmüş durumdadır, o yüzden o da kullanılır.
+
+    Ayrım satırları kilitlenir ve yalnızca bu çağrının sildiği satırlar sayılır:
+    aynı anda çalışan ``_sweep_batch`` satırı önce silmişse stoğu o geri vermiştir,
+    ayrım yokmuş gibi davranılır (stok iki kez geri verilmez).
+    """
+    rows = list(_scoped(key, scope).select_for_update().values_list('pk', 'product_id', 'quantity'))
+    holds = {}
+    for pk, product_id, quantity in rows:
+        if StockHold.objects.filter(pk=pk).delete()[0]:
+            holds[product_id] = quantity
+    if not holds:
+        return dict(counts)
+    return_stock({pid: quantity - counts.get(pid, 0) for pid, quantity in holds.items()})
+    return {
+        pid: quantity - holds.get(pid, 0)
+        for pid, quantity in counts.items()
+        if quantity > holds.get(pid, 0)
+    }
+
+
+@retry_on_lock
+@transaction.atomic
+def _sweep_batch(now, batch_size):
+    rows = list(
+        StockHold.objects.select_for_update().filter(expires_at__lte=now)
+        .order_by('expires_at').values_list('pk', 'product_id', 'quantity')[:batch_size]
+    )
+    if rows:
+        StockHold.objects.filter(pk__in=[pk for pk, _, _ in rows]).delete()
+        totals = Counter()
+        for _, product_id, quantity in rows:
+            totals[product_id] += quantity
+        return_stock(totals)
+    return len(rows)
+
+
+def sweep(now=None, batch_size=SWEEP_BATCH_SIZE):
+    """Süresi dolan ayrımları partiler halinde stoğa geri verir; geri alınan ayrım sayısını döndürür."""
+    now = now or timezone.now()
+    reclaimed = 0
+    while True:
+        count = _sweep_batch(now, batch_size)
+        reclaimed += count
+        if count < batch_size:
+            return reclaimed
+
+
+def maybe_sweep():
+    """En fazla STOCK_HOLD_SWEEP_INTERVAL saniyede bir süpürür (cache.add ile tek süreç)."""
+    if cache.add(SWEEP_CACHE_KEY, True, timeout=getattr(settings, 'STOCK_HOLD_SWEEP_INTERVAL', 60)):
+        return sweep()
+    return 0
@@ -0,0 +1,95 @@
+"""
+Checkout tekrar anahtarları (idempotency key).
+
+Sipariş formu sayfa açılışında rastgele bir anahtar üretip her gönderimde
+yollar. Çift tıklama ya da ağ tekrarıyla aynı anahtar tekrar geldiğinde
+sipariş transaction'ı yeniden çalıştırılmaz: anahtar tek sorguyla okunur ve
+ilk isteğin oluşturduğu siparişe (veya ön kayda) yönlendirilir.
+
+Anahtar, yazma işleminden hemen önce benzersiz satır olarak alınır (``claim``);
+aynı anda gelen ikinci istek satırı bulur ve ilk istek bitene kadar 409 alır.
+İlk istek başarısız olursa anahtar bırakılır (``release``), müşteri seçimini
+düzeltip aynı formla tekrar deneyebilir. Anahtarlar IDEMPOTENCY_KEY_TTL süresince
+geçerlidir; eskiler ``purge`` ile toplu silinir.
+
+Anahtar, alındığı oturuma bağlanır (session anahtarının özeti, ``owner``): başka
+bir oturumdan aynı anahtarla gelen istek ilk müşterinin başarı sayfasına
+yönlenmez, kendi anahtarı gibi yeni sipariş olarak işlenir.
+"""
+import hashlib
+import re
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+
+from .models import IdempotencyKey
+
+KEY_PATTERN = re.compile(r'^[A-Za-z0-9_-]{16,64}$')
+PURGE_CACHE_KEY = 'idempotency_keys_purged'
+PURGE_INTERVAL = 60 * 60
+
+
+def clean_key(value):
+    """Geçerli biçimdeki anahtarı döndürür; değilse None (anahtarsız istek normal işlenir)."""
+    return value if value and KEY_PATTERN.match(value) else None
+
+
+def cutoff():
+    return timezone.now() - timedelta(seconds=getattr(settings, 'IDEMPOTENCY_KEY_TTL', 24 * 60 * 60))
+
+
+def owner(session_key):
+    """Oturum anahtarının özeti; session anahtarı veritabanında açık tutulmaz."""
+    return hashlib.blake2b(session_key.encode(), digest_size=16).hexdigest()
+
+
+def lookup(key, session_key):
+    """Bu oturumun süresi dolmamış anahtar kaydı (ön kaydıyla birlikte) ya da None."""
+    if not key or not session_key:
+        return None
+    return IdempotencyKey.objects.select_related('intake').filter(
+        key=key, owner=owner(session_key), created_at__gte=cutoff(),
+    ).first()
+
+
+def claim(key, session_key):
+    """
+    Anahtarı bu oturumdaki istek adına alır: (kayıt, alındı mı). Alınamadıysa kayıt,
+    aynı oturumdan aynı anahtarla daha önce gelen (biten ya da süren) isteğindir.
+    """
+    maybe_purge()
+    digest = owner(session_key)
+    try:
+        with transaction.atomic():
+            return IdempotencyKey.objects.create(key=key, owner=digest), True
+    except IntegrityError:
+        existing = IdempotencyKey.objects.select_related('intake').get(key=key, owner=digest)
+        if existing.created_at >= cutoff():
+            return existing, False
+        # Süresi dolmuş ama henüz silinmemiş anahtar: yeniden kullanılabilir
+        existing.delete()
+        return claim(key, session_key)
+
+
+def complete(record, order=None, intake=None):
+    """Anahtarı oluşan siparişe (veya ön kayda) bağlar."""
+    IdempotencyKey.objects.filter(pk=record.pk).update(order=order, intake=intake)
+
+
+def release(record):
+    """Başarısız istekten sonra anahtarı bırakır."""
+    IdempotencyKey.objects.filter(pk=record.pk).delete()
+
+
+def purge():
+    """Süresi dolan anahtarları siler; silinen sayıyı döndürür."""
+    return IdempotencyKey.objects.filter(created_at__lt=cutoff()).delete()[0]
+
+
+def maybe_purge():
+    if cache.add(PURGE_CACHE_KEY, True, timeout=PURGE_INTERVAL):
+        return purge()
+    return 0
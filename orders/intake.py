@@ -0,0 +1,138 @@
+"""
+Yoğun satış için sipariş ön kaydı (write-behind).
+
+``ORDER_INTAKE_MODE = 'journal'`` iken checkout isteği ucuz kontrollerden
+(kampanya, ürünlerin kampanyaya ait olması, adres id'leri) geçtikten sonra
+sipariş verisi ``OrderIntake`` tablosuna tek INSERT ile yazılır ve müşteri takip
+numarasıyla hemen başarı sayfasına yönlenir. Stok, sayaçlar, kalemler ve durum
+geçmişi yazılmaz; istek başına uzun yazma transaction'ı tutulmaz.
+
+Ön kayıtları worker toplu olarak siparişe çevirir: her partide tek transaction
+açılır, her kayıt orders.checkout.place_order ile kendi savepoint'inde işlenir.
+Stok yetmeyen kayıt yalnızca kendi savepoint'ini geri alır ve 'failed' olarak
+işaretlenir; müşteri bunu başarı sayfasında görür. Kim işler
+``ORDER_INTAKE_RUNNER`` ile seçilir (bkz. admin_panel.image_jobs):
+
+- ``thread``: kayıt sonrası süreç içi tek thread kuyruğu boşaltır,
+- ``worker``: yalnızca ``process_order_intake`` komutu işler,
+- ``inline``: aynı istekte işlenir (test/geliştirme).
+"""
+import logging
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.db import OperationalError, close_old_connections, models, transaction
+from django.utils import timezone
+
+from campaigns.models import Campaign
+from gumbuz_shop.db import retry_on_lock
+from . import abuse
+from .checkout import generate_tracking_number, place_order
+from .models import OrderIntake
+
+logger = logging.getLogger(__name__)
+
+BATCH_SIZE = 50
+
+_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='order-intake')
+
+
+def enabled():
+    return getattr(settings, 'ORDER_INTAKE_MODE', 'direct') == 'journal'
+
+
+def submit(campaign, product_ids, size_slugs, hold_key=None, verdict=None, **order_fields):
+    """
+    Siparişi ön kayda yazar ve OrderIntake döndürür. order_fields place_order ile
+    aynıdır; model nesneleri id olarak saklanır. verdict: ``abuse.check`` kararı,
+    checkout pencerelere ön kaydın transaction'ında eklenir (eşik aşıldıysa
+    ``abuse.Rejected``); worker siparişi kararın alanlarıyla oluşturur.
+    """
+    with transaction.atomic():
+        if verdict is not None:
+            order_fields.update(abuse.record(verdict).order_fields())
+        payload = {'product_ids': list(product_ids), 'size_slugs': list(size_slugs)}
+        for name, value in order_fields.items():
+            if isinstance(value, models.Model):
+                payload[f'{name}_id'] = value.pk
+            else:
+                payload[name] = value
+        intake = OrderIntake.objects.create(
+            tracking_number=generate_tracking_number(),
+            campaign_id=campaign.pk,
+            payload=payload,
+            hold_key=hold_key or '',
+        )
+    transaction.on_commit(kick, robust=True)
+    return intake
+
+
+def kick():
+    runner = getattr(settings, 'ORDER_INTAKE_RUNNER', 'thread')
+    if runner == 'thread':
+        _executor.submit(_run_in_thread)
+    elif runner == 'inline':
+        drain()
+
+
+def _run_in_thread():
+    close_old_connections()
+    try:
+        drain()
+    except Exception:
+        logger.exception('Sipariş ön kayıtları işlenemedi')
+    finally:
+        close_old_connections()
+
+
+def _place(intake, campaign):
+    if campaign is None:
+        raise ValueError("Kampanya bulunamadı.")
+    fields = dict(intake.payload)
+    product_ids = fields.pop('product_ids')
+    size_slugs = fields.pop('size_slugs')
+    return place_order(
+        campaign, product_ids, size_slugs,
+        hold_key=intake.hold_key or None, tracking_number=intake.tracking_number, **fields,
+    )
+
+
+@retry_on_lock
+@transaction.atomic
+def drain_batch(batch_size=BATCH_SIZE):
+    """Bekleyen ön kayıtlardan bir partiyi tek transaction'da işler; işlenen kayıt sayısını döndürür."""
+    intakes = list(
+        OrderIntake.objects.select_for_update(skip_locked=True)
+        .filter(status='pending').order_by('id')[:batch_size]
+    )
+    if not intakes:
+        return 0
+    campaigns = Campaign.objects.in_bulk({intake.campaign_id for intake in intakes})
+    for intake in intakes:
+        try:
+            intake.order = _place(intake, campaigns.get(intake.campaign_id))
+            intake.status = 'done'
+        except ValueError as exc:
+            intake.status, intake.error = 'failed', str(exc)
+        except OperationalError:
+            # Kilit vb.: tüm parti geri alınır ve yeniden denenir
+            raise
+        except Exception:
+            logger.exception('Sipariş ön kaydı işlenemedi: %s', intake)
+            intake.status, intake.error = 'failed', "Sipariş oluşturulurken bir hata oluştu."
+        intake.processed_at = timezone.now()
+    OrderIntake.objects.bulk_update(intakes, ['status', 'order', 'error', 'processed_at'])
+    return len(intakes)
+
+
+def drain(batch_size=BATCH_SIZE, limit=None):
+    """Kuyruk boşalana (veya limit dolana) kadar partileri işler; işlenen kayıt sayısını döndürür."""
+    processed = 0
+    while limit is None or processed < limit:
+        size = batch_size if limit is None else min(batch_size, limit - processed)
+        count = drain_batch(size)
+        processed += count
+        if count < size:
+            break
+    return processed
+
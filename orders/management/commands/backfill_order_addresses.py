@@ -0,0 +1,65 @@
+import csv
+
+from django.core.management.base import BaseCommand
+
+from orders import address_backfill
+
+MISSING_LABELS = {'city': 'il', 'district': 'ilçe', 'neighborhood': 'mahalle'}
+
+
+class Command(BaseCommand):
+    help = 'Yalnızca metin adresi olan eski siparişleri il/ilçe/mahalle kayıtlarına bağlar (bulanık eşleşmeli)'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=address_backfill.BATCH_SIZE,
+            help='Tek seferde işlenen sipariş sayısı'
+        )
+        parser.add_argument(
+            '--after-id',
+            type=int,
+            default=0,
+            help='Bu id\'den sonraki siparişlerden devam et (yarıda kalan çalıştırma için)'
+        )
+        parser.add_argument(
+            '--cutoff',
+            type=float,
+            default=address_backfill.FUZZY_CUTOFF,
+            help='Bulanık eşleşme benzerlik eşiği, 0-1 (varsayılan: %(default)s)'
+        )
+        parser.add_argument(
+            '--report',
+            default='unmatched_order_addresses.csv',
+            help='Eşleşmeyen siparişlerin yazılacağı CSV dosyası'
+        )
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Eşleştir ve raporla, veritabanına yazma'
+        )
+
+    def handle(self, *args, **options):
+        matcher = address_backfill.AddressMatcher(cutoff=options['cutoff'])
+        scanned = updated = unmatched = 0
+
+        with open(options['report'], 'w', newline='', encoding='utf-8') as report:
+            writer = csv.writer(report)
+            writer.writerow(['id', 'il', 'ilçe', 'adres', 'eşleşmeyen'])
+            for batch in address_backfill.backfill_batches(
+                after_id=options['after_id'], batch_size=options['batch_size'],
+                dry_run=options['dry_run'], matcher=matcher,
+            ):
+                scanned += batch.scanned
+                updated += batch.updated
+                unmatched += len(batch.unmatched)
+                for order, missing in batch.unmatched:
+                    writer.writerow([order.pk, order.city, order.district, order.full_address, MISSING_LABELS[missing]])
+                report.flush()
+                self.stdout.write(f'  id {batch.last_id}\'e kadar: {scanned} sipariş, {updated} güncellendi')
+
+        verb = 'güncellenecek' if options['dry_run'] else 'güncellendi'
+        self.stdout.write(self.style.SUCCESS(
+            f'{scanned} sipariş tarandı, {updated} {verb}, {unmatched} tam eşleşmedi ({options["report"]})'
+        ))
@@ -0,0 +1,119 @@
+import multiprocessing
+import os
+import random
+import tempfile
+import time
+
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+from django.db.models import Sum
+
+from gumbuz_shop.db import is_lock_error
+
+
+def _checkout_worker(args):
+    """Alt süreç: rastgele ürünlerle art arda checkout; (başarılı, stok yok, kilit hatası) döndürür."""
+    from django.db import OperationalError
+    from campaigns.models import Campaign
+    from orders.checkout import OutOfStock, place_order
+
+    worker, attempts, product_ids, seed = args
+    rng = random.Random(seed)
+    campaign = Campaign.objects.get()
+    placed = out_of_stock = locked = 0
+    for attempt in range(attempts):
+        # Aynı ürün iki kez seçilebilir (tek kalemde 2 adet stok düşümü)
+        selected = [rng.choice(product_ids) for _ in range(rng.randint(1, 2))]
+        try:
+            place_order(
+                campaign, selected, [],
+                customer_name=f'Yük Testi {worker}-{attempt}', phone='5550000000', full_address='Test',
+            )
+            placed += 1
+        except OutOfStock:
+            out_of_stock += 1
+        except OperationalError as exc:
+            if not is_lock_error(exc):
+                raise
+            locked += 1
+    connections.close_all()
+    return placed, out_of_stock, locked
+
+
+class Command(BaseCommand):
+    help = (
+        'Eşzamanlı checkout yük testi: geçici bir SQLite veritabanında birden çok süreç aynı '
+        'sınırlı stoklu ürünleri sipariş eder; eksi stok ve kayıp sipariş olmadığını doğrular'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--processes', type=int, default=8, help='Eşzamanlı süreç sayısı (varsayılan: 8)')
+        parser.add_argument('--orders', type=int, default=25, help='Süreç başına checkout denemesi (varsayılan: 25)')
+        parser.add_argument('--products', type=int, default=3, help='Ürün sayısı (varsayılan: 3)')
+        parser.add_argument(
+            '--stock', type=int, default=40,
+            help='Ürün başına başlangıç stoğu; toplam talepten az olmalı ki stok tükensin (varsayılan: 40)'
+        )
+
+    def handle(self, *args, **options):
+        with tempfile.TemporaryDirectory() as tmp:
+            # Gerçek veritabanına dokunulmaz; aynı ayarlarla (WAL, IMMEDIATE) geçici dosya
+            connections.close_all()
+            settings_dict = connections['default'].settings_dict
+            original_name = settings_dict['NAME']
+            settings_dict['NAME'] = os.path.join(tmp, 'stress.sqlite3')
+            try:
+                self.run(options)
+            finally:
+                connections.close_all()
+                settings_dict['NAME'] = original_name
+
+    def run(self, options):
+        from campaigns.models import Campaign, CampaignProduct
+        from orders.models import Order, OrderItem
+        from products.models import Product
+
+        call_command('migrate', verbosity=0, interactive=False)
+        call_command('createcachetable', verbosity=0)
+
+        campaign = Campaign.objects.create(title='Yük Testi', slug='yuk-testi', price=100)
+        product_ids = []
+        for i in range(options['products']):
+            product = Product.objects.create(name=f'Yük Ürünü {i}', sku=f'YUK-{i}', stock_qty=options['stock'])
+            CampaignProduct.objects.create(campaign=campaign, product=product)
+            product_ids.append(product.id)
+        initial_stock = options['stock'] * len(product_ids)
+
+        # Alt süreçler kendi bağlantılarını açar
+        connections.close_all()
+        jobs = [(worker, options['orders'], product_ids, worker) for worker in range(options['processes'])]
+        started = time.monotonic()
+        with multiprocessing.get_context('fork').Pool(options['processes']) as pool:
+            results = pool.map(_checkout_worker, jobs)
+        elapsed = time.monotonic() - started
+
+        placed, out_of_stock, locked = (sum(column) for column in zip(*results))
+        orders = Order.objects.count()
+        items = OrderItem.objects.count()
+        stock = Product.objects.aggregate(total=Sum('stock_qty'))['total']
+        negative = Product.objects.filter(stock_qty__lt=0).count()
+
+        self.stdout.write(
+            f'{placed + out_of_stock + locked} deneme / {elapsed:.1f} sn: {placed} sipariş, '
+            f'{out_of_stock} stok yetersiz, {locked} kilit hatası'
+        )
+        self.stdout.write(f'Stok: {initial_stock} -> {stock}, sipariş kalemi: {items}, sipariş: {orders}')
+
+        errors = []
+        if negative:
+            errors.append(f'{negative} ürünün stoğu eksiye düştü')
+        if orders != placed:
+            errors.append(f'Başarılı checkout {placed}, veritabanındaki sipariş {orders}')
+        if initial_stock - stock != items:
+            errors.append(f'Düşülen stok {initial_stock - stock}, satılan kalem {items}')
+        if locked:
+            errors.append(f'{locked} checkout yeniden denemelere rağmen kilit alamadı')
+        if errors:
+            raise CommandError('; '.join(errors))
+        self.stdout.write(self.style.SUCCESS('Eksi stok ve kayıp sipariş yok.'))
@@ -7,6 +7,7 @@ from orders.models import Order, OrderItem
 from campaigns.models import Campaign
 from products.models import Product
 from addresses.models import City, District, Neighborhood
+from orders import counters
 
 
 class Command(BaseCommand):
@@ -139,6 +140,8 @@ class Command(BaseCommand):
         yesterday_count = orders_created - today_count
         self.stdout.write(self.style.SUCCESS(f'Created {yesterday_count} orders for YESTERDAY'))
         
+        counters.refresh_all()
+
         self.stdout.write(self.style.SUCCESS(f'\n=== Total: {orders_created} orders created! ==='))
         self.stdout.write('\nStatus breakdown:')
         for status_data in Order.objects.values('status').annotate(count=Count('id')).order_by('-count'):
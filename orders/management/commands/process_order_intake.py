@@ -0,0 +1,74 @@
+import multiprocessing
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections, connections
+
+from orders import intake
+
+
+def _loop(batch_size, sleep):
+    try:
+        while True:
+            close_old_connections()
+            if not intake.drain(batch_size):
+                time.sleep(sleep)
+    except KeyboardInterrupt:
+        pass
+
+
+class Command(BaseCommand):
+    help = 'Yoğun satış modundaki sipariş ön kayıtlarını toplu transaction\'larla siparişe çevirir'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--once',
+            action='store_true',
+            help='Kuyruğu bir kez boşalt ve çık'
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=intake.BATCH_SIZE,
+            help=f'Tek transaction\'da işlenecek ön kayıt sayısı (varsayılan: {intake.BATCH_SIZE})'
+        )
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=1,
+            help='Worker süreç sayısı (SQLite tek yazıcıdır; birden fazlası sıraya girer, varsayılan: 1)'
+        )
+        parser.add_argument(
+            '--sleep',
+            type=float,
+            default=0.5,
+            help='Kuyruk boşken bekleme süresi (sn, varsayılan: 0.5)'
+        )
+
+    def handle(self, *args, **options):
+        batch_size = max(options['batch_size'], 1)
+        if options['once']:
+            processed = intake.drain(batch_size)
+            self.stdout.write(self.style.SUCCESS(f'{processed} sipariş ön kaydı işlendi'))
+            return
+
+        workers = max(options['workers'], 1)
+        self.stdout.write(self.style.SUCCESS(f'Sipariş ön kayıtları {workers} worker ile işleniyor... (Ctrl+C ile çıkış)'))
+        if workers == 1:
+            _loop(batch_size, options['sleep'])
+        else:
+            # fork: her süreç kendi veritabanı bağlantısını açar
+            connections.close_all()
+            processes = [
+                multiprocessing.get_context('fork').Process(target=_loop, args=(batch_size, options['sleep']))
+                for _ in range(workers)
+            ]
+            for process in processes:
+                process.start()
+            try:
+                for process in processes:
+                    process.join()
+            except KeyboardInterrupt:
+                for process in processes:
+                    process.join()
+        self.stdout.write('Durduruldu')
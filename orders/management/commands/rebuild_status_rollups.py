@@ -0,0 +1,35 @@
+from datetime import datetime
+
+from django.core.management.base import BaseCommand, CommandError
+
+from orders import rollups
+
+
+class Command(BaseCommand):
+    help = 'Günlük sipariş durum özetlerini (huni / durumlar arası süre) durum geçmişinden yeniden kurar'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--since',
+            help='Sadece bu günden (YYYY-MM-DD) itibaren yeniden kur'
+        )
+        parser.add_argument(
+            '--backfill',
+            action='store_true',
+            help='Geçmişi olmayan eski siparişler için yaklaşık geçmiş satırları oluştur'
+        )
+
+    def handle(self, *args, **options):
+        since = None
+        if options['since']:
+            try:
+                since = datetime.strptime(options['since'], '%Y-%m-%d').date()
+            except ValueError:
+                raise CommandError('--since YYYY-MM-DD biçiminde olmalı')
+
+        if options['backfill']:
+            created = rollups.backfill_events()
+            self.stdout.write(f'{created} geçmiş satırı oluşturuldu.')
+
+        count = rollups.rebuild(since)
+        self.stdout.write(self.style.SUCCESS(f'{count} özet satırı yeniden kuruldu.'))
@@ -0,0 +1,44 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import F, Q
+
+from campaigns.models import Campaign
+from orders import counters
+from products.models import Product
+
+
+class Command(BaseCommand):
+    help = 'Kampanya ve ürün liste sayaçlarını (sipariş/ürün/satış/ciro) kaynak tablolardan yeniden hesaplar'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Sadece sapan kayıt sayısını raporla, güncelleme yapma'
+        )
+
+    def drifted(self, model, expressions):
+        """Beklenen değerden sapan kayıtların id'leri."""
+        expected = {f'expected_{name}': expression for name, expression in expressions.items()}
+        mismatch = Q()
+        for name in expressions:
+            mismatch |= ~Q(**{name: F(f'expected_{name}')})
+        return list(model.objects.annotate(**expected).filter(mismatch).values_list('pk', flat=True))
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            campaign_ids = self.drifted(Campaign, counters.campaign_counter_expressions())
+            product_ids = self.drifted(Product, counters.product_counter_expressions())
+
+            self.stdout.write(f'Sapan kampanya sayacı: {len(campaign_ids)}')
+            self.stdout.write(f'Sapan ürün sayacı: {len(product_ids)}')
+
+            if options['dry_run']:
+                return
+
+            counters.refresh_campaigns(campaign_ids)
+            counters.refresh_products(product_ids)
+
+        self.stdout.write(self.style.SUCCESS(
+            f'{len(campaign_ids)} kampanya ve {len(product_ids)} ürün sayacı düzeltildi.'
+        ))
@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from orders import social_proof
+
+
+class Command(BaseCommand):
+    help = 'Sosyal kanıt akışını son siparişlerden yeniden oluşturur (cron ile periyodik çalıştırılabilir)'
+
+    def handle(self, *args, **options):
+        entries = social_proof.refresh()
+        self.stdout.write(self.style.SUCCESS(f'Sosyal kanıt akışı güncellendi: {len(entries)} kayıt'))
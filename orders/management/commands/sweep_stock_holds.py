@@ -0,0 +1,19 @@
+from django.core.management.base import BaseCommand
+
+from orders import holds
+
+
+class Command(BaseCommand):
+    help = 'Süresi dolan stok ayırmalarını toplu olarak stoğa geri verir (cron ile periyodik çalıştırılabilir)'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=holds.SWEEP_BATCH_SIZE,
+            help=f'Tek transaction\'da geri alınacak ayrım sayısı (varsayılan: {holds.SWEEP_BATCH_SIZE})'
+        )
+
+    def handle(self, *args, **options):
+        reclaimed = holds.sweep(batch_size=max(options['batch_size'], 1))
+        self.stdout.write(self.style.SUCCESS(f'{reclaimed} süresi dolan stok ayırması geri alındı.'))
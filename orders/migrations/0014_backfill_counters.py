@@ -0,0 +1,45 @@
+from django.db import migrations
+from django.db.models import DecimalField, F, Func, IntegerField, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
+
+
+def _total(queryset, function, expression, output_field):
+    subquery = queryset.order_by().annotate(
+        result=Func(expression, function=function, output_field=output_field)
+    ).values('result')[:1]
+    return Coalesce(Subquery(subquery), Value(0), output_field=output_field)
+
+
+def backfill_counters(apps, schema_editor):
+    Campaign = apps.get_model('campaigns', 'Campaign')
+    CampaignProduct = apps.get_model('campaigns', 'CampaignProduct')
+    Product = apps.get_model('products', 'Product')
+    Order = apps.get_model('orders', 'Order')
+    OrderItem = apps.get_model('orders', 'OrderItem')
+    integer = IntegerField()
+
+    Campaign.objects.update(
+        product_count=_total(CampaignProduct.objects.filter(campaign=OuterRef('pk')), 'COUNT', F('pk'), integer),
+        order_count=_total(Order.objects.filter(campaign=OuterRef('pk')), 'COUNT', F('pk'), integer),
+    )
+    orders_with_product = Order.objects.filter(
+        pk__in=OrderItem.objects.filter(product=OuterRef(OuterRef('pk'))).values('order_id')
+    )
+    Product.objects.update(
+        campaign_count=_total(CampaignProduct.objects.filter(product=OuterRef('pk')), 'COUNT', F('pk'), integer),
+        sales_count=_total(OrderItem.objects.filter(product=OuterRef('pk')), 'SUM', F('quantity'), integer),
+        revenue=_total(orders_with_product, 'SUM', F('total_amount'), DecimalField(max_digits=14, decimal_places=2)),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('campaigns', '0010_campaign_order_count_campaign_product_count'),
+        ('products', '0003_product_campaign_count_product_revenue_and_more'),
+        ('orders', '0013_returnrequest_returnitem'),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_counters, migrations.RunPython.noop),
+    ]
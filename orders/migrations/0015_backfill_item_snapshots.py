@@ -0,0 +1,53 @@
+from django.core.files.storage import default_storage
+from django.db import migrations
+from django.db.models import Q
+
+BATCH_SIZE = 500
+SNAPSHOT_FIELDS = ['product_name', 'product_sku', 'product_description', 'product_image_url', 'selected_size_name']
+
+
+def backfill_item_snapshots(apps, schema_editor):
+    """Snapshot alanları boş eski sipariş kalemlerini ürünün bugünkü bilgileriyle doldurur."""
+    OrderItem = apps.get_model('orders', 'OrderItem')
+    ProductImage = apps.get_model('products', 'ProductImage')
+
+    missing = OrderItem.objects.filter(
+        Q(product_name__isnull=True) | Q(product_name='') | Q(product_image_url__isnull=True)
+    ).select_related('product').order_by('pk')
+
+    first_images = {}
+    for product_id, image in ProductImage.objects.filter(
+        product_id__in=missing.values('product_id')
+    ).order_by('product_id', '-sort_order', '-pk').values_list('product_id', 'image'):
+        first_images[product_id] = image
+
+    batch = []
+    for item in missing.iterator(chunk_size=BATCH_SIZE):
+        product = item.product
+        if not item.product_name:
+            item.product_name = product.name
+            item.product_sku = item.product_sku or product.sku
+            if item.product_description is None:
+                item.product_description = product.description
+        if item.product_image_url is None and first_images.get(product.id):
+            item.product_image_url = default_storage.url(first_images[product.id])
+        if not item.selected_size_name and item.selected_size:
+            item.selected_size_name = item.selected_size
+        batch.append(item)
+        if len(batch) >= BATCH_SIZE:
+            OrderItem.objects.bulk_update(batch, SNAPSHOT_FIELDS)
+            batch = []
+    if batch:
+        OrderItem.objects.bulk_update(batch, SNAPSHOT_FIELDS)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('products', '0004_productimage_variants'),
+        ('orders', '0014_backfill_counters'),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_item_snapshots, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,34 @@
+# Generated by Django 5.2.6 on 2026-10-19 16:36
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('orders', '0015_backfill_item_snapshots'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='OrderStatusEvent',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('order', 'Sipariş'), ('return', 'İade Talebi')], default='order', max_length=10, verbose_name='Tür')),
+                ('from_status', models.CharField(max_length=20, verbose_name='Önceki Durum')),
+                ('to_status', models.CharField(max_length=20, verbose_name='Yeni Durum')),
+                ('created_at', models.DateTimeField(auto_now_add=True, db_index=True, verbose_name='Tarih')),
+                ('order', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='status_events', to='orders.order', verbose_name='Sipariş')),
+                ('return_request', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='status_events', to='orders.returnrequest', verbose_name='İade Talebi')),
+                ('user', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, to=settings.AUTH_USER_MODEL, verbose_name='Kullanıcı')),
+            ],
+            options={
+                'verbose_name': 'Durum Geçmişi',
+                'verbose_name_plural': 'Durum Geçmişi',
+                'ordering': ['-created_at', '-id'],
+            },
+        ),
+    ]
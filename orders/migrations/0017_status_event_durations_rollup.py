@@ -0,0 +1,59 @@
+# Generated by Django 5.2.6 on 2026-10-19 16:40
+
+import django.utils.timezone
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('orders', '0016_orderstatusevent'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='OrderStatusRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField(verbose_name='Gün')),
+                ('from_status', models.CharField(blank=True, max_length=20, verbose_name='Önceki Durum')),
+                ('to_status', models.CharField(max_length=20, verbose_name='Yeni Durum')),
+                ('count', models.PositiveIntegerField(default=0, verbose_name='Geçiş Sayısı')),
+                ('seconds_in_previous', models.BigIntegerField(default=0, verbose_name='Önceki Durumda Geçen Toplam Süre (sn)')),
+                ('seconds_since_placed', models.BigIntegerField(default=0, verbose_name='Siparişten Beri Geçen Toplam Süre (sn)')),
+            ],
+            options={
+                'verbose_name': 'Durum Özeti',
+                'verbose_name_plural': 'Durum Özetleri',
+            },
+        ),
+        migrations.AddField(
+            model_name='orderstatusevent',
+            name='seconds_in_previous',
+            field=models.PositiveIntegerField(blank=True, null=True, verbose_name='Önceki Durumda Geçen Süre (sn)'),
+        ),
+        migrations.AddField(
+            model_name='orderstatusevent',
+            name='seconds_since_placed',
+            field=models.PositiveIntegerField(blank=True, null=True, verbose_name='Siparişten Beri Geçen Süre (sn)'),
+        ),
+        migrations.AlterField(
+            model_name='orderstatusevent',
+            name='created_at',
+            field=models.DateTimeField(default=django.utils.timezone.now, verbose_name='Tarih'),
+        ),
+        migrations.AddIndex(
+            model_name='orderstatusevent',
+            index=models.Index(fields=['to_status', 'created_at'], name='orders_event_status_at'),
+        ),
+        migrations.AddIndex(
+            model_name='orderstatusevent',
+            index=models.Index(fields=['order', 'created_at'], name='orders_event_order_at'),
+        ),
+        migrations.AddConstraint(
+            model_name='orderstatusrollup',
+            constraint=models.UniqueConstraint(fields=('day', 'from_status', 'to_status'), name='orders_rollup_day_transition'),
+        ),
+    ]
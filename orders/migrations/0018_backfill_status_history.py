@@ -0,0 +1,61 @@
+from django.db import migrations
+from django.db.models import Count, Sum
+from django.db.models.functions import Coalesce, TruncDate
+
+BATCH_SIZE = 1000
+
+
+def backfill_status_history(apps, schema_editor):
+    """Mevcut siparişler için yaklaşık durum geçmişi ve günlük özetler (bkz. orders.rollups)."""
+    Order = apps.get_model('orders', 'Order')
+    OrderStatusEvent = apps.get_model('orders', 'OrderStatusEvent')
+    OrderStatusRollup = apps.get_model('orders', 'OrderStatusRollup')
+
+    events = []
+    orders = Order.objects.filter(status_events__isnull=True).values_list('pk', 'status', 'created_at', 'updated_at')
+    for pk, status, created_at, updated_at in orders.iterator(chunk_size=BATCH_SIZE):
+        events.append(OrderStatusEvent(
+            order_id=pk, kind='order', from_status='', to_status='new',
+            created_at=created_at, seconds_since_placed=0,
+        ))
+        if status != 'new':
+            seconds = max(0, int((updated_at - created_at).total_seconds()))
+            events.append(OrderStatusEvent(
+                order_id=pk, kind='order', from_status='new', to_status=status, created_at=updated_at,
+                seconds_in_previous=seconds, seconds_since_placed=seconds,
+            ))
+        if len(events) >= BATCH_SIZE:
+            OrderStatusEvent.objects.bulk_create(events)
+            events = []
+    OrderStatusEvent.objects.bulk_create(events)
+
+    OrderStatusRollup.objects.all().delete()
+    rows = (
+        OrderStatusEvent.objects.filter(kind='order')
+        .annotate(day=TruncDate('created_at'))
+        .values('day', 'from_status', 'to_status')
+        .annotate(
+            count=Count('id'),
+            in_previous=Coalesce(Sum('seconds_in_previous'), 0),
+            since_placed=Coalesce(Sum('seconds_since_placed'), 0),
+        )
+        .order_by()
+    )
+    OrderStatusRollup.objects.bulk_create([
+        OrderStatusRollup(
+            day=row['day'], from_status=row['from_status'], to_status=row['to_status'], count=row['count'],
+            seconds_in_previous=row['in_previous'], seconds_since_placed=row['since_placed'],
+        )
+        for row in rows
+    ], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('orders', '0017_status_event_durations_rollup'),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_status_history, migrations.RunPython.noop),
+    ]
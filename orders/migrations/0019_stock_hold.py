@@ -0,0 +1,30 @@
+# Generated by Django 5.2.6 on 2026-10-19 16:50
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('orders', '0018_backfill_status_history'),
+        ('products', '0004_productimage_variants'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='StockHold',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('key', models.CharField(max_length=40, verbose_name='Oturum Anahtarı')),
+                ('quantity', models.PositiveSmallIntegerField(default=1, verbose_name='Adet')),
+                ('expires_at', models.DateTimeField(db_index=True, verbose_name='Bitiş')),
+                ('product', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='stock_holds', to='products.product', verbose_name='Ürün')),
+            ],
+            options={
+                'verbose_name': 'Stok Ayırma',
+                'verbose_name_plural': 'Stok Ayırmaları',
+                'constraints': [models.UniqueConstraint(fields=('key', 'product'), name='orders_stockhold_key_product')],
+            },
+        ),
+    ]
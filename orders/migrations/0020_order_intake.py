@@ -0,0 +1,37 @@
+# Generated by Django 5.2.6 on 2026-10-19 16:53
+
+import django.db.models.deletion
+import uuid
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('orders', '0019_stock_hold'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='OrderIntake',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('token', models.UUIDField(default=uuid.uuid4, editable=False, unique=True, verbose_name='Anahtar')),
+                ('tracking_number', models.CharField(max_length=10, unique=True, verbose_name='Takip Numarası')),
+                ('campaign_id', models.PositiveBigIntegerField(verbose_name='Kampanya ID')),
+                ('payload', models.JSONField(verbose_name='Sipariş Verisi')),
+                ('hold_key', models.CharField(blank=True, max_length=40, verbose_name='Stok Ayırma Anahtarı')),
+                ('status', models.CharField(choices=[('pending', 'Bekliyor'), ('done', 'Tamamlandı'), ('failed', 'Başarısız')], default='pending', max_length=20, verbose_name='Durum')),
+                ('error', models.TextField(blank=True, verbose_name='Hata')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='Oluşturulma Tarihi')),
+                ('processed_at', models.DateTimeField(blank=True, null=True, verbose_name='İşlenme Zamanı')),
+                ('order', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='orders.order', verbose_name='Sipariş')),
+            ],
+            options={
+                'verbose_name': 'Sipariş Ön Kaydı',
+                'verbose_name_plural': 'Sipariş Ön Kayıtları',
+                'ordering': ['id'],
+                'indexes': [models.Index(fields=['status', 'id'], name='orders_orde_status_a4992b_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,54 @@
+# Generated by Django 5.2.6 on 2026-10-19 17:04
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('addresses', '0001_initial'),
+        ('orders', '0021_idempotency_key'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AbuseWindow',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('key', models.CharField(max_length=40, unique=True, verbose_name='Anahtar')),
+                ('stamps', models.JSONField(default=list, verbose_name='Sipariş Zamanları')),
+                ('expires_at', models.DateTimeField(db_index=True, verbose_name='Bitiş')),
+            ],
+            options={
+                'verbose_name': 'Sipariş Penceresi',
+                'verbose_name_plural': 'Sipariş Pencereleri',
+            },
+        ),
+        migrations.AddField(
+            model_name='order',
+            name='is_suspicious',
+            field=models.BooleanField(db_index=True, default=False, verbose_name='Şüpheli'),
+        ),
+        migrations.AddField(
+            model_name='order',
+            name='suspicion_reason',
+            field=models.CharField(blank=True, max_length=255, verbose_name='Şüphe Nedeni'),
+        ),
+        migrations.CreateModel(
+            name='BlockedContact',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('phone', 'Telefon'), ('address', 'Adres')], default='phone', max_length=10, verbose_name='Tür')),
+                ('value', models.CharField(max_length=255, verbose_name='Telefon / Adres')),
+                ('digest', models.CharField(editable=False, max_length=16, unique=True, verbose_name='Özet')),
+                ('reason', models.CharField(blank=True, max_length=255, verbose_name='Neden')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='Oluşturulma Tarihi')),
+                ('neighborhood', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, to='addresses.neighborhood', verbose_name='Mahalle')),
+            ],
+            options={
+                'verbose_name': 'Engellenen Kişi',
+                'verbose_name_plural': 'Engel Listesi',
+            },
+        ),
+    ]
@@ -0,0 +1,28 @@
+# Generated by Django 5.2.6 on 2026-10-19 18:20
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('orders', '0022_abuse_detection'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='idempotencykey',
+            name='owner',
+            field=models.CharField(default='', max_length=32, verbose_name='Oturum Özeti'),
+            preserve_default=False,
+        ),
+        migrations.AlterField(
+            model_name='idempotencykey',
+            name='key',
+            field=models.CharField(max_length=64, verbose_name='Anahtar'),
+        ),
+        migrations.AddConstraint(
+            model_name='idempotencykey',
+            constraint=models.UniqueConstraint(fields=('key', 'owner'), name='orders_idempotency_key_owner'),
+        ),
+    ]
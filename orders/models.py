@@ -1,4 +1,8 @@
+import uuid
+
+from django.contrib.auth.models import User
 from django.db import models
+from django.utils import timezone
 from products.models import Product
 from addresses.models import City, District, Neighborhood
 
@@ -48,6 +52,10 @@ class Order(models.Model):
     tracking_code = models.CharField(max_length=100, blank=True, null=True, verbose_name="Takip Kodu")
     cargo_barcode = models.CharField(max_length=100, blank=True, null=True, verbose_name="Kargo Barkod")
 
+    # Checkout anındaki tekrar/sahte sipariş tespiti (orders.abuse)
+    is_suspicious = models.BooleanField(default=False, db_index=True, verbose_name="Şüpheli")
+    suspicion_reason = models.CharField(max_length=255, blank=True, verbose_name="Şüphe Nedeni")
+
     created_at = models.DateTimeField(auto_now_add=True, verbose_name="Oluşturulma Tarihi")
     updated_at = models.DateTimeField(auto_now=True, verbose_name="Güncellenme Tarihi")
 
@@ -122,3 +130,188 @@ class ReturnItem(models.Model):
 
     def __str__(self):
         return f"{self.quantity}x {self.order_item.product_name} - İade #{self.return_request.id}"
+
+
+class OrderStatusEvent(models.Model):
+    """Sipariş ve iade durum geçmişi; toplu geçişlerde bulk_create ile yazılır (orders.transitions)."""
+    KIND_CHOICES = (
+        ('order', 'Sipariş'),
+        ('return', 'İade Talebi'),
+    )
+
+    order = models.ForeignKey(Order, on_delete=models.CASCADE, related_name='status_events', verbose_name="Sipariş")
+    return_request = models.ForeignKey(ReturnRequest, on_delete=models.CASCADE, null=True, blank=True, related_name='status_events', verbose_name="İade Talebi")
+    kind = models.CharField(max_length=10, choices=KIND_CHOICES, default='order', verbose_name="Tür")
+    from_status = models.CharField(max_length=20, verbose_name="Önceki Durum")
+    to_status = models.CharField(max_length=20, verbose_name="Yeni Durum")
+    user = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, blank=True, verbose_name="Kullanıcı")
+    created_at = models.DateTimeField(default=timezone.now, verbose_name="Tarih")
+    # Geçiş anında hesaplanan süreler (rollup'lar yeniden kurulurken de kullanılır)
+    seconds_in_previous = models.PositiveIntegerField(null=True, blank=True, verbose_name="Önceki Durumda Geçen Süre (sn)")
+    seconds_since_placed = models.PositiveIntegerField(null=True, blank=True, verbose_name="Siparişten Beri Geçen Süre (sn)")
+
+    class Meta:
+        verbose_name = "Durum Geçmişi"
+        verbose_name_plural = "Durum Geçmişi"
+        ordering = ['-created_at', '-id']
+        indexes = [
+            models.Index(fields=['to_status', 'created_at'], name='orders_event_status_at'),
+            models.Index(fields=['order', 'created_at'], name='orders_event_order_at'),
+        ]
+
+    def __str__(self):
+        return f"#{self.order_id} {self.from_status} -> {self.to_status}"
+
+
+class OrderStatusRollup(models.Model):
+    """
+    Günlük durum geçişi özeti (orders.rollups). Rapor sayfasının huni ve
+    durumlar arası süre tabloları olay tablosunu taramadan buradan okunur.
+    """
+    day = models.DateField(verbose_name="Gün")
+    from_status = models.CharField(max_length=20, blank=True, verbose_name="Önceki Durum")
+    to_status = models.CharField(max_length=20, verbose_name="Yeni Durum")
+    count = models.PositiveIntegerField(default=0, verbose_name="Geçiş Sayısı")
+    seconds_in_previous = models.BigIntegerField(default=0, verbose_name="Önceki Durumda Geçen Toplam Süre (sn)")
+    seconds_since_placed = models.BigIntegerField(default=0, verbose_name="Siparişten Beri Geçen Toplam Süre (sn)")
+
+    class Meta:
+        verbose_name = "Durum Özeti"
+        verbose_name_plural = "Durum Özetleri"
+        constraints = [
+            models.UniqueConstraint(fields=['day', 'from_status', 'to_status'], name='orders_rollup_day_transition'),
+        ]
+
+    def __str__(self):
+        return f"{self.day} {self.from_status or '-'} -> {self.to_status}: {self.count}"
+
+
+class StockHold(models.Model):
+    """
+    Checkout öncesi kısa süreli stok ayırma (orders.holds). Ayrılan adet ürün
+    stoğundan hemen düşülür; checkout ayrımı siparişe çevirir, süresi dolan
+    ayrımlar süpürücü tarafından stoğa toplu olarak geri verilir.
+    """
+    key = models.CharField(max_length=40, verbose_name="Oturum Anahtarı")
+    product = models.ForeignKey('products.Product', on_delete=models.CASCADE, related_name='stock_holds', verbose_name="Ürün")
+    quantity = models.PositiveSmallIntegerField(default=1, verbose_name="Adet")
+    expires_at = models.DateTimeField(db_index=True, verbose_name="Bitiş")
+
+    class Meta:
+        verbose_name = "Stok Ayırma"
+        verbose_name_plural = "Stok Ayırmaları"
+        constraints = [
+            models.UniqueConstraint(fields=['key', 'product'], name='orders_stockhold_key_product'),
+        ]
+
+    def __str__(self):
+        return f"{self.key[:8]} #{self.product_id} x{self.quantity}"
+
+
+class OrderIntake(models.Model):
+    """
+    Yoğun satışta siparişin ön kaydı (orders.intake). İstek doğrulanıp buraya
+    tek INSERT ile yazılır; siparişe dönüştürme worker'da toplu transaction'larla yapılır.
+    """
+    STATUS_CHOICES = [
+        ('pending', 'Bekliyor'),
+        ('done', 'Tamamlandı'),
+        ('failed', 'Başarısız'),
+    ]
+
+    token = models.UUIDField(default=uuid.uuid4, unique=True, editable=False, verbose_name="Anahtar")
+    tracking_number = models.CharField(max_length=10, unique=True, verbose_name="Takip Numarası")
+    campaign_id = models.PositiveBigIntegerField(verbose_name="Kampanya ID")
+    payload = models.JSONField(verbose_name="Sipariş Verisi")
+    hold_key = models.CharField(max_length=40, blank=True, verbose_name="Stok Ayırma Anahtarı")
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='pending', verbose_name="Durum")
+    order = models.ForeignKey(Order, on_delete=models.SET_NULL, null=True, blank=True, related_name='+', verbose_name="Sipariş")
+    error = models.TextField(blank=True, verbose_name="Hata")
+    created_at = models.DateTimeField(auto_now_add=True, verbose_name="Oluşturulma Tarihi")
+    processed_at = models.DateTimeField(null=True, blank=True, verbose_name="İşlenme Zamanı")
+
+    class Meta:
+        verbose_name = "Sipariş Ön Kaydı"
+        verbose_name_plural = "Sipariş Ön Kayıtları"
+        ordering = ['id']
+        indexes = [
+            models.Index(fields=['status', 'id']),
+        ]
+
+    def __str__(self):
+        return f"#{self.tracking_number} ({self.get_status_display()})"
+
+
+class IdempotencyKey(models.Model):
+    """
+    Checkout formunun ürettiği tekrar anahtarı -> oluşan sipariş (orders.idempotency).
+    Aynı oturumdan aynı anahtarla gelen tekrar istekler transaction çalıştırılmadan ilk
+    sonuca yönlenir.
+    """
+    key = models.CharField(max_length=64, verbose_name="Anahtar")
+    owner = models.CharField(max_length=32, verbose_name="Oturum Özeti")
+    order = models.ForeignKey(Order, on_delete=models.SET_NULL, null=True, blank=True, related_name='+', verbose_name="Sipariş")
+    intake = models.ForeignKey(OrderIntake, on_delete=models.SET_NULL, null=True, blank=True, related_name='+', verbose_name="Ön Kayıt")
+    created_at = models.DateTimeField(default=timezone.now, db_index=True, verbose_name="Oluşturulma Tarihi")
+
+    class Meta:
+        verbose_name = "Tekrar Anahtarı"
+        verbose_name_plural = "Tekrar Anahtarları"
+        constraints = [
+            models.UniqueConstraint(fields=['key', 'owner'], name='orders_idempotency_key_owner'),
+        ]
+
+    def __str__(self):
+        return self.key
+
+
+class BlockedContact(models.Model):
+    """Sipariş veremeyecek telefon veya adres (orders.abuse); checkout'ta veritabanından (digest indeksi) kontrol edilir."""
+    KIND_CHOICES = (
+        ('phone', 'Telefon'),
+        ('address', 'Adres'),
+    )
+
+    kind = models.CharField(max_length=10, choices=KIND_CHOICES, default='phone', verbose_name="Tür")
+    value = models.CharField(max_length=255, verbose_name="Telefon / Adres")
+    neighborhood = models.ForeignKey(Neighborhood, on_delete=models.CASCADE, null=True, blank=True, verbose_name="Mahalle")
+    digest = models.CharField(max_length=16, unique=True, editable=False, verbose_name="Özet")
+    reason = models.CharField(max_length=255, blank=True, verbose_name="Neden")
+    created_at = models.DateTimeField(auto_now_add=True, verbose_name="Oluşturulma Tarihi")
+
+    class Meta:
+        verbose_name = "Engellenen Kişi"
+        verbose_name_plural = "Engel Listesi"
+
+    def __str__(self):
+        return f"{self.get_kind_display()}: {self.value}"
+
+    def compute_digest(self):
+        from .abuse import address_key, phone_key
+        if self.kind == 'phone':
+            self.digest = phone_key(self.value)
+        else:
+            self.digest = address_key(self.neighborhood_id, self.value)
+        return self.digest
+
+    def save(self, *args, **kwargs):
+        self.compute_digest()
+        super().save(*args, **kwargs)
+
+
+class AbuseWindow(models.Model):
+    """
+    Kayan pencere: telefon+kampanya veya mahalle+adres özeti -> son sipariş
+    zamanları (orders.abuse). Satır başına birkaç tamsayı; süresi dolan satırlar
+    toplu silinir.
+    """
+    key = models.CharField(max_length=40, unique=True, verbose_name="Anahtar")
+    stamps = models.JSONField(default=list, verbose_name="Sipariş Zamanları")
+    expires_at = models.DateTimeField(db_index=True, verbose_name="Bitiş")
+
+    class Meta:
+        verbose_name = "Sipariş Penceresi"
+        verbose_name_plural = "Sipariş Pencereleri"
+
+    def __str__(self):
+        return f"{self.key}: {len(self.stamps)}"
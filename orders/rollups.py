@@ -0,0 +1,182 @@
+"""
+Günlük sipariş durum özetleri (huni ve durumlar arası süreler).
+
+Her sipariş durum geçişi ``OrderStatusEvent`` satırı olarak yazılır
+(orders.transitions); aynı işlemde ``status_changed`` sinyali ile gelen satırlar
+gün + (önceki durum, yeni durum) anahtarıyla toplanıp ``OrderStatusRollup``
+tablosuna artımlı eklenir. Rapor sayfası bir dönem için yalnızca bu özet
+satırlarını okur (gün sayısı x geçiş çeşidi kadar satır); olay tablosu taranmaz.
+
+Silinen siparişlerin olayları (CASCADE) özetlerden ``subtract`` ile, silme ile
+aynı transaction'da düşülür. Özetler olay tablosundan her zaman yeniden
+kurulabilir: ``rebuild_status_rollups`` komutu.
+"""
+from collections import defaultdict
+
+from django.db import IntegrityError, transaction
+from django.db.models import Count, F, Sum
+from django.db.models.functions import Coalesce, Greatest, TruncDate
+from django.utils import timezone
+
+from .models import Order, OrderStatusEvent, OrderStatusRollup
+
+# Huni sırası; 'new' sipariş anı ('' -> 'new' geçişi)
+FUNNEL_STATUSES = ('new', 'processing', 'shipped', 'delivered', 'return', 'cancelled')
+
+
+def summarize(events):
+    """{(gün, önceki, yeni): [adet, önceki durumda geçen sn, siparişten beri sn]}"""
+    summary = defaultdict(lambda: [0, 0, 0])
+    for event in events:
+        if event.kind != 'order':
+            continue
+        totals = summary[(timezone.localdate(event.created_at), event.from_status, event.to_status)]
+        totals[0] += 1
+        totals[1] += event.seconds_in_previous or 0
+        totals[2] += event.seconds_since_placed or 0
+    return summary
+
+
+def add(summary):
+    """Özet satırlarını artımlı günceller; satır yoksa oluşturur (anahtar başına 1-2 sorgu)."""
+    for (day, from_status, to_status), (count, in_previous, since_placed) in summary.items():
+        rows = OrderStatusRollup.objects.filter(day=day, from_status=from_status, to_status=to_status)
+        changes = {
+            'count': F('count') + count,
+            'seconds_in_previous': F('seconds_in_previous') + in_previous,
+            'seconds_since_placed': F('seconds_since_placed') + since_placed,
+        }
+        if rows.update(**changes):
+            continue
+        try:
+            with transaction.atomic():
+                OrderStatusRollup.objects.create(
+                    day=day, from_status=from_status, to_status=to_status, count=count,
+                    seconds_in_previous=in_previous, seconds_since_placed=since_placed,
+                )
+        except IntegrityError:
+            # Aynı anda başka bir işlem oluşturdu
+            rows.update(**changes)
+
+
+def on_status_changed(sender, kind, events=(), **kwargs):
+    if kind == 'order' and events:
+        add(summarize(events))
+
+
+def _grouped(events):
+    """Olayların gün + geçiş başına toplamları (tek gruplu sorgu)."""
+    return (
+        events.annotate(day=TruncDate('created_at'))
+        .values('day', 'from_status', 'to_status')
+        .annotate(
+            count=Count('id'),
+            in_previous=Coalesce(Sum('seconds_in_previous'), 0),
+            since_placed=Coalesce(Sum('seconds_since_placed'), 0),
+        )
+        .order_by()
+    )
+
+
+def subtract(orders):
+    """
+    Siparişlerin geçişlerini özetlerden düşer. Siparişler silinmeden önce, silme ile
+    aynı transaction'da çağrılır (olayları silmeyle birlikte gider).
+    """
+    for row in _grouped(OrderStatusEvent.objects.filter(order__in=orders, kind='order')):
+        OrderStatusRollup.objects.filter(
+            day=row['day'], from_status=row['from_status'], to_status=row['to_status'],
+        ).update(
+            count=Greatest(F('count') - row['count'], 0),
+            seconds_in_previous=Greatest(F('seconds_in_previous') - row['in_previous'], 0),
+            seconds_since_placed=Greatest(F('seconds_since_placed') - row['since_placed'], 0),
+        )
+    OrderStatusRollup.objects.filter(count=0).delete()
+
+
+@transaction.atomic
+def rebuild(start=None):
+    """Özetleri olay tablosundan yeniden kurar (start verilirse o günden itibaren)."""
+    events = OrderStatusEvent.objects.filter(kind='order')
+    rollups = OrderStatusRollup.objects.all()
+    if start:
+        events = events.filter(created_at__date__gte=start)
+        rollups = rollups.filter(day__gte=start)
+    rollups.delete()
+
+    created = OrderStatusRollup.objects.bulk_create([
+        OrderStatusRollup(
+            day=row['day'], from_status=row['from_status'], to_status=row['to_status'], count=row['count'],
+            seconds_in_previous=row['in_previous'], seconds_since_placed=row['since_placed'],
+        )
+        for row in _grouped(events)
+    ], batch_size=500)
+    return len(created)
+
+
+def backfill_events(batch_size=1000):
+    """
+    Geçmişi hiç olmayan (bu tablodan önceki) siparişler için yaklaşık geçmiş yazar:
+    sipariş anında '' -> 'new', durum 'new' değilse son güncellemede 'new' -> durum.
+    """
+    orders = Order.objects.filter(status_events__isnull=True).values_list('pk', 'status', 'created_at', 'updated_at')
+    events = []
+    for pk, status, created_at, updated_at in orders.iterator(chunk_size=batch_size):
+        events.append(OrderStatusEvent(
+            order_id=pk, kind='order', from_status='', to_status='new',
+            created_at=created_at, seconds_since_placed=0,
+        ))
+        if status != 'new':
+            seconds = max(0, int((updated_at - created_at).total_seconds()))
+            events.append(OrderStatusEvent(
+                order_id=pk, kind='order', from_status='new', to_status=status, created_at=updated_at,
+                seconds_in_previous=seconds, seconds_since_placed=seconds,
+            ))
+    OrderStatusEvent.objects.bulk_create(events, batch_size=batch_size)
+    return len(events)
+
+
+def period_report(start, end):
+    """
+    Dönem için huni ve geçiş süreleri; yalnızca özet tablosundan iki gruplu sorgu.
+    Süreler saat cinsinden ortalamadır.
+    """
+    rollups = OrderStatusRollup.objects.filter(day__gte=start, day__lte=end)
+
+    reached = {
+        row['to_status']: row
+        for row in rollups.values('to_status').annotate(
+            total=Sum('count'), since_placed=Sum('seconds_since_placed'),
+        ).order_by()
+    }
+    placed = reached.get('new', {}).get('total') or 0
+    funnel = []
+    for status in FUNNEL_STATUSES:
+        row = reached.get(status, {})
+        total = row.get('total') or 0
+        funnel.append({
+            'status': status,
+            'label': dict(Order.STATUS_CHOICES)[status],
+            'count': total,
+            'rate': (total / placed * 100) if placed else 0,
+            'avg_hours_since_placed': (row['since_placed'] / total / 3600) if total and status != 'new' else None,
+        })
+
+    labels = dict(Order.STATUS_CHOICES)
+    transitions = [
+        {
+            'from_label': labels.get(row['from_status'], row['from_status']),
+            'to_label': labels.get(row['to_status'], row['to_status']),
+            'count': row['total'],
+            'avg_hours': row['in_previous'] / row['total'] / 3600 if row['total'] else 0,
+        }
+        for row in rollups.exclude(from_status='').values('from_status', 'to_status').annotate(
+            total=Sum('count'), in_previous=Sum('seconds_in_previous'),
+        ).order_by('-total')
+    ]
+    shipped = reached.get('shipped', {})
+    return {
+        'funnel': funnel,
+        'transitions': transitions,
+        'avg_hours_to_ship': (shipped['since_placed'] / shipped['total'] / 3600) if shipped.get('total') else None,
+    }
@@ -0,0 +1,62 @@
+"""
+Sipariş snapshot'ları.
+
+Sipariş anındaki ürün bilgisi (ad, SKU, açıklama, görsel URL'i, beden) sipariş
+kalemine kopyalanır. Checkout'ta bu veriler tek seferde yüklenen ürün/görsel/beden
+yapısından doldurulur; admin sipariş detayı, yazdırma sayfası ve müşteri modalı
+ise yalnızca bu kolonları okur, canlı ürün ve görsel tablolarına gitmez.
+"""
+from django.db.models import Prefetch
+
+from campaigns.models import SizeOption
+from products.models import Product, ProductImage
+from .models import OrderItem
+
+# Sipariş gösterimlerinin okuduğu kalem kolonları (ürün FK'sı yalnızca id olarak)
+ITEM_SNAPSHOT_FIELDS = (
+    'id', 'order_id', 'product_id', 'quantity',
+    'selected_size', 'selected_size_name', 'selected_size_description',
+    'product_name', 'product_sku', 'product_description', 'product_image_url',
+)
+
+
+class CheckoutSnapshot:
+    """Checkout'ta seçilen ürünler (kilitli, ilk görseliyle) ve bedenler; kalem başına sorgu atılmaz."""
+
+    def __init__(self, product_ids, size_slugs, lock=True):
+        products = Product.objects.filter(id__in=set(product_ids)).prefetch_related(
+            Prefetch('images', queryset=ProductImage.objects.only('id', 'product_id', 'image', 'sort_order'))
+        )
+        if lock:
+            # GÜVENLİK: Race Condition Önleme - satırlar transaction sonuna kadar kilitli
+            products = products.select_for_update()
+        self.products = {product.id: product for product in products}
+        self.sizes = {
+            size.slug: size
+            for size in SizeOption.objects.filter(slug__in=[slug for slug in size_slugs if slug])
+        }
+
+    def product(self, product_id):
+        return self.products[int(product_id)]
+
+    def item_fields(self, product_id, size_slug=None):
+        """Sipariş kalemine yazılacak snapshot alanları."""
+        product = self.product(product_id)
+        images = product.images.all()  # prefetch: sort_order sıralı
+        size = self.sizes.get(size_slug) if size_slug else None
+        size_name = size.name if size else ""
+        return {
+            'product': product,
+            'selected_size': size_name,  # Backward compatibility
+            'selected_size_name': size_name,
+            'selected_size_description': size.description if size else "",
+            'product_name': product.name,
+            'product_sku': product.sku,
+            'product_description': product.description,
+            'product_image_url': images[0].image.url if images else None,
+        }
+
+
+def snapshot_items():
+    """Sipariş kalemlerini yalnızca snapshot kolonlarıyla getiren prefetch."""
+    return Prefetch('items', queryset=OrderItem.objects.only(*ITEM_SNAPSHOT_FIELDS).order_by('id'))
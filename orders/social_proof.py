@@ -0,0 +1,204 @@
+"""
+Sosyal kanıt (son siparişler) widget'ı için önceden hazırlanmış akış.
+
+Son siparişlerden maskelenmiş girdiler cache'te küçük bir halka tampon olarak
+tutulur. Yeni sipariş commit edildiğinde başa eklenir (push), periyodik olarak
+``refresh_social_proof`` komutu ile baştan kurulur (iptal/iade olanlar düşer).
+Poll isteği tek bir cache okuması ve rastgele seçimden ibarettir.
+
+Tamponu yazan push ve refresh, cache.add ile alınan kısa ömürlü bir kilit
+altında çalışır; eşzamanlı push'lar (farklı süreçler dahil) birbirinin girdisini
+ezmez. Kilit zamanında alınamazsa girdi kaybolmasın diye akış veritabanından
+baştan kurulur.
+"""
+import random
+import time
+import uuid
+from contextlib import contextmanager
+from datetime import datetime, timezone as dt_timezone
+
+from asgiref.sync import sync_to_async
+from django.core.cache import cache
+from django.db import transaction
+from django.utils import timezone
+from django.utils.timesince import timesince
+
+from .models import Order
+
+CACHE_KEY = 'social_proof_feed'
+LOCK_KEY = 'social_proof_feed:lock'
+LOCK_TIMEOUT = 5  # saniye; kilidi tutan süreç ölürse kilit kendiliğinden düşer
+LOCK_WAIT = 0.5  # saniye
+FEED_SIZE = 20
+VISIBLE_STATUSES = ('new', 'processing', 'shipped', 'delivered')
+PLACEHOLDER_IMAGE = '/static/images/placeholder.jpg'
+
+
+def mask_name(full_name):
+    """Ayşe Yılmaz -> Ayşe Yı***"""
+    parts = (full_name or '').strip().split()
+    if not parts:
+        return '***'
+
+    if len(parts) >= 2:
+        first_name = parts[0]
+        last_name = parts[-1]
+        if len(last_name) > 2:
+            masked_last = last_name[:2] + "***"
+        else:
+            masked_last = last_name[0] + "***"
+        return f"{first_name} {masked_last}"
+
+    # Single name
+    name = parts[0]
+    if len(name) > 2:
+        return name[:2] + "***"
+    return name + "***"
+
+
+def short_description(description):
+    if not description:
+        return ""
+    if len(description) > 50:
+        return description[:47] + "..."
+    return description
+
+
+def make_entry(order, item=None):
+    """
+    Sipariş (ve ilk kalemi) için maskelenmiş girdi. Kalemin snapshot alanları
+    kullanılır; eski siparişlerde snapshot yoksa ürüne düşülür.
+    """
+    if order.city_fk_id and order.city_fk:
+        location = order.city_fk.name
+    else:
+        location = order.city or "Türkiye"
+
+    product_name = "Ürün"
+    product_image = PLACEHOLDER_IMAGE
+    product_desc = ""
+    if item is not None:
+        product_name = item.product_name or item.product.name
+        product_image = item.product_image_url
+        if not product_image:
+            images = list(item.product.images.all())
+            product_image = images[0].image.url if images else PLACEHOLDER_IMAGE
+        product_desc = short_description(
+            item.product_description if item.product_description is not None else item.product.description
+        )
+
+    return {
+        "name": mask_name(order.customer_name),
+        "location": location,
+        "product_name": product_name,
+        "product_image": product_image,
+        "product_description": product_desc,
+        "created_at": order.created_at.timestamp(),
+    }
+
+
+def build_feed():
+    orders = Order.objects.filter(
+        status__in=VISIBLE_STATUSES
+    ).select_related('city_fk').prefetch_related('items__product__images').order_by('-created_at')[:FEED_SIZE]
+
+    entries = []
+    for order in orders:
+        items = list(order.items.all())
+        entries.append(make_entry(order, items[0] if items else None))
+    return entries
+
+
+@contextmanager
+def _feed_lock():
+    """Tampon kilidini LOCK_WAIT süresince almaya çalışır; alınıp alınmadığını verir."""
+    token = uuid.uuid4().hex
+    deadline = time.monotonic() + LOCK_WAIT
+    acquired = cache.add(LOCK_KEY, token, timeout=LOCK_TIMEOUT)
+    while not acquired and time.monotonic() < deadline:
+        time.sleep(0.01)
+        acquired = cache.add(LOCK_KEY, token, timeout=LOCK_TIMEOUT)
+    try:
+        yield acquired
+    finally:
+        # Süresi dolup başkasına geçmiş kilit silinmez
+        if acquired and cache.get(LOCK_KEY) == token:
+            cache.delete(LOCK_KEY)
+
+
+def refresh():
+    """Akışı veritabanından baştan kurar ve cache'e yazar."""
+    with _feed_lock():
+        entries = build_feed()
+        cache.set(CACHE_KEY, entries, timeout=None)
+    return entries
+
+
+def push(entry):
+    """
+    Yeni girdiyi halka tamponun başına ekler (en eski düşer). Oku-ekle-yaz kilit
+    altında yapılır; kilit alınamazsa ya da tampon yoksa akış veritabanından kurulur
+    (girdinin siparişi commit edilmiş olduğu için akışta yer alır).
+    """
+    with _feed_lock() as locked:
+        entries = cache.get(CACHE_KEY) if locked else None
+        if entries is None:
+            entries = build_feed()
+        else:
+            entries = [entry] + entries[:FEED_SIZE - 1]
+        cache.set(CACHE_KEY, entries, timeout=None)
+
+
+def on_status_changed(sender, kind, to_status, changes, **kwargs):
+    """Toplu durum geçişi akışta görünen siparişleri etkiliyorsa akış commit sonrası yeniden kurulur."""
+    if kind != 'order':
+        return
+    visible = to_status in VISIBLE_STATUSES
+    # Yeni siparişler ('' -> 'new') commit sonrası push ile eklenir
+    if any(status and (status in VISIBLE_STATUSES) != visible for status in changes):
+        transaction.on_commit(refresh, robust=True)
+
+
+def get_feed():
+    entries = cache.get(CACHE_KEY)
+    if entries is None:
+        entries = refresh()
+    return entries
+
+
+def time_ago(created_at, now=None):
+    now = now or timezone.now()
+    created = datetime.fromtimestamp(created_at, tz=dt_timezone.utc)
+    if (now - created).total_seconds() < 300:  # Less than 5 minutes
+        return "Şimdi"
+
+    text = timesince(created, now).split(',')[0]  # "1 minute" or "2 hours"
+    # Translate common time strings if needed (basic mapping)
+    text = text.replace('minutes', 'dakika').replace('minute', 'dakika')
+    text = text.replace('hours', 'saat').replace('hour', 'saat')
+    text = text.replace('days', 'gün').replace('day', 'gün')
+    return f"{text} önce"
+
+
+async def aget_feed():
+    entries = await cache.aget(CACHE_KEY)
+    if entries is None:
+        entries = await sync_to_async(refresh)()
+    return entries
+
+
+def pick(entries):
+    """Poll yanıtı: rastgele bir girdi (time_ago o an hesaplanır) veya None."""
+    if not entries:
+        return None
+    entry = dict(random.choice(entries))
+    entry["time_ago"] = time_ago(entry.pop("created_at"))
+    return entry
+
+
+def random_entry():
+    return pick(get_feed())
+
+
+async def arandom_entry():
+    return pick(await aget_feed())
@@ -1,11 +1,17 @@
-from django.test import TestCase, Client, override_settings
+from django.test import SimpleTestCase, TestCase, Client, override_settings
 from django.urls import reverse
-from .models import Order, OrderItem
+from .models import Order, OrderItem, ReturnRequest
 from campaigns.models import Campaign, SizeOption, CampaignProduct
 from products.models import Product
 from addresses.models import City, District, Neighborhood
 from django.core.cache import cache
 from admin_panel.models import SiteSettings
+from django.core.management import call_command
+from io import StringIO
+from . import counters, social_proof
+from gumbuz_shop import sse
+import asyncio
+import json
 
 class OrderModelTest(TestCase):
     def setUp(self):
@@ -356,3 +362,1412 @@ class OrderSuccessViewTest(TestCase):
         url = reverse('order_success')
         response = self.client.get(url)
         self.assertRedirects(response, reverse('home'), target_status_code=302)
+
+
+class CreateRandomOrdersCommandTest(TestCase):
+    def setUp(self):
+        self.campaign = Campaign.objects.create(
+            title="Test Campaign", slug="test-campaign-4", price=100.00,
+            shipping_price=10, shipping_price_discounted=0, cod_price=10, cod_price_discounted=5
+        )
+        self.size = SizeOption.objects.create(name="M", slug="m", description="Bel: 36cm")
+        self.campaign.available_sizes.add(self.size)
+        for i in range(2):
+            product = Product.objects.create(name=f"P{i}", stock_qty=10, sku=f"GEN-SKU-{i}")
+            CampaignProduct.objects.create(campaign=self.campaign, product=product, sort_order=i)
+        city = City.objects.create(name="Istanbul")
+        district = District.objects.create(name="Kadikoy", city=city)
+        self.neighborhood = Neighborhood.objects.create(name="Caferaga", district=district)
+        # Mevcut sipariş: üretilen id'ler bunun üzerine eklenmeli
+        Order.objects.create(campaign=self.campaign, customer_name="Existing", total_amount=100)
+
+    def test_bulk_generation(self):
+        out = StringIO()
+        call_command('create_random_orders', count=25, batch_size=10, seed=1, days=3, stdout=out)
+
+        generated = Order.objects.exclude(customer_name="Existing")
+        self.assertEqual(generated.count(), 25)
+        self.assertEqual(OrderItem.objects.count(), 50)
+        self.assertIn('Toplam 25 adet', out.getvalue())
+
+        order = generated.first()
+        self.assertEqual(order.campaign_title, "Test Campaign")
+        self.assertEqual(order.neighborhood_fk, self.neighborhood)
+        self.assertEqual(order.total_amount, order.campaign_price + order.cargo_price + order.cod_fee)
+        self.assertEqual(order.created_at, order.updated_at)
+        item = order.items.first()
+        self.assertEqual(item.selected_size_name, "M")
+        self.assertEqual(item.product_sku, item.product.sku)
+
+        # Her siparişin ilk geçmiş satırı ve günlük özetler checkout'taki gibi yazılır
+        from .models import OrderStatusEvent, OrderStatusRollup
+
+        events = OrderStatusEvent.objects.filter(order__in=generated)
+        self.assertEqual(
+            sorted(events.values_list('order_id', 'to_status', 'created_at')),
+            sorted(generated.values_list('id', 'status', 'created_at')),
+        )
+        self.assertFalse(events.exclude(from_status='').exists())
+        self.assertEqual(sum(OrderStatusRollup.objects.filter(from_status='').values_list('count', flat=True)), 25)
+
+        # ORM ile yeni kayıt açılabilmeli (id çakışması olmamalı)
+        Order.objects.create(campaign=self.campaign, customer_name="After", total_amount=100)
+
+    def test_writer_does_not_reserve_ids_ahead(self):
+        from django.utils import timezone
+        from .generators import GenerationOptions, OrderLookup, RowWriter, generate_rows
+
+        lookup = OrderLookup.load()
+        writer = RowWriter()
+        rows = generate_rows(lookup, 0, 60, GenerationOptions(now=timezone.now(), seed=3))
+        # Yazıcı kurulduktan sonra gelen checkout ile id çakışmamalı
+        Order.objects.create(campaign=self.campaign, customer_name="Checkout", total_amount=100)
+        self.assertEqual(writer.write(rows), 60)
+
+        generated = Order.objects.exclude(customer_name__in=["Existing", "Checkout"])
+        self.assertEqual(generated.count(), 60)
+        # Kalemler ve geçmiş satırları doğru siparişe bağlanır (RETURNING sırası)
+        for order in generated.prefetch_related('items', 'status_events'):
+            self.assertEqual(len(order.items.all()), 2)
+            self.assertEqual([e.to_status for e in order.status_events.all()], [order.status])
+
+    def test_same_seed_same_data(self):
+        call_command('create_random_orders', count=5, seed=7, stdout=StringIO())
+        first = list(Order.objects.exclude(customer_name="Existing").order_by('id').values_list('customer_name', 'status'))
+        Order.objects.exclude(customer_name="Existing").delete()
+        call_command('create_random_orders', count=5, seed=7, stdout=StringIO())
+        second = list(Order.objects.exclude(customer_name="Existing").order_by('id').values_list('customer_name', 'status'))
+        self.assertEqual(first, second)
+
+
+class CounterTest(TestCase):
+    def setUp(self):
+        self.client = Client()
+        cache.clear()
+        self.campaign = Campaign.objects.create(
+            title="Test Campaign", slug="test-campaign-5", price=100.00, min_quantity=2,
+            shipping_price=10, shipping_price_discounted=0, cod_price=10, cod_price_discounted=5
+        )
+        self.size = SizeOption.objects.create(name="M", slug="m")
+        self.products = [Product.objects.create(name=f"P{i}", stock_qty=10, sku=f"CNT-SKU-{i}") for i in range(2)]
+        for i, product in enumerate(self.products):
+            CampaignProduct.objects.create(campaign=self.campaign, product=product, sort_order=i)
+        self.city = City.objects.create(name="Istanbul")
+        self.district = District.objects.create(name="Kadikoy", city=self.city)
+        self.neighborhood = Neighborhood.objects.create(name="Caferaga", district=self.district)
+        counters.refresh_all()
+
+    def place_order(self, product_ids):
+        return self.client.post(reverse('create_order'), {
+            'campaign_id': self.campaign.id,
+            'first_name': 'Jane',
+            'last_name': 'Doe',
+            'phone': '5559876543',
+            'city': self.city.id,
+            'district': self.district.id,
+            'neighborhood': self.neighborhood.id,
+            'address_detail': 'Test',
+            'selected_products[]': product_ids,
+            'selected_sizes[]': [self.size.slug] * len(product_ids),
+        })
+
+    def test_order_updates_counters(self):
+        p0, p1 = self.products
+        self.assertEqual(self.place_order([p0.id, p0.id]).status_code, 200)
+        self.assertEqual(self.place_order([p0.id, p1.id]).status_code, 200)
+
+        self.campaign.refresh_from_db()
+        p0.refresh_from_db()
+        p1.refresh_from_db()
+        self.assertEqual(self.campaign.product_count, 2)
+        self.assertEqual(self.campaign.order_count, 2)
+        self.assertEqual(p0.campaign_count, 1)
+        self.assertEqual(p0.sales_count, 3)
+        # Ciro sipariş başına bir kez (fan-out yok): 2 x 105
+        self.assertEqual(p0.revenue, 210)
+        self.assertEqual(p1.revenue, 105)
+
+        # Artımlı güncelleme ile baştan hesaplama aynı sonucu vermeli
+        out = StringIO()
+        call_command('reconcile_counters', stdout=out)
+        self.assertIn('0 kampanya ve 0 ürün', out.getvalue())
+
+    def test_order_pushed_to_social_proof_feed(self):
+        social_proof.refresh()
+        with self.captureOnCommitCallbacks(execute=True):
+            self.place_order([self.products[0].id, self.products[1].id])
+        entries = social_proof.get_feed()
+        self.assertEqual(entries[0]['name'], "Jane Do***")
+        self.assertEqual(entries[0]['product_name'], "P0")
+
+    def test_full_save_keeps_counters(self):
+        product = Product.objects.get(pk=self.products[0].pk)
+        self.place_order([self.products[0].id, self.products[1].id])
+        # Sipariş öncesi yüklenmiş örnek kaydedilince sayaçlar ezilmemeli
+        product.name = "Yeni İsim"
+        product.save()
+        product.refresh_from_db()
+        self.assertEqual(product.sales_count, 1)
+
+    def test_reconcile_fixes_drift(self):
+        Campaign.objects.filter(pk=self.campaign.pk).update(product_count=99)
+        Product.objects.filter(pk=self.products[0].pk).update(revenue=5)
+
+        out = StringIO()
+        call_command('reconcile_counters', '--dry-run', stdout=out)
+        self.assertIn('Sapan kampanya sayacı: 1', out.getvalue())
+        self.campaign.refresh_from_db()
+        self.assertEqual(self.campaign.product_count, 99)
+
+        call_command('reconcile_counters', stdout=StringIO())
+        self.campaign.refresh_from_db()
+        self.assertEqual(self.campaign.product_count, 2)
+        self.assertEqual(Product.objects.get(pk=self.products[0].pk).revenue, 0)
+
+
+class SocialProofFeedTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.campaign = Campaign.objects.create(title="Test Campaign", slug="test-campaign-6", price=100.00)
+        self.product = Product.objects.create(name="Elbise", sku="SP-1", stock_qty=5, description="Açıklama")
+        self.city = City.objects.create(name="Istanbul")
+        order = Order.objects.create(
+            campaign=self.campaign, customer_name="Ayşe Yılmaz", city_fk=self.city, total_amount=100
+        )
+        OrderItem.objects.create(order=order, product=self.product, product_name="Elbise")
+        Order.objects.create(campaign=self.campaign, customer_name="İptal Eden", status='cancelled', total_amount=100)
+
+    def test_mask_name(self):
+        self.assertEqual(social_proof.mask_name("Ayşe Yılmaz"), "Ayşe Yı***")
+        self.assertEqual(social_proof.mask_name("Ali Ak"), "Ali A***")
+        self.assertEqual(social_proof.mask_name("Zeynep"), "Ze***")
+
+    @override_settings(SSE_PATH='/canli/yayin/')
+    def test_widget_uses_configured_stream_path(self):
+        response = self.client.get(reverse('campaign_detail', args=[self.campaign.slug]))
+        self.assertContains(response, "new EventSource('/canli/yayin/')")
+
+    def test_poll_reads_cache_only(self):
+        social_proof.refresh()
+        with self.assertNumQueries(1):  # tek cache okuması
+            response = self.client.get(reverse('social_proof_api'))
+        self.assertEqual(response.status_code, 200)
+        data = response.json()
+        self.assertEqual(data['name'], "Ayşe Yı***")
+        self.assertEqual(data['location'], "Istanbul")
+        self.assertEqual(data['product_name'], "Elbise")
+        self.assertEqual(data['time_ago'], "Şimdi")
+        self.assertIn('max-age=10', response['Cache-Control'])
+
+    def test_refresh_skips_hidden_statuses(self):
+        entries = social_proof.refresh()
+        self.assertEqual([entry['name'] for entry in entries], ["Ayşe Yı***"])
+
+    def test_push_is_bounded(self):
+        social_proof.refresh()
+        for i in range(social_proof.FEED_SIZE + 5):
+            social_proof.push({'name': f'N{i}', 'created_at': 0})
+        entries = social_proof.get_feed()
+        self.assertEqual(len(entries), social_proof.FEED_SIZE)
+        self.assertEqual(entries[0]['name'], f'N{social_proof.FEED_SIZE + 4}')
+
+    @override_settings(CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}})
+    def test_concurrent_pushes_keep_every_entry(self):
+        import threading
+        import time
+        from unittest.mock import patch
+        from django.core.cache.backends.locmem import LocMemCache
+
+        cache.set(social_proof.CACHE_KEY, [], timeout=None)
+        original_get = LocMemCache.get
+
+        def slow_get(self, key, *args, **kwargs):
+            value = original_get(self, key, *args, **kwargs)
+            if key == social_proof.CACHE_KEY:
+                time.sleep(0.005)  # oku-yaz arasını genişletir
+            return value
+
+        with patch.object(LocMemCache, 'get', slow_get):
+            threads = [
+                threading.Thread(target=social_proof.push, args=({'name': f'N{i}', 'created_at': 0},))
+                for i in range(8)
+            ]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+
+        names = {entry['name'] for entry in cache.get(social_proof.CACHE_KEY)}
+        self.assertEqual(names, {f'N{i}' for i in range(8)})
+
+    def test_push_rebuilds_from_database_when_locked(self):
+        from unittest.mock import patch
+
+        cache.set(social_proof.CACHE_KEY, [{'name': 'Eski', 'created_at': 0}], timeout=None)
+        cache.add(social_proof.LOCK_KEY, 'başkası', timeout=social_proof.LOCK_TIMEOUT)
+        with patch.object(social_proof, 'LOCK_WAIT', 0):
+            social_proof.push({'name': 'Yeni', 'created_at': 0})
+        entries = cache.get(social_proof.CACHE_KEY)
+        self.assertEqual([entry['name'] for entry in entries], ["Ayşe Yı***"])
+        self.assertEqual(cache.get(social_proof.LOCK_KEY), 'başkası')
+
+    def test_empty_feed(self):
+        Order.objects.all().delete()
+        self.assertEqual(self.client.get(reverse('social_proof_api')).status_code, 404)
+
+
+class OrderSnapshotTest(TestCase):
+    def setUp(self):
+        from django.contrib.auth.models import User
+        from admin_panel.models import AdminRole, AdminUser, AdminPermission
+        from products.models import ProductImage
+
+        cache.clear()
+        self.campaign = Campaign.objects.create(title="Kampanya", slug="snapshot", price=100, min_quantity=1)
+        self.size = SizeOption.objects.create(name="M", slug="m", description="Orta")
+        self.products = []
+        for i in range(3):
+            product = Product.objects.create(name=f"Ürün {i}", sku=f"SKU-{i}", description=f"Açıklama {i}", stock_qty=5)
+            ProductImage.objects.create(product=product, image=f"products/{i}-b.jpg", sort_order=2)
+            ProductImage.objects.create(product=product, image=f"products/{i}-a.jpg", sort_order=1)
+            CampaignProduct.objects.create(campaign=self.campaign, product=product)
+            self.products.append(product)
+
+        user = User.objects.create_user(username='admin', password='password')
+        role = AdminRole.objects.create(name='admin')
+        AdminUser.objects.create(user=user, role=role)
+        AdminPermission.objects.create(role=role, permission='manage_orders')
+
+    def place(self, products, sizes=None):
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.post(reverse('create_order'), {
+                'campaign_id': self.campaign.id,
+                'first_name': 'Ayşe',
+                'last_name': 'Yılmaz',
+                'phone': '5550000000',
+                'address_detail': 'Adres',
+                'selected_products[]': [p.id for p in products],
+                'selected_sizes[]': sizes or [self.size.slug] * len(products),
+            })
+        self.assertEqual(response.status_code, 200)
+        return Order.objects.latest('id'), len(queries)
+
+    def test_checkout_captures_snapshot_from_preloaded_products(self):
+        order, _ = self.place(self.products[:2])
+        item = order.items.order_by('id').first()
+        self.assertEqual(item.product_name, "Ürün 0")
+        self.assertEqual(item.product_sku, "SKU-0")
+        self.assertEqual(item.product_description, "Açıklama 0")
+        self.assertTrue(item.product_image_url.endswith('0-a.jpg'))
+        self.assertEqual((item.selected_size_name, item.selected_size_description), ("M", "Orta"))
+
+    def test_checkout_queries_do_not_grow_per_item(self):
+        _, one = self.place(self.products[:1])
+        _, three = self.place(self.products)
+        # Kalem başına yalnızca INSERT (ve sayaç güncellemeleri) kalır; ürün/görsel/beden sorgusu tekrar etmez
+        _, repeated = self.place([self.products[0]] * 3)
+        self.assertLess(repeated, three)
+        self.assertLessEqual(three - one, 2 * 4)
+
+    def test_repeated_product_checks_and_decrements_stock_once(self):
+        product = self.products[0]
+        Product.objects.filter(pk=product.pk).update(stock_qty=2)
+        self.place([product, product])
+        product.refresh_from_db()
+        self.assertEqual(product.stock_qty, 0)
+
+        response = self.client.post(reverse('create_order'), {
+            'campaign_id': self.campaign.id, 'first_name': 'A', 'last_name': 'B', 'phone': '1',
+            'address_detail': 'X', 'selected_products[]': [product.id],
+        })
+        self.assertEqual(response.status_code, 400)
+
+    def assert_no_live_product_queries(self, url, method='get', data=None):
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+
+        self.client.login(username='admin', password='password')
+        with CaptureQueriesContext(connection) as queries:
+            response = getattr(self.client, method)(url, data or {})
+        self.assertEqual(response.status_code, 200)
+        tables = ' '.join(query['sql'] for query in queries)
+        self.assertNotIn('products_product', tables)
+        return response
+
+    def test_admin_views_render_snapshot_only(self):
+        order, _ = self.place(self.products[:2])
+        Product.objects.filter(pk=self.products[0].pk).update(name="Yeni Ad", sku="YENI")
+        self.products[0].images.all().delete()
+
+        detail = self.assert_no_live_product_queries(reverse('admin_order_detail', args=[order.id]))
+        self.assertContains(detail, "Ürün 0")
+        self.assertContains(detail, "0-a.jpg")
+        self.assertNotContains(detail, "Yeni Ad")
+
+        printed = self.assert_no_live_product_queries(reverse('admin_order_print'), 'post', {'selected_items': [order.id]})
+        self.assertContains(printed, "SKU-0")
+
+        self.assert_no_live_product_queries(reverse('admin_customer_detail', args=[order.phone]))
+
+    def test_customer_detail_unknown_phone(self):
+        self.client.login(username='admin', password='password')
+        self.assertEqual(self.client.get(reverse('admin_customer_detail', args=['000'])).status_code, 404)
+
+
+class ShippingLabelTest(TestCase):
+    def setUp(self):
+        from django.contrib.auth.models import User
+        from admin_panel.models import AdminRole, AdminUser, AdminPermission
+
+        user = User.objects.create_user(username='admin', password='password')
+        role = AdminRole.objects.create(name='admin')
+        AdminUser.objects.create(user=user, role=role)
+        AdminPermission.objects.create(role=role, permission='manage_orders')
+        self.client.login(username='admin', password='password')
+
+        product = Product.objects.create(name="P", sku="SKU")
+        self.orders = []
+        for i in range(5):
+            order = Order.objects.create(
+                customer_name=f"Müşteri {i}", phone="555", full_address="Adres", city="İstanbul",
+                campaign_title="Kampanya", tracking_number=f"{i:010d}" if i else None,
+            )
+            OrderItem.objects.create(order=order, product=product, product_name=f"Ürün {i}", product_sku=f"SKU-{i}")
+            self.orders.append(order)
+
+    def test_code128_encoding(self):
+        from gumbuz_shop.barcodes import encode, modules
+
+        # Rakamlar C kümesiyle ikişer ikişer; kontrol = (105 + 1*12 + 2*34 + 3*56 + 4*78 + 5*90) % 103
+        self.assertEqual(encode('1234567890'), [105, 12, 34, 56, 78, 90, 85, 106])
+        self.assertEqual(encode('A1')[:3], [104, 33, 17])
+        self.assertEqual(sum(modules('1234567890')), 11 * 7 + 13)
+        with self.assertRaises(ValueError):
+            encode('ş')
+
+    def test_barcode_svg_is_memoized(self):
+        from gumbuz_shop.barcodes import code128_svg
+
+        first = code128_svg('0000000042')
+        hits = code128_svg.cache_info().hits
+        self.assertIs(code128_svg('0000000042'), first)
+        self.assertEqual(code128_svg.cache_info().hits, hits + 1)
+        self.assertTrue(first.startswith('<svg'))
+
+    def test_print_streams_labels_in_chunks(self):
+        from unittest.mock import patch
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+
+        ids = [order.id for order in self.orders]
+        with patch('admin_panel.views.orders.LABEL_CHUNK_SIZE', 2):
+            response = self.client.post(reverse('admin_order_print'), {'selected_items': ids + ['x']})
+            self.assertTrue(response.streaming)
+            with CaptureQueriesContext(connection) as queries:
+                content = b''.join(response.streaming_content).decode()
+
+        # 3 parça x (sipariş + kalem) sorgusu; canlı ürün tablosuna gidilmez
+        self.assertEqual(len(queries), 6)
+        self.assertNotIn('products_product', ' '.join(query['sql'] for query in queries))
+        self.assertIn('Yazdır (5 etiket)', content)
+        self.assertEqual(content.count('class="print-container"'), 5)
+        self.assertIn('0000000004', content)
+        self.assertIn(f'aria-label="{self.orders[0].id}"', content)  # takip numarası yoksa sipariş no
+        self.assertIn('SKU-3', content)
+        self.assertTrue(content.rstrip().endswith('</html>'))
+
+    def test_print_uses_session_selection(self):
+        session = self.client.session
+        session['print_orders'] = [str(self.orders[1].id)]
+        session.save()
+        content = b''.join(self.client.get(reverse('admin_order_print')).streaming_content).decode()
+        self.assertIn('Müşteri 1', content)
+        self.assertNotIn('Müşteri 2', content)
+
+        session['print_orders'] = []
+        session.save()
+        self.assertEqual(self.client.get(reverse('admin_order_print')).status_code, 404)
+
+
+class StatusTransitionTest(TestCase):
+    def setUp(self):
+        from django.contrib.auth.models import User
+        from admin_panel.models import AdminRole, AdminUser, AdminPermission
+
+        cache.clear()
+        self.user = User.objects.create_user(username='admin', password='password')
+        role = AdminRole.objects.create(name='admin')
+        AdminUser.objects.create(user=self.user, role=role)
+        AdminPermission.objects.create(role=role, permission='manage_orders')
+        self.client.login(username='admin', password='password')
+
+    def make_orders(self, count, status='new'):
+        return Order.objects.bulk_create([
+            Order(customer_name=f"Müşteri {i}", phone="555", full_address="Adres", status=status)
+            for i in range(count)
+        ])
+
+    def make_returns(self, count):
+        return ReturnRequest.objects.bulk_create([
+            ReturnRequest(order=order, reason='other', iban='TR00') for order in self.make_orders(count, 'delivered')
+        ])
+
+    def test_plan_separates_invalid_and_unchanged(self):
+        from .transitions import ORDER_TRANSITIONS, plan
+
+        result = plan({1: 'new', 2: 'shipped', 3: 'delivered', 4: 'processing'}, 'shipped', ORDER_TRANSITIONS)
+        self.assertEqual(result.changes, {'new': [1], 'processing': [4]})
+        self.assertEqual(result.unchanged, [2])
+        self.assertEqual(result.invalid, [3])
+        with self.assertRaises(ValueError):
+            plan({}, 'lost', ORDER_TRANSITIONS)
+
+    def test_bulk_order_action_validates_and_audits(self):
+        from .models import OrderStatusEvent
+
+        new_orders = self.make_orders(3)
+        cancelled = self.make_orders(1, 'cancelled')
+        ids = [o.id for o in new_orders + cancelled]
+        response = self.client.post(reverse('admin_order_bulk_action'), {'action': 'shipped', 'selected_items': ids})
+
+        toast = json.loads(response['HX-Trigger'])['showToast']
+        self.assertEqual(toast['type'], 'warning')
+        self.assertIn('3 sipariş durumu güncellendi', toast['message'])
+        self.assertEqual(Order.objects.get(pk=cancelled[0].pk).status, 'cancelled')
+        self.assertEqual(Order.objects.filter(status='shipped').count(), 3)
+        events = OrderStatusEvent.objects.filter(kind='order')
+        self.assertEqual(events.count(), 3)
+        self.assertEqual(set(events.values_list('from_status', 'to_status', 'user')), {('new', 'shipped', self.user.id)})
+
+    def test_single_status_update_rejects_invalid_transition(self):
+        order = self.make_orders(1, 'delivered')[0]
+        url = reverse('admin_order_status', args=[order.pk])
+        self.assertEqual(self.client.post(url, {'status': 'new'}).status_code, 400)
+        self.assertEqual(self.client.post(url, {'status': 'bogus'}).status_code, 400)
+        self.assertEqual(self.client.post(url, {'status': 'return'}).status_code, 200)
+        self.assertEqual(Order.objects.get(pk=order.pk).status, 'return')
+
+    def test_bulk_approve_uses_constant_queries(self):
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+        from .models import OrderStatusEvent
+        from .transitions import transition_returns
+
+        def approve(returns):
+            with CaptureQueriesContext(connection) as queries:
+                result = transition_returns([r.id for r in returns], 'approved', user=self.user)
+            self.assertEqual(result.updated, len(returns))
+            return len(queries)
+
+        small = approve(self.make_returns(5))
+        large = approve(self.make_returns(300))
+        # Kayıt başına sorgu yok; yalnızca geçmiş INSERT'leri veritabanının parametre sınırına göre bölünür
+        fields = [f for f in OrderStatusEvent._meta.concrete_fields if not f.primary_key]
+        batch = min(connection.ops.bulk_batch_size(fields, [None] * 600), 1000)
+        # seçim + 2 UPDATE + giriş zamanları + geçmiş INSERT + günlük özet upsert'ü
+        self.assertLessEqual(small, 12)
+        self.assertLessEqual(large, small - 1 + -(-600 // batch))
+        self.assertEqual(ReturnRequest.objects.filter(status='approved').count(), 305)
+        self.assertEqual(Order.objects.filter(status='return').count(), 305)
+        self.assertEqual(OrderStatusEvent.objects.filter(kind='return').count(), 305)
+        self.assertEqual(OrderStatusEvent.objects.filter(kind='order', to_status='return').count(), 305)
+
+    def test_return_action_keeps_note_and_updates_order(self):
+        ret = self.make_returns(1)[0]
+        self.client.post(reverse('admin_return_action', args=[ret.pk]), {'action': 'approve', 'note': 'Kargo bekleniyor'})
+        ret.refresh_from_db()
+        self.assertEqual((ret.status, ret.admin_note), ('approved', 'Kargo bekleniyor'))
+        self.assertEqual(ret.order.status, 'return')
+
+        ret.status = 'completed'
+        ret.save()
+        self.client.post(reverse('admin_return_action', args=[ret.pk]), {'action': 'reject'})
+        self.assertEqual(ReturnRequest.objects.get(pk=ret.pk).status, 'completed')
+
+    def test_aggregated_event_refreshes_social_proof_once(self):
+        from unittest.mock import patch
+        from .transitions import status_changed, transition_orders
+
+        orders = self.make_orders(3)
+        social_proof.refresh()
+        received = []
+        handler = lambda sender, **kwargs: received.append(kwargs)
+        status_changed.connect(handler)
+        self.addCleanup(status_changed.disconnect, handler)
+
+        with patch.object(social_proof, 'refresh', wraps=social_proof.refresh) as refresh:
+            with self.captureOnCommitCallbacks(execute=True):
+                transition_orders([o.id for o in orders], 'cancelled')
+            self.assertEqual(refresh.call_count, 1)
+        self.assertEqual(len(received), 1)
+        self.assertEqual(received[0]['changes'], {'new': [o.id for o in orders]})
+        self.assertEqual(social_proof.get_feed(), [])
+
+
+class StatusHistoryTest(TestCase):
+    def setUp(self):
+        from datetime import timedelta
+        from django.utils import timezone
+
+        self.placed_at = timezone.now() - timedelta(hours=30)
+        self.orders = Order.objects.bulk_create([
+            Order(customer_name=f"M {i}", phone="555", full_address="Adres") for i in range(4)
+        ])
+        Order.objects.update(created_at=self.placed_at)
+
+    def transition(self, ids, status, hours_after_placed):
+        from datetime import timedelta
+        from unittest.mock import patch
+        from .transitions import transition_orders
+
+        with patch('orders.transitions.timezone.now', return_value=self.placed_at + timedelta(hours=hours_after_placed)):
+            return transition_orders(ids, status)
+
+    def rollup_rows(self):
+        from .models import OrderStatusRollup
+        return sorted(OrderStatusRollup.objects.values_list(
+            'day', 'from_status', 'to_status', 'count', 'seconds_in_previous', 'seconds_since_placed'
+        ))
+
+    def test_checkout_records_placed_event(self):
+        from .models import OrderStatusEvent, OrderStatusRollup
+
+        campaign = Campaign.objects.create(title="K", slug="k", price=100, min_quantity=1)
+        product = Product.objects.create(name="P", stock_qty=5)
+        CampaignProduct.objects.create(campaign=campaign, product=product)
+        self.client.post(reverse('create_order'), {
+            'campaign_id': campaign.id, 'first_name': 'A', 'last_name': 'B', 'phone': '1',
+            'address_detail': 'X', 'selected_products[]': [product.id],
+        })
+        order = Order.objects.latest('id')
+        event = OrderStatusEvent.objects.get(order=order)
+        self.assertEqual((event.from_status, event.to_status, event.seconds_since_placed), ('', 'new', 0))
+        self.assertEqual(OrderStatusRollup.objects.get(from_status='').count, 1)
+
+    def test_durations_and_period_report(self):
+        from datetime import timedelta
+        from django.utils import timezone
+        from . import rollups
+        from .models import OrderStatusEvent
+
+        ids = [o.id for o in self.orders]
+        self.transition(ids[:2], 'processing', 2)
+        self.transition(ids[:2], 'shipped', 6)
+        self.transition(ids[2:3], 'shipped', 12)
+
+        events = OrderStatusEvent.objects.filter(order_id=ids[0]).order_by('created_at')
+        self.assertEqual(
+            [(e.from_status, e.seconds_in_previous, e.seconds_since_placed) for e in events],
+            [('new', 2 * 3600, 2 * 3600), ('processing', 4 * 3600, 6 * 3600)],
+        )
+
+        day = timezone.localdate(self.placed_at)
+        report = rollups.period_report(day, day + timedelta(days=2))
+        funnel = {step['status']: step for step in report['funnel']}
+        self.assertEqual(funnel['processing']['count'], 2)
+        self.assertEqual(funnel['shipped']['count'], 3)
+        self.assertAlmostEqual(report['avg_hours_to_ship'], (6 + 6 + 12) / 3)
+        by_pair = {(t['from_label'], t['to_label']): t for t in report['transitions']}
+        self.assertAlmostEqual(by_pair[('İşleme Alındı', 'Kargolandı')]['avg_hours'], 4)
+        self.assertAlmostEqual(by_pair[('Yeni Sipariş', 'Kargolandı')]['avg_hours'], 12)
+
+    def test_rebuild_matches_incremental_rollups(self):
+        from . import rollups
+
+        ids = [o.id for o in self.orders]
+        self.transition(ids, 'processing', 1)
+        self.transition(ids[:3], 'shipped', 5)
+        self.transition(ids[3:], 'cancelled', 26)
+        incremental = self.rollup_rows()
+
+        out = StringIO()
+        call_command('rebuild_status_rollups', stdout=out)
+        self.assertEqual(self.rollup_rows(), incremental)
+        self.assertIn('özet satırı', out.getvalue())
+        self.assertEqual(rollups.rebuild(), len(incremental))
+
+    def test_bulk_delete_subtracts_from_rollups(self):
+        from datetime import timedelta
+        from django.contrib.auth.models import User
+        from django.utils import timezone
+        from admin_panel.models import AdminRole, AdminUser, AdminPermission
+        from . import rollups
+
+        user = User.objects.create_user(username='admin', password='password')
+        role = AdminRole.objects.create(name='admin')
+        AdminUser.objects.create(user=user, role=role)
+        AdminPermission.objects.create(role=role, permission='manage_orders')
+        self.client.login(username='admin', password='password')
+
+        ids = [o.id for o in self.orders]
+        self.transition(ids, 'processing', 2)
+        self.transition(ids[:2], 'shipped', 6)
+        self.transition(ids[2:3], 'shipped', 12)
+
+        response = self.client.post(reverse('admin_order_bulk_action'), {
+            'action': 'delete', 'selected_items': [ids[0], ids[2]],
+        })
+        self.assertEqual(response.status_code, 200)
+
+        day = timezone.localdate(self.placed_at)
+        report = rollups.period_report(day, day + timedelta(days=2))
+        funnel = {step['status']: step for step in report['funnel']}
+        self.assertEqual(funnel['processing']['count'], 2)
+        self.assertEqual(funnel['shipped']['count'], 1)
+        self.assertAlmostEqual(report['avg_hours_to_ship'], 6)
+        # Silinmeyen siparişlerden yeniden kurulan özetlerle aynı
+        incremental = self.rollup_rows()
+        rollups.rebuild()
+        self.assertEqual(self.rollup_rows(), incremental)
+
+    def test_backfill_legacy_orders(self):
+        from .models import OrderStatusEvent
+
+        Order.objects.filter(pk=self.orders[0].pk).update(status='delivered')
+        call_command('rebuild_status_rollups', '--backfill', stdout=StringIO())
+        self.assertEqual(OrderStatusEvent.objects.filter(from_status='').count(), 4)
+        delivered = OrderStatusEvent.objects.get(to_status='delivered')
+        self.assertEqual((delivered.order_id, delivered.from_status), (self.orders[0].pk, 'new'))
+        # İkinci çalıştırma tekrar satır eklemez
+        call_command('rebuild_status_rollups', '--backfill', stdout=StringIO())
+        self.assertEqual(OrderStatusEvent.objects.count(), 5)
+
+
+class CheckoutConcurrencyTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.campaign = Campaign.objects.create(title="Kampanya", slug="eszamanli", price=100, min_quantity=1)
+        self.product = Product.objects.create(name="Son Ürün", sku="SON-1", stock_qty=1)
+        CampaignProduct.objects.create(campaign=self.campaign, product=self.product)
+
+    def post(self, products):
+        return self.client.post(reverse('create_order'), {
+            'campaign_id': self.campaign.id,
+            'first_name': 'Ayşe',
+            'last_name': 'Yılmaz',
+            'phone': '5550000000',
+            'address_detail': 'Adres',
+            'selected_products[]': [p.id for p in products],
+        })
+
+    def test_conditional_decrement_never_oversells(self):
+        response = self.post([self.product, self.product])
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("stok yetersiz", response.content.decode())
+        self.assertEqual(self.post([self.product]).status_code, 200)
+        self.assertEqual(self.post([self.product]).status_code, 400)
+
+        self.product.refresh_from_db()
+        self.assertEqual(self.product.stock_qty, 0)
+        self.assertEqual(Order.objects.count(), 1)
+
+    def test_stale_snapshot_does_not_decrement(self):
+        from .checkout import OutOfStock, reserve_stock
+        from .snapshots import CheckoutSnapshot
+
+        # Snapshot stok 1 görürken başka bir checkout son ürünü almış
+        snapshot = CheckoutSnapshot([self.product.id], [])
+        Product.objects.filter(pk=self.product.pk).update(stock_qty=0)
+        with self.assertRaises(OutOfStock):
+            reserve_stock(snapshot, [self.product.id])
+        self.product.refresh_from_db()
+        self.assertEqual(self.product.stock_qty, 0)
+
+    def test_lock_error_after_retries_returns_503(self):
+        from unittest.mock import patch
+        from django.db import OperationalError
+
+        with patch('orders.views.place_order', side_effect=OperationalError('database is locked')):
+            response = self.post([self.product])
+        self.assertEqual(response.status_code, 503)
+
+    def test_stress_command_multi_process(self):
+        import subprocess
+        import sys
+        from django.conf import settings
+
+        result = subprocess.run(
+            [sys.executable, 'manage.py', 'checkout_stress', '--processes', '4', '--orders', '15', '--stock', '8'],
+            cwd=settings.BASE_DIR, capture_output=True, text=True, timeout=300,
+        )
+        self.assertEqual(result.returncode, 0, result.stderr)
+        self.assertIn("Eksi stok ve kayıp sipariş yok", result.stdout)
+
+
+class StockHoldTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.campaign = Campaign.objects.create(title="Flaş", slug="flas", price=100, min_quantity=2)
+        self.last = Product.objects.create(name="Son Ürün", sku="SON-1", stock_qty=1)
+        self.other = Product.objects.create(name="Diğer", sku="DGR-1", stock_qty=5)
+        for product in (self.last, self.other):
+            CampaignProduct.objects.create(campaign=self.campaign, product=product)
+
+    def hold(self, client, products):
+        return client.post(reverse('hold_stock'), {
+            'campaign_id': self.campaign.id,
+            'selected_products[]': [p.id for p in products],
+        })
+
+    def order(self, client, products):
+        return client.post(reverse('create_order'), {
+            'campaign_id': self.campaign.id,
+            'first_name': 'Ayşe',
+            'last_name': 'Yılmaz',
+            'phone': '5550000000',
+            'address_detail': 'Adres',
+            'selected_products[]': [p.id for p in products],
+        })
+
+    def stock(self, product):
+        product.refresh_from_db()
+        return product.stock_qty
+
+    def test_hold_takes_stock_and_reports_sold_out(self):
+        from .models import StockHold
+
+        data = self.hold(self.client, [self.last, self.other]).json()
+        self.assertEqual(data['unavailable'], [])
+        self.assertEqual((self.stock(self.last), self.stock(self.other)), (0, 4))
+
+        rival = Client()
+        data = self.hold(rival, [self.last, self.other]).json()
+        self.assertEqual(data['unavailable'], [self.last.id])
+        self.assertEqual(data['held'], {str(self.other.id): 1})
+        self.assertEqual(StockHold.objects.count(), 3)
+
+    def test_changing_selection_releases_dropped_products(self):
+        self.hold(self.client, [self.last, self.other])
+        self.hold(self.client, [self.other, self.other])
+        self.assertEqual((self.stock(self.last), self.stock(self.other)), (1, 3))
+        self.assertEqual(self.hold(self.client, [self.last] * 3).status_code, 400)
+
+    def test_checkout_converts_hold_without_second_decrement(self):
+        from .models import StockHold
+
+        self.hold(self.client, [self.last, self.other])
+        self.assertEqual(self.order(Client(), [self.last, self.other]).status_code, 400)
+        self.assertEqual(self.order(self.client, [self.last, self.other]).status_code, 200)
+        self.assertEqual((self.stock(self.last), self.stock(self.other)), (0, 4))
+        self.assertFalse(StockHold.objects.exists())
+
+    def test_checkout_returns_unused_holds(self):
+        self.hold(self.client, [self.last, self.other])
+        self.assertEqual(self.order(self.client, [self.other, self.other]).status_code, 200)
+        self.assertEqual((self.stock(self.last), self.stock(self.other)), (1, 3))
+
+    def test_holds_of_other_campaigns_are_kept(self):
+        from .models import StockHold
+
+        other_campaign = Campaign.objects.create(title="Diğer", slug="diger", price=100, min_quantity=1)
+        extra = Product.objects.create(name="Ek", sku="EK-1", stock_qty=2)
+        CampaignProduct.objects.create(campaign=other_campaign, product=extra)
+        self.hold(self.client, [self.last])
+        self.client.post(reverse('hold_stock'), {'campaign_id': other_campaign.id, 'selected_products[]': [extra.id]})
+        self.hold(self.client, [self.other])
+        self.assertEqual(
+            set(StockHold.objects.values_list('product_id', flat=True)), {self.other.id, extra.id}
+        )
+        self.assertEqual(self.order(self.client, [self.other, self.other]).status_code, 200)
+        self.assertEqual(list(StockHold.objects.values_list('product_id', flat=True)), [extra.id])
+        self.assertEqual(self.stock(extra), 1)
+
+    @override_settings(STOCK_HOLD_MAX_PER_PRODUCT=1)
+    def test_quantity_per_product_is_capped(self):
+        self.assertEqual(self.hold(self.client, [self.other, self.other]).status_code, 400)
+        self.assertEqual(self.stock(self.other), 5)
+
+    @override_settings(STOCK_HOLD_RATE_FACTOR=1)
+    def test_hold_is_rate_limited(self):
+        settings = SiteSettings.load()
+        settings.rate_limit_count = 2
+        settings.save()
+        self.assertEqual(self.hold(self.client, [self.other]).status_code, 200)
+        self.assertEqual(self.hold(self.client, [self.other]).status_code, 200)
+        self.assertEqual(self.hold(self.client, [self.other]).status_code, 429)
+
+    def test_consume_skips_holds_swept_meanwhile(self):
+        from collections import Counter
+        from datetime import timedelta
+        from django.utils import timezone
+        from . import holds
+
+        holds.hold('oturum', [self.other.id, self.other.id])
+        # Süpürücü ayrımı stoğa verdiyse checkout onu tekrar geri vermez, stoktan düşer
+        holds.sweep(now=timezone.now() + timedelta(hours=1))
+        self.assertEqual(self.stock(self.other), 5)
+        self.assertEqual(holds.consume('oturum', Counter({self.other.id: 2})), {self.other.id: 2})
+        self.assertEqual(self.stock(self.other), 5)
+
+    def test_sweep_reclaims_expired_holds_in_bulk(self):
+        from datetime import timedelta
+        from django.utils import timezone
+        from . import holds
+        from .models import StockHold
+
+        holds.hold('aktif', [self.other.id])
+        products = [Product.objects.create(name=f"Ü{i}", sku=f"U-{i}", stock_qty=3) for i in range(20)]
+        for i, product in enumerate(products):
+            holds.hold(f'oturum-{i}', [product.id] * (1 + i % 2), ttl=-1)
+        self.assertEqual(StockHold.objects.count(), 21)
+
+        # savepoint x2, okuma, silme ve adet başına tek UPDATE (1 ve 2 adet); ayrım sayısından bağımsız
+        with self.assertNumQueries(6):
+            self.assertEqual(holds.sweep(batch_size=100), 20)
+        self.assertTrue(all(self.stock(product) == 3 for product in products))
+        self.assertEqual(list(StockHold.objects.values_list('key', flat=True)), ['aktif'])
+        self.assertEqual(holds.sweep(now=timezone.now() + timedelta(hours=1)), 1)
+        self.assertEqual(self.stock(self.other), 5)
+
+    def test_sweep_command(self):
+        from . import holds
+
+        holds.hold('eski', [self.last.id], ttl=-1)
+        out = StringIO()
+        call_command('sweep_stock_holds', stdout=out)
+        self.assertIn("1 süresi dolan", out.getvalue())
+        self.assertEqual(self.stock(self.last), 1)
+
+
+@override_settings(ORDER_INTAKE_MODE='journal', ORDER_INTAKE_RUNNER='worker')
+class OrderIntakeTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.campaign = Campaign.objects.create(title="Viral", slug="viral", price=100, min_quantity=1)
+        self.city = City.objects.create(name="İzmir")
+        self.product = Product.objects.create(name="Son Ürün", sku="SON-1", stock_qty=1)
+        CampaignProduct.objects.create(campaign=self.campaign, product=self.product)
+
+    def order(self, client, phone='5550000000'):
+        return client.post(reverse('create_order'), {
+            'campaign_id': self.campaign.id,
+            'first_name': 'Ayşe',
+            'last_name': 'Yılmaz',
+            'phone': phone,
+            'city': self.city.id,
+            'address_detail': 'Adres',
+            'selected_products[]': [self.product.id],
+        })
+
+    def test_request_only_appends_to_journal(self):
+        from .models import OrderIntake
+
+        response = self.order(self.client)
+        self.assertEqual(response['HX-Redirect'], '/orders/success/')
+        self.assertFalse(Order.objects.exists())
+        entry = OrderIntake.objects.get()
+        self.assertEqual(entry.status, 'pending')
+        self.assertEqual(entry.payload['city_fk_id'], self.city.id)
+        self.product.refresh_from_db()
+        self.assertEqual(self.product.stock_qty, 1)
+
+        page = self.client.get(reverse('order_success'))
+        self.assertContains(page, entry.tracking_number)
+        self.assertEqual(self.client.get(reverse('order_success'), HTTP_HX_REQUEST='true').status_code, 204)
+
+    def test_tracking_number_skips_numbers_reserved_by_intake(self):
+        from unittest.mock import patch
+        from .checkout import generate_tracking_number
+        from .models import OrderIntake
+
+        OrderIntake.objects.create(tracking_number='1111111111', campaign_id=self.campaign.id, payload={})
+        Order.objects.create(campaign=self.campaign, customer_name='A', phone='5550000000', tracking_number='2222222222')
+        with patch('orders.checkout.random.choices', side_effect=[list('1111111111'), list('2222222222'), list('3333333333')]):
+            self.assertEqual(generate_tracking_number(), '3333333333')
+
+    def test_worker_places_orders_and_reports_failures(self):
+        from . import intake
+        from .models import OrderIntake
+
+        rival = Client()
+        self.order(self.client)
+        self.order(rival)
+        self.assertEqual(intake.drain(), 2)
+
+        order = Order.objects.get()
+        first, second = OrderIntake.objects.order_by('id')
+        self.assertEqual((first.status, first.order_id), ('done', order.id))
+        self.assertEqual(order.tracking_number, first.tracking_number)
+        self.assertEqual(order.city, "İzmir")
+        self.assertEqual(second.status, 'failed')
+        self.assertIn("stok yetersiz", second.error)
+        self.product.refresh_from_db()
+        self.assertEqual(self.product.stock_qty, 0)
+
+        refresh = self.client.get(reverse('order_success'), HTTP_HX_REQUEST='true')
+        self.assertEqual(refresh['HX-Refresh'], 'true')
+        self.assertContains(self.client.get(reverse('order_success')), order.tracking_number)
+        self.assertContains(rival.get(reverse('order_success')), "Oluşturulamadı")
+        self.assertEqual(rival.get(reverse('order_success')).status_code, 302)
+
+    def test_drains_in_batches(self):
+        from . import intake
+
+        Product.objects.filter(pk=self.product.pk).update(stock_qty=10)
+        for i in range(5):
+            self.order(Client(), phone=f'555000000{i}')
+        self.assertEqual(intake.drain(batch_size=2), 5)
+        self.assertEqual(Order.objects.count(), 5)
+        self.assertEqual(intake.drain(), 0)
+
+    @override_settings(ORDER_INTAKE_RUNNER='inline')
+    def test_inline_runner_drains_after_commit(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.order(self.client)
+        self.assertEqual(Order.objects.count(), 1)
+
+
+class IdempotentCheckoutTest(TestCase):
+    KEY = '0b7f3c2e-9a41-4d55-8c1e-2f6a7d9e1b03'
+
+    def setUp(self):
+        cache.clear()
+        self.campaign = Campaign.objects.create(title="Kampanya", slug="tekrar", price=100, min_quantity=1)
+        self.product = Product.objects.create(name="Ürün", sku="TKR-1", stock_qty=3)
+        CampaignProduct.objects.create(campaign=self.campaign, product=self.product)
+
+    def order(self, client=None, key=KEY):
+        return (client or self.client).post(reverse('create_order'), {
+            'campaign_id': self.campaign.id,
+            'first_name': 'Ayşe',
+            'last_name': 'Yılmaz',
+            'phone': '5550000000',
+            'address_detail': 'Adres',
+            'selected_products[]': [self.product.id],
+            'idempotency_key': key,
+        })
+
+    def test_repeat_returns_original_redirect_without_new_order(self):
+        self.assertEqual(self.order().status_code, 200)
+        # Ağ tekrarı / çift tıklama: aynı oturumdan aynı anahtar
+        # aktif kullanıcı sayacı (6) + anahtar okuma + session okuma/kaydı (savepoint dahil); sipariş sorgusu yok
+        with self.assertNumQueries(6 + 1 + 4):
+            response = self.client.post(reverse('create_order'), {'idempotency_key': self.KEY})
+        self.assertEqual(response['HX-Redirect'], '/orders/success/')
+
+        order = Order.objects.get()
+        self.assertContains(self.client.get(reverse('order_success')), order.tracking_number)
+        self.product.refresh_from_db()
+        self.assertEqual(self.product.stock_qty, 2)
+
+    def test_key_from_another_session_is_not_replayed(self):
+        self.order()
+        # Anahtarı bilen başka oturum ilk müşterinin siparişine yönlenmez; kendi siparişi oluşur
+        other = Client()
+        self.assertEqual(self.order(other).status_code, 200)
+        first, second = Order.objects.order_by('id')
+        response = other.get(reverse('order_success'))
+        self.assertContains(response, second.tracking_number)
+        self.assertNotContains(response, first.tracking_number)
+
+    def test_in_flight_duplicate_gets_conflict(self):
+        from . import idempotency
+        from .models import IdempotencyKey
+
+        IdempotencyKey.objects.create(key=self.KEY, owner=idempotency.owner(self.client.session.session_key))
+        self.assertEqual(self.order().status_code, 409)
+        self.assertFalse(Order.objects.exists())
+
+    def test_failed_attempt_releases_key(self):
+        Product.objects.filter(pk=self.product.pk).update(stock_qty=0)
+        self.assertEqual(self.order().status_code, 400)
+        Product.objects.filter(pk=self.product.pk).update(stock_qty=1)
+        self.assertEqual(self.order().status_code, 200)
+        self.assertEqual(Order.objects.count(), 1)
+
+    def test_expired_key_places_new_order(self):
+        from datetime import timedelta
+        from django.utils import timezone
+        from . import idempotency
+        from .models import IdempotencyKey
+
+        self.order()
+        IdempotencyKey.objects.update(created_at=timezone.now() - timedelta(days=2))
+        self.order()
+        self.assertEqual(Order.objects.count(), 2)
+        self.assertEqual(idempotency.purge(), 0)
+
+    def test_invalid_key_is_ignored(self):
+        from .models import IdempotencyKey
+
+        self.order(key='kisa')
+        self.order(key='kisa')
+        self.assertEqual(Order.objects.count(), 2)
+        self.assertFalse(IdempotencyKey.objects.exists())
+
+    @override_settings(ORDER_INTAKE_MODE='journal', ORDER_INTAKE_RUNNER='worker')
+    def test_repeat_in_intake_mode_points_to_same_intake(self):
+        from .models import OrderIntake
+
+        self.order()
+        self.order()
+        entry = OrderIntake.objects.get()
+        self.assertContains(self.client.get(reverse('order_success')), entry.tracking_number)
+
+
+class AddressBackfillTest(TestCase):
+    def setUp(self):
+        from addresses import tree
+
+        self.campaign = Campaign.objects.create(title="Kampanya", slug="adres", price=100)
+        self.istanbul = City.objects.create(name="İstanbul")
+        self.kadikoy = District.objects.create(city=self.istanbul, name="Kadıköy")
+        self.caferaga = Neighborhood.objects.create(district=self.kadikoy, name="Caferağa")
+        self.fenerbahce = Neighborhood.objects.create(district=self.kadikoy, name="Fenerbahçe")
+        tree.clear()
+
+    def legacy(self, city, district, full_address, **fields):
+        return Order.objects.create(
+            campaign=self.campaign, customer_name="Eski", total_amount=100,
+            city=city, district=district, full_address=full_address, **fields
+        )
+
+    def backfill(self, *args, **kwargs):
+        import os
+        import tempfile
+
+        handle, path = tempfile.mkstemp(suffix='.csv')
+        os.close(handle)
+        self.addCleanup(os.remove, path)
+        call_command('backfill_order_addresses', *args, report=path, stdout=StringIO(), **kwargs)
+        with open(path, encoding='utf-8') as report:
+            return report.read()
+
+    def test_exact_folded_and_fuzzy_matches(self):
+        exact = self.legacy("ISTANBUL", "kadıköy", "Caferağa Mah. Moda Cad. No:1")
+        typo = self.legacy("Istambul", "Kadikoi", "fenerbahce mahallesi Kalamış Sk.")
+        partial = self.legacy("İstanbul", "Kadıköy", "Bilinmeyen Mah. 5")
+        unknown = self.legacy("Atlantis", "", "Bir yer")
+
+        report = self.backfill(batch_size=2)
+
+        exact.refresh_from_db()
+        typo.refresh_from_db()
+        partial.refresh_from_db()
+        unknown.refresh_from_db()
+        self.assertEqual(
+            (exact.city_fk, exact.district_fk, exact.neighborhood_fk), (self.istanbul, self.kadikoy, self.caferaga)
+        )
+        self.assertEqual((typo.city_fk, typo.neighborhood_fk), (self.istanbul, self.fenerbahce))
+        self.assertEqual((partial.district_fk, partial.neighborhood_fk), (self.kadikoy, None))
+        self.assertIsNone(unknown.city_fk)
+        self.assertIn(f"{partial.pk},İstanbul,Kadıköy,Bilinmeyen Mah. 5,mahalle", report)
+        self.assertIn(f"{unknown.pk},Atlantis", report)
+        self.assertNotIn(f"\n{exact.pk},", report)
+
+    def test_keeps_existing_keys_and_resumes(self):
+        other = District.objects.create(city=self.istanbul, name="Beşiktaş")
+        linked = self.legacy("İstanbul", "Kadıköy", "Caferağa Mah.", district_fk=other)
+        skipped = self.legacy("İstanbul", "Kadıköy", "Caferağa Mah.")
+
+        self.backfill(after_id=skipped.pk - 1, dry_run=True)
+        skipped.refresh_from_db()
+        self.assertIsNone(skipped.city_fk)
+
+        self.backfill(after_id=linked.pk)
+        linked.refresh_from_db()
+        skipped.refresh_from_db()
+        self.assertIsNone(linked.city_fk)
+        self.assertEqual(skipped.neighborhood_fk, self.caferaga)
+
+        self.backfill()
+        linked.refresh_from_db()
+        self.assertEqual((linked.city_fk, linked.district_fk), (self.istanbul, other))
+
+
+class AbuseDetectorTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        settings = SiteSettings.load()
+        settings.rate_limit_count = 100
+        settings.save()
+        self.campaign = Campaign.objects.create(title="Kampanya", slug="sahte", price=100, min_quantity=1)
+        self.city = City.objects.create(name="Ankara")
+        self.district = District.objects.create(city=self.city, name="Çankaya")
+        self.neighborhood = Neighborhood.objects.create(district=self.district, name="Kızılay")
+        self.product = Product.objects.create(name="Ürün", sku="SHT-1", stock_qty=100)
+        CampaignProduct.objects.create(campaign=self.campaign, product=self.product)
+
+    def order(self, phone='0555 111 22 33', address='Atatürk Cad. No:5'):
+        return self.client.post(reverse('create_order'), {
+            'campaign_id': self.campaign.id,
+            'first_name': 'Ayşe',
+            'last_name': 'Yılmaz',
+            'phone': phone,
+            'city': self.city.id,
+            'district': self.district.id,
+            'neighborhood': self.neighborhood.id,
+            'address_detail': address,
+            'selected_products[]': [self.product.id],
+        })
+
+    def test_normalization(self):
+        from . import abuse
+
+        self.assertEqual(
+            {abuse.normalize_phone(p) for p in ('0555 111 22 33', '+90 (555) 111-2233', '5551112233')},
+            {'5551112233'},
+        )
+        self.assertEqual(abuse.normalize_address('ATATÜRK  Cad.,No:5 '), abuse.normalize_address('atatürk cad no 5'))
+        self.assertEqual(abuse.normalize_address('IŞIK Sok.'), 'ışık sok')
+
+    def test_repeated_phone_is_flagged_then_rejected(self):
+        self.assertEqual(self.order().status_code, 200)
+        self.assertFalse(Order.objects.latest('id').is_suspicious)
+
+        self.order(phone='+90 555 111 2233', address='Başka adres 1')
+        flagged = Order.objects.latest('id')
+        self.assertTrue(flagged.is_suspicious)
+        self.assertIn("Aynı telefondan", flagged.suspicion_reason)
+
+        self.order(address='Başka adres 2')
+        self.order(address='Başka adres 3')
+        response = self.order(address='Başka adres 4')
+        self.assertEqual(response.status_code, 403)
+        self.assertEqual(Order.objects.count(), 4)
+
+    def test_same_address_from_different_phones_is_flagged(self):
+        for i in range(3):
+            self.order(phone=f'555000000{i}', address='atatürk cad no 5' if i else 'ATATÜRK Cad. No:5')
+        flags = list(Order.objects.order_by('id').values_list('is_suspicious', flat=True))
+        self.assertEqual(flags, [False, False, True])
+
+    def test_blocklist_rejects(self):
+        from .models import BlockedContact
+
+        BlockedContact.objects.create(kind='phone', value='+90 555 111 22 33', reason='Sahte')
+        self.assertEqual(self.order().status_code, 403)
+        self.assertFalse(Order.objects.exists())
+
+    def test_admin_action_blocks_order_contacts(self):
+        from django.contrib.admin.sites import site
+        from django.test import RequestFactory
+        from django.contrib.messages.storage.fallback import FallbackStorage
+        from .models import BlockedContact
+
+        self.order()
+        request = RequestFactory().post('/')
+        request.session = {}
+        request._messages = FallbackStorage(request)
+        site._registry[Order].block_contacts(request, Order.objects.all())
+        self.assertEqual(BlockedContact.objects.count(), 2)
+        # Aynı adrese farklı telefonla da sipariş verilemez
+        self.assertEqual(self.order(phone='5559998877').status_code, 403)
+
+    def test_check_does_not_touch_order_table(self):
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+        from . import abuse
+
+        for _ in range(3):
+            self.order()
+        with CaptureQueriesContext(connection) as queries:
+            verdict = abuse.check('5551112233', self.campaign.id, self.neighborhood.id, 'x')
+        self.assertLessEqual(len(queries), 6)
+        self.assertFalse(any('orders_order' in q['sql'] for q in queries.captured_queries))
+        self.assertEqual(verdict.action, 'flag')
+
+    def test_window_expires(self):
+        from datetime import timedelta
+        from django.utils import timezone
+        from . import abuse
+
+        for _ in range(4):
+            self.order()
+        later = timezone.now() + timedelta(hours=1)
+        self.assertEqual(abuse.purge(now=later), 2)
+        self.assertEqual(abuse.check('5551112233', self.campaign.id, now=later).action, 'allow')
+
+    def test_check_is_read_only_and_record_rejudges(self):
+        from django.db import connection, transaction
+        from django.test.utils import CaptureQueriesContext
+        from . import abuse
+        from .models import AbuseWindow
+
+        # Kontrol yazmaz: aynı anda kontrol edilen iki checkout da temiz görünür
+        with CaptureQueriesContext(connection) as queries:
+            first = abuse.check('5551112233', self.campaign.id, self.neighborhood.id, 'x')
+            second = abuse.check('5551112233', self.campaign.id, self.neighborhood.id, 'y')
+        self.assertEqual((first.action, second.action), ('allow', 'allow'))
+        self.assertTrue(all(q['sql'].lstrip().upper().startswith('SELECT') for q in queries.captured_queries))
+        self.assertFalse(AbuseWindow.objects.exists())
+
+        # Kayıt sırasında ikincisi ilkini görür
+        with transaction.atomic():
+            abuse.record(first)
+        with transaction.atomic():
+            abuse.record(second)
+        self.assertEqual((first.action, second.action), ('allow', 'flag'))
+
+        # Eşik kayıt anında aşılırsa reddedilir; geri alınan transaction zaman eklemez
+        third = abuse.check('5551112233', self.campaign.id, self.neighborhood.id, 'z')
+        with self.settings(ABUSE_REJECT_PHONE=2), self.assertRaises(abuse.Rejected):
+            with transaction.atomic():
+                abuse.record(third)
+        self.assertEqual(len(AbuseWindow.objects.get(key__startswith='p:').stamps), 2)
+
+    def test_rejected_at_record_rolls_back_order(self):
+        from . import abuse, checkout
+
+        with self.settings(ABUSE_REJECT_PHONE=1):
+            verdict = abuse.check('5551112233', self.campaign.id, self.neighborhood.id, 'x')
+            self.order()
+            with self.assertRaises(abuse.Rejected):
+                checkout.place_order(self.campaign, [self.product.id], [], verdict=verdict, customer_name='A', phone='5551112233')
+        self.assertEqual(Order.objects.count(), 1)
+
+    def test_failed_order_does_not_count(self):
+        self.product.stock_qty = 0
+        self.product.save()
+        self.assertEqual(self.order().status_code, 400)
+        self.product.stock_qty = 10
+        self.product.save()
+        self.order()
+        self.assertFalse(Order.objects.get().is_suspicious)
+
+
+class RetryOnLockTest(SimpleTestCase):
+    def flaky(self, failures, message='database is locked'):
+        from django.db import OperationalError
+        from gumbuz_shop.db import retry_on_lock
+
+        calls = []
+
+        @retry_on_lock(attempts=3, base_delay=0)
+        def write():
+            calls.append(1)
+            if len(calls) <= failures:
+                raise OperationalError(message)
+            return 'ok'
+
+        return write, calls
+
+    def test_retries_lock_errors(self):
+        write, calls = self.flaky(2)
+        self.assertEqual(write(), 'ok')
+        self.assertEqual(len(calls), 3)
+
+    def test_gives_up_after_attempts(self):
+        from django.db import OperationalError
+
+        write, calls = self.flaky(10)
+        with self.assertRaises(OperationalError):
+            write()
+        self.assertEqual(len(calls), 4)
+
+    def test_other_errors_are_not_retried(self):
+        from django.db import OperationalError
+
+        write, calls = self.flaky(1, 'no such table: x')
+        with self.assertRaises(OperationalError):
+            write()
+        self.assertEqual(len(calls), 1)
+
+
+class FakeBroadcaster(sse.Broadcaster):
+    """Cache yerine bellekteki durumu okur (testte DB'ye başka thread'den gidilmez)."""
+
+    def __init__(self, entries, visitors):
+        super().__init__(interval=0.01)
+        self.state = (entries, visitors)
+
+    def read_state(self):
+        return self.state
+
+
+@override_settings(SSE_HEARTBEAT=0.05)
+class SSEStreamTest(SimpleTestCase):
+    def test_update_publishes_only_changes(self):
+        async def scenario():
+            broadcaster = FakeBroadcaster([{'name': 'A', 'created_at': 1}], 3)
+            queue = await broadcaster.subscribe()
+            broadcaster.update([{'name': 'B', 'created_at': 2}, {'name': 'A', 'created_at': 1}], 3)
+            broadcaster.update([{'name': 'B', 'created_at': 2}, {'name': 'A', 'created_at': 1}], 4)
+            messages = [queue.get_nowait() for _ in range(queue.qsize())]
+            broadcaster.unsubscribe(queue)
+            return messages
+
+        messages = asyncio.run(scenario())
+        self.assertEqual(len(messages), 2)
+        self.assertTrue(messages[0].startswith(b'event: social_proof\n'))
+        self.assertIn(b'"name":"B"', messages[0])
+        self.assertEqual(messages[1], b'event: visitors\ndata: {"count":4}\n\n')
+
+    def test_slow_client_drops_oldest(self):
+        async def scenario():
+            broadcaster = FakeBroadcaster([], 0)
+            broadcaster.queue_size = 2
+            queue = await broadcaster.subscribe()
+            for count in (1, 2, 3):
+                broadcaster.publish('visitors', {'count': count})
+            messages = [queue.get_nowait() for _ in range(queue.qsize())]
+            broadcaster.unsubscribe(queue)
+            return messages
+
+        messages = asyncio.run(scenario())
+        self.assertEqual(len(messages), 2)
+        self.assertIn(b'"count":2', messages[0])
+
+    def call(self, method, broadcaster):
+        sent = []
+
+        async def receive():
+            return {'type': 'http.disconnect'}
+
+        async def send(message):
+            sent.append(message)
+
+        scope = {'type': 'http', 'method': method, 'path': '/orders/stream/'}
+        asyncio.run(asyncio.wait_for(sse.sse_application(scope, receive, send, broadcaster=broadcaster), timeout=5))
+        return sent
+
+    def test_head_returns_headers_without_streaming(self):
+        broadcaster = FakeBroadcaster([], 0)
+        sent = self.call('HEAD', broadcaster)
+        self.assertEqual(sent[0]['status'], 200)
+        self.assertIn((b'content-type', b'text/event-stream; charset=utf-8'), sent[0]['headers'])
+        self.assertEqual(sent[1], {'type': 'http.response.body', 'body': b''})
+        self.assertEqual(len(sent), 2)
+        self.assertIsNone(broadcaster.task)
+
+    def test_other_methods_not_allowed(self):
+        sent = self.call('POST', FakeBroadcaster([], 0))
+        self.assertEqual(sent[0]['status'], 405)
+        self.assertIn((b'allow', b'GET, HEAD'), sent[0]['headers'])
+
+    def test_stream_sends_snapshot_events_and_heartbeat(self):
+        async def scenario():
+            broadcaster = FakeBroadcaster([{'name': 'A', 'created_at': 1}], 5)
+            sent = []
+            disconnected = asyncio.Event()
+
+            async def receive():
+                await disconnected.wait()
+                return {'type': 'http.disconnect'}
+
+            async def send(message):
+                sent.append(message)
+                if len(sent) == 2:
+                    broadcaster.state = ([{'name': 'B', 'created_at': 2}, {'name': 'A', 'created_at': 1}], 5)
+                body = message.get('body', b'')
+                if body.startswith(b': ping'):
+                    disconnected.set()
+
+            scope = {'type': 'http', 'method': 'GET', 'path': '/orders/stream/'}
+            await asyncio.wait_for(sse.sse_application(scope, receive, send, broadcaster=broadcaster), timeout=5)
+            return broadcaster, sent
+
+        broadcaster, sent = asyncio.run(scenario())
+        self.assertEqual(sent[0]['status'], 200)
+        self.assertIn((b'content-type', b'text/event-stream; charset=utf-8'), sent[0]['headers'])
+        snapshot = sent[1]['body'].split(b'event: snapshot\ndata: ')[1]
+        self.assertEqual(json.loads(snapshot), {'entries': [{'name': 'A', 'created_at': 1}], 'visitors': 5})
+        bodies = b''.join(message.get('body', b'') for message in sent[2:])
+        self.assertIn(b'event: social_proof\ndata: {"name":"B","created_at":2}', bodies)
+        self.assertIn(b': ping', bodies)
+        # Son istemci ayrılınca üretici durur
+        self.assertEqual(broadcaster.subscribers, set())
+        self.assertIsNone(broadcaster.task)
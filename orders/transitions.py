@@ -0,0 +1,212 @@
+"""
+Sipariş ve iade durum geçişleri.
+
+Admin'deki tekli ve toplu durum değişiklikleri buradan geçer. Seçilen kayıtların
+mevcut durumları tek sorguda okunur ve izin verilmeyen geçişler ayıklanır. Geçerli
+olanlar, hedef durum başına tek bir ``UPDATE`` ile güncellenir ve geçmiş satırları
+``bulk_create`` ile yazılır. İşlemin sonunda bağımlı özetler (sosyal kanıt akışı,
+raporlar) kayıt başına değil, toplu tek bir ``status_changed`` sinyaliyle
+bilgilendirilir. Böylece 5.000 iadeyi onaylamak da birkaç sorguda biter.
+
+Geçmiş satırı, siparişin önceki durumda ve sipariş anından beri geçirdiği süreyi
+de taşır; günlük huni/süre özetleri (orders.rollups) bu satırlardan beslenir.
+"""
+from collections import defaultdict
+from dataclasses import dataclass, field
+
+from django.db import transaction
+from django.db.models import Max
+from django.dispatch import Signal
+from django.utils import timezone
+
+from .models import Order, OrderStatusEvent, ReturnRequest
+
+# Gönderilen argümanlar: kind ('order' | 'return'), to_status, changes ({önceki durum: [id, ...]}),
+# events (yazılan OrderStatusEvent nesneleri). Yeni sipariş için önceki durum ''.
+status_changed = Signal()
+
+ORDER_TRANSITIONS = {
+    'new': {'processing', 'shipped', 'cancelled'},
+    'processing': {'new', 'shipped', 'cancelled'},
+    'shipped': {'processing', 'delivered', 'cancelled', 'return'},
+    'delivered': {'return'},
+    'cancelled': {'new'},
+    'return': {'delivered', 'cancelled'},
+}
+
+RETURN_TRANSITIONS = {
+    'pending': {'approved', 'rejected'},
+    'approved': {'completed', 'rejected'},
+    'rejected': {'pending', 'approved'},
+    'completed': set(),
+}
+
+EVENT_BATCH_SIZE = 1000
+
+
+@dataclass
+class TransitionResult:
+    to_status: str
+    changes: dict = field(default_factory=dict)  # önceki durum -> [id]
+    unchanged: list = field(default_factory=list)  # zaten hedef durumda
+    invalid: list = field(default_factory=list)  # izin verilmeyen geçiş
+
+    @property
+    def updated(self):
+        return sum(len(ids) for ids in self.changes.values())
+
+    @property
+    def updated_ids(self):
+        return [pk for ids in self.changes.values() for pk in ids]
+
+    def message(self, noun):
+        text = f'{self.updated} {noun} güncellendi'
+        if self.invalid:
+            text += f', {len(self.invalid)} kayıt bu duruma geçirilemez'
+        return text
+
+
+def plan(current, to_status, transitions):
+    """current: {id: mevcut durum}. Hangi kaydın geçeceğini hesaplar (veritabanına gitmez)."""
+    if to_status not in transitions:
+        raise ValueError(f'Geçersiz durum: {to_status}')
+    result = TransitionResult(to_status)
+    changes = defaultdict(list)
+    for pk, status in sorted(current.items()):
+        if status == to_status:
+            result.unchanged.append(pk)
+        elif to_status in transitions.get(status, ()):
+            changes[status].append(pk)
+        else:
+            result.invalid.append(pk)
+    result.changes = dict(changes)
+    return result
+
+
+def _apply(model, result, transitions, now, extra=None):
+    """Geçerli kayıtları tek UPDATE ile taşır; WHERE'deki durum koşulu eşzamanlı değişikliğe karşı korur."""
+    if not result.changes:
+        return 0
+    sources = [status for status, allowed in transitions.items() if result.to_status in allowed]
+    return model.objects.filter(pk__in=result.updated_ids, status__in=sources).update(
+        status=result.to_status, updated_at=now, **(extra or {})
+    )
+
+
+def _notify(kind, result, events):
+    if result.changes:
+        status_changed.send(
+            sender=TransitionResult, kind=kind, to_status=result.to_status,
+            changes=result.changes, events=events,
+        )
+
+
+def _ids(ids):
+    return {int(pk) for pk in ids if str(pk).isdigit()}
+
+
+def _seconds(start, end):
+    return max(0, int((end - start).total_seconds())) if start else None
+
+
+def _entered_at(order_ids):
+    """Siparişlerin mevcut durumlarına giriş zamanı (son geçmiş satırı)."""
+    return dict(
+        OrderStatusEvent.objects.filter(order_id__in=order_ids, kind='order')
+        .values('order_id').annotate(at=Max('created_at')).values_list('order_id', 'at')
+    )
+
+
+def _order_events(result, placed_at, user, now):
+    """result.changes için sipariş geçmiş satırları; geçmişi olmayan (eski) siparişte sipariş anı esas alınır."""
+    entered = _entered_at(result.updated_ids)
+    return [
+        OrderStatusEvent(
+            order_id=pk, kind='order', from_status=status, to_status=result.to_status, user=user,
+            created_at=now,
+            seconds_in_previous=_seconds(entered.get(pk) or placed_at[pk], now),
+            seconds_since_placed=_seconds(placed_at[pk], now),
+        )
+        for status, pks in result.changes.items() for pk in pks
+    ]
+
+
+@transaction.atomic
+def transition_orders(ids, to_status, user=None):
+    """Siparişleri to_status'a geçirir; TransitionResult döndürür."""
+    rows = Order.objects.filter(pk__in=_ids(ids)).values_list('pk', 'status', 'created_at')
+    result = plan({pk: status for pk, status, _ in rows}, to_status, ORDER_TRANSITIONS)
+    now = timezone.now()
+    events = _order_events(result, {pk: created_at for pk, _, created_at in rows}, user, now)
+    _apply(Order, result, ORDER_TRANSITIONS, now)
+    OrderStatusEvent.objects.bulk_create(events, batch_size=EVENT_BATCH_SIZE)
+    _notify('order', result, events)
+    return result
+
+
+@transaction.atomic
+def transition_returns(ids, to_status, user=None, note=None):
+    """
+    İade taleplerini to_status'a geçirir. Onaylanan taleplerin siparişleri de
+    'return' durumuna alınır (sipariş geçiş kuralından bağımsız, iade onayı
+    siparişi her durumda iadeye çeker).
+    """
+    rows = ReturnRequest.objects.filter(pk__in=_ids(ids)).values_list(
+        'pk', 'status', 'order_id', 'order__status', 'order__created_at'
+    )
+    current = {pk: status for pk, status, *_ in rows}
+    orders = {pk: (order_id, order_status) for pk, _, order_id, order_status, _ in rows}
+    placed_at = {order_id: created_at for _, _, order_id, _, created_at in rows}
+
+    result = plan(current, to_status, RETURN_TRANSITIONS)
+    now = timezone.now()
+    _apply(ReturnRequest, result, RETURN_TRANSITIONS, now, {'admin_note': note} if note is not None else None)
+    return_events = [
+        OrderStatusEvent(
+            order_id=orders[pk][0], return_request_id=pk, kind='return',
+            from_status=status, to_status=to_status, user=user, created_at=now,
+        )
+        for status, pks in result.changes.items() for pk in pks
+    ]
+
+    order_result, order_events = None, []
+    if to_status == 'approved':
+        order_changes = defaultdict(list)
+        seen = set()
+        for pk in result.updated_ids:
+            order_id, order_status = orders[pk]
+            if order_status != 'return' and order_id not in seen:
+                seen.add(order_id)
+                order_changes[order_status].append(order_id)
+        order_result = TransitionResult('return', dict(order_changes))
+        if order_result.changes:
+            order_events = _order_events(order_result, placed_at, user, now)
+            Order.objects.filter(pk__in=order_result.updated_ids).update(status='return', updated_at=now)
+
+    OrderStatusEvent.objects.bulk_create(return_events + order_events, batch_size=EVENT_BATCH_SIZE)
+    _notify('return', result, return_events)
+    if order_result is not None:
+        _notify('order', order_result, order_events)
+    return result
+
+
+def record_placed(order):
+    """Yeni siparişin ilk geçmiş satırı ('' -> 'new'); checkout transaction'ı içinde çağrılır."""
+    event = OrderStatusEvent.objects.create(
+        order=order, kind='order', from_status='', to_status=order.status,
+        created_at=order.created_at, seconds_since_placed=0,
+    )
+    _notify('order', TransitionResult(order.status, {'': [order.pk]}), [event])
+    return event
+
+
+def record_change(order, from_status, user=None):
+    """Geçiş servisi dışında (Django admin formu) kaydedilmiş durum değişikliğini geçmişe yazar."""
+    if from_status == order.status:
+        return None
+    now = timezone.now()
+    result = TransitionResult(order.status, {from_status: [order.pk]})
+    events = _order_events(result, {order.pk: order.created_at}, user, now)
+    OrderStatusEvent.objects.bulk_create(events)
+    _notify('order', result, events)
+    return events[0]
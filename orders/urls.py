@@ -3,6 +3,7 @@ from . import views
 
 urlpatterns = [
     path('create/', views.create_order, name='create_order'),
+    path('hold/', views.hold_stock, name='hold_stock'),
     path('success/', views.order_success, name='order_success'),
     path('api/social-proof/', views.social_proof_api, name='social_proof_api'),
 ]
@@ -1,31 +1,33 @@
 from django.shortcuts import render, redirect, get_object_or_404
-from django.http import HttpResponse, JsonResponse
-from .models import Order, OrderItem, ReturnRequest, ReturnItem
-from campaigns.models import Campaign, SizeOption, CampaignProduct
-from products.models import Product
-from addresses.models import City, District, Neighborhood
+from django.http import Http404, HttpResponse, JsonResponse
+from .models import Order, OrderIntake, OrderItem, ReturnRequest, ReturnItem
+from . import abuse, holds, idempotency, intake, social_proof
+from .checkout import place_order
+from campaigns.models import Campaign, CampaignProduct
+from addresses.tree import AddressMismatch, UnknownAddress, get_tree
 from django.views.decorators.http import require_POST
 import json
-import random
-import string
 from django.utils import timezone
-from django.utils.timesince import timesince
-from django.db import transaction
-from django.db.models import F
 from django.core.cache import cache
+from django.db import OperationalError
+from django.utils.cache import patch_cache_control
+from django.conf import settings as django_settings
 from admin_panel.models import SiteSettings
+from gumbuz_shop.db import is_lock_error
 
-@require_POST
-def create_order(request):
-    # GÜVENLİK: Rate Limiting (Spam Koruması)
+def _rate_limited(request, scope, factor=1):
+    """
+    IP başına SiteSettings'teki sürede en fazla rate_limit_count x factor istek;
+    aşıldıysa 429 yanıtı, değilse None döner. scope sayaçları ayırır.
+    """
     # Ayarları veritabanından çek
     settings = SiteSettings.load()
-    limit_count = settings.rate_limit_count
+    limit_count = settings.rate_limit_count * factor
     limit_period = settings.rate_limit_period
 
-    # Her IP için belirlenen sürede maksimum X sipariş
+    # Her IP için belirlenen sürede maksimum X istek
     ip_address = request.META.get('REMOTE_ADDR')
-    cache_key = f"rate_limit_order_{ip_address}"
+    cache_key = f"rate_limit_{scope}_{ip_address}"
     request_count = cache.get(cache_key, 0)
 
     if request_count >= limit_count:
@@ -41,6 +43,20 @@ def create_order(request):
         cache.set(cache_key, 1, timeout=limit_period)
     else:
         cache.incr(cache_key)
+    return None
+
+@require_POST
+def create_order(request):
+    # Çift tıklama / ağ tekrarı: aynı tekrar anahtarı daha önce siparişe dönüştüyse doğrudan yönlendir
+    idempotency_key = idempotency.clean_key(request.POST.get('idempotency_key'))
+    previous = idempotency.lookup(idempotency_key, request.session.session_key)
+    if previous:
+        return _replay(request, previous)
+
+    # GÜVENLİK: Rate Limiting (Spam Koruması)
+    limited = _rate_limited(request, 'order')
+    if limited:
+        return limited
 
     # Form verilerini al
     campaign_id = request.POST.get('campaign_id')
@@ -57,10 +73,13 @@ def create_order(request):
     neighborhood_id = request.POST.get('neighborhood')
     address_detail = request.POST.get('address_detail')
     
-    # Adres modellerini çek
-    city_obj = get_object_or_404(City, id=city_id) if city_id else None
-    district_obj = get_object_or_404(District, id=district_id) if district_id else None
-    neighborhood_obj = get_object_or_404(Neighborhood, id=neighborhood_id) if neighborhood_id else None
+    # Adres süreç içi ağaçtan çözülür (sorgusuz); mahalle ilçeye, ilçe ile ait olmalı
+    try:
+        city_obj, district_obj, neighborhood_obj = get_tree().resolve(city_id, district_id, neighborhood_id)
+    except UnknownAddress:
+        raise Http404("Adres bulunamadı.")
+    except AddressMismatch as exc:
+        return HttpResponse(str(exc), status=400)
     
     # Tam adresi oluştur
     neighborhood_name = neighborhood_obj.name if neighborhood_obj else ""
@@ -94,101 +113,165 @@ def create_order(request):
     if not selected_ids_int.issubset(valid_product_ids):
         return HttpResponse("Güvenlik Hatası: Seçilen ürünlerden bazıları bu kampanyaya ait değil.", status=400)
 
-    # 10 haneli unique tracking number oluştur
-    def generate_tracking_number():
-        while True:
-            tracking = ''.join(random.choices(string.digits, k=10))
-            if not Order.objects.filter(tracking_number=tracking).exists():
-                return tracking
-    
-    tracking_number = generate_tracking_number()
+    order_fields = {
+        'customer_name': customer_name,
+        'phone': phone,
+        # ForeignKey ilişkileri (ağaç düğümlerinin id'leri)
+        'city_fk_id': city_obj.id if city_obj else None,
+        'district_fk_id': district_obj.id if district_obj else None,
+        'neighborhood_fk_id': neighborhood_obj.id if neighborhood_obj else None,
+        # Text field'lar (backward compatibility)
+        'city': city_obj.name if city_obj else "",
+        'district': district_obj.name if district_obj else "",
+        'full_address': full_address,
+        'hold_key': request.session.session_key,
+    }
 
-    # Siparişi oluştur (Transaction Atomic ile)
-    try:
-        with transaction.atomic():
-            # Siparişi oluştur
-            order = Order.objects.create(
-                campaign=campaign,
-                # Snapshot Data
-                campaign_title=campaign.title,
-                campaign_slug=campaign.slug,
-                campaign_image_url=campaign.banner_image.url if campaign.banner_image else None,
-                
-                customer_name=customer_name,
-                phone=phone,
-                tracking_number=tracking_number,  # Yeni eklenen alan
-                # ForeignKey ilişkileri
-                city_fk=city_obj,
-                district_fk=district_obj,
-                neighborhood_fk=neighborhood_obj,
-                # Text field'lar (backward compatibility)
-                city=city_obj.name if city_obj else "",
-                district=district_obj.name if district_obj else "",
-                full_address=full_address,
-                campaign_price=campaign.price,
-                cargo_price=campaign.shipping_price_discounted,  # İndirimli fiyat kullan
-                cod_fee=campaign.cod_price_discounted,  # İndirimli fiyat kullan
-                total_amount=campaign.price + campaign.shipping_price_discounted + campaign.cod_price_discounted  # Doğru hesaplama
-            )
-            
-            # Sipariş kalemlerini ekle
-            for i, product_id in enumerate(selected_product_ids):
-                # GÜVENLİK: Race Condition Önleme
-                # select_for_update() ile satırı kilitle
-                product = Product.objects.select_for_update().get(id=product_id)
-                
-                # Stok kontrolü (Tekrar)
-                if product.stock_qty < 1:
-                    raise ValueError(f"{product.name} için stok yetersiz.")
+    # Tekrar/sahte sipariş tespiti: kayan pencereler ve engel listesi (Order tablosuna gitmez).
+    # Kontrol yalnızca okur; kabul edilen checkout siparişin (ya da ön kaydın) transaction'ında
+    # pencereye yazılır, sipariş oluşmazsa kayıt da geri alınır.
+    verdict = abuse.check(phone, campaign.id, neighborhood_obj.id if neighborhood_obj else None, full_address)
+    if verdict.rejected:
+        return _rejected()
 
-                size_slug = selected_sizes[i] if i < len(selected_sizes) else None
-                
-                # Beden ismini ve açıklamasını bul (slug'dan)
-                size_name = ""
-                size_description = ""
-                if size_slug:
-                    size_obj = SizeOption.objects.filter(slug=size_slug).first()
-                    if size_obj:
-                        size_name = size_obj.name
-                        size_description = size_obj.description
-
-                OrderItem.objects.create(
-                    order=order,
-                    product=product,
-                    quantity=1,
-                    selected_size=size_name,  # Backward compatibility
-                    selected_size_name=size_name,
-                    selected_size_description=size_description,
-                    # Snapshot Data
-                    product_name=product.name,
-                    product_sku=product.sku,
-                    product_description=product.description,
-                    product_image_url=product.images.first().image.url if product.images.exists() else None
-                )
-                
-                # Stok düşme işlemi (Atomic Update)
-                product.stock_qty = F('stock_qty') - 1
-                product.save(update_fields=['stock_qty'])
-                
-    except ValueError as e:
-        return HttpResponse(str(e), status=400)
+    # Tekrar anahtarı bu istek adına alınır; aynı anda gelen kopya ilk isteğin sonucuna yönlenir
+    record = None
+    if idempotency_key:
+        if not request.session.session_key:
+            # Anahtar oturuma bağlanır; ilk istekte session hemen oluşturulur
+            request.session.save()
+        record, claimed = idempotency.claim(idempotency_key, request.session.session_key)
+        if not claimed:
+            return _replay(request, record)
+
+    # Yoğun satış modu: ön kayda yaz, siparişi worker oluşturur (orders.intake)
+    if intake.enabled():
+        try:
+            entry = intake.submit(campaign, selected_product_ids, selected_sizes, verdict=verdict, **order_fields)
+        except Exception as e:
+            if record:
+                idempotency.release(record)
+            if isinstance(e, abuse.Rejected):
+                return _rejected()
+            raise
+        if record:
+            idempotency.complete(record, intake=entry)
+        return _redirect_to_success(request, intake_token=entry.token)
+
+    # Siparişi oluştur (tek transaction, kilit çakışmasında yeniden denenir)
+    try:
+        order = place_order(campaign, selected_product_ids, selected_sizes, verdict=verdict, **order_fields)
     except Exception as e:
+        # Başarısız istek anahtarı tutmaz; müşteri düzeltip tekrar deneyebilir
+        if record:
+            idempotency.release(record)
+        if isinstance(e, abuse.Rejected):
+            return _rejected()
+        if isinstance(e, ValueError):
+            return HttpResponse(str(e), status=400)
+        if isinstance(e, OperationalError) and is_lock_error(e):
+            # Yeniden denemelere rağmen kilit alınamadı: geçici yoğunluk
+            return HttpResponse("Şu an yoğunluk var, lütfen birkaç saniye sonra tekrar deneyin.", status=503)
         return HttpResponse("Sipariş oluşturulurken bir hata oluştu.", status=500)
-    
+
+    if record:
+        idempotency.complete(record, order=order)
+    return _redirect_to_success(request, order_id=order.id)
+
+
+def _rejected():
+    return HttpResponse("Siparişiniz alınamadı. Lütfen müşteri hizmetlerimizle iletişime geçin.", status=403)
+
+
+def _redirect_to_success(request, order_id=None, intake_token=None):
     # Siparişi session'a kaydet (success sayfası için)
-    request.session['last_order_id'] = order.id
+    if intake_token:
+        request.session.pop('last_order_id', None)
+        request.session['intake_token'] = str(intake_token)
+    else:
+        request.session.pop('intake_token', None)
+        request.session['last_order_id'] = order_id
     request.session['order_completed'] = True
-    
+
     # Başarılı olursa HTMX ile yönlendir
     response = HttpResponse()
     response['HX-Redirect'] = '/orders/success/'
     return response
 
+
+def _replay(request, record):
+    """Aynı tekrar anahtarıyla gelen istek: transaction çalıştırmadan ilk sonuca yönlendirir."""
+    if record.order_id:
+        return _redirect_to_success(request, order_id=record.order_id)
+    if record.intake_id:
+        return _redirect_to_success(request, intake_token=record.intake.token)
+    return HttpResponse("Siparişiniz işleniyor, lütfen bekleyin.", status=409)
+
+@require_POST
+def hold_stock(request):
+    """
+    Kampanya sayfasındaki seçimi oturuma kısa süreli ayırır (orders.holds).
+    Seçim her değiştiğinde tüm seçim gönderilir; stoğu yetmeyen ürünler döner.
+    """
+    # Seçim her değişiklikte gönderildiği için sipariş limitinin katı kadar istek
+    limited = _rate_limited(request, 'hold', factor=getattr(django_settings, 'STOCK_HOLD_RATE_FACTOR', 10))
+    if limited:
+        return limited
+
+    campaign = get_object_or_404(Campaign, id=request.POST.get('campaign_id'), is_active=True)
+    try:
+        product_ids = [int(pid) for pid in request.POST.getlist('selected_products[]')]
+    except ValueError:
+        return HttpResponse("Geçersiz ürün ID formatı.", status=400)
+
+    # Oturum başına en fazla kampanyanın sipariş adedi kadar, ürün başına en fazla
+    # STOCK_HOLD_MAX_PER_PRODUCT adet ayrılabilir
+    valid_product_ids = set(
+        CampaignProduct.objects.filter(campaign=campaign).values_list('product_id', flat=True)
+    )
+    if (
+        len(product_ids) > campaign.min_quantity
+        or not set(product_ids).issubset(valid_product_ids)
+        or any(product_ids.count(pid) > getattr(django_settings, 'STOCK_HOLD_MAX_PER_PRODUCT', 3) for pid in set(product_ids))
+    ):
+        return HttpResponse("Geçersiz ürün seçimi.", status=400)
+
+    if not request.session.session_key:
+        request.session.create()
+    holds.maybe_sweep()
+    held, unavailable = holds.hold(request.session.session_key, product_ids, scope=valid_product_ids)
+    return JsonResponse({
+        'held': held,
+        'unavailable': unavailable,
+        'expires_in': holds.hold_ttl(),
+    })
+
 def order_success(request):
     # Session kontrolü - sadece sipariş sonrası göster
     if not request.session.get('order_completed'):
         return redirect('home')
     
+    # Ön kayıt (yoğun satış modu): sipariş oluşana kadar bekleme sayfası
+    token = request.session.get('intake_token')
+    if token and not request.session.get('last_order_id'):
+        entry = OrderIntake.objects.filter(token=token).first()
+        if entry is None:
+            return redirect('home')
+        if entry.status == 'pending':
+            if request.headers.get('HX-Request'):
+                return HttpResponse(status=204)
+            return render(request, 'orders/processing.html', {'intake': entry})
+        if request.headers.get('HX-Request'):
+            # Sonuç belli: sayfa tamamen yenilenir
+            response = HttpResponse()
+            response['HX-Refresh'] = 'true'
+            return response
+        request.session.pop('intake_token', None)
+        if entry.status == 'failed':
+            request.session.pop('order_completed', None)
+            return render(request, 'orders/processing.html', {'intake': entry})
+        request.session['last_order_id'] = entry.order_id
+
     # Order ID'yi session'dan al
     order_id = request.session.get('last_order_id')
     if not order_id:
@@ -214,97 +297,21 @@ def order_success(request):
     
     return render(request, 'orders/success.html', context)
     
-def social_proof_api(request):
+async def social_proof_api(request):
     """
     Returns a random real order for the social proof widget.
+    Veritabanına gitmez; orders.social_proof cache akışından (async cache API) okunur.
     """
-    # Get last 20 orders
-    recent_orders = Order.objects.filter(
-        status__in=['new', 'processing', 'shipped', 'delivered']
-    ).select_related('city_fk').prefetch_related('items__product__images').order_by('-created_at')[:20]
-    
-    if not recent_orders.exists():
+    entry = await social_proof.arandom_entry()
+    if entry is None:
         # Fallback if no orders exist yet
-        return JsonResponse({}, status=404)
-
-    # Pick a random order
-    order = random.choice(recent_orders)
-    
-    # Mask Name (Ayşe Yıl***)
-    full_name = order.customer_name.strip()
-    parts = full_name.split()
-    masked_name = ""
-    
-    if len(parts) >= 2:
-        first_name = parts[0]
-        last_name = parts[-1]
-        
-        if len(last_name) > 2:
-            masked_last = last_name[:2] + "***"
-        else:
-            masked_last = last_name[0] + "***"
-            
-        masked_name = f"{first_name} {masked_last}"
-    else:
-        # Single name
-        name = parts[0]
-        if len(name) > 2:
-            masked_name = name[:2] + "***"
-        else:
-            masked_name = name + "***"
-            
-    # Location
-    location = ""
-    if order.city_fk:
-        location = order.city_fk.name
-    elif order.city:
-        location = order.city
-    else:
-        location = "Türkiye"
-        
-    # Product
-    product_item = order.items.first()
-    product_name = "Ürün"
-    product_image = "/static/images/placeholder.jpg"
-    product_desc = ""
-    
-    if product_item:
-        product = product_item.product
-        product_name = product.name
-        if product.images.exists():
-            product_image = product.images.first().image.url
-            
-        if product.description:
-            desc = product.description
-            if len(desc) > 50:
-                desc = desc[:47] + "..."
-            product_desc = desc
-            
-    # Time Ago
-    now = timezone.now()
-    diff = now - order.created_at
-    
-    if diff.total_seconds() < 300: # Less than 5 minutes
-        time_ago = "Şimdi"
+        response = JsonResponse({}, status=404)
     else:
-        time_ago = timesince(order.created_at).split(',')[0] # "1 minute" or "2 hours"
-        
-        # Translate common time strings if needed (basic mapping)
-        time_ago = time_ago.replace('minutes', 'dakika').replace('minute', 'dakika')
-        time_ago = time_ago.replace('hours', 'saat').replace('hour', 'saat')
-        time_ago = time_ago.replace('days', 'gün').replace('day', 'gün')
-        time_ago = f"{time_ago} önce"
-
-    data = {
-        "name": masked_name,
-        "location": location,
-        "product_name": product_name,
-        "product_image": product_image,
-        "product_description": product_desc,
-        "time_ago": time_ago
-    }
-    
-    return JsonResponse(data)
+        response = JsonResponse(entry)
+
+    # Widget 8-15 sn arayla poll eder; kısa süreli paylaşımlı cache yeterli
+    patch_cache_control(response, public=True, max_age=10)
+    return response
 
 from django.db.models import Q
 
@@ -0,0 +1,39 @@
+from django.core.management.base import BaseCommand
+
+from campaigns.models import Campaign
+from gumbuz_shop.images import ensure_variants
+from products.models import ProductImage
+
+
+class Command(BaseCommand):
+    help = 'Ürün görselleri ve kampanya bannerları için eksik boyutlandırılmış türevleri (WebP/JPEG) üretir'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--force',
+            action='store_true',
+            help='Kayıtlı türev bilgisi olsa da kaynağı yeniden oku (silinmiş türev dosyaları için)'
+        )
+
+    def build(self, queryset, field_name, variants_field, force):
+        built = failed = 0
+        for instance in queryset.iterator(chunk_size=200):
+            if force:
+                setattr(instance, variants_field, {})
+            elif getattr(instance, variants_field).get('source') == getattr(instance, field_name).name:
+                continue
+            if ensure_variants(instance, field_name, variants_field):
+                built += 1
+            else:
+                failed += 1
+        return built, failed
+
+    def handle(self, *args, **options):
+        force = options['force']
+
+        built, failed = self.build(ProductImage.objects.all(), 'image', 'variants', force)
+        self.stdout.write(self.style.SUCCESS(f'Ürün görseli: {built} işlendi, {failed} başarısız'))
+
+        campaigns = Campaign.objects.exclude(banner_image='').exclude(banner_image=None)
+        built, failed = self.build(campaigns, 'banner_image', 'banner_variants', force)
+        self.stdout.write(self.style.SUCCESS(f'Kampanya banner: {built} işlendi, {failed} başarısız'))
@@ -0,0 +1,48 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from gumbuz_shop.utils import benchmark_data
+
+
+class Command(BaseCommand):
+    help = 'Benchmark için deterministik, internetsiz büyük veri seti oluşturur'
+
+    def add_arguments(self, parser):
+        defaults = benchmark_data.DatasetSize()
+        parser.add_argument('--campaigns', type=int, default=defaults.campaigns, help='Kampanya sayısı')
+        parser.add_argument('--products', type=int, default=defaults.products, help='Ürün sayısı')
+        parser.add_argument('--products-per-campaign', type=int, default=defaults.products_per_campaign, help='Kampanya başına ürün')
+        parser.add_argument('--images-per-product', type=int, default=defaults.images_per_product, help='Ürün başına görsel')
+        parser.add_argument('--image-pool', type=int, default=defaults.image_pool, help='Üretilecek farklı placeholder görsel sayısı')
+        parser.add_argument('--cities', type=int, default=defaults.cities, help='İl sayısı')
+        parser.add_argument('--districts-per-city', type=int, default=defaults.districts_per_city, help='İl başına ilçe')
+        parser.add_argument('--neighborhoods-per-district', type=int, default=defaults.neighborhoods_per_district, help='İlçe başına mahalle')
+        parser.add_argument('--orders', type=int, default=defaults.orders, help='Sipariş sayısı')
+        parser.add_argument('--days', type=int, default=defaults.days, help='Siparişlerin yayılacağı gün sayısı')
+        parser.add_argument('--seed', type=int, default=1, help='Deterministik üretim için seed')
+        parser.add_argument('--reset', action='store_true', help='Önceki benchmark verisini siler')
+
+    def handle(self, *args, **options):
+        if options['reset']:
+            self.stdout.write(self.style.WARNING('Önceki benchmark verisi siliniyor...'))
+            benchmark_data.reset()
+
+        size = benchmark_data.DatasetSize(
+            campaigns=options['campaigns'],
+            products=options['products'],
+            products_per_campaign=options['products_per_campaign'],
+            images_per_product=options['images_per_product'],
+            image_pool=options['image_pool'],
+            cities=options['cities'],
+            districts_per_city=options['districts_per_city'],
+            neighborhoods_per_district=options['neighborhoods_per_district'],
+            orders=options['orders'],
+            days=options['days'],
+        )
+        start = time.perf_counter()
+        counts = benchmark_data.generate(size, seed=options['seed'], log=self.stdout.write)
+
+        self.stdout.write(self.style.SUCCESS(f'\n=== Benchmark Verisi ({time.perf_counter() - start:.1f} sn) ==='))
+        for name, count in counts.items():
+            self.stdout.write(f'{name}: {count}')
@@ -2,6 +2,7 @@ from django.core.management.base import BaseCommand
 from products.models import Product, ProductImage
 from campaigns.models import Campaign, CampaignProduct, SizeOption
 from orders.models import Order, OrderItem
+from orders import counters
 from django.core.files.base import ContentFile
 from django.utils.text import slugify
 import requests
@@ -172,4 +173,6 @@ class Command(BaseCommand):
                     selected_size="38 (M)"
                 )
 
+        counters.refresh_all()
+
         self.stdout.write(self.style.SUCCESS('Database seeded successfully!'))
@@ -0,0 +1,28 @@
+# Generated by Django 5.2.6 on 2026-10-19 16:03
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('products', '0002_alter_product_options_alter_productimage_options_and_more'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='product',
+            name='campaign_count',
+            field=models.PositiveIntegerField(db_index=True, default=0, editable=False, verbose_name='Kampanya Sayısı'),
+        ),
+        migrations.AddField(
+            model_name='product',
+            name='revenue',
+            field=models.DecimalField(db_index=True, decimal_places=2, default=0, editable=False, max_digits=14, verbose_name='Ciro'),
+        ),
+        migrations.AddField(
+            model_name='product',
+            name='sales_count',
+            field=models.PositiveIntegerField(db_index=True, default=0, editable=False, verbose_name='Satış Adedi'),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.6 on 2026-10-19 16:19
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('products', '0003_product_campaign_count_product_revenue_and_more'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='productimage',
+            name='variants',
+            field=models.JSONField(blank=True, default=dict, editable=False, verbose_name='Görsel Türevleri'),
+        ),
+    ]
@@ -1,5 +1,7 @@
 from django.db import models
 
+from gumbuz_shop.images import ResponsiveImage
+
 class Product(models.Model):
     name = models.CharField(max_length=255, verbose_name="Ürün Adı")
     sku = models.CharField(max_length=100, unique=True, verbose_name="Stok Kodu (SKU)")
@@ -7,6 +9,13 @@ class Product(models.Model):
     is_active = models.BooleanField(default=True, verbose_name="Aktif mi?")
     stock_qty = models.IntegerField(default=0, verbose_name="Stok Adedi")
 
+    # Denormalize sayaçlar (orders.counters tarafından güncellenir)
+    campaign_count = models.PositiveIntegerField(default=0, db_index=True, editable=False, verbose_name="Kampanya Sayısı")
+    sales_count = models.PositiveIntegerField(default=0, db_index=True, editable=False, verbose_name="Satış Adedi")
+    revenue = models.DecimalField(max_digits=14, decimal_places=2, default=0, db_index=True, editable=False, verbose_name="Ciro")
+
+    COUNTER_FIELDS = ('campaign_count', 'sales_count', 'revenue')
+
     class Meta:
         verbose_name = "Ürün"
         verbose_name_plural = "Ürünler"
@@ -14,10 +23,21 @@ class Product(models.Model):
     def __str__(self):
         return self.name
 
+    def save(self, *args, **kwargs):
+        # Sayaçlar tam save ile eski değerlerine geri yazılmasın
+        if not self._state.adding and kwargs.get('update_fields') is None and not kwargs.get('force_insert'):
+            kwargs['update_fields'] = [
+                f.name for f in self._meta.concrete_fields
+                if not f.primary_key and f.name not in self.COUNTER_FIELDS
+            ]
+        super().save(*args, **kwargs)
+
 class ProductImage(models.Model):
     product = models.ForeignKey(Product, on_delete=models.CASCADE, related_name='images', verbose_name="Ürün")
     image = models.ImageField(upload_to='products/', verbose_name="Görsel")
     sort_order = models.IntegerField(default=0, verbose_name="Sıralama")
+    # Boyutlandırılmış türevler (gumbuz_shop.images)
+    variants = models.JSONField(default=dict, blank=True, editable=False, verbose_name="Görsel Türevleri")
 
     class Meta:
         ordering = ['sort_order']
@@ -26,3 +46,14 @@ class ProductImage(models.Model):
 
     def __str__(self):
         return f"{self.product.name} Görseli"
+
+    def save(self, *args, **kwargs):
+        super().save(*args, **kwargs)
+        if self.image and self.variants.get('source') != self.image.name:
+            # Doğrulama/sıkıştırma/türevler arka planda (admin_panel.image_jobs)
+            from admin_panel.image_jobs import enqueue
+            enqueue(self, 'image', 'variants')
+
+    @property
+    def responsive(self):
+        return ResponsiveImage(self.image, self.variants)
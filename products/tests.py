@@ -1,4 +1,15 @@
-from django.test import TestCase
+from io import BytesIO, StringIO
+
+from django.core.files.storage import default_storage
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.test import RequestFactory, TestCase
+from PIL import Image
+
+from admin_panel import image_jobs
+from campaigns.models import Campaign
+from gumbuz_shop import images
+from gumbuz_shop.testing import TempDirMixin
 from .models import Product, ProductImage
 
 class ProductModelTest(TestCase):
@@ -61,3 +72,86 @@ class ProductImageModelTest(TestCase):
         images = list(self.product.images.all())
         self.assertEqual(images[0], self.image2)  # sort_order=1
         self.assertEqual(images[1], self.image1)  # sort_order=2
+
+
+def make_upload(name="foto.jpg", size=(2000, 1000), color=(200, 30, 90)):
+    buffer = BytesIO()
+    Image.new("RGB", size, color).save(buffer, "JPEG")
+    return SimpleUploadedFile(name, buffer.getvalue(), content_type="image/jpeg")
+
+
+class ImageVariantTest(TempDirMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        self.product = Product.objects.create(name="Görselli Ürün", sku="VAR-1")
+
+    def create_image(self, **kwargs):
+        image = ProductImage.objects.create(product=self.product, **kwargs)
+        image_jobs.run_pending()  # testte on_commit çalışmaz; kuyruk elle boşaltılır
+        image.refresh_from_db()
+        return image
+
+    def test_variants_generated_by_job(self):
+        image = self.create_image(image=make_upload())
+
+        self.assertEqual(image.variants["source"], image.image.name)
+        self.assertEqual(image.variants["sizes"]["card"], [480, 240])
+        self.assertEqual(image.variants["sizes"]["og"], [1200, 630])
+        for variant in images.VARIANTS:
+            for ext in images.FORMATS:
+                self.assertTrue(default_storage.exists(images.variant_name(image.variants["hash"], variant, ext)))
+
+        responsive = image.responsive
+        self.assertTrue(responsive.card.endswith("-card.jpg"))
+        self.assertEqual(responsive.srcset_webp.count("w, "), 2)
+        self.assertIn(" 1600w", responsive.srcset)
+
+    def test_small_source_is_not_upscaled(self):
+        image = self.create_image(image=make_upload(size=(300, 400)))
+        self.assertEqual(image.variants["sizes"]["lightbox"], [300, 400])
+        # thumb 160w + kaynak ölçüsü; card ve lightbox aynı genişlikte tek girdi
+        self.assertEqual(image.responsive.srcset.count("w"), 2)
+
+    def test_same_content_is_stored_once(self):
+        first = self.create_image(image=make_upload("a.jpg"))
+        second = self.create_image(image=make_upload("b.JPG"))
+        self.assertEqual(first.image.name, second.image.name)
+        self.assertRegex(first.image.name, r"^products/([0-9a-f]{2})/\1[0-9a-f]{30}\.jpg$")
+        self.assertEqual(first.variants["hash"], second.variants["hash"])
+        self.assertEqual(first.responsive.card, second.responsive.card)
+
+    def test_different_content_gets_different_name(self):
+        first = self.create_image(image=make_upload("a.jpg"))
+        second = self.create_image(image=make_upload("a.jpg", color=(0, 0, 0)))
+        self.assertNotEqual(first.image.name, second.image.name)
+
+    def test_immutable_media_response(self):
+        from gumbuz_shop.storage import serve_media
+
+        image = self.create_image(image=make_upload())
+        request = RequestFactory().get("/media/" + image.image.name)
+        response = serve_media(request, image.image.name, document_root=self.temp_dir)
+        self.assertIn("immutable", response["Cache-Control"])
+        self.assertIn("max-age=31536000", response["Cache-Control"])
+
+        response = serve_media(RequestFactory().get("/media/x"), image.responsive.card[len("/media/"):], document_root=self.temp_dir)
+        self.assertIn("immutable", response["Cache-Control"])
+
+    def test_missing_file_falls_back_to_original(self):
+        image = self.create_image(image="products/yok.jpg")
+        self.assertEqual(image.variants, {})
+        self.assertEqual(image.responsive.card, image.image.url)
+        self.assertEqual(image.responsive.srcset, "")
+
+    def test_campaign_banner_and_command(self):
+        campaign = Campaign.objects.create(title="Banner", slug="banner", price=100, banner_image=make_upload())
+        image_jobs.run_pending()
+        campaign.refresh_from_db()
+        self.assertTrue(campaign.banner.og.endswith("-og.jpg"))
+
+        Campaign.objects.filter(pk=campaign.pk).update(banner_variants={})
+        out = StringIO()
+        call_command("build_image_variants", stdout=out)
+        self.assertIn("Kampanya banner: 1 işlendi", out.getvalue())
+        campaign.refresh_from_db()
+        self.assertEqual(campaign.banner_variants["source"], campaign.banner_image.name)